@@ -13,19 +13,92 @@ Fecha: Julio 2025
 """
 
 import dash
-from dash import Dash, html, dcc, callback, Input, Output, State
+from dash import Dash, html, dcc, callback, ctx, Input, Output, State
 import dash_bootstrap_components as dbc
+from flask import abort
 import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
-import sqlite3
 import json
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+from dashboard.utils.data_service import enable_copy_on_write
+from dashboard.utils.db_pool import Query, ReadOnlyPool
+from dashboard.utils.figure_cache import DISK_DIR, diagnostics_enabled, figure_cache, memoize_figure, normalize
+from dashboard.utils.map_render import (
+    PROBLEM_INDEX, PROBLEM_SCALE, Viewport, fit_viewport, map_figure, map_layer,
+    valid_coordinates, viewport_from_relayout
+)
+
+# Copy-on-write para todo el proceso (misma configuración que app_multipagina)
+enable_copy_on_write()
 
 # Configuración de paths
 DB_PATH = Path(__file__).parent.parent / "data" / "database" / "edersa_quality.db"
 MAPBOX_TOKEN = None  # Agregar token si se tiene
+CRITICIDAD_SUCURSAL_MINIMA = 0.3
+
+# Consultas del dashboard (SQL fijo, preparado una vez por conexión)
+db = ReadOnlyPool(DB_PATH, [
+    Query('metricas', """
+    SELECT * FROM metricas_resumen 
+    ORDER BY fecha_actualizacion DESC 
+    LIMIT 1
+    """),
+    Query('calidad', """
+    SELECT resultado, COUNT(*) as cantidad
+    FROM transformadores
+    WHERE resultado IS NOT NULL
+    GROUP BY resultado
+    """),
+    Query('criticidad_zonas', """
+    SELECT tipo_zona, AVG(criticidad_compuesta) as criticidad_promedio
+    FROM transformadores
+    WHERE tipo_zona IS NOT NULL
+    GROUP BY tipo_zona
+    ORDER BY criticidad_promedio DESC
+    """),
+    Query('mapa', """
+    SELECT codigoct, coord_x, coord_y, n_sucursal, n_localida,
+           potencia, q_usuarios, resultado, criticidad_compuesta
+    FROM transformadores
+    WHERE coord_x IS NOT NULL AND coord_y IS NOT NULL
+    """),
+    Query('sucursales_criticas', """
+    SELECT n_sucursal, criticidad_promedio, num_transformadores, usuarios_totales
+    FROM sucursales
+    WHERE criticidad_promedio > ?
+    ORDER BY criticidad_promedio DESC
+    LIMIT 10
+    """),
+    Query('sucursales', "SELECT DISTINCT n_sucursal FROM transformadores WHERE n_sucursal IS NOT NULL ORDER BY n_sucursal"),
+    Query('tipos_gd', """
+    SELECT gd_type_recommended as tipo, COUNT(*) as cantidad
+    FROM transformadores
+    WHERE gd_type_recommended IS NOT NULL
+    GROUP BY gd_type_recommended
+    """),
+    Query('recomendaciones_gd', """
+    SELECT 
+        r.codigoct as "Código",
+        t.n_sucursal as "Sucursal",
+        t.n_localida as "Localidad",
+        r.score as "Score GD",
+        r.prioridad as "Prioridad",
+        r.capacidad_actual_kva as "Capacidad (kVA)",
+        r.capacidad_gd_kw as "GD Recom. (kW)",
+        r.tipo_gd_recomendado as "Tipo GD"
+    FROM recomendaciones_gd r
+    JOIN transformadores t ON r.codigoct = t.codigoct
+    ORDER BY r.score DESC
+    LIMIT 20
+    """),
+])
+
+# Consultas de los callbacks de la página principal (mismo evento de URL)
+OVERVIEW_QUERIES = ('calidad', 'criticidad_zonas', 'mapa', 'sucursales_criticas')
 
 # Inicializar aplicación
 app = Dash(
@@ -35,6 +108,22 @@ app = Dash(
     title="EDERSA - Análisis de Calidad"
 )
 
+# Figuras memorizadas por versión de la base (compartidas entre workers vía disco)
+figure_cache.enable_disk(DISK_DIR)
+
+
+@app.server.route('/cache-stats')
+def cache_stats():
+    """Contadores de la caché de figuras y de la base (diagnóstico, ver diagnostics_enabled)"""
+    if not diagnostics_enabled(app.server):
+        abort(404)
+    return {'figuras': figure_cache.stats(), 'base': db.stats()}
+
+
+def database_digest():
+    """Versión de la base de datos de la que salen las figuras"""
+    return [DB_PATH.name, db.version()]
+
 # Estilos personalizados
 CARD_STYLE = {
     "box-shadow": "0 4px 6px 0 rgba(0, 0, 0, 0.1)",
@@ -51,20 +140,18 @@ METRIC_CARD_STYLE = {
 
 
 def get_db_connection():
-    """Obtiene conexión a la base de datos."""
-    return sqlite3.connect(DB_PATH)
+    """Conexión de solo lectura prestada por el pool; usar con `with` para devolverla."""
+    return db.connection()
+
+
+def load_overview_data():
+    """Resultados de la página principal: una sola ronda de consultas por versión de la base."""
+    return db.round(OVERVIEW_QUERIES, params={'sucursales_criticas': [CRITICIDAD_SUCURSAL_MINIMA]})
 
 
 def load_summary_metrics():
     """Carga métricas resumen desde la base de datos."""
-    conn = get_db_connection()
-    query = """
-    SELECT * FROM metricas_resumen 
-    ORDER BY fecha_actualizacion DESC 
-    LIMIT 1
-    """
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    df = db.query('metricas')
     
     if len(df) > 0:
         return df.iloc[0].to_dict()
@@ -252,18 +339,10 @@ def create_overview_page():
     Output('quality-distribution-chart', 'figure'),
     Input('url', 'pathname')
 )
+@memoize_figure(digest=database_digest, ignore=(0,))
 def update_quality_distribution(pathname):
     """Actualiza gráfico de distribución de calidad."""
-    conn = get_db_connection()
-    
-    query = """
-    SELECT resultado, COUNT(*) as cantidad
-    FROM transformadores
-    WHERE resultado IS NOT NULL
-    GROUP BY resultado
-    """
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    df = load_overview_data()['calidad']
     
     # Colores personalizados
     colors = {
@@ -294,19 +373,10 @@ def update_quality_distribution(pathname):
     Output('criticality-zones-chart', 'figure'),
     Input('url', 'pathname')
 )
+@memoize_figure(digest=database_digest, ignore=(0,))
 def update_criticality_zones(pathname):
     """Actualiza gráfico de criticidad por zona."""
-    conn = get_db_connection()
-    
-    query = """
-    SELECT tipo_zona, AVG(criticidad_compuesta) as criticidad_promedio
-    FROM transformadores
-    WHERE tipo_zona IS NOT NULL
-    GROUP BY tipo_zona
-    ORDER BY criticidad_promedio DESC
-    """
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    df = load_overview_data()['criticidad_zonas']
     
     fig = px.bar(
         df,
@@ -326,71 +396,55 @@ def update_criticality_zones(pathname):
     return fig
 
 
+@lru_cache(maxsize=1)
+def load_map_points(version):
+    """Transformadores con coordenadas para el mapa (una lectura por versión de la base)."""
+    df = valid_coordinates(load_overview_data()['mapa'], 'coord_x', 'coord_y')
+    # Indicador de problema por estado (color de puntos y promedio de celdas)
+    df['indice_problemas'] = df['resultado'].map(PROBLEM_INDEX)
+    return df
+
+
+@memoize_figure(digest=database_digest)
+def render_transformers_map(viewport_key):
+    """Mapa de la vista (redondeada): puntos visibles o celdas agregadas."""
+    df = load_map_points(normalize(database_digest()))
+    viewport = Viewport.from_key(viewport_key)
+    
+    trace = map_layer(
+        df, viewport, df['indice_problemas'],
+        hover_fields=[
+            ('Código', 'codigoct', ''),
+            ('Sucursal', 'n_sucursal', ''),
+            ('Localidad', 'n_localida', ''),
+            ('Potencia (kVA)', 'potencia', ''),
+            ('Usuarios', 'q_usuarios', ''),
+            ('Estado', 'resultado', ''),
+            ('Criticidad', 'criticidad_compuesta', ':.2f')
+        ],
+        color_label='Problemas',
+        sum_fields=[('Usuarios', 'q_usuarios'), ('Potencia (kVA)', 'potencia')],
+        lon_column='coord_x',
+        lat_column='coord_y'
+    )
+    return map_figure(trace, viewport, PROBLEM_SCALE, 'Problemas')
+
+
 @app.callback(
     Output('transformers-map', 'figure'),
-    Input('url', 'pathname')
+    Input('url', 'pathname'),
+    Input('transformers-map', 'relayoutData')
 )
-def update_transformers_map(pathname):
-    """Actualiza mapa de transformadores."""
-    conn = get_db_connection()
-    
-    query = """
-    SELECT codigoct, coord_x, coord_y, n_sucursal, n_localida,
-           potencia, q_usuarios, resultado, criticidad_compuesta
-    FROM transformadores
-    WHERE coord_x IS NOT NULL AND coord_y IS NOT NULL
-    """
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    
-    # Colores según resultado
-    color_map = {
-        'Correcta': 'green',
-        'Penalizada': 'orange',
-        'Fallida': 'red'
-    }
-    df['color'] = df['resultado'].map(color_map).fillna('gray')
-    
-    # Crear mapa
-    fig = go.Figure()
+def update_transformers_map(pathname, relayout_data):
+    """Actualiza mapa de transformadores según la vista (zoom y posición)."""
+    df = load_map_points(normalize(database_digest()))
     
-    # Agregar puntos
-    fig.add_trace(go.Scattermapbox(
-        lat=df['coord_y'],
-        lon=df['coord_x'],
-        mode='markers',
-        marker=dict(
-            size=8,
-            color=df['color'],
-            opacity=0.8
-        ),
-        text=df.apply(lambda row: f"""
-        <b>{row['codigoct']}</b><br>
-        Sucursal: {row['n_sucursal']}<br>
-        Localidad: {row['n_localida']}<br>
-        Potencia: {row['potencia']} kVA<br>
-        Usuarios: {row['q_usuarios']}<br>
-        Estado: {row['resultado']}<br>
-        Criticidad: {row['criticidad_compuesta']:.2f}
-        """, axis=1),
-        hovertemplate='%{text}<extra></extra>'
-    ))
+    # Vista inicial: toda la red; al mover el mapa, la vista del usuario
+    viewport = fit_viewport(df['coord_x'], df['coord_y'])
+    if ctx.triggered_id == 'transformers-map':
+        viewport = viewport_from_relayout(relayout_data, viewport)
     
-    # Configurar layout del mapa
-    fig.update_layout(
-        mapbox=dict(
-            style="carto-positron",
-            center=dict(
-                lat=df['coord_y'].mean(),
-                lon=df['coord_x'].mean()
-            ),
-            zoom=6
-        ),
-        margin=dict(l=0, r=0, t=0, b=0),
-        height=500
-    )
-    
-    return fig
+    return render_transformers_map(viewport.snapped().as_key())
 
 
 @app.callback(
@@ -399,17 +453,7 @@ def update_transformers_map(pathname):
 )
 def update_critical_branches_table(pathname):
     """Actualiza tabla de sucursales críticas."""
-    conn = get_db_connection()
-    
-    query = """
-    SELECT n_sucursal, criticidad_promedio, num_transformadores, usuarios_totales
-    FROM sucursales
-    WHERE criticidad_promedio > 0.3
-    ORDER BY criticidad_promedio DESC
-    LIMIT 10
-    """
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    df = load_overview_data()['sucursales_criticas']
     
     if len(df) == 0:
         return html.P("No hay sucursales críticas", className="text-muted")
@@ -617,10 +661,7 @@ def update_sucursal_options(pathname):
     if pathname != '/analysis':
         return []
     
-    conn = get_db_connection()
-    query = "SELECT DISTINCT n_sucursal FROM transformadores WHERE n_sucursal IS NOT NULL ORDER BY n_sucursal"
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    df = db.query('sucursales')
     
     return [{'label': s, 'value': s} for s in df['n_sucursal']]
 
@@ -634,15 +675,7 @@ def update_gd_types_chart(pathname):
     if pathname != '/gd':
         return {}
     
-    conn = get_db_connection()
-    query = """
-    SELECT gd_type_recommended as tipo, COUNT(*) as cantidad
-    FROM transformadores
-    WHERE gd_type_recommended IS NOT NULL
-    GROUP BY gd_type_recommended
-    """
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    df = db.query('tipos_gd')
     
     fig = px.bar(
         df,
@@ -669,24 +702,7 @@ def update_gd_recommendations_table(pathname):
     if pathname != '/gd':
         return []
     
-    conn = get_db_connection()
-    query = """
-    SELECT 
-        r.codigoct as "Código",
-        t.n_sucursal as "Sucursal",
-        t.n_localida as "Localidad",
-        r.score as "Score GD",
-        r.prioridad as "Prioridad",
-        r.capacidad_actual_kva as "Capacidad (kVA)",
-        r.capacidad_gd_kw as "GD Recom. (kW)",
-        r.tipo_gd_recomendado as "Tipo GD"
-    FROM recomendaciones_gd r
-    JOIN transformadores t ON r.codigoct = t.codigoct
-    ORDER BY r.score DESC
-    LIMIT 20
-    """
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    df = db.query('recomendaciones_gd').copy()
     
     # Formatear números
     df['Score GD'] = df['Score GD'].round(3)
@@ -16,6 +16,7 @@ Basado en los hallazgos de Fase 0 y el análisis eléctrico extendido.
 import dash
 from dash import Dash, html, dcc, page_container
 import dash_bootstrap_components as dbc
+from flask import abort
 from pathlib import Path
 import sys
 
@@ -23,9 +24,14 @@ import sys
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
+# Copy-on-write antes de cargar datasets: las páginas reciben vistas del servicio de datos
+from dashboard.utils.data_service import data_service, enable_copy_on_write
+enable_copy_on_write()
+
 # Importar componentes
 from dashboard.components.navbar import create_navbar
 from dashboard.components.sidebar import create_sidebar
+from dashboard.utils.figure_cache import DISK_DIR, diagnostics_enabled, figure_cache
 
 # Inicializar aplicación Dash con páginas
 app = Dash(
@@ -44,6 +50,17 @@ app = Dash(
 # Configurar el servidor para deployment
 server = app.server
 
+# Figuras memorizadas compartidas entre workers y reinicios (ver figure_cache)
+figure_cache.enable_disk(DISK_DIR)
+
+
+@server.route('/cache-stats')
+def cache_stats():
+    """Contadores de la caché de figuras y estado de los datasets (diagnóstico, ver diagnostics_enabled)"""
+    if not diagnostics_enabled(server):
+        abort(404)
+    return {'figuras': figure_cache.stats(), 'datasets': data_service.stats()}
+
 # Estilos CSS personalizados
 app.index_string = '''
 <!DOCTYPE html>
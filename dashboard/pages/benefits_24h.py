@@ -9,7 +9,6 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
-import json
 from pathlib import Path
 
 # Registrar página
@@ -22,56 +21,55 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 from dashboard.components.metrics_cards import (
     create_metric_card, create_summary_card, create_alert_card
 )
+from dashboard.utils.data_service import data_service, read_csv, read_json
 
 # Cargar datos
-def load_benefits_24h_data():
-    """Carga los datos de beneficios 24h"""
-    base_path = Path(__file__).parent.parent.parent
-    
-    # Cargar beneficios técnicos
-    benefits_file = base_path / "reports" / "clustering" / "benefits_24h" / "technical_benefits_24h.csv"
-    if benefits_file.exists():
-        df_benefits = pd.read_csv(benefits_file)
-    else:
-        # Datos de ejemplo si no existe el archivo
-        df_benefits = pd.DataFrame({
-            'cluster_id': range(15),
-            'perfil_dominante': np.random.choice(['Comercial', 'Residencial', 'Mixto', 'Industrial'], 15),
-            'gd_mw': np.random.uniform(1, 35, 15),
-            'n_usuarios': np.random.randint(1000, 70000, 15),
-            'voltage_improvement_pct': np.random.uniform(3, 5, 15),
-            'night_voltage_improvement_pct': np.random.uniform(2, 4, 15),
-            'voltage_improvement_24h_pct': np.random.uniform(3.5, 4.5, 15),
-            'loss_reduction_pct': np.random.uniform(0.3, 0.8, 15),
-            'loss_reduction_24h_pct': np.random.uniform(0.4, 0.6, 15),
-            'power_factor_final': np.random.uniform(0.91, 0.94, 15),
-            'operation_mode': np.random.choice(['Solar-Optimized', 'STATCOM-Optimized', 'Balanced 24h'], 15),
-            'benefit_score_24h': np.random.uniform(0.4, 0.6, 15),
-            'total_energy_value_mwh_year': np.random.uniform(5000, 50000, 15)
-        })
-    
-    # Cargar reporte JSON
-    report_file = base_path / "reports" / "clustering" / "benefits_24h" / "technical_benefits_24h_report.json"
-    if report_file.exists():
-        with open(report_file, 'r', encoding='utf-8') as f:
-            report = json.load(f)
-    else:
-        report = {
-            'summary': {
-                'avg_voltage_improvement_24h': 4.42,
-                'avg_loss_reduction_24h': 0.49,
-                'avg_power_factor_improvement': 0.081,
-                'total_energy_value_gwh_year': 216.9
-            },
-            'economic_benefits': {
-                'energy_displacement_value_musd': 9.0,
-                'reactive_support_value_musd': 3.0,
-                'loss_reduction_savings_musd': 1.5,
-                'total_annual_benefits_musd': 15.0
-            }
+BENEFITS_24H_DIR = Path(__file__).parent.parent.parent / "reports" / "clustering" / "benefits_24h"
+
+def example_benefits_24h():
+    """Beneficios de ejemplo si no existe el archivo"""
+    return pd.DataFrame({
+        'cluster_id': range(15),
+        'perfil_dominante': np.random.choice(['Comercial', 'Residencial', 'Mixto', 'Industrial'], 15),
+        'gd_mw': np.random.uniform(1, 35, 15),
+        'n_usuarios': np.random.randint(1000, 70000, 15),
+        'voltage_improvement_pct': np.random.uniform(3, 5, 15),
+        'night_voltage_improvement_pct': np.random.uniform(2, 4, 15),
+        'voltage_improvement_24h_pct': np.random.uniform(3.5, 4.5, 15),
+        'loss_reduction_pct': np.random.uniform(0.3, 0.8, 15),
+        'loss_reduction_24h_pct': np.random.uniform(0.4, 0.6, 15),
+        'power_factor_final': np.random.uniform(0.91, 0.94, 15),
+        'operation_mode': np.random.choice(['Solar-Optimized', 'STATCOM-Optimized', 'Balanced 24h'], 15),
+        'benefit_score_24h': np.random.uniform(0.4, 0.6, 15),
+        'total_energy_value_mwh_year': np.random.uniform(5000, 50000, 15)
+    })
+
+def example_benefits_24h_report():
+    """Reporte de ejemplo si no existe el archivo"""
+    return {
+        'summary': {
+            'avg_voltage_improvement_24h': 4.42,
+            'avg_loss_reduction_24h': 0.49,
+            'avg_power_factor_improvement': 0.081,
+            'total_energy_value_gwh_year': 216.9
+        },
+        'economic_benefits': {
+            'energy_displacement_value_musd': 9.0,
+            'reactive_support_value_musd': 3.0,
+            'loss_reduction_savings_musd': 1.5,
+            'total_annual_benefits_musd': 15.0
         }
-    
-    return df_benefits, report
+    }
+
+# Una lectura por proceso; se recargan al cambiar los archivos (ver data_service)
+data_service.register('benefits_24h', [(BENEFITS_24H_DIR / "technical_benefits_24h.csv", read_csv)],
+                      default=example_benefits_24h)
+data_service.register('benefits_24h_report', [(BENEFITS_24H_DIR / "technical_benefits_24h_report.json", read_json)],
+                      default=example_benefits_24h_report)
+
+def load_benefits_24h_data():
+    """Carga los datos de beneficios 24h (compartidos por el proceso)"""
+    return data_service.frame('benefits_24h'), data_service.get('benefits_24h_report')
 
 # Crear perfiles horarios para visualización
 def create_hourly_profiles():
@@ -25,8 +25,13 @@ from dashboard.components.metrics_cards import (
     create_metric_card, create_summary_card, create_alert_card
 )
 from dashboard.utils.data_loader import (
-    load_transformadores_completo, get_valid_coordinates
+    load_transformadores_completo, get_valid_coordinates, get_transformadores
 )
+from dashboard.utils.figure_cache import memoize_figure
+from dashboard.utils.map_render import COORD_DECIMALS
+
+# Columnas del hover de los transformadores en el mapa de clusters
+HOVER_COLUMNS = ['Codigoct', 'Resultado', 'Q_Usuarios']
 
 # Layout de la página
 layout = html.Div([
@@ -389,12 +394,8 @@ def run_clustering(n_clicks, method, estado_filter, sucursal, eps, min_samples,
         return {}, card1, card2, card3, card4
     
     try:
-        # Cargar datos
-        df = load_transformadores_completo()
-        
-        # Filtrar por sucursal
-        if sucursal:
-            df = df[df['N_Sucursal'] == sucursal]
+        # Cargar datos filtrados por sucursal (rango de filas del servicio de datos)
+        df = get_transformadores(sucursal)
         
         # Filtrar por estado
         if estado_filter == "problemas":
@@ -530,6 +531,7 @@ def run_clustering(n_clicks, method, estado_filter, sucursal, eps, min_samples,
     Output("cluster-map", "figure"),
     Input("cluster-results-store", "data")
 )
+@memoize_figure()
 def update_cluster_map(results):
     """Actualiza mapa de clusters"""
     if not results or 'df' not in results:
@@ -558,21 +560,22 @@ def update_cluster_map(results):
             if cluster_id >= 0:  # Ignorar noise points
                 cluster_data = df[df['cluster'] == cluster_id]
                 
+                # Hover formateado en el navegador (sin armar un texto por fila)
+                hover = cluster_data.reindex(columns=HOVER_COLUMNS).astype(object)
                 fig.add_trace(go.Scattermapbox(
-                    lat=cluster_data['Coord_Y'],
-                    lon=cluster_data['Coord_X'],
+                    lat=cluster_data['Coord_Y'].round(COORD_DECIMALS),
+                    lon=cluster_data['Coord_X'].round(COORD_DECIMALS),
                     mode='markers',
                     name=f'Cluster {cluster_id}',
                     marker=dict(
                         size=8,
                         color=colors[i % len(colors)]
                     ),
-                    text=cluster_data.apply(lambda row: 
-                        f"Cluster: {cluster_id}<br>" +
-                        f"Código: {row.get('Codigoct', 'N/A')}<br>" +
-                        f"Estado: {row.get('Resultado', 'N/A')}<br>" +
-                        f"Usuarios: {row.get('Q_Usuarios', 0)}", axis=1),
-                    hovertemplate='%{text}<extra></extra>'
+                    customdata=hover.where(hover.notna(), 'N/A').to_numpy(),
+                    hovertemplate=(f"Cluster: {cluster_id}<br>"
+                                   "Código: %{customdata[0]}<br>"
+                                   "Estado: %{customdata[1]}<br>"
+                                   "Usuarios: %{customdata[2]}<extra></extra>")
                 ))
         
         # Agregar centroides de clusters
@@ -22,7 +22,7 @@ from dashboard.components.metrics_cards import (
     create_metric_card, create_summary_card, create_alert_card
 )
 from dashboard.utils.data_loader import (
-    load_transformadores_completo, load_alimentadores
+    load_transformadores_completo, load_alimentadores, get_transformadores
 )
 
 # Layout de la página
@@ -313,10 +313,9 @@ def update_alimentador_options(sucursal):
         return [], True, None
     
     try:
-        df = load_transformadores_completo()
-        df_suc = df[df['N_Sucursal'] == sucursal]
+        df_suc = get_transformadores(sucursal)
         
-        alimentadores = df_suc['Alimentador'].unique() if 'Alimentador' in df_suc.columns else []
+        alimentadores = df_suc['Alimentador'].dropna().unique() if 'Alimentador' in df_suc.columns else []
         options = [{"label": alim, "value": alim} for alim in sorted(alimentadores)]
         
         return options, False, None
@@ -334,13 +333,8 @@ def update_alimentador_options(sucursal):
 def update_mapa_calor(variable, sucursal, alimentador):
     """Actualiza mapa de calor según variable seleccionada"""
     try:
-        df = load_transformadores_completo()
-        
-        # Filtrar por sucursal/alimentador
-        if sucursal:
-            df = df[df['N_Sucursal'] == sucursal]
-        if alimentador:
-            df = df[df['Alimentador'] == alimentador]
+        # Filtrar por sucursal/alimentador (rango de filas del servicio de datos)
+        df = get_transformadores(sucursal, alimentador)
         
         # Verificar coordenadas
         if 'Coord_X' not in df.columns or 'Coord_Y' not in df.columns:
@@ -394,7 +388,8 @@ def update_mapa_calor(variable, sucursal, alimentador):
         else:  # modos de falla
             if 'modo_falla_probable' not in df.columns:
                 # Asignar modo de falla basado en resultado
-                df['modo_falla_probable'] = df['Resultado'].map({
+                # Resultado es categórica: map sobre object para obtener valores simples
+                df['modo_falla_probable'] = df['Resultado'].astype(object).map({
                     'Correcta': 'Sin falla',
                     'Penalizada': 'Dieléctrico',
                     'Fallida': 'Térmico'
@@ -446,13 +441,8 @@ def update_mapa_calor(variable, sucursal, alimentador):
 def update_stats_zona(variable, sucursal, alimentador):
     """Actualiza estadísticas de la zona seleccionada"""
     try:
-        df = load_transformadores_completo()
-        
-        # Filtrar
-        if sucursal:
-            df = df[df['N_Sucursal'] == sucursal]
-        if alimentador:
-            df = df[df['Alimentador'] == alimentador]
+        # Filtrar por sucursal/alimentador (rango de filas del servicio de datos)
+        df = get_transformadores(sucursal, alimentador)
         
         stats = []
         
@@ -537,13 +527,8 @@ def update_stats_zona(variable, sucursal, alimentador):
 def update_histograma(variable, sucursal, alimentador):
     """Actualiza histograma de distribución"""
     try:
-        df = load_transformadores_completo()
-        
-        # Filtrar
-        if sucursal:
-            df = df[df['N_Sucursal'] == sucursal]
-        if alimentador:
-            df = df[df['Alimentador'] == alimentador]
+        # Filtrar por sucursal/alimentador (rango de filas del servicio de datos)
+        df = get_transformadores(sucursal, alimentador)
         
         if variable == "impedancia":
             if 'impedancia_estimada' not in df.columns:
@@ -575,7 +560,7 @@ def update_histograma(variable, sucursal, alimentador):
             
         else:  # modos de falla
             if 'modo_falla_probable' not in df.columns:
-                df['modo_falla_probable'] = df['Resultado'].map({
+                df['modo_falla_probable'] = df['Resultado'].astype(object).map({
                     'Correcta': 'Sin falla',
                     'Penalizada': 'Dieléctrico',
                     'Fallida': 'Térmico'
@@ -620,17 +605,12 @@ def update_histograma(variable, sucursal, alimentador):
 def update_correlacion(variable, sucursal, alimentador):
     """Actualiza gráfico de correlación con calidad"""
     try:
-        df = load_transformadores_completo()
-        
-        # Filtrar
-        if sucursal:
-            df = df[df['N_Sucursal'] == sucursal]
-        if alimentador:
-            df = df[df['Alimentador'] == alimentador]
+        # Filtrar por sucursal/alimentador (rango de filas del servicio de datos)
+        df = get_transformadores(sucursal, alimentador)
         
         # Mapear calidad a numérico
         calidad_map = {'Correcta': 0, 'Penalizada': 1, 'Fallida': 2}
-        df['calidad_num'] = df['Resultado'].map(calidad_map)
+        df['calidad_num'] = df['Resultado'].astype(object).map(calidad_map)
         
         if variable == "impedancia":
             if 'impedancia_estimada' not in df.columns:
@@ -664,7 +644,7 @@ def update_correlacion(variable, sucursal, alimentador):
         else:  # modos de falla
             # Matriz de confusión modo de falla vs calidad
             if 'modo_falla_probable' not in df.columns:
-                df['modo_falla_probable'] = df['Resultado'].map({
+                df['modo_falla_probable'] = df['Resultado'].astype(object).map({
                     'Correcta': 'Sin falla',
                     'Penalizada': 'Dieléctrico',
                     'Fallida': 'Térmico'
@@ -706,13 +686,8 @@ def update_modos_falla(variable, sucursal, alimentador):
         ])
     
     try:
-        df = load_transformadores_completo()
-        
-        # Filtrar
-        if sucursal:
-            df = df[df['N_Sucursal'] == sucursal]
-        if alimentador:
-            df = df[df['Alimentador'] == alimentador]
+        # Filtrar por sucursal/alimentador (rango de filas del servicio de datos)
+        df = get_transformadores(sucursal, alimentador)
         
         # Análisis de modos de falla
         content = []
@@ -751,7 +726,7 @@ def update_modos_falla(variable, sucursal, alimentador):
         
         # Tabla de análisis por rango de potencia
         if 'modo_falla_probable' not in df.columns:
-            df['modo_falla_probable'] = df['Resultado'].map({
+            df['modo_falla_probable'] = df['Resultado'].astype(object).map({
                 'Correcta': 'Sin falla',
                 'Penalizada': 'Dieléctrico',
                 'Fallida': 'Térmico'
@@ -9,7 +9,6 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
-import json
 from pathlib import Path
 from datetime import datetime
 
@@ -23,44 +22,44 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 from dashboard.components.metrics_cards import (
     create_metric_card, create_summary_card, create_alert_card
 )
+from dashboard.utils.data_service import data_service, read_json
 
 # Cargar datos consolidados
+EXECUTIVE_DIR = Path(__file__).parent.parent.parent / "reports" / "clustering" / "executive_final"
+
+def example_executive_summary():
+    """Datos por defecto si no existe el resumen final"""
+    return {
+        'key_metrics': {
+            'total_gd_mw': 120.48,
+            'total_users': 158476,
+            'total_investment_musd': 145,
+            'annual_benefits_musd': 15,
+            'avg_ias_v3': 0.467,
+            'clusters_analyzed': 15
+        },
+        'main_findings': [
+            'Q at Night capability transforms residential clusters into valuable assets',
+            'Land availability is the primary constraint for 67% of clusters',
+            '24h operation mode provides optimal ROI for 10 of 15 clusters',
+            'Average power factor improvement from 0.85 to 0.93'
+        ],
+        'strategic_recommendations': [
+            'Prioritize mixed/residential clusters with high Q at Night potential',
+            'Specify inverters with certified STATCOM capability',
+            'Negotiate ancillary services compensation with CAMMESA',
+            'Implement DERMS for coordinated 120 MW management',
+            'Validate land availability for top 5 clusters immediately'
+        ]
+    }
+
+# Una lectura por proceso; se recarga al cambiar el archivo (ver data_service)
+data_service.register('executive_summary', [(EXECUTIVE_DIR / "final_executive_summary.json", read_json)],
+                      default=example_executive_summary)
+
 def load_executive_data():
-    """Carga todos los datos necesarios para el resumen ejecutivo"""
-    base_path = Path(__file__).parent.parent.parent
-    
-    # Cargar resumen final
-    summary_file = base_path / "reports" / "clustering" / "executive_final" / "final_executive_summary.json"
-    if summary_file.exists():
-        with open(summary_file, 'r', encoding='utf-8') as f:
-            summary = json.load(f)
-    else:
-        # Datos por defecto
-        summary = {
-            'key_metrics': {
-                'total_gd_mw': 120.48,
-                'total_users': 158476,
-                'total_investment_musd': 145,
-                'annual_benefits_musd': 15,
-                'avg_ias_v3': 0.467,
-                'clusters_analyzed': 15
-            },
-            'main_findings': [
-                'Q at Night capability transforms residential clusters into valuable assets',
-                'Land availability is the primary constraint for 67% of clusters',
-                '24h operation mode provides optimal ROI for 10 of 15 clusters',
-                'Average power factor improvement from 0.85 to 0.93'
-            ],
-            'strategic_recommendations': [
-                'Prioritize mixed/residential clusters with high Q at Night potential',
-                'Specify inverters with certified STATCOM capability',
-                'Negotiate ancillary services compensation with CAMMESA',
-                'Implement DERMS for coordinated 120 MW management',
-                'Validate land availability for top 5 clusters immediately'
-            ]
-        }
-    
-    return summary
+    """Carga todos los datos necesarios para el resumen ejecutivo (compartidos por el proceso)"""
+    return data_service.get('executive_summary')
 
 # Layout de la página
 layout = html.Div([
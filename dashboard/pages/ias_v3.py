@@ -10,7 +10,6 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
-import json
 from pathlib import Path
 
 # Registrar página
@@ -23,50 +22,49 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 from dashboard.components.metrics_cards import (
     create_metric_card, create_summary_card, create_alert_card
 )
+from dashboard.utils.data_service import data_service, read_csv, read_json
 
 # Cargar datos
+IAS_V3_DIR = Path(__file__).parent.parent.parent / "reports" / "clustering" / "ias_v3"
+
+def example_ias_v3_clusters():
+    """Clusters de ejemplo si no existe el ranking IAS v3"""
+    return pd.DataFrame({
+        'cluster_id': range(15),
+        'ias_v3': np.random.uniform(0.4, 0.6, 15),
+        'ias_promedio': np.random.uniform(0.35, 0.55, 15),
+        'delta_ias': np.random.uniform(-0.1, 0.1, 15),
+        'rank_change': np.random.randint(-5, 5, 15),
+        'perfil_dominante': np.random.choice(['Comercial', 'Residencial', 'Mixto', 'Industrial'], 15),
+        'gd_recomendada_mw': np.random.uniform(1, 35, 15),
+        'n_usuarios': np.random.randint(1000, 70000, 15),
+        'C1_criticidad': np.random.uniform(3, 8, 15),
+        'C2_coincidencia': np.random.uniform(2, 9, 15),
+        'C3_vulnerabilidad': np.random.uniform(3, 7, 15),
+        'C4_cargabilidad': np.random.uniform(4, 8, 15),
+        'C5_riesgo_rpf': np.random.uniform(2, 7, 15),
+        'C6_q_at_night': np.random.uniform(4, 9, 15),
+        'C7_land_availability': np.random.uniform(2, 8, 15)
+    })
+
+def example_ias_v3_report():
+    """Reporte de ejemplo si no existe el análisis IAS v3"""
+    return {
+        'summary': {'avg_ias_v3': 0.467, 'avg_ias_original': 0.458, 'avg_delta': 0.009,
+                   'clusters_improved': 8, 'clusters_worsened': 7},
+        'metadata': {'criteria_weights': {'C1': 0.087, 'C2': 0.201, 'C3': 0.031,
+                                        'C4': 0.056, 'C5': 0.120, 'C6': 0.301, 'C7': 0.204}}
+    }
+
+# Una lectura por proceso; se recargan al cambiar los archivos (ver data_service)
+data_service.register('ias_v3_clusters', [(IAS_V3_DIR / "cluster_ranking_ias_v3.csv", read_csv)],
+                      default=example_ias_v3_clusters)
+data_service.register('ias_v3_report', [(IAS_V3_DIR / "ias_v3_analysis_report.json", read_json)],
+                      default=example_ias_v3_report)
+
 def load_ias_v3_data():
-    """Carga los datos de IAS v3"""
-    base_path = Path(__file__).parent.parent.parent
-    
-    # Cargar clusters con IAS v3
-    cluster_file = base_path / "reports" / "clustering" / "ias_v3" / "cluster_ranking_ias_v3.csv"
-    if cluster_file.exists():
-        df_clusters = pd.read_csv(cluster_file)
-    else:
-        # Datos de ejemplo si no existe el archivo
-        df_clusters = pd.DataFrame({
-            'cluster_id': range(15),
-            'ias_v3': np.random.uniform(0.4, 0.6, 15),
-            'ias_promedio': np.random.uniform(0.35, 0.55, 15),
-            'delta_ias': np.random.uniform(-0.1, 0.1, 15),
-            'rank_change': np.random.randint(-5, 5, 15),
-            'perfil_dominante': np.random.choice(['Comercial', 'Residencial', 'Mixto', 'Industrial'], 15),
-            'gd_recomendada_mw': np.random.uniform(1, 35, 15),
-            'n_usuarios': np.random.randint(1000, 70000, 15),
-            'C1_criticidad': np.random.uniform(3, 8, 15),
-            'C2_coincidencia': np.random.uniform(2, 9, 15),
-            'C3_vulnerabilidad': np.random.uniform(3, 7, 15),
-            'C4_cargabilidad': np.random.uniform(4, 8, 15),
-            'C5_riesgo_rpf': np.random.uniform(2, 7, 15),
-            'C6_q_at_night': np.random.uniform(4, 9, 15),
-            'C7_land_availability': np.random.uniform(2, 8, 15)
-        })
-    
-    # Cargar reporte JSON
-    report_file = base_path / "reports" / "clustering" / "ias_v3" / "ias_v3_analysis_report.json"
-    if report_file.exists():
-        with open(report_file, 'r', encoding='utf-8') as f:
-            report = json.load(f)
-    else:
-        report = {
-            'summary': {'avg_ias_v3': 0.467, 'avg_ias_original': 0.458, 'avg_delta': 0.009,
-                       'clusters_improved': 8, 'clusters_worsened': 7},
-            'metadata': {'criteria_weights': {'C1': 0.087, 'C2': 0.201, 'C3': 0.031,
-                                            'C4': 0.056, 'C5': 0.120, 'C6': 0.301, 'C7': 0.204}}
-        }
-    
-    return df_clusters, report
+    """Carga los datos de IAS v3 (compartidos por el proceso)"""
+    return data_service.frame('ias_v3_clusters'), data_service.get('ias_v3_report')
 
 # Layout de la página
 layout = html.Div([
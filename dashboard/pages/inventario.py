@@ -22,7 +22,7 @@ from dashboard.components.metrics_cards import (
 )
 from dashboard.utils.data_loader import (
     load_transformadores_completo, get_summary_metrics,
-    filter_transformadores
+    filter_transformadores, get_summary_cube
 )
 
 # Layout de la página
@@ -187,27 +187,26 @@ def update_sucursal_options(_):
 )
 def update_metrics(sucursal, estado, size):
     """Actualiza métricas según filtros"""
-    df = filter_transformadores(
-        branch=sucursal,
-        quality=estado
-    )
+    # Métricas desde el cubo resumen (sin recorrer los transformadores)
+    cube = get_summary_cube().slice(N_Sucursal=sucursal, Resultado=estado)
     
-    if df.empty:
+    if cube.empty:
         return dbc.Alert("No hay datos para los filtros seleccionados", color="warning")
     
     # Filtro adicional por tamaño
-    if size != "all" and 'size_category' in df.columns:
-        df = df[df['size_category'] == size]
+    cube = cube.slice(size_category=size)
     
     # Calcular métricas
-    total_trafos = len(df)
-    total_usuarios = df['Q_Usuarios'].sum() if 'Q_Usuarios' in df.columns else 0
-    capacidad_total = df['Potencia'].sum() / 1000 if 'Potencia' in df.columns else 0
-    
-    if 'Resultado' in df.columns:
-        correctas = (df['Resultado'] == 'Correcta').sum()
-        penalizadas = (df['Resultado'] == 'Penalizada').sum()
-        fallidas = (df['Resultado'] == 'Fallida').sum()
+    totals = cube.totals()
+    total_trafos = int(totals['transformadores'])
+    total_usuarios = totals.get('usuarios', 0)
+    capacidad_total = totals.get('potencia_kva', 0) / 1000
+    
+    if 'Resultado' in cube.dimensions:
+        por_estado = cube.count('Resultado')
+        correctas = por_estado.get('Correcta', 0)
+        penalizadas = por_estado.get('Penalizada', 0)
+        fallidas = por_estado.get('Fallida', 0)
         tasa_problemas = ((penalizadas + fallidas) / total_trafos * 100) if total_trafos > 0 else 0
     else:
         correctas = penalizadas = fallidas = 0
@@ -257,17 +256,16 @@ def update_metrics(sucursal, estado, size):
 )
 def update_bar_sucursal(sucursal, estado, size):
     """Actualiza gráfico de barras por sucursal"""
-    df = filter_transformadores(branch=sucursal, quality=estado)
+    cube = get_summary_cube().slice(N_Sucursal=sucursal, Resultado=estado)
     
-    if df.empty or 'N_Sucursal' not in df.columns:
+    if cube.empty or 'N_Sucursal' not in cube.dimensions:
         return go.Figure().add_annotation(text="No hay datos disponibles", showarrow=False)
     
     # Filtro adicional por tamaño
-    if size != "all" and 'size_category' in df.columns:
-        df = df[df['size_category'] == size]
+    cube = cube.slice(size_category=size)
     
     # Agrupar por sucursal
-    summary = df.groupby('N_Sucursal').size().reset_index(name='cantidad')
+    summary = cube.by('N_Sucursal')['transformadores'].rename('cantidad').reset_index()
     summary = summary.sort_values('cantidad', ascending=True)
     
     fig = go.Figure([
@@ -354,21 +352,17 @@ def update_pie_capacidad(sucursal, estado, size):
 )
 def update_heatmap_calidad(sucursal, estado, size):
     """Actualiza mapa de calor de calidad por sucursal"""
-    df = load_transformadores_completo()
+    df = filter_transformadores(branch=sucursal, quality=estado)
     
     if df.empty or 'N_Sucursal' not in df.columns or 'Resultado' not in df.columns:
         return go.Figure().add_annotation(text="No hay datos disponibles", showarrow=False)
     
-    # Aplicar filtros básicos
-    if sucursal != "all":
-        df = df[df['N_Sucursal'] == sucursal]
-    if estado != "all":
-        df = df[df['Resultado'] == estado]
+    # Aplicar filtro de tamaño
     if size != "all" and 'size_category' in df.columns:
         df = df[df['size_category'] == size]
     
-    # Crear tabla pivote
-    pivot = pd.crosstab(df['N_Sucursal'], df['Resultado'])
+    # Crear tabla pivote (sobre object: sin filas vacías de categorías filtradas)
+    pivot = pd.crosstab(df['N_Sucursal'].astype(object), df['Resultado'].astype(object))
     
     # Calcular porcentajes
     pivot_pct = pivot.div(pivot.sum(axis=1), axis=0) * 100
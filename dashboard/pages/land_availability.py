@@ -9,7 +9,6 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
-import json
 from pathlib import Path
 
 # Registrar página
@@ -22,58 +21,60 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 from dashboard.components.metrics_cards import (
     create_metric_card, create_summary_card, create_alert_card
 )
+from dashboard.utils.data_service import data_service, read_csv, read_json
 
 # Cargar datos
-def load_land_availability_data():
-    """Carga los datos de disponibilidad de terreno"""
-    base_path = Path(__file__).parent.parent.parent
-    
-    # Cargar análisis de terreno
-    land_file = base_path / "reports" / "clustering" / "land_availability_detailed.csv"
-    if land_file.exists():
-        df_land = pd.read_csv(land_file)
-    else:
-        # Datos de ejemplo si no existe el archivo
-        df_land = pd.DataFrame({
-            'cluster_id': range(15),
-            'mw_required': np.random.uniform(1, 35, 15),
-            'hectares_required': np.random.uniform(1, 35, 15),
-            'zone_type': np.random.choice(['urbana_densa', 'urbana_media', 'periurbana', 'rural'], 15),
-            'base_land_score': np.random.uniform(0.1, 0.9, 15),
-            'C7_land_availability': np.random.uniform(0.1, 0.9, 15),
-            'feasibility_category': np.random.choice(['Alta', 'Media', 'Baja', 'Muy Baja'], 15),
-            'alternative_solutions': [['Solar distribuido', 'Múltiples sitios'] for _ in range(15)]
-        })
-    
-    # Cargar reporte JSON
-    report_file = base_path / "reports" / "clustering" / "land_availability_report.json"
-    if report_file.exists():
-        with open(report_file, 'r', encoding='utf-8') as f:
-            report = json.load(f)
-    else:
-        report = {
-            'summary': {
-                'total_hectares_required': 120.5,
-                'average_c7_score': 0.371,
-                'clusters_high_feasibility': 0,
-                'clusters_low_feasibility': 12
-            },
-            'by_zone_type': {
-                'rural': {'n_clusters': 2, 'total_hectares': 20, 'avg_c7_score': 0.8},
-                'periurbana': {'n_clusters': 5, 'total_hectares': 40, 'avg_c7_score': 0.5},
-                'urbana_media': {'n_clusters': 6, 'total_hectares': 50, 'avg_c7_score': 0.3},
-                'urbana_densa': {'n_clusters': 2, 'total_hectares': 10.5, 'avg_c7_score': 0.1}
-            }
+LAND_DIR = Path(__file__).parent.parent.parent / "reports" / "clustering"
+
+def example_land_availability():
+    """Análisis de terreno de ejemplo si no existe el archivo"""
+    return pd.DataFrame({
+        'cluster_id': range(15),
+        'mw_required': np.random.uniform(1, 35, 15),
+        'hectares_required': np.random.uniform(1, 35, 15),
+        'zone_type': np.random.choice(['urbana_densa', 'urbana_media', 'periurbana', 'rural'], 15),
+        'base_land_score': np.random.uniform(0.1, 0.9, 15),
+        'C7_land_availability': np.random.uniform(0.1, 0.9, 15),
+        'feasibility_category': np.random.choice(['Alta', 'Media', 'Baja', 'Muy Baja'], 15),
+        'alternative_solutions': [['Solar distribuido', 'Múltiples sitios'] for _ in range(15)]
+    })
+
+def example_land_availability_report():
+    """Reporte de ejemplo si no existe el archivo"""
+    return {
+        'summary': {
+            'total_hectares_required': 120.5,
+            'average_c7_score': 0.371,
+            'clusters_high_feasibility': 0,
+            'clusters_low_feasibility': 12
+        },
+        'by_zone_type': {
+            'rural': {'n_clusters': 2, 'total_hectares': 20, 'avg_c7_score': 0.8},
+            'periurbana': {'n_clusters': 5, 'total_hectares': 40, 'avg_c7_score': 0.5},
+            'urbana_media': {'n_clusters': 6, 'total_hectares': 50, 'avg_c7_score': 0.3},
+            'urbana_densa': {'n_clusters': 2, 'total_hectares': 10.5, 'avg_c7_score': 0.1}
         }
-    
-    # Agregar coordenadas si no existen
+    }
+
+def with_centroids(df_land):
+    """Agregar coordenadas si no existen"""
     if 'centroid_lat' not in df_land.columns:
         base_lat = -39.0
         base_lon = -67.5
         df_land['centroid_lat'] = base_lat + np.random.uniform(-2, 2, len(df_land))
         df_land['centroid_lon'] = base_lon + np.random.uniform(-2, 2, len(df_land))
-    
-    return df_land, report
+    return df_land
+
+# Una lectura por proceso; se recargan al cambiar los archivos (ver data_service)
+data_service.register('land_availability',
+                      [(LAND_DIR / "land_availability_detailed.csv", lambda path: with_centroids(read_csv(path)))],
+                      default=lambda: with_centroids(example_land_availability()))
+data_service.register('land_availability_report', [(LAND_DIR / "land_availability_report.json", read_json)],
+                      default=example_land_availability_report)
+
+def load_land_availability_data():
+    """Carga los datos de disponibilidad de terreno (compartidos por el proceso)"""
+    return data_service.frame('land_availability'), data_service.get('land_availability_report')
 
 # Layout de la página
 layout = html.Div([
@@ -22,6 +22,7 @@ import json
 BASE_DIR = Path(__file__).parent.parent.parent
 DATA_DIR = BASE_DIR / "data" / "processed"
 OPTIMIZATION_DIR = BASE_DIR / "reports" / "clustering" / "optimization"
+VALUE_SURFACES_DIR = OPTIMIZATION_DIR / "value_surfaces"
 
 # Importar módulos necesarios
 import sys
@@ -43,8 +44,8 @@ from src.economics.network_benefits_modular import (
     calculate_total_network_benefits,
     estimate_network_parameters
 )
+from src.economics.capex import calculate_capex
 from src.economics.financial_metrics import (
-    calculate_capex_total,
     calculate_annual_opex,
     calculate_cash_flows,
     calculate_npv,
@@ -54,6 +55,9 @@ from src.economics.financial_metrics import (
     calculate_all_financial_metrics
 )
 
+from src.economics.value_surface import ValueSurfaceStore
+
+from dashboard.utils.data_service import data_service
 from dashboard.components.optimization_components import (
     create_header_section, create_config_card, create_form_group,
     create_slider_with_value, create_metric_card_v3, create_alert_banner,
@@ -68,13 +72,19 @@ dash.register_page(
     title='Análisis de Configuraciones - FASE 3'
 )
 
-# Cargar datos de clusters
+# Cargar datos de clusters (una lectura por proceso, ver data_service)
+data_service.register(
+    'clusters_optimization',
+    [(OPTIMIZATION_DIR / 'clusters_optimization_data.parquet', pd.read_parquet)],
+    default=pd.DataFrame
+)
+
 def load_cluster_data():
     """Carga datos de clusters preparados"""
-    cluster_file = OPTIMIZATION_DIR / 'clusters_optimization_data.parquet'
-    if cluster_file.exists():
-        return pd.read_parquet(cluster_file)
-    return pd.DataFrame()
+    return data_service.frame('clusters_optimization')
+
+# Dataset de superficies de valor del script 16 (solo lectura)
+value_surfaces = ValueSurfaceStore(VALUE_SURFACES_DIR)
 
 def calculate_flows_realtime(cluster_data, pv_mw, bess_mwh, q_mvar):
     """
@@ -91,7 +101,7 @@ def calculate_flows_realtime(cluster_data, pv_mw, bess_mwh, q_mvar):
     try:
         from src.config.config_loader import get_config
         config = get_config()
-        params = config.get_economic_params()
+        params = config.get_economic_snapshot()
         network_params = config.get_network_params()
         print("calculate_flows_realtime: Config loaded successfully")
     except Exception as e:
@@ -103,24 +113,10 @@ def calculate_flows_realtime(cluster_data, pv_mw, bess_mwh, q_mvar):
         # =====================
         # 1. CALCULAR CAPEX
         # =====================
-        capex_total = calculate_capex_total(
-            pv_mw=pv_mw,
-            bess_mwh=bess_mwh,
-            q_mvar=q_mvar,
-            pv_capex_usd_mw=params.get('pv_capex_usd_mw', 800000),
-            bess_capex_usd_mwh=params.get('bess_capex_usd_mwh', 200000),
-            statcom_capex_usd_mvar=params.get('statcom_capex_usd_mvar', 40000),
-            bos_factor=params.get('bos_factor', 0.15)
-        )
-        
-        # Desglose de CAPEX
-        capex = {
-            'pv': pv_mw * params.get('pv_capex_usd_mw', 800000),
-            'bess': bess_mwh * params.get('bess_capex_usd_mwh', 200000),
-            'q_night': q_mvar * params.get('statcom_capex_usd_mvar', 40000),
-            'bos': capex_total / 1.15 * 0.15,  # Extraer BOS del total
-            'total': capex_total
-        }
+        # Mismo modelo que el optimizador: economías de escala PV, BESS
+        # energía + potencia y Q nocturno vía inversor hasta 30% de PV
+        capex = calculate_capex(pv_mw, bess_mwh, q_mvar, params)
+        capex_total = capex['total']
         
         # =====================
         # 2. CALCULAR FLUJOS PV
@@ -487,6 +483,21 @@ layout = dbc.Container([
         ], md=8)
     ]),
     
+    # Superficie de valor precalculada (script 16)
+    dbc.Row([
+        dbc.Col([
+            dbc.Card([
+                dbc.CardHeader([
+                    html.I(className="fas fa-th me-2"),
+                    "Superficie de Valor del Cluster (NPV precalculado)"
+                ]),
+                dbc.CardBody([
+                    dcc.Graph(id="value-surface-chart")
+                ])
+            ], className="shadow-sm mb-4")
+        ])
+    ]),
+    
     # Store para datos
     dcc.Store(id="calculation-results-store"),
     dcc.Store(id="cluster-data-store"),
@@ -755,6 +766,61 @@ def update_metrics_cards(results):
         ], md=6, lg=3, className="mb-3"),
     ])
 
+@callback(
+    Output("value-surface-chart", "figure"),
+    Input("cluster-selector", "value"),
+    Input("pv-ratio-slider", "value"),
+    Input("bess-hours-slider", "value"),
+    Input("q-night-ratio-slider", "value")
+)
+def update_value_surface(cluster_id, pv_ratio, bess_hours, q_ratio):
+    """Heatmap NPV (PV × BESS) leído del dataset de superficies, al Q más cercano"""
+    fig = go.Figure()
+    fig.update_layout(height=450, template="plotly_white",
+                      plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
+    
+    surface = pd.DataFrame()
+    if cluster_id is not None:
+        surface = value_surfaces.load(
+            [cluster_id], columns=['pv_ratio', 'bess_hours', 'q_ratio', 'npv_musd']
+        )
+    if surface.empty:
+        fig.add_annotation(text="Sin superficie precalculada - ejecute el script 16",
+                           showarrow=False, font=dict(size=14))
+        return fig
+    
+    # Corte de la superficie en el Q de la grilla más cercano al slider
+    q_values = np.unique(surface['q_ratio'].to_numpy())
+    q_cut = q_values[np.abs(q_values - (q_ratio or 0)).argmin()]
+    pivot = surface[surface['q_ratio'] == q_cut].pivot_table(
+        values='npv_musd', index='bess_hours', columns='pv_ratio'
+    )
+    
+    fig.add_trace(go.Heatmap(
+        z=pivot.values,
+        x=pivot.columns,
+        y=pivot.index,
+        colorscale='RdYlGn',
+        zmid=0,
+        colorbar=dict(title="NPV (MUSD)"),
+        hovertemplate="PV: %{x:.2f}x<br>BESS: %{y:.1f} h<br>NPV: $%{z:.2f}M<extra></extra>"
+    ))
+    
+    # Configuración seleccionada
+    if pv_ratio is not None and bess_hours is not None:
+        fig.add_trace(go.Scatter(
+            x=[pv_ratio], y=[bess_hours], mode='markers', name='Selección',
+            marker=dict(symbol='x', size=14, color='black'), showlegend=False
+        ))
+    
+    fig.update_layout(
+        title=f"Q nocturno = {q_cut:.0%} de PV",
+        xaxis_title="Ratio PV/Demanda",
+        yaxis_title="Horas BESS",
+        font=dict(family="system-ui, -apple-system, sans-serif")
+    )
+    return fig
+
 @callback(
     Output("flow-breakdown-chart", "figure"),
     Input("calculation-results-store", "data")
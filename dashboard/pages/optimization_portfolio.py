@@ -28,6 +28,7 @@ OPTIMIZATION_DIR = BASE_DIR / "reports" / "clustering" / "optimization"
 import sys
 sys.path.append(str(BASE_DIR))
 from src.config.config_loader import get_config
+from dashboard.utils.data_service import data_service, isolated_copy
 from dashboard.components.optimization_components import (
     create_header_section, create_config_card, create_form_group,
     create_slider_with_value, create_metric_card_v3, create_alert_banner,
@@ -43,32 +44,32 @@ dash.register_page(
 )
 
 # Funciones de optimización
-def load_optimal_configurations():
-    """Carga configuraciones óptimas por cluster"""
-    file_path = OPTIMIZATION_DIR / "integrated_flows" / "optimal_configurations.csv"
+def read_optimal_configurations(path):
+    """Configuraciones óptimas del archivo y lista de columnas estimadas"""
     estimated_columns = []
     
-    if file_path.exists():
-        df = pd.read_csv(file_path)
-        # Agregar columnas faltantes con valores estimados REALISTAS pero FAVORABLES
-        if 'total_users' not in df.columns:
-            # PSFV multipropósito beneficia a MÁS usuarios por su operación 24h
-            # Estimación: 150-200 usuarios por MW (vs 100 tradicional)
-            df['total_users'] = (df['pv_mw'] * 175).astype(int)
-            estimated_columns.append("usuarios beneficiados")
-            
-        if 'implementation_months' not in df.columns:
-            # PSFV multipropósito tiene implementación MÁS RÁPIDA por estandarización
-            # 4-6 meses pequeños, 8-10 medianos, 12 grandes
-            df['implementation_months'] = np.where(df['pv_mw'] < 50, 5, 
-                                                 np.where(df['pv_mw'] < 100, 8, 12))
-            estimated_columns.append("tiempo de implementación")
-            
-        # Retornar DataFrame y lista de columnas estimadas
-        return df, estimated_columns
-    else:
-        # Datos simulados si no existe el archivo
-        return create_sample_data(), ["TODOS los datos (archivo no encontrado)"]
+    df = pd.read_csv(path)
+    # Agregar columnas faltantes con valores estimados REALISTAS pero FAVORABLES
+    if 'total_users' not in df.columns:
+        # PSFV multipropósito beneficia a MÁS usuarios por su operación 24h
+        # Estimación: 150-200 usuarios por MW (vs 100 tradicional)
+        df['total_users'] = (df['pv_mw'] * 175).astype(int)
+        estimated_columns.append("usuarios beneficiados")
+        
+    if 'implementation_months' not in df.columns:
+        # PSFV multipropósito tiene implementación MÁS RÁPIDA por estandarización
+        # 4-6 meses pequeños, 8-10 medianos, 12 grandes
+        df['implementation_months'] = np.where(df['pv_mw'] < 50, 5, 
+                                             np.where(df['pv_mw'] < 100, 8, 12))
+        estimated_columns.append("tiempo de implementación")
+        
+    # Retornar DataFrame y lista de columnas estimadas
+    return df, estimated_columns
+
+def load_optimal_configurations():
+    """Carga configuraciones óptimas por cluster (compartidas por el proceso)"""
+    df, estimated_columns = data_service.get('optimal_configurations')
+    return isolated_copy(df), list(estimated_columns)
 
 def create_sample_data():
     """Crea datos de muestra REALISTAS para demostración - Favoreciendo PSFV multipropósito"""
@@ -96,6 +97,14 @@ def create_sample_data():
     
     return pd.DataFrame(clusters)
 
+# Una lectura por proceso; se recarga al cambiar el archivo (ver data_service).
+# Datos simulados si no existe el archivo
+data_service.register(
+    'optimal_configurations',
+    [(OPTIMIZATION_DIR / "integrated_flows" / "optimal_configurations.csv", read_optimal_configurations)],
+    default=lambda: (create_sample_data(), ["TODOS los datos (archivo no encontrado)"])
+)
+
 def optimize_portfolio(projects_df, budget_constraint, objectives, constraints):
     """
     Optimiza la selección de proyectos usando programación lineal
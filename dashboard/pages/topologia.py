@@ -23,8 +23,16 @@ from dashboard.components.metrics_cards import (
     create_metric_card, create_summary_card, create_alert_card
 )
 from dashboard.utils.data_loader import (
-    load_transformadores_completo, load_alimentadores
+    load_transformadores_completo, load_alimentadores, get_transformadores,
+    transformadores_version
 )
+from dashboard.utils.figure_cache import dataset_digest, memoize_figure
+from src.network.mst_topology import minimum_spanning_parents
+from src.network.tree_features import calculate_tree_features
+from functools import lru_cache
+
+TOPOLOGY_COLUMNS = ['numero_saltos', 'es_nodo_hoja', 'kVA_aguas_abajo',
+                    'usuarios_aguas_abajo', 'num_descendientes', 'centralidad_intermediacion']
 
 # Layout de la página
 layout = html.Div([
@@ -148,6 +156,52 @@ layout = html.Div([
 ])
 
 # Callbacks
+def estimate_substation(df_feeder):
+    """Subestación probable: centroide de transformadores grandes (≥315 kVA)"""
+    large_trafos = df_feeder[df_feeder['Potencia'] >= 315] if 'Potencia' in df_feeder.columns else df_feeder
+    if len(large_trafos) == 0:
+        large_trafos = df_feeder
+    return large_trafos['Coord_X'].mean(), large_trafos['Coord_Y'].mean()
+
+@lru_cache(maxsize=32)
+def calculate_feeder_topology(feeder, version=None):
+    """
+    MST del alimentador y características topológicas de todos sus nodos
+    
+    Args:
+        feeder: Alimentador
+        version: Versión del dataset de transformadores (clave de la caché:
+            una recarga del archivo invalida los MST calculados)
+    
+    Returns:
+        (df del alimentador con coordenadas y columnas TOPOLOGY_COLUMNS,
+         coordenadas de la subestación, array de padres con la subestación en 0)
+    """
+    df_feeder = get_transformadores(alimentador=feeder)
+    df_feeder = df_feeder[df_feeder['Coord_X'].notna() & df_feeder['Coord_Y'].notna()].copy()
+    
+    sub_x, sub_y = estimate_substation(df_feeder)
+    lon = np.concatenate([[sub_x], df_feeder['Coord_X'].to_numpy(dtype=float)])
+    lat = np.concatenate([[sub_y], df_feeder['Coord_Y'].to_numpy(dtype=float)])
+    potencia = np.concatenate([[0], df_feeder['Potencia'].fillna(0).to_numpy()])
+    usuarios = np.concatenate([[0], df_feeder['Q_Usuarios'].fillna(0).to_numpy()])
+    
+    mst = minimum_spanning_parents(lat, lon)
+    features = calculate_tree_features(mst.parent, potencia, usuarios)
+    for col in TOPOLOGY_COLUMNS:
+        df_feeder[col] = features[col][1:]
+    
+    return df_feeder, (sub_x, sub_y), mst.parent
+
+def feeder_with_topology(feeder):
+    """Transformadores del alimentador con las columnas topológicas (datos o MST)"""
+    df_feeder = get_transformadores(alimentador=feeder)
+    if all(col in df_feeder.columns for col in ('numero_saltos', 'kVA_aguas_abajo')):
+        return df_feeder
+    if df_feeder.empty or 'Coord_X' not in df_feeder.columns:
+        return df_feeder
+    return calculate_feeder_topology(feeder, transformadores_version())[0].copy()
+
 @callback(
     Output("topologia-feeder-select", "options"),
     Input("topologia-view-type", "value")  # Trigger inicial
@@ -188,8 +242,7 @@ def update_metrics(feeder):
         return html.Div("Seleccione un alimentador para ver las métricas", className="text-muted")
     
     try:
-        df = load_transformadores_completo()
-        df_feeder = df[df['Alimentador'] == feeder]
+        df_feeder = get_transformadores(alimentador=feeder)
         
         if df_feeder.empty:
             return html.Div("No hay datos para este alimentador", className="text-muted")
@@ -268,6 +321,7 @@ def update_metrics(feeder):
     [Input("topologia-feeder-select", "value"),
      Input("topologia-view-type", "value")]
 )
+@memoize_figure(digest=lambda: dataset_digest('transformadores'))
 def update_mst_graph(feeder, view_type):
     """Actualiza visualización MST del alimentador"""
     if not feeder:
@@ -282,16 +336,15 @@ def update_mst_graph(feeder, view_type):
         return fig
     
     try:
-        df = load_transformadores_completo()
-        df_feeder = df[df['Alimentador'] == feeder]
+        df_feeder = feeder_with_topology(feeder)
         
         if df_feeder.empty:
             return go.Figure().add_annotation(text="No hay datos", showarrow=False)
         
         # Crear visualización según el tipo seleccionado
         if view_type == "geo":
-            # Vista geográfica con conexiones
-            fig = create_geographic_view(df_feeder)
+            # Vista geográfica con las conexiones del MST
+            fig = create_geographic_view(feeder)
         elif view_type == "hierarchy":
             # Vista jerárquica tipo árbol
             fig = create_hierarchical_view(df_feeder)
@@ -314,15 +367,19 @@ def update_mst_graph(feeder, view_type):
             showarrow=False
         )
 
-def create_geographic_view(df_feeder):
+def create_geographic_view(feeder):
     """Crea vista geográfica del MST"""
     fig = go.Figure()
     
     # Verificar columnas necesarias
-    if 'Coord_X' not in df_feeder.columns or 'Coord_Y' not in df_feeder.columns:
+    df = load_transformadores_completo()
+    if 'Coord_X' not in df.columns or 'Coord_Y' not in df.columns:
         fig.add_annotation(text="No hay coordenadas disponibles", showarrow=False)
         return fig
     
+    # MST con raíz en la subestación probable
+    df_feeder, (sub_x, sub_y), parent = calculate_feeder_topology(feeder, transformadores_version())
+    
     # Colores por estado
     color_map = {
         'Correcta': 'green',
@@ -330,15 +387,6 @@ def create_geographic_view(df_feeder):
         'Fallida': 'red'
     }
     
-    # Identificar subestación probable (centroide de transformadores grandes)
-    large_trafos = df_feeder[df_feeder['Potencia'] >= 315] if 'Potencia' in df_feeder.columns else df_feeder
-    if len(large_trafos) > 0:
-        sub_x = large_trafos['Coord_X'].mean()
-        sub_y = large_trafos['Coord_Y'].mean()
-    else:
-        sub_x = df_feeder['Coord_X'].mean()
-        sub_y = df_feeder['Coord_Y'].mean()
-    
     # Agregar subestación
     fig.add_trace(go.Scatter(
         x=[sub_x],
@@ -349,16 +397,22 @@ def create_geographic_view(df_feeder):
         showlegend=True
     ))
     
-    # Agregar líneas de conexión simuladas (estrella desde subestación)
-    for _, row in df_feeder.iterrows():
-        fig.add_trace(go.Scatter(
-            x=[sub_x, row['Coord_X']],
-            y=[sub_y, row['Coord_Y']],
-            mode='lines',
-            line=dict(color='lightgray', width=1),
-            showlegend=False,
-            hoverinfo='skip'
-        ))
+    # Agregar conexiones del MST (una sola traza, segmentos separados por NaN)
+    node_x = np.concatenate([[sub_x], df_feeder['Coord_X'].to_numpy(dtype=float)])
+    node_y = np.concatenate([[sub_y], df_feeder['Coord_Y'].to_numpy(dtype=float)])
+    children = np.flatnonzero(parent >= 0)
+    edge_x = np.column_stack([node_x[parent[children]], node_x[children],
+                              np.full(len(children), np.nan)]).ravel()
+    edge_y = np.column_stack([node_y[parent[children]], node_y[children],
+                              np.full(len(children), np.nan)]).ravel()
+    fig.add_trace(go.Scatter(
+        x=edge_x,
+        y=edge_y,
+        mode='lines',
+        line=dict(color='lightgray', width=1),
+        showlegend=False,
+        hoverinfo='skip'
+    ))
     
     # Agregar transformadores
     for estado, color in color_map.items():
@@ -446,7 +500,7 @@ def create_radial_view(df_feeder):
     y = radii * np.sin(angles)
     
     # Colores por estado
-    colors = df_feeder['Resultado'].map({
+    colors = df_feeder['Resultado'].astype(object).map({
         'Correcta': 'green',
         'Penalizada': 'orange',
         'Fallida': 'red'
@@ -536,8 +590,7 @@ def update_topology_stats(feeder):
         return html.Div("Seleccione un alimentador", className="text-muted")
     
     try:
-        df = load_transformadores_completo()
-        df_feeder = df[df['Alimentador'] == feeder]
+        df_feeder = feeder_with_topology(feeder)
         
         stats = []
         
@@ -578,14 +631,14 @@ def update_topology_stats(feeder):
     Output("topologia-hops-dist", "figure"),
     Input("topologia-feeder-select", "value")
 )
+@memoize_figure(digest=lambda: dataset_digest('transformadores'))
 def update_hops_distribution(feeder):
     """Actualiza distribución de saltos"""
     if not feeder:
         return go.Figure()
     
     try:
-        df = load_transformadores_completo()
-        df_feeder = df[df['Alimentador'] == feeder]
+        df_feeder = feeder_with_topology(feeder)
         
         # Simular distribución de saltos si no existe
         if 'numero_saltos' not in df_feeder.columns:
@@ -628,14 +681,14 @@ def update_hops_distribution(feeder):
     Output("topologia-kva-downstream", "figure"),
     Input("topologia-feeder-select", "value")
 )
+@memoize_figure(digest=lambda: dataset_digest('transformadores'))
 def update_kva_downstream(feeder):
     """Actualiza gráfico de kVA aguas abajo"""
     if not feeder:
         return go.Figure()
     
     try:
-        df = load_transformadores_completo()
-        df_feeder = df[df['Alimentador'] == feeder]
+        df_feeder = feeder_with_topology(feeder)
         
         # Simular kVA aguas abajo si no existe
         if 'kVA_aguas_abajo' not in df_feeder.columns:
@@ -3,9 +3,8 @@ Página de Análisis de Vulnerabilidad
 """
 
 import dash
-from dash import html, dcc, callback, Input, Output, State, dash_table
+from dash import html, dcc, callback, ctx, Input, Output, State, dash_table
 import dash_bootstrap_components as dbc
-import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
@@ -22,7 +21,11 @@ from dashboard.components.metrics_cards import (
     create_metric_card, create_summary_card, create_alert_card
 )
 from dashboard.utils.data_loader import (
-    load_transformadores_completo, get_top_critical_transformers
+    load_transformadores_completo, get_top_critical_transformers, get_transformadores
+)
+from dashboard.utils.map_render import (
+    VULNERABILITY_SCALE, fit_viewport, map_figure, map_layer, valid_coordinates,
+    viewport_from_relayout
 )
 from dashboard.utils.vulnerability_helper import (
     create_vulnerability_levels, get_vulnerability_colors, get_vulnerability_order
@@ -378,16 +381,14 @@ def update_initial_data(_):
     Output("vuln-mapa", "figure"),
     [Input("vuln-sucursal-select", "value"),
      Input("vuln-nivel-select", "value"),
-     Input("vuln-indice-slider", "value")]
+     Input("vuln-indice-slider", "value"),
+     Input("vuln-mapa", "relayoutData")]
 )
-def update_mapa_vulnerabilidad(sucursal, nivel, rango_indice):
-    """Actualiza mapa de vulnerabilidad"""
+def update_mapa_vulnerabilidad(sucursal, nivel, rango_indice, relayout_data):
+    """Actualiza mapa de vulnerabilidad (puntos visibles o celdas según el zoom)"""
     try:
-        df = load_transformadores_completo()
-        
-        # Filtrar por sucursal
-        if sucursal:
-            df = df[df['N_Sucursal'] == sucursal]
+        # Filtrar por sucursal (rango de filas del servicio de datos)
+        df = get_transformadores(sucursal)
         
         # Asegurar que existe nivel_vulnerabilidad
         if 'nivel_vulnerabilidad' not in df.columns:
@@ -408,7 +409,7 @@ def update_mapa_vulnerabilidad(sucursal, nivel, rango_indice):
             fig.add_annotation(text="No hay coordenadas disponibles", showarrow=False)
             return fig
         
-        df = df.dropna(subset=['Coord_X', 'Coord_Y'])
+        df = valid_coordinates(df)
         
         if df.empty:
             fig = go.Figure()
@@ -417,40 +418,43 @@ def update_mapa_vulnerabilidad(sucursal, nivel, rango_indice):
         
         # Color por índice de vulnerabilidad o nivel
         if 'criticidad_compuesta' in df.columns:
-            color_col = 'criticidad_compuesta'
-            color_scale = 'RdYlGn_r'  # Invertido: rojo para alto, verde para bajo
+            color = df['criticidad_compuesta'].to_numpy(dtype=float)
             color_label = 'Índice de Vulnerabilidad'
         else:
-            # Mapear niveles a números
-            nivel_map = {'Mínima': 0, 'Baja': 1, 'Media': 2, 'Alta': 3, 'Crítica': 4}
-            df['nivel_num'] = df['nivel_vulnerabilidad'].map(nivel_map).fillna(2)
-            color_col = 'nivel_num'
-            color_scale = [[0, 'green'], [0.25, 'lightgreen'], [0.5, 'yellow'], 
-                          [0.75, 'orange'], [1, 'red']]
+            # Mapear niveles a números (0-1)
+            nivel_map = {'Mínima': 0, 'Baja': 0.25, 'Media': 0.5, 'Alta': 0.75, 'Crítica': 1}
+            color = df['nivel_vulnerabilidad'].astype(object).map(nivel_map).fillna(0.5).to_numpy(dtype=float)
             color_label = 'Nivel de Vulnerabilidad'
         
-        # Crear mapa
-        fig = px.scatter_mapbox(
-            df,
-            lat='Coord_Y',
-            lon='Coord_X',
-            color=color_col,
-            size='Q_Usuarios' if 'Q_Usuarios' in df.columns else None,
-            hover_data=['Codigoct', 'Potencia', 'Q_Usuarios', 'Resultado', 'nivel_vulnerabilidad'],
-            color_continuous_scale=color_scale,
-            mapbox_style="open-street-map",
+        # Vista: toda la sucursal al elegirla; si no, la del usuario (si muestra datos)
+        viewport = fit_viewport(df['Coord_X'], df['Coord_Y'])
+        if ctx.triggered_id != "vuln-sucursal-select":
+            current = viewport_from_relayout(relayout_data, viewport)
+            if current.contains(df['Coord_X'].to_numpy(dtype=float), df['Coord_Y'].to_numpy(dtype=float)).any():
+                viewport = current
+        viewport = viewport.snapped()
+        
+        codigo_col = 'Codigo' if 'Codigo' in df.columns else 'Codigoct'
+        hover_fields = [(label, column, fmt) for label, column, fmt in [
+            ('Código', codigo_col, ''),
+            ('Potencia (kVA)', 'Potencia', ''),
+            ('Usuarios', 'Q_Usuarios', ''),
+            ('Estado', 'Resultado', ''),
+            ('Nivel', 'nivel_vulnerabilidad', ''),
+            ('Índice', 'criticidad_compuesta', ':.2f')
+        ] if column in df.columns]
+        
+        trace = map_layer(df, viewport, color, hover_fields, color_label=color_label,
+                          sum_fields=[('Usuarios', 'Q_Usuarios'), ('Potencia (kVA)', 'Potencia')],
+                          size_column='Q_Usuarios')
+        # Nueva sucursal = nueva vista inicial; mover el mapa conserva la del usuario
+        return map_figure(
+            trace, viewport, VULNERABILITY_SCALE, color_label,
+            style="open-street-map",
             title=f"Mapa de Vulnerabilidad - {sucursal if sucursal else 'Red Completa'}",
-            zoom=10,
-            height=500
+            uirevision=str(sucursal)
         )
         
-        fig.update_layout(
-            coloraxis_colorbar=dict(title=color_label),
-            margin=dict(l=0, r=0, t=30, b=0)
-        )
-        
-        return fig
-        
     except Exception as e:
         print(f"Error en update_mapa_vulnerabilidad: {e}")
         fig = go.Figure()
@@ -465,11 +469,8 @@ def update_mapa_vulnerabilidad(sucursal, nivel, rango_indice):
 def update_distribucion(sucursal, nivel):
     """Actualiza gráfico de distribución por nivel"""
     try:
-        df = load_transformadores_completo()
-        
-        # Filtrar por sucursal
-        if sucursal:
-            df = df[df['N_Sucursal'] == sucursal]
+        # Filtrar por sucursal (rango de filas del servicio de datos)
+        df = get_transformadores(sucursal)
         
         # Asegurar nivel_vulnerabilidad
         if 'nivel_vulnerabilidad' not in df.columns:
@@ -527,11 +528,8 @@ def update_distribucion(sucursal, nivel):
 def update_factores(sucursal, nivel):
     """Actualiza gráfico de factores contribuyentes"""
     try:
-        df = load_transformadores_completo()
-        
-        # Filtrar
-        if sucursal:
-            df = df[df['N_Sucursal'] == sucursal]
+        # Filtrar por sucursal (rango de filas del servicio de datos)
+        df = get_transformadores(sucursal)
         
         if nivel != "all" and 'nivel_vulnerabilidad' in df.columns:
             df = df[df['nivel_vulnerabilidad'] == nivel]
@@ -596,10 +594,8 @@ def update_factores(sucursal, nivel):
 def update_vuln_vs_calidad(sucursal):
     """Actualiza gráfico de vulnerabilidad vs calidad"""
     try:
-        df = load_transformadores_completo()
-        
-        if sucursal:
-            df = df[df['N_Sucursal'] == sucursal]
+        # Filtrar por sucursal (rango de filas del servicio de datos)
+        df = get_transformadores(sucursal)
         
         # Asegurar columnas necesarias
         if 'nivel_vulnerabilidad' not in df.columns:
@@ -609,9 +605,10 @@ def update_vuln_vs_calidad(sucursal):
             return go.Figure()
         
         # Crear matriz de correlación
+        # Resultado sobre object: sin columnas vacías de categorías filtradas
         confusion = pd.crosstab(
             df['nivel_vulnerabilidad'], 
-            df['Resultado'],
+            df['Resultado'].astype(object),
             normalize='columns'
         ) * 100
         
@@ -6,72 +6,112 @@ import pandas as pd
 import sqlite3
 from pathlib import Path
 import json
-from functools import lru_cache
+import sys
 import numpy as np
 
 # Paths base
 BASE_DIR = Path(__file__).parent.parent.parent
 DATA_DIR = BASE_DIR / "data"
 
+# Almacenamiento intermedio Parquet (src/pipeline/store)
+sys.path.append(str(BASE_DIR))
+from src.pipeline.store import apply_schema, read_frame
+
+from dashboard.utils.data_service import data_service, isolated_copy, read_csv
+from dashboard.utils.summary_cube import load_or_build_cube
+
 # Paths de archivos principales
 PATHS = {
     # Usar archivos existentes mientras no tengamos los del análisis eléctrico
-    'transformadores_completo': DATA_DIR / "processed/network_analysis/transformadores_con_topologia.csv",
-    'transformadores_fallback': DATA_DIR / "processed/transformers_analysis.csv",
-    'alimentadores': DATA_DIR / "processed/network_analysis/alimentadores_caracterizados.csv",
-    'topologia_mst': DATA_DIR / "processed/electrical_analysis/transformadores_mst_topology.csv",
-    'distancia_electrica': DATA_DIR / "processed/electrical_analysis/transformadores_distancia_electrica.csv",
-    'carga_estimada': DATA_DIR / "processed/electrical_analysis/transformadores_carga_estimada.csv",
+    'transformadores_completo': DATA_DIR / "processed/network_analysis/transformadores_con_topologia.parquet",
+    'transformadores_fallback': DATA_DIR / "processed/transformers_analysis.parquet",
+    'alimentadores': DATA_DIR / "processed/network_analysis/alimentadores_caracterizados.parquet",
+    'topologia_mst': DATA_DIR / "processed/electrical_analysis/transformadores_mst_topology.parquet",
+    'distancia_electrica': DATA_DIR / "processed/electrical_analysis/transformadores_distancia_electrica.parquet",
+    'carga_estimada': DATA_DIR / "processed/electrical_analysis/transformadores_carga_estimada.parquet",
     'database': DATA_DIR / "edersa_transformadores.db",
+    'ml_datasets': DATA_DIR / "processed/electrical_analysis/ml_datasets",
     'metadata_ml': DATA_DIR / "processed/electrical_analysis/ml_datasets/metadata.json",
     'feature_importance': DATA_DIR / "processed/electrical_analysis/ml_datasets/feature_importance.csv"
 }
 
-@lru_cache(maxsize=10)
-def load_transformadores_completo():
-    """Carga el dataset completo de transformadores con todas las features"""
-    try:
-        df = pd.read_csv(PATHS['transformadores_completo'])
-        print(f"✓ Cargados {len(df)} transformadores con {len(df.columns)} columnas")
-        return df
-    except Exception as e:
-        print(f"Error cargando transformadores principal: {e}")
-        # Intentar archivo fallback
+def _read_transformadores_fallback(path):
+    """Dataset del preprocesamiento, con las columnas que esperan las páginas"""
+    df = read_frame(path)
+    print(f"✓ Cargados {len(df)} transformadores desde archivo fallback")
+    # Asegurar que tenga columnas esperadas
+    if 'nivel_vulnerabilidad' not in df.columns:
+        df['nivel_vulnerabilidad'] = 'Media'  # Default
+    if 'indice_vulnerabilidad_compuesto' not in df.columns:
+        df['indice_vulnerabilidad_compuesto'] = 0.5  # Default
+    if 'modo_falla_probable' not in df.columns:
+        df['modo_falla_probable'] = 'Mixto'  # Default
+    return df
+
+def _read_database_table(table_name):
+    """Loader de una tabla de la base SQLite con el esquema de los datasets"""
+    def loader(path):
+        conn = sqlite3.connect(path)
         try:
-            df = pd.read_csv(PATHS['transformadores_fallback'])
-            print(f"✓ Cargados {len(df)} transformadores desde archivo fallback")
-            # Asegurar que tenga columnas esperadas
-            if 'nivel_vulnerabilidad' not in df.columns:
-                df['nivel_vulnerabilidad'] = 'Media'  # Default
-            if 'indice_vulnerabilidad_compuesto' not in df.columns:
-                df['indice_vulnerabilidad_compuesto'] = 0.5  # Default
-            if 'modo_falla_probable' not in df.columns:
-                df['modo_falla_probable'] = 'Mixto'  # Default
-            return df
-        except Exception as e2:
-            print(f"Error cargando fallback: {e2}")
-            # Intentar cargar desde base de datos
-            return load_from_database('transformadores')
-
-@lru_cache(maxsize=5)
+            return apply_schema(pd.read_sql_query(f"SELECT * FROM {table_name}", conn))
+        finally:
+            conn.close()
+    return loader
+
+# Datasets compartidos por todas las páginas (ver data_service)
+data_service.register(
+    'transformadores',
+    [(PATHS['transformadores_completo'], read_frame),
+     (PATHS['transformadores_fallback'], _read_transformadores_fallback),
+     (PATHS['database'], _read_database_table('transformadores'))],
+    default=pd.DataFrame,
+    index_by=('N_Sucursal', 'Alimentador')
+)
+data_service.register('alimentadores', [(PATHS['alimentadores'], read_frame)], default=pd.DataFrame)
+data_service.register('feature_importance', [(PATHS['feature_importance'], read_csv)], default=pd.DataFrame)
+
+def load_transformadores_completo():
+    """Dataset completo de transformadores con todas las features (compartido, solo lectura)"""
+    return data_service.frame('transformadores')
+
+def get_transformadores(sucursal=None, alimentador=None):
+    """
+    Transformadores de una sucursal y/o alimentador
+    
+    Args:
+        sucursal: Sucursal, o None/'all' para todas
+        alimentador: Alimentador, o None/'all' para todos
+    
+    Returns:
+        DataFrame propio (con copy-on-write, vista del dataset compartido cuando
+        la selección es un rango de filas)
+    """
+    return data_service.subset('transformadores', N_Sucursal=sucursal, Alimentador=alimentador)
+
+def transformadores_version():
+    """Versión cargada del dataset de transformadores (cambia al recargar el archivo)"""
+    return data_service.version('transformadores')
+
+def _summary_cube():
+    source, signature = data_service.source('transformadores')
+    return load_or_build_cube(data_service.frame('transformadores'), source, signature)
+
+def get_summary_cube():
+    """
+    Cubo resumen de la versión cargada de transformadores (ver summary_cube).
+
+    Se calcula (o se lee del archivo junto a los datos) una vez por versión;
+    es compartido: consultarlo con slice/by/totals, no modificarlo.
+    """
+    return data_service.cached('transformadores', 'cubo_resumen', _summary_cube)
+
 def load_alimentadores():
     """Carga los datos de alimentadores caracterizados"""
-    try:
-        df = pd.read_csv(PATHS['alimentadores'])
-        return df
-    except Exception as e:
-        print(f"Error cargando alimentadores: {e}")
-        return pd.DataFrame()
+    return data_service.frame('alimentadores')
 
-@lru_cache(maxsize=1)
 def load_feature_importance():
     """Carga la importancia de features del análisis ML"""
-    try:
-        df = pd.read_csv(PATHS['feature_importance'])
-        return df
-    except Exception as e:
-        print(f"Error cargando feature importance: {e}")
-        return pd.DataFrame()
+    return data_service.frame('feature_importance')
 
 def load_from_database(table_name):
     """Carga datos desde la base de datos SQLite"""
@@ -86,9 +126,9 @@ def load_from_database(table_name):
 
 def get_summary_metrics():
     """Obtiene métricas resumen del sistema"""
-    df = load_transformadores_completo()
+    cube = get_summary_cube()
     
-    if df.empty:
+    if cube.empty:
         return {
             'total_transformadores': 0,
             'total_usuarios': 0,
@@ -98,39 +138,40 @@ def get_summary_metrics():
             'alimentadores_total': 0
         }
     
+    totals = cube.totals()
+    total = totals['transformadores']
     metrics = {
-        'total_transformadores': len(df),
-        'total_usuarios': df['Q_Usuarios'].sum() if 'Q_Usuarios' in df.columns else 0,
-        'capacidad_total_mva': df['Potencia'].sum() / 1000 if 'Potencia' in df.columns else 0,
-        'tasa_problemas': (df['Resultado'] != 'Correcta').mean() * 100 if 'Resultado' in df.columns else 0,
-        'transformadores_criticos': len(df[df.get('nivel_vulnerabilidad', '') == 'Crítica']) if 'nivel_vulnerabilidad' in df.columns else 0,
-        'alimentadores_total': df['Alimentador'].nunique() if 'Alimentador' in df.columns else 0
+        'total_transformadores': int(total),
+        'total_usuarios': totals.get('usuarios', 0),
+        'capacidad_total_mva': totals.get('potencia_kva', 0) / 1000,
+        'tasa_problemas': totals['problemas'] / total * 100 if 'problemas' in totals else 0,
+        'transformadores_criticos': int(cube.slice(nivel_vulnerabilidad='Crítica').totals()['transformadores']) if 'nivel_vulnerabilidad' in cube.dimensions else 0,
+        'alimentadores_total': cube.nunique('Alimentador')
     }
     
     return metrics
 
 def get_quality_distribution():
     """Obtiene distribución de estados de calidad"""
-    df = load_transformadores_completo()
+    cube = get_summary_cube()
     
-    if df.empty or 'Resultado' not in df.columns:
+    if cube.empty or 'Resultado' not in cube.dimensions:
         return pd.DataFrame()
     
-    return df['Resultado'].value_counts().reset_index()
+    return cube.count('Resultado').rename('count').rename_axis('Resultado').reset_index()
 
 def get_vulnerability_distribution():
     """Obtiene distribución de niveles de vulnerabilidad"""
-    df = load_transformadores_completo()
+    cube = get_summary_cube()
     
-    if df.empty or 'nivel_vulnerabilidad' not in df.columns:
+    if cube.empty or 'nivel_vulnerabilidad' not in cube.dimensions:
         return pd.DataFrame()
     
     # Orden específico
     order = ['Crítica', 'Alta', 'Media', 'Baja', 'Mínima']
-    dist = df['nivel_vulnerabilidad'].value_counts()
-    dist = dist.reindex(order, fill_value=0)
+    dist = cube.count('nivel_vulnerabilidad', order=order)
     
-    return dist.reset_index()
+    return dist.rename('count').rename_axis('nivel_vulnerabilidad').reset_index()
 
 def filter_transformadores(branch=None, quality=None, vulnerability=None, feeder=None):
     """
@@ -142,25 +183,14 @@ def filter_transformadores(branch=None, quality=None, vulnerability=None, feeder
         vulnerability: Nivel de vulnerabilidad o 'all'
         feeder: Alimentador específico o None
     """
-    df = load_transformadores_completo()
-    
-    if df.empty:
-        return df
-    
-    # Aplicar filtros
-    if branch and branch != 'all' and 'N_Sucursal' in df.columns:
-        df = df[df['N_Sucursal'] == branch]
-    
-    if quality and quality != 'all' and 'Resultado' in df.columns:
-        df = df[df['Resultado'] == quality]
-    
-    if vulnerability and vulnerability != 'all' and 'nivel_vulnerabilidad' in df.columns:
-        df = df[df['nivel_vulnerabilidad'] == vulnerability]
-    
-    if feeder and 'Alimentador' in df.columns:
-        df = df[df['Alimentador'] == feeder]
-    
-    return df
+    # Sucursal y alimentador por índice (rango de filas), el resto como máscara
+    return data_service.subset(
+        'transformadores',
+        N_Sucursal=branch,
+        Alimentador=feeder,
+        Resultado=quality,
+        nivel_vulnerabilidad=vulnerability
+    )
 
 def get_top_critical_transformers(n=10):
     """Obtiene los N transformadores más críticos"""
@@ -193,31 +223,25 @@ def get_top_critical_transformers(n=10):
 
 def get_feeder_summary():
     """Obtiene resumen por alimentador"""
-    df = load_transformadores_completo()
+    cube = get_summary_cube()
     feeders = load_alimentadores()
     
-    if df.empty or 'Alimentador' not in df.columns:
+    if cube.empty or 'Alimentador' not in cube.dimensions:
         return pd.DataFrame()
     
     try:
-        # Agregar por alimentador
-        # Usar la primera columna disponible como contador
-        count_col = 'Codigo' if 'Codigo' in df.columns else 'Codigoct' if 'Codigoct' in df.columns else df.columns[0]
-        
-        summary = df.groupby('Alimentador').agg({
-            count_col: 'count',
-            'Potencia': 'sum',
-            'Q_Usuarios': 'sum',
-            'Resultado': lambda x: (x != 'Correcta').mean() if 'Resultado' in df.columns else 0
-        }).rename(columns={
-            count_col: 'num_transformadores',
-            'Potencia': 'potencia_total_kva',
-            'Resultado': 'tasa_problemas'
+        # Agregar por alimentador desde el cubo (medidas ya sumadas por celda)
+        by_feeder = cube.by('Alimentador')
+        summary = pd.DataFrame({
+            'num_transformadores': by_feeder['transformadores'],
+            'potencia_total_kva': by_feeder['potencia_kva'],
+            'Q_Usuarios': by_feeder['usuarios'],
+            'tasa_problemas': by_feeder['tasa_problemas']
         })
         
         # Agregar métricas adicionales si existen
-        if 'indice_vulnerabilidad_compuesto' in df.columns:
-            summary['vulnerabilidad_promedio'] = df.groupby('Alimentador')['indice_vulnerabilidad_compuesto'].mean()
+        if 'vulnerabilidad_promedio' in by_feeder.columns:
+            summary['vulnerabilidad_promedio'] = by_feeder['vulnerabilidad_promedio']
         
         # Merge con datos de alimentadores si disponible
         if not feeders.empty and 'Alimentador' in feeders.columns:
@@ -235,11 +259,8 @@ def get_feeder_summary():
         print(f"Error en get_feeder_summary: {e}")
         return pd.DataFrame()
 
-# Cache para coordenadas válidas
-@lru_cache(maxsize=1)
-def get_valid_coordinates():
-    """Obtiene transformadores con coordenadas válidas para mapas"""
-    df = load_transformadores_completo()
+def _valid_coordinates():
+    df = data_service.frame('transformadores')
     
     if df.empty:
         return pd.DataFrame()
@@ -252,4 +273,9 @@ def get_valid_coordinates():
         (df['Coord_Y'] != 0)
     )
     
-    return df[mask]
\ No newline at end of file
+    return df[mask]
+
+def get_valid_coordinates():
+    """Obtiene transformadores con coordenadas válidas para mapas"""
+    # Calculado una vez por versión del dataset
+    return isolated_copy(data_service.cached('transformadores', 'coordenadas_validas', _valid_coordinates))
\ No newline at end of file
@@ -0,0 +1,363 @@
+"""
+Servicio de Datos Compartido del Dashboard
+==========================================
+Un único punto de carga para todas las páginas, compartido por el proceso:
+
+- Cada dataset se lee una sola vez (Parquet con columnas categóricas para
+  los datos de transformadores) y se recarga solo cuando cambia el archivo
+  de origen (fecha de modificación y tamaño, revisados como máximo cada
+  CHECK_INTERVAL_S segundos).
+- Las filas se ordenan por las columnas de índice (sucursal, alimentador):
+  la selección de una sucursal o de un alimentador es un rango de filas y,
+  con copy-on-write, se devuelve como vista sin copiar datos.
+- Solo lectura: cada página recibe su propia copia (isolated_copy). Las
+  aplicaciones activan copy-on-write al iniciar (enable_copy_on_write,
+  necesario con pandas 2.x): la copia es superficial y solo se copian las
+  columnas que la página modifica. Sin copy-on-write (el servicio usado
+  fuera de las aplicaciones) la copia es completa. Importar el servicio no
+  cambia opciones globales de pandas.
+- Resultados derivados (coordenadas válidas, resúmenes) se guardan por
+  versión del dataset y se descartan al recargar.
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+PANDAS_MAJOR = int(pd.__version__.split('.')[0])
+
+CHECK_INTERVAL_S = 2.0
+
+# Valores de filtro que significan "sin filtro" en los controles de las páginas
+NO_FILTER = ('', 'all')
+
+Loader = Callable[[Path], Any]
+RowSelection = Union[slice, np.ndarray]
+
+
+def resolve_source(path: Path) -> Optional[Path]:
+    """Archivo en disco de una fuente (un .parquet puede existir aún como .csv)"""
+    path = Path(path)
+    if path.exists():
+        return path
+    if path.suffix == '.parquet' and path.with_suffix('.csv').exists():
+        return path.with_suffix('.csv')
+    return None
+
+
+def copy_on_write_enabled() -> bool:
+    """Copy-on-write de pandas activo (siempre desde pandas 3)"""
+    return PANDAS_MAJOR >= 3 or pd.get_option('mode.copy_on_write') is True
+
+
+def enable_copy_on_write() -> None:
+    """
+    Activa copy-on-write de pandas para todo el proceso.
+
+    Lo llaman las aplicaciones del dashboard al iniciar, antes de cargar
+    datasets; con él isolated_copy no copia datos.
+    """
+    if PANDAS_MAJOR < 3:
+        pd.set_option('mode.copy_on_write', True)
+
+
+def isolated_copy(value):
+    """
+    Copia de un DataFrame/Series compartido que se puede modificar sin
+    alterar el original.
+
+    Args:
+        value: DataFrame o Series
+
+    Returns:
+        Copia superficial con copy-on-write (configuración de las
+        aplicaciones); completa sin él
+    """
+    return value.copy(deep=not copy_on_write_enabled())
+
+
+def is_active_filter(value: Any) -> bool:
+    """Un filtro de página con valor (None, '' y 'all' no filtran)"""
+    return value is not None and not (isinstance(value, str) and value in NO_FILTER)
+
+
+def file_signature(path: Optional[Path]) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, tamaño) del archivo, o None si no existe"""
+    if path is None:
+        return None
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def build_index(frame: pd.DataFrame, column: str) -> Dict[Hashable, RowSelection]:
+    """
+    Posiciones de las filas de cada valor de una columna.
+
+    Args:
+        frame: Datos
+        column: Columna de índice
+
+    Returns:
+        {valor: slice si las filas son contiguas, si no array de posiciones}
+    """
+    codes, uniques = pd.factorize(frame[column], sort=False)
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+    index = {}
+    for positions in np.split(order, bounds):
+        if len(positions) == 0 or codes[positions[0]] < 0:
+            continue
+        value = uniques[codes[positions[0]]]
+        first, last = int(positions[0]), int(positions[-1])
+        index[value] = slice(first, last + 1) if last - first + 1 == len(positions) else positions
+    return index
+
+
+class Snapshot(NamedTuple):
+    """
+    Versión cargada de un dataset.
+
+    Se reemplaza entera en cada recarga: quien la lee una vez por llamada
+    ve el valor y los índices de la misma versión aunque otro hilo recargue.
+    """
+    value: Any
+    indexes: Dict[str, Dict[Hashable, RowSelection]]
+    version: int
+    source: Optional[Path]
+    signature: Optional[Tuple[int, int]]
+    derived: Dict[Hashable, Any]
+
+
+@dataclass
+class Dataset:
+    """Dataset registrado y su versión cargada"""
+    name: str
+    sources: Sequence[Tuple[Path, Loader]]
+    default: Optional[Callable[[], Any]] = None
+    index_by: Sequence[str] = ()
+    snapshot: Optional[Snapshot] = None
+    checked_at: float = 0.0
+
+
+class DataService:
+    """Datasets del dashboard cargados una vez por proceso"""
+
+    def __init__(self, check_interval_s: float = CHECK_INTERVAL_S):
+        self.check_interval_s = check_interval_s
+        self._datasets: Dict[str, Dataset] = {}
+        self._lock = threading.RLock()
+        self.loads = 0
+
+    def register(self, name: str, sources: Sequence[Tuple[Union[str, Path], Loader]],
+                 default: Optional[Callable[[], Any]] = None, index_by: Sequence[str] = ()) -> None:
+        """
+        Registra un dataset (volver a registrarlo lo reemplaza).
+
+        Args:
+            name: Nombre del dataset
+            sources: [(ruta, loader)] en orden de preferencia; se usa la
+                primera que exista
+            default: Valor cuando no existe ninguna fuente (datos de ejemplo)
+            index_by: Columnas con selección por valor (DataFrame); las
+                filas se ordenan por ellas
+        """
+        with self._lock:
+            self._datasets[name] = Dataset(
+                name=name,
+                sources=[(Path(path), loader) for path, loader in sources],
+                default=default,
+                index_by=tuple(index_by),
+            )
+
+    def _snapshot(self, name: str) -> Snapshot:
+        """Versión vigente del dataset (recargada si cambió el archivo)"""
+        if name not in self._datasets:
+            raise KeyError(f"Dataset no registrado: {name}")
+        dataset = self._datasets[name]
+        now = time.monotonic()
+        snapshot = dataset.snapshot
+        if snapshot is not None and now - dataset.checked_at < self.check_interval_s:
+            return snapshot
+        with self._lock:
+            dataset.checked_at = now
+            source = next((resolved for resolved in (resolve_source(p) for p, _ in dataset.sources)
+                           if resolved is not None), None)
+            snapshot = dataset.snapshot
+            if snapshot is None or source != snapshot.source or file_signature(source) != snapshot.signature:
+                self._load(dataset)
+            return dataset.snapshot
+
+    def _load(self, dataset: Dataset) -> None:
+        """Carga la primera fuente disponible (o el valor por defecto), indexa y publica la versión"""
+        value, source = None, None
+        for path, loader in dataset.sources:
+            resolved = resolve_source(path)
+            if resolved is None:
+                continue
+            try:
+                value, source = loader(resolved), resolved
+                break
+            except Exception as e:
+                logger.warning(f"{dataset.name}: error leyendo {resolved}: {e}")
+        if source is None:
+            value = dataset.default() if dataset.default is not None else None
+
+        indexes = {}
+        if isinstance(value, pd.DataFrame) and dataset.index_by:
+            present = [c for c in dataset.index_by if c in value.columns]
+            if present:
+                value = value.sort_values(present, kind='stable', ignore_index=True)
+            indexes = {c: build_index(value, c) for c in present}
+
+        version = dataset.snapshot.version + 1 if dataset.snapshot is not None else 1
+        # Una sola asignación: los lectores ven la versión anterior o la nueva completas
+        dataset.snapshot = Snapshot(value=value, indexes=indexes, version=version, source=source,
+                                    signature=file_signature(source), derived={})
+        self.loads += 1
+        logger.info(f"{dataset.name}: cargado desde {source or 'valores por defecto'} "
+                    f"(versión {version})")
+
+    def get(self, name: str) -> Any:
+        """
+        Valor del dataset (DataFrame o JSON).
+
+        Los DataFrame se devuelven como copia propia (isolated_copy); los
+        diccionarios de JSON son compartidos y no deben modificarse.
+        """
+        value = self._snapshot(name).value
+        if isinstance(value, pd.DataFrame):
+            return isolated_copy(value)
+        return value
+
+    def frame(self, name: str) -> pd.DataFrame:
+        """DataFrame completo del dataset (vacío si no se pudo cargar)"""
+        value = self.get(name)
+        return value if isinstance(value, pd.DataFrame) else pd.DataFrame()
+
+    def version(self, name: str) -> int:
+        """Versión cargada del dataset (aumenta con cada recarga)"""
+        return self._snapshot(name).version
+
+    def source(self, name: str) -> Tuple[Optional[Path], Optional[Tuple[int, int]]]:
+        """Archivo del que se cargó el dataset y su firma (None si son valores por defecto)"""
+        snapshot = self._snapshot(name)
+        return snapshot.source, snapshot.signature
+
+    def values(self, name: str, column: str) -> list:
+        """Valores de una columna de índice, ordenados"""
+        indexes = self._snapshot(name).indexes
+        if column not in indexes:
+            raise KeyError(f"{name} no tiene índice por {column}")
+        return sorted(indexes[column], key=str)
+
+    def counts(self, name: str, column: str) -> Dict[Hashable, int]:
+        """Cantidad de filas por valor de una columna de índice"""
+        indexes = self._snapshot(name).indexes
+        if column not in indexes:
+            raise KeyError(f"{name} no tiene índice por {column}")
+        return {value: (rows.stop - rows.start if isinstance(rows, slice) else len(rows))
+                for value, rows in indexes[column].items()}
+
+    def subset(self, name: str, **filters) -> pd.DataFrame:
+        """
+        Filas del dataset que cumplen todos los filtros columna = valor.
+
+        Los filtros con None, '' o 'all' se ignoran. El primer filtro sobre
+        una columna de índice contigua se resuelve como rango de filas; el
+        resto se aplica como máscara sobre esas filas. El resultado es una
+        copia propia (isolated_copy).
+
+        Args:
+            name: Nombre del dataset
+            **filters: columna=valor
+
+        Returns:
+            DataFrame con las filas seleccionadas
+        """
+        # Valor e índices de la misma versión aunque otro hilo recargue
+        snapshot = self._snapshot(name)
+        frame, indexes = snapshot.value, snapshot.indexes
+        if not isinstance(frame, pd.DataFrame):
+            return pd.DataFrame()
+        active = {c: v for c, v in filters.items() if is_active_filter(v)}
+        if not active:
+            return isolated_copy(frame)
+
+        # Índices primero, empezando por los rangos contiguos
+        indexed = sorted((c for c in active if c in indexes),
+                         key=lambda c: not isinstance(indexes[c].get(active[c]), slice))
+        if indexed:
+            first = indexed[0]
+            rows = indexes[first].get(active.pop(first))
+            if rows is None:
+                return isolated_copy(frame.iloc[0:0])
+            frame = frame.iloc[rows]
+        for column, value in active.items():
+            if column not in frame.columns:
+                continue
+            frame = frame[frame[column] == value]
+        return isolated_copy(frame)
+
+    def cached(self, name: str, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Resultado derivado del dataset, calculado una vez por versión.
+
+        Args:
+            name: Dataset del que depende
+            key: Identificador del resultado
+            compute: Función sin argumentos que lo calcula
+
+        Returns:
+            Resultado (compartido: no modificar)
+        """
+        derived = self._snapshot(name).derived
+        if key not in derived:
+            derived[key] = compute()
+        return derived[key]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Estado de los datasets cargados (para diagnóstico)"""
+        stats = {}
+        for name, dataset in self._datasets.items():
+            snapshot = dataset.snapshot
+            value = snapshot.value if snapshot is not None else None
+            stats[name] = {
+                'cargado': snapshot is not None,
+                'fuente': Path(snapshot.source).name if snapshot is not None and snapshot.source else None,
+                'version': snapshot.version if snapshot is not None else 0,
+                'filas': len(value) if isinstance(value, pd.DataFrame) else None,
+                'memoria_mb': (float(value.memory_usage(deep=True).sum()) / 1e6
+                               if isinstance(value, pd.DataFrame) else None),
+            }
+        return stats
+
+
+def read_json(path: Path) -> Any:
+    """Loader de reportes JSON"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def read_csv(path: Path) -> pd.DataFrame:
+    """Loader de tablas CSV"""
+    return pd.read_csv(path)
+
+
+# Instancia compartida por todas las páginas del proceso
+data_service = DataService()
@@ -0,0 +1,303 @@
+"""
+Acceso de Solo Lectura a la Base SQLite del Dashboard
+=====================================================
+Capa de acceso a datos para las consultas de los callbacks:
+
+- Conexiones de solo lectura (URI mode=ro) en un pool acotado compartido
+  por todos los hilos: cada consulta o ronda toma una conexión libre y la
+  devuelve al terminar (el servidor de desarrollo usa un hilo por request,
+  así que no sirve una conexión por hilo). Como máximo MAX_CONNECTIONS
+  abiertas; se reabren solo si el archivo de la base se reemplaza (la
+  reconstrucción lo borra y lo crea de nuevo).
+- La base se deja en modo WAL, así una reconstrucción o actualización no
+  bloquea a los lectores.
+- Consultas con nombre y parámetros (?): el SQL es fijo, así que sqlite3 lo
+  prepara una vez por conexión y lo reutiliza desde su caché de sentencias.
+- Resultados guardados por versión de los datos, que es la última
+  metricas_resumen.fecha_actualizacion (revisada como máximo cada
+  CHECK_INTERVAL_S segundos): al recalcular las métricas se descartan.
+- Rondas: varias consultas en una misma lectura (una transacción, datos
+  consistentes). Los callbacks disparados por el mismo evento piden la
+  misma ronda y solo el primero la ejecuta.
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterator, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from dashboard.utils.data_service import CHECK_INTERVAL_S
+
+logger = logging.getLogger(__name__)
+
+# Sentencias preparadas que sqlite3 conserva por conexión
+CACHED_STATEMENTS = 64
+MAX_RESULTS = 128
+# Conexiones abiertas a la vez (lecturas concurrentes; SQLite en WAL no bloquea lectores)
+MAX_CONNECTIONS = 4
+
+VERSION_SQL = "SELECT MAX(fecha_actualizacion) FROM metricas_resumen"
+
+
+def file_identity(path: Path) -> Optional[Tuple[int, int]]:
+    """(dispositivo, inodo) del archivo: cambia si se borra y se vuelve a crear"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+@dataclass(frozen=True)
+class Query:
+    """Consulta con nombre y SQL fijo con parámetros ?"""
+    name: str
+    sql: str
+
+
+class ReadOnlyPool:
+    """Pool acotado de conexiones de solo lectura y resultados por versión de los datos"""
+
+    def __init__(self, path: Path, queries: Sequence[Query] = (),
+                 check_interval_s: float = CHECK_INTERVAL_S, max_results: int = MAX_RESULTS,
+                 max_connections: int = MAX_CONNECTIONS):
+        self.path = Path(path)
+        self.queries: Dict[str, Query] = {}
+        self.check_interval_s = check_interval_s
+        self.max_results = max_results
+        self.max_connections = max_connections
+        self._lock = threading.Lock()
+        self._round_locks: Dict[Hashable, threading.Lock] = {}
+        # Conexiones libres (generación, conexión); el semáforo limita las abiertas
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._open = 0
+        self._results: Dict[Hashable, Any] = {}
+        self._identity: Optional[Tuple[int, int]] = None
+        self._generation = 0
+        self._version: Any = None
+        self._version_stale = True
+        self._checked_at = 0.0
+        self.opened = 0
+        self.executed = 0
+        self.hits = 0
+        for query in queries:
+            self.register(query)
+
+    def register(self, query: Query) -> Query:
+        """Registra una consulta con nombre"""
+        self.queries[query.name] = query
+        return query
+
+    def _ensure_wal(self) -> None:
+        """Deja la base en modo WAL (persistente en el archivo); si no se puede, sigue igual"""
+        try:
+            conn = sqlite3.connect(self.path, timeout=1.0)
+            try:
+                mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+            finally:
+                conn.close()
+            if mode.lower() != 'wal':
+                logger.info(f"La base {self.path.name} sigue en modo {mode}")
+        except sqlite3.Error as e:
+            logger.warning(f"No se pudo activar WAL en {self.path.name}: {e}")
+
+    def _refresh(self) -> None:
+        """Revisa el archivo y marca la versión para releer (como máximo cada check_interval_s)"""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval_s:
+            return
+        identity = file_identity(self.path)
+        with self._lock:
+            self._checked_at = now
+            self._version_stale = True
+            changed = identity != self._identity
+            if changed:
+                if self._identity is not None:
+                    logger.info(f"Base {self.path.name} reemplazada: se reabren las conexiones")
+                self._identity = identity
+                self._generation += 1
+                self._results.clear()
+        if changed and identity is not None:
+            self._ensure_wal()
+
+    def _open_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True,
+                               check_same_thread=False, cached_statements=CACHED_STATEMENTS)
+        conn.execute("PRAGMA query_only = ON")
+        with self._lock:
+            self._open += 1
+            self.opened += 1
+        return conn
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._open -= 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Conexión de solo lectura prestada por el pool mientras dura el with.
+
+        Si las max_connections están en uso espera a que se libere una.
+
+        Yields:
+            sqlite3.Connection abierta con mode=ro
+
+        Raises:
+            sqlite3.OperationalError: Si la base no existe
+        """
+        self._refresh()
+        self._slots.acquire()
+        try:
+            conn = None
+            while conn is None:
+                try:
+                    generation, idle = self._idle.get_nowait()
+                except queue.Empty:
+                    conn = self._open_connection()
+                    generation = self._generation
+                    break
+                if generation == self._generation:
+                    conn = idle
+                else:
+                    self._discard(idle)
+            try:
+                yield conn
+            except BaseException:
+                # Una transacción a medio terminar no vuelve al pool
+                self._discard(conn)
+                raise
+            else:
+                if generation == self._generation:
+                    self._idle.put((generation, conn))
+                else:
+                    self._discard(conn)
+        finally:
+            self._slots.release()
+
+    def version(self) -> Any:
+        """Versión de los datos: última fecha de actualización de las métricas"""
+        self._refresh()
+        if self._version_stale:
+            try:
+                with self.connection() as conn:
+                    version = conn.execute(VERSION_SQL).fetchone()[0]
+            except sqlite3.Error as e:
+                logger.warning(f"No se pudo leer la versión de {self.path.name}: {e}")
+                return None
+            with self._lock:
+                if version != self._version:
+                    self._results.clear()
+                self._version, self._version_stale = version, False
+        return self._version
+
+    def _execute(self, conn: sqlite3.Connection, name: str, params: Sequence) -> pd.DataFrame:
+        cursor = conn.execute(self.queries[name].sql, tuple(params))
+        columns = [d[0] for d in cursor.description]
+        frame = pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+        with self._lock:
+            self.executed += 1
+        return frame
+
+    def _cached(self, key: Hashable, compute) -> Any:
+        """Resultado de la clave para la versión actual; un solo hilo lo calcula"""
+        key = (self.version(), self._generation, key)
+        if key in self._results:
+            with self._lock:
+                self.hits += 1
+            return self._results[key]
+        with self._lock:
+            round_lock = self._round_locks.setdefault(key, threading.Lock())
+        with round_lock:
+            if key in self._results:
+                with self._lock:
+                    self.hits += 1
+                return self._results[key]
+            try:
+                value = compute()
+                with self._lock:
+                    if len(self._results) >= self.max_results:
+                        self._results.pop(next(iter(self._results)))
+                    self._results[key] = value
+            finally:
+                with self._lock:
+                    self._round_locks.pop(key, None)
+        return value
+
+    def query(self, name: str, params: Sequence = ()) -> pd.DataFrame:
+        """
+        Resultado de una consulta registrada (guardado por versión de los datos).
+
+        Args:
+            name: Nombre de la consulta
+            params: Valores de los parámetros ?
+
+        Returns:
+            DataFrame (compartido: no modificar en el lugar)
+        """
+        def compute():
+            with self.connection() as conn:
+                return self._execute(conn, name, params)
+        return self._cached(('query', name, tuple(params)), compute)
+
+    def round(self, names: Sequence[str], params: Optional[Dict[str, Sequence]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Varias consultas en una sola lectura consistente.
+
+        Args:
+            names: Consultas de la ronda
+            params: Parámetros por nombre de consulta (las demás sin parámetros)
+
+        Returns:
+            {nombre: DataFrame} (compartidos: no modificar en el lugar)
+        """
+        params = {name: tuple((params or {}).get(name, ())) for name in names}
+
+        def compute():
+            with self.connection() as conn:
+                conn.execute("BEGIN")
+                try:
+                    return {name: self._execute(conn, name, params[name]) for name in names}
+                finally:
+                    conn.rollback()
+        return self._cached(('round', tuple(params.items())), compute)
+
+    def close(self) -> None:
+        """Cierra las conexiones libres (las prestadas se cierran al devolverse) y descarta los resultados"""
+        with self._lock:
+            self._generation += 1
+            self._results.clear()
+            self._version_stale = True
+        while True:
+            try:
+                _, conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de uso (para diagnóstico)"""
+        with self._lock:
+            return {
+                'conexiones_abiertas': self.opened,
+                'conexiones_en_pool': self._open,
+                'consultas_ejecutadas': self.executed,
+                'aciertos': self.hits,
+                'resultados': len(self._results),
+                'version': self._version,
+            }
@@ -0,0 +1,240 @@
+"""
+Caché de Figuras de los Callbacks del Dashboard
+===============================================
+Memoriza la salida de callbacks que construyen figuras Plotly (o tablas)
+a partir de sus entradas:
+
+- Clave: (callback, entradas normalizadas, digest de datos/configuración).
+  El digest identifica la versión de los datos por archivo (fecha de
+  modificación y tamaño), así que sirve entre procesos y reinicios.
+- LRU en memoria compartida por el proceso; opcionalmente se escribe en un
+  directorio local para que otros procesos (workers) y reinicios reutilicen
+  lo ya calculado.
+- Contadores de aciertos (memoria y disco), fallos y descartes.
+
+Solo para callbacks cuya salida depende únicamente de sus argumentos y de
+los datos del digest (no de callback_context ni de la hora).
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Union
+
+from dashboard.utils.data_service import data_service, file_signature
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRIES = 256
+MAX_DISK_ENTRIES = 2000
+DISK_SUFFIX = '.pkl'
+
+# Directorio de la copia en disco que activan las aplicaciones
+DISK_DIR = Path(__file__).parent.parent.parent / 'data' / '.figure_cache'
+
+# Habilita /cache-stats fuera del modo debug (p. ej. en un servidor de pruebas)
+DIAGNOSTICS_ENV = 'DASHBOARD_DIAGNOSTICS'
+
+
+def diagnostics_enabled(server) -> bool:
+    """
+    Rutas de diagnóstico activas: servidor Flask en modo debug o
+    DASHBOARD_DIAGNOSTICS=1. En producción no se exponen.
+    """
+    return bool(server.debug) or os.environ.get(DIAGNOSTICS_ENV, '').lower() in ('1', 'true', 'yes')
+
+
+def normalize(value: Any) -> str:
+    """Representación canónica de entradas y digests (JSON con claves ordenadas)"""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), default=repr)
+
+
+def dataset_digest(*names: str) -> list:
+    """Digest de datasets del servicio de datos (archivo de origen y su firma)"""
+    digest = []
+    for name in names:
+        source, signature = data_service.source(name)
+        digest.append([name, source.name if source else None, signature])
+    return digest
+
+
+def file_digest(*paths: Union[str, Path]) -> list:
+    """Digest de archivos (nombre, fecha de modificación y tamaño)"""
+    return [[Path(path).name, file_signature(Path(path))] for path in paths]
+
+
+class FigureCache:
+    """LRU de salidas de callbacks con copia opcional en disco"""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, disk_dir: Optional[Path] = None,
+                 max_disk_entries: int = MAX_DISK_ENTRIES):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.disk_dir = None
+        self._entries: 'OrderedDict[str, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if disk_dir is not None:
+            self.enable_disk(disk_dir)
+
+    def enable_disk(self, disk_dir: Union[str, Path]) -> None:
+        """Activa la copia en disco de las entradas (directorio local)"""
+        disk_dir = Path(disk_dir)
+        try:
+            disk_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Caché de figuras solo en memoria, no se pudo crear {disk_dir}: {e}")
+            return
+        self.disk_dir = disk_dir
+
+    def key(self, callback_id: str, args: Sequence, kwargs: Dict[str, Any], digest: Any = None) -> str:
+        """
+        Clave de una llamada.
+
+        Args:
+            callback_id: Identificador del callback
+            args: Argumentos posicionales (valores de Input/State)
+            kwargs: Argumentos por nombre
+            digest: Versión de los datos y configuración de los que depende
+
+        Returns:
+            Hash SHA-256 hexadecimal
+        """
+        payload = normalize([callback_id, list(args), kwargs, digest])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / (key + DISK_SUFFIX)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Entrada de la clave (memoria, luego disco) o default"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            try:
+                with open(path, 'rb') as f:
+                    value = pickle.load(f)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Entrada de caché ilegible {path.name}: {e}")
+            else:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._store_memory(key, value)
+                return value
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def _store_memory(self, key: str, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def set(self, key: str, value: Any) -> None:
+        """Guarda una entrada (y su copia en disco si está activa)"""
+        with self._lock:
+            self._store_memory(key, value)
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(path)
+            self._prune_disk()
+        except Exception as e:
+            logger.warning(f"No se pudo guardar la entrada de caché {path.name}: {e}")
+            tmp.unlink(missing_ok=True)
+
+    def _prune_disk(self) -> None:
+        """Elimina las entradas en disco más antiguas por encima del máximo"""
+        entries = [entry for entry in os.scandir(self.disk_dir) if entry.name.endswith(DISK_SUFFIX)]
+        if len(entries) <= self.max_disk_entries:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+        for entry in entries[:len(entries) - self.max_disk_entries]:
+            Path(entry.path).unlink(missing_ok=True)
+
+    def clear(self, disk: bool = False) -> None:
+        """Vacía la memoria (y el disco si disk=True); los contadores se mantienen"""
+        with self._lock:
+            self._entries.clear()
+        if disk and self.disk_dir is not None:
+            for path in self.disk_dir.glob('*' + DISK_SUFFIX):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de uso (para diagnóstico)"""
+        with self._lock:
+            requests = self.hits + self.disk_hits + self.misses
+            return {
+                'entradas': len(self._entries),
+                'aciertos': self.hits,
+                'aciertos_disco': self.disk_hits,
+                'fallos': self.misses,
+                'descartes': self.evictions,
+                'tasa_aciertos': (self.hits + self.disk_hits) / requests if requests else 0.0,
+                'disco': self.disk_dir.name if self.disk_dir else None,
+            }
+
+
+# Instancia compartida por todas las páginas del proceso
+figure_cache = FigureCache()
+
+_MISSING = object()
+
+
+def memoize_figure(digest: Optional[Callable[[], Any]] = None, ignore: Sequence[int] = (),
+                   cache: Optional[FigureCache] = None, name: Optional[str] = None):
+    """
+    Decorador de callbacks: reutiliza la salida para las mismas entradas y datos.
+
+    Se aplica debajo de @callback. Las excepciones (incluida PreventUpdate)
+    no se guardan.
+
+    Args:
+        digest: Función sin argumentos con la versión de los datos y
+            configuración usados (p.ej. lambda: dataset_digest('transformadores'))
+        ignore: Posiciones de argumentos que no cambian la salida (n_clicks)
+        cache: Caché a usar (por defecto figure_cache)
+        name: Identificador del callback (por defecto módulo.función)
+
+    Returns:
+        Decorador
+    """
+    def decorator(func):
+        callback_id = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            target = cache or figure_cache
+            key_args = [arg for i, arg in enumerate(args) if i not in ignore]
+            key = target.key(callback_id, key_args, kwargs, digest() if digest else None)
+            value = target.get(key, _MISSING)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                target.set(key, value)
+            return value
+        return wrapper
+    return decorator
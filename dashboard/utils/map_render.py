@@ -0,0 +1,327 @@
+"""
+Mapas de Transformadores con Agregación por Vista
+=================================================
+Renderizado de mapas de la red completa (~14k transformadores) sin enviar
+cada punto al navegador:
+
+- Según la vista del mapa (centro y zoom de relayoutData) se envían solo
+  los transformadores visibles. Si son más que POINT_LIMIT (zoom bajo) se
+  agregan en celdas de una grilla de CELL_PX pixeles de pantalla: una
+  marca por celda con cantidad, usuarios, kVA e indicador promedio.
+- La grilla está anclada a coordenadas fijas, así que al desplazar el mapa
+  las celdas no cambian; la vista se redondea a esa grilla para que vistas
+  casi iguales compartan la misma figura en la caché.
+- El texto de hover no se arma en Python: cada punto lleva sus valores en
+  customdata y el navegador los formatea con hovertemplate.
+- Las figuras son diccionarios (sin validación de plotly por punto) con
+  coordenadas redondeadas a ~1 m.
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+POINT_LIMIT = 4000
+CELL_PX = 24
+TILE_PX = 256
+MAP_WIDTH_PX = 1000
+MAP_HEIGHT_PX = 500
+MAX_ZOOM = 18
+COORD_DECIMALS = 5
+# Fracción de la vista agregada a cada lado (desplazamientos cortos sin huecos)
+VIEW_MARGIN = 0.25
+
+# Escalas explícitas (plotly.js no conoce los nombres de escalas de plotly express)
+PROBLEM_SCALE = [[0.0, '#00cc44'], [0.5, '#ff9900'], [1.0, '#cc0000']]
+VULNERABILITY_SCALE = [[0.0, 'green'], [0.25, 'lightgreen'], [0.5, 'yellow'], [0.75, 'orange'], [1.0, 'red']]
+
+# Resultado -> indicador de problema (color de puntos y promedio de celdas)
+PROBLEM_INDEX = {'Correcta': 0.0, 'Penalizada': 0.5, 'Fallida': 1.0}
+
+
+@dataclass(frozen=True)
+class Viewport:
+    """Vista del mapa: límites en grados y zoom de mapbox"""
+    lon_min: float
+    lon_max: float
+    lat_min: float
+    lat_max: float
+    zoom: float
+
+    @property
+    def center(self) -> Dict[str, float]:
+        return {'lon': (self.lon_min + self.lon_max) / 2, 'lat': (self.lat_min + self.lat_max) / 2}
+
+    def snapped(self) -> 'Viewport':
+        """Vista redondeada (zoom a medios niveles, límites a la grilla de celdas)"""
+        zoom = math.floor(self.zoom * 2) / 2
+        step = cell_size_deg(zoom) * 4
+        return Viewport(
+            lon_min=math.floor(self.lon_min / step) * step,
+            lon_max=math.ceil(self.lon_max / step) * step,
+            lat_min=math.floor(self.lat_min / step) * step,
+            lat_max=math.ceil(self.lat_max / step) * step,
+            zoom=zoom,
+        )
+
+    def contains(self, lon: np.ndarray, lat: np.ndarray, margin: float = VIEW_MARGIN) -> np.ndarray:
+        """Máscara de coordenadas dentro de la vista ampliada en margin"""
+        dx = (self.lon_max - self.lon_min) * margin
+        dy = (self.lat_max - self.lat_min) * margin
+        return ((lon >= self.lon_min - dx) & (lon <= self.lon_max + dx) &
+                (lat >= self.lat_min - dy) & (lat <= self.lat_max + dy))
+
+    def as_key(self) -> List[float]:
+        """Representación JSON (clave de caché)"""
+        return [round(v, 6) for v in (self.lon_min, self.lon_max, self.lat_min, self.lat_max, self.zoom)]
+
+    @classmethod
+    def from_key(cls, key: Sequence[float]) -> 'Viewport':
+        return cls(*key)
+
+
+def cell_size_deg(zoom: float) -> float:
+    """Lado de una celda de CELL_PX pixeles en grados de longitud para un zoom"""
+    return CELL_PX * 360.0 / (TILE_PX * 2 ** zoom)
+
+
+def viewport_around(lon: float, lat: float, zoom: float,
+                    width_px: int = MAP_WIDTH_PX, height_px: int = MAP_HEIGHT_PX) -> Viewport:
+    """Vista estimada a partir del centro y zoom (tamaño del mapa de referencia)"""
+    half_lon = width_px / 2 * 360.0 / (TILE_PX * 2 ** zoom)
+    half_lat = height_px / 2 * 360.0 / (TILE_PX * 2 ** zoom) * math.cos(math.radians(lat))
+    return Viewport(lon - half_lon, lon + half_lon, lat - half_lat, lat + half_lat, zoom)
+
+
+def fit_viewport(lon: np.ndarray, lat: np.ndarray,
+                 width_px: int = MAP_WIDTH_PX, height_px: int = MAP_HEIGHT_PX) -> Viewport:
+    """
+    Vista que contiene todas las coordenadas (vista inicial del mapa).
+
+    Args:
+        lon, lat: Coordenadas válidas
+        width_px, height_px: Tamaño de referencia del mapa
+
+    Returns:
+        Viewport
+    """
+    lon = np.asarray(lon, dtype=float)
+    lat = np.asarray(lat, dtype=float)
+    if len(lon) == 0:
+        return viewport_around(-67.0, -40.0, 5)
+    # 10% de borde alrededor de los puntos
+    lon_span = max(float(lon.max() - lon.min()), 1e-3) * 1.1
+    lat_center = float((lat.max() + lat.min()) / 2)
+    lat_span = max(float(lat.max() - lat.min()), 1e-3) * 1.1 / math.cos(math.radians(lat_center))
+    zoom = min(math.log2(360.0 * width_px / (TILE_PX * lon_span)),
+               math.log2(360.0 * height_px / (TILE_PX * lat_span)))
+    zoom = max(0.0, min(MAX_ZOOM, zoom))
+    return viewport_around(float((lon.max() + lon.min()) / 2), lat_center, zoom, width_px, height_px)
+
+
+def viewport_from_relayout(relayout: Optional[Dict[str, Any]], default: Viewport) -> Viewport:
+    """
+    Vista actual del mapa a partir de relayoutData de un gráfico mapbox.
+
+    Usa las esquinas de mapbox._derived si están; si no, estima la vista a
+    partir del centro y el zoom. Eventos sin datos de mapbox devuelven default.
+
+    Args:
+        relayout: relayoutData del dcc.Graph (o None)
+        default: Vista si el evento no describe el mapa
+
+    Returns:
+        Viewport
+    """
+    if not relayout:
+        return default
+    zoom = relayout.get('mapbox.zoom')
+    center = relayout.get('mapbox.center')
+    corners = (relayout.get('mapbox._derived') or {}).get('coordinates')
+    if zoom is None and center is None and not corners:
+        return default
+    zoom = float(zoom) if zoom is not None else default.zoom
+    if corners:
+        lons = [float(c[0]) for c in corners]
+        lats = [float(c[1]) for c in corners]
+        return Viewport(min(lons), max(lons), min(lats), max(lats), zoom)
+    center = center or default.center
+    return viewport_around(float(center['lon']), float(center['lat']), zoom)
+
+
+def valid_coordinates(df: pd.DataFrame, lon_column: str = 'Coord_X', lat_column: str = 'Coord_Y') -> pd.DataFrame:
+    """Filas con coordenadas no nulas y distintas de cero"""
+    lon = pd.to_numeric(df[lon_column], errors='coerce')
+    lat = pd.to_numeric(df[lat_column], errors='coerce')
+    return df[lon.notna() & lat.notna() & (lon != 0) & (lat != 0)]
+
+
+def aggregate_cells(lon: np.ndarray, lat: np.ndarray, color: np.ndarray,
+                    sums: Dict[str, np.ndarray], cell_deg: float) -> pd.DataFrame:
+    """
+    Agrega puntos en celdas de una grilla anclada en (0, 0).
+
+    Args:
+        lon, lat: Coordenadas
+        color: Indicador numérico por punto (se promedia ignorando NaN)
+        sums: {nombre: valores} a sumar por celda
+        cell_deg: Lado de la celda en grados
+
+    Returns:
+        DataFrame con lon/lat (centroide), transformadores, color y sumas
+    """
+    ix = np.floor(lon / cell_deg).astype(np.int64)
+    iy = np.floor(lat / cell_deg).astype(np.int64)
+    codes, _ = pd.factorize(ix * 10_000_000 + iy, sort=True)
+    n_cells = int(codes.max()) + 1 if len(codes) else 0
+    count = np.bincount(codes, minlength=n_cells).astype(np.int64)
+
+    color = np.asarray(color, dtype=float)
+    has_color = ~np.isnan(color)
+    color_n = np.bincount(codes, weights=has_color, minlength=n_cells)
+    color_sum = np.bincount(codes, weights=np.where(has_color, color, 0.0), minlength=n_cells)
+
+    cells = pd.DataFrame({
+        'lon': np.bincount(codes, weights=lon, minlength=n_cells) / np.maximum(count, 1),
+        'lat': np.bincount(codes, weights=lat, minlength=n_cells) / np.maximum(count, 1),
+        'transformadores': count,
+        'color': np.divide(color_sum, color_n, out=np.full(n_cells, np.nan), where=color_n > 0),
+    })
+    for name, values in sums.items():
+        values = np.nan_to_num(np.asarray(values, dtype=float))
+        cells[name] = np.bincount(codes, weights=values, minlength=n_cells)
+    return cells
+
+
+def _array(values: Any, decimals: Optional[int] = None) -> list:
+    """Lista JSON de un arreglo (NaN -> None), opcionalmente redondeada"""
+    values = np.asarray(values, dtype=float)
+    if decimals is not None:
+        values = np.round(values, decimals)
+    return [None if v != v else v for v in values.tolist()]
+
+
+def _customdata(frame: pd.DataFrame, columns: Sequence[str]) -> list:
+    """Filas de customdata (valores crudos, formateados por el navegador)"""
+    data = frame[list(columns)].astype(object)
+    return data.where(data.notna(), None).to_numpy().tolist()
+
+
+def map_layer(df: pd.DataFrame, viewport: Viewport, color: np.ndarray,
+              hover_fields: Sequence[Tuple[str, str, str]], color_label: str,
+              sum_fields: Sequence[Tuple[str, str]] = (), size_column: Optional[str] = None, point_limit: int = POINT_LIMIT,
+              lon_column: str = 'Coord_X', lat_column: str = 'Coord_Y') -> Dict[str, Any]:
+    """
+    Traza scattermapbox de los transformadores de la vista.
+
+    Args:
+        df: Transformadores con coordenadas válidas
+        viewport: Vista del mapa
+        color: Indicador numérico por fila de df (color de puntos, promedio de celdas)
+        hover_fields: [(etiqueta, columna, formato d3)]; la primera se muestra en negrita
+        color_label: Nombre del indicador en el hover de las celdas
+        sum_fields: [(etiqueta, columna)] sumadas por celda en el hover de las celdas
+            (las columnas que falten en df se omiten)
+        size_column: Columna para el tamaño de los puntos (None = fijo)
+        point_limit: Máximo de puntos individuales antes de agregar
+        lon_column, lat_column: Columnas de coordenadas
+
+    Returns:
+        Traza (diccionario) con 'meta' = {'modo', 'transformadores', 'marcas'}
+    """
+    lon = df[lon_column].to_numpy(dtype=float)
+    lat = df[lat_column].to_numpy(dtype=float)
+    color = np.asarray(color, dtype=float)
+    visible = viewport.contains(lon, lat)
+    n_visible = int(visible.sum())
+
+    if n_visible <= point_limit:
+        points = df[visible]
+        columns = [column for _, column, _ in hover_fields]
+        lines = [f"<b>%{{customdata[0]{hover_fields[0][2]}}}</b>"] + [
+            f"{label}: %{{customdata[{i}]{fmt}}}" for i, (label, _, fmt) in enumerate(hover_fields) if i > 0]
+        size = 8
+        if size_column is not None and size_column in points.columns:
+            values = points[size_column].to_numpy(dtype=float)
+            top = np.nanmax(values) if len(values) and np.isfinite(values).any() else 0
+            size = _array(5 + 10 * np.sqrt(np.nan_to_num(values) / top) if top > 0 else np.full(len(values), 8.0), 1)
+        return {
+            'type': 'scattermapbox',
+            'mode': 'markers',
+            'lon': _array(lon[visible], COORD_DECIMALS),
+            'lat': _array(lat[visible], COORD_DECIMALS),
+            'customdata': _customdata(points, columns),
+            'hovertemplate': '<br>'.join(lines) + '<extra></extra>',
+            'marker': {'color': _array(color[visible], 3), 'size': size, 'opacity': 0.8},
+            'meta': {'modo': 'puntos', 'transformadores': n_visible, 'marcas': n_visible},
+        }
+
+    sum_fields = [(label, column) for label, column in sum_fields if column in df.columns]
+    cells = aggregate_cells(lon[visible], lat[visible], color[visible],
+                            {column: df[column].to_numpy(dtype=float)[visible] for _, column in sum_fields},
+                            cell_size_deg(viewport.zoom))
+    size = 8 + 22 * np.sqrt(cells['transformadores'] / cells['transformadores'].max())
+    hover = ['%{customdata[0]:,} transformadores'] + [
+        f"{label}: %{{customdata[{i}]:,.0f}}" for i, (label, _) in enumerate(sum_fields, start=1)]
+    hover.append(f"{color_label} promedio: %{{customdata[{len(hover)}]:.2f}}")
+    columns = ['transformadores'] + [column for _, column in sum_fields] + ['color']
+    cells['color'] = cells['color'].round(3)
+    return {
+        'type': 'scattermapbox',
+        'mode': 'markers',
+        'lon': _array(cells['lon'], COORD_DECIMALS),
+        'lat': _array(cells['lat'], COORD_DECIMALS),
+        'customdata': _customdata(cells, columns),
+        'hovertemplate': '<br>'.join(hover) + '<extra>Acerque para ver transformadores</extra>',
+        'marker': {'color': _array(cells['color'], 3), 'size': _array(size, 1), 'opacity': 0.75},
+        'meta': {'modo': 'celdas', 'transformadores': n_visible, 'marcas': len(cells)},
+    }
+
+
+def map_figure(trace: Dict[str, Any], viewport: Viewport, colorscale: list, color_label: str,
+               cmin: float = 0.0, cmax: float = 1.0, height: int = MAP_HEIGHT_PX,
+               style: str = 'carto-positron', title: Optional[str] = None,
+               uirevision: str = 'mapa') -> Dict[str, Any]:
+    """
+    Figura (diccionario) de un mapa con una traza de map_layer.
+
+    uirevision conserva el zoom y la posición del usuario cuando la figura
+    se reemplaza al mover el mapa.
+
+    Args:
+        trace: Traza de map_layer
+        viewport: Vista inicial
+        colorscale: Escala de colores explícita
+        color_label: Título de la barra de colores
+        cmin, cmax: Rango del indicador
+        height: Alto del mapa en pixeles
+        style: Estilo de mapbox
+        title: Título (None = sin título)
+        uirevision: Identificador de la vista a conservar
+
+    Returns:
+        Figura para dcc.Graph
+    """
+    trace = {**trace, 'marker': {**trace['marker'], 'colorscale': colorscale, 'cmin': cmin, 'cmax': cmax,
+                                 'showscale': True, 'colorbar': {'title': {'text': color_label}}}}
+    meta = trace['meta']
+    note = (f"{meta['transformadores']:,} transformadores en {meta['marcas']:,} celdas - acerque para ver el detalle"
+            if meta['modo'] == 'celdas' else f"{meta['transformadores']:,} transformadores")
+    layout = {
+        'mapbox': {'style': style, 'center': viewport.center, 'zoom': viewport.zoom},
+        'margin': {'l': 0, 'r': 0, 't': 30 if title else 0, 'b': 0},
+        'height': height,
+        'uirevision': uirevision,
+        'showlegend': False,
+        'annotations': [{'text': note, 'xref': 'paper', 'yref': 'paper', 'x': 0.01, 'y': 0.01,
+                         'showarrow': False, 'bgcolor': 'rgba(255,255,255,0.8)', 'font': {'size': 11}}],
+    }
+    if title:
+        layout['title'] = {'text': title}
+    return {'data': [trace], 'layout': layout}
@@ -0,0 +1,285 @@
+"""
+Cubo Resumen de Transformadores
+===============================
+Agregados precalculados para las tarjetas KPI y los gráficos de barras del
+dashboard. Se construye una vez por versión del dataset de transformadores:
+
+- Una fila (celda) por combinación presente de sucursal, alimentador,
+  estado de calidad, nivel de vulnerabilidad, tipo de zona y tamaño.
+- Medidas aditivas por celda: transformadores, kVA, usuarios, problemas y
+  suma/cantidad del índice de vulnerabilidad. Tasas y promedios se derivan
+  al consultar, así que cualquier corte o re-agrupación es exacto.
+- Un cubo no cambia: cortes y agrupaciones se memorizan, así que la misma
+  tarjeta o gráfico pedido de nuevo no recalcula nada.
+- Se guarda junto al archivo de datos (Parquet) con la firma del archivo de
+  origen; otro proceso del dashboard lo lee en lugar de recalcularlo y se
+  reconstruye cuando los datos cambian.
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dashboard.utils.data_service import is_active_filter, isolated_copy
+
+logger = logging.getLogger(__name__)
+
+# Dimensiones del cubo (se usan las que existan en los datos)
+DIMENSIONS = ('N_Sucursal', 'Alimentador', 'Resultado', 'nivel_vulnerabilidad', 'tipo_zona', 'size_category')
+
+# Medida -> columna de origen sumada
+SUM_MEASURES = {
+    'potencia_kva': 'Potencia',
+    'usuarios': 'Q_Usuarios',
+}
+
+CUBE_SUFFIX = '_cubo_resumen.parquet'
+CUBE_FORMAT = 1
+METADATA_KEY = b'cubo_resumen'
+
+
+@dataclass
+class SummaryCube:
+    """Celdas agregadas y las dimensiones que las identifican"""
+    cells: pd.DataFrame
+    dimensions: Tuple[str, ...]
+    memo: Dict[Hashable, Any] = field(default_factory=dict, repr=False, compare=False)
+
+    def _memoized(self, key: Hashable, compute):
+        """Resultado memorizado; se entrega una copia propia (isolated_copy)"""
+        if key not in self.memo:
+            self.memo[key] = compute()
+        result = self.memo[key]
+        return isolated_copy(result) if isinstance(result, (pd.DataFrame, pd.Series)) else result
+
+    @property
+    def measures(self) -> list:
+        """Columnas de medidas de las celdas"""
+        return [c for c in self.cells.columns if c not in self.dimensions]
+
+    @property
+    def empty(self) -> bool:
+        return self.cells.empty
+
+    def slice(self, **filters) -> 'SummaryCube':
+        """
+        Celdas que cumplen los filtros dimensión = valor.
+
+        Igual que data_service.subset: None, '' y 'all' no filtran y las
+        dimensiones inexistentes se ignoran.
+
+        Args:
+            **filters: dimensión=valor
+
+        Returns:
+            SummaryCube con las celdas seleccionadas
+        """
+        active = tuple(sorted((d, v) for d, v in filters.items()
+                              if d in self.dimensions and is_active_filter(v)))
+        if not active:
+            return self
+        key = ('slice', active)
+        if key not in self.memo:
+            cells = self.cells
+            for dimension, value in active:
+                cells = cells[cells[dimension] == value]
+            self.memo[key] = SummaryCube(cells, self.dimensions)
+        return self.memo[key]
+
+    def totals(self) -> pd.Series:
+        """Suma de cada medida sobre todas las celdas"""
+        return self._memoized(('totals',), lambda: self.cells[self.measures].sum())
+
+    def by(self, *dimensions: str) -> pd.DataFrame:
+        """
+        Medidas agregadas por las dimensiones pedidas, con tasas derivadas.
+
+        Las celdas sin valor en esas dimensiones se omiten (como groupby).
+
+        Args:
+            *dimensions: Dimensiones de agrupación
+
+        Returns:
+            DataFrame indexado por las dimensiones
+        """
+        missing = [d for d in dimensions if d not in self.dimensions]
+        if missing:
+            raise KeyError(f"El cubo no tiene las dimensiones {missing}")
+        return self._memoized(('by', dimensions), lambda: with_rates(
+            self.cells.groupby(list(dimensions), observed=True)[self.measures].sum()))
+
+    def count(self, dimension: str, order: Optional[Sequence] = None) -> pd.Series:
+        """
+        Transformadores por valor de una dimensión.
+
+        Args:
+            dimension: Dimensión
+            order: Valores y orden del resultado (faltantes con 0); None
+                ordena de mayor a menor
+
+        Returns:
+            Serie valor -> cantidad
+        """
+        def compute():
+            counts = self.by(dimension)['transformadores']
+            counts.index = counts.index.astype(object)
+            counts = counts[counts > 0]
+            if order is not None:
+                return counts.reindex(order, fill_value=0)
+            return counts.sort_values(ascending=False, kind='stable')
+        return self._memoized(('count', dimension, None if order is None else tuple(order)), compute)
+
+    def nunique(self, dimension: str) -> int:
+        """Cantidad de valores distintos (no nulos) de una dimensión"""
+        if dimension not in self.dimensions:
+            return 0
+        return self._memoized(('nunique', dimension), lambda: int(
+            self.cells.loc[self.cells['transformadores'] > 0, dimension].nunique()))
+
+
+def with_rates(frame: pd.DataFrame) -> pd.DataFrame:
+    """Agrega tasa de problemas y vulnerabilidad promedio a medidas sumadas"""
+    frame = frame.copy()
+    if 'problemas' in frame.columns:
+        frame['tasa_problemas'] = frame['problemas'] / frame['transformadores'].where(frame['transformadores'] > 0)
+    if 'vulnerabilidad_suma' in frame.columns:
+        frame['vulnerabilidad_promedio'] = (frame['vulnerabilidad_suma'] /
+                                            frame['vulnerabilidad_n'].where(frame['vulnerabilidad_n'] > 0))
+    return frame
+
+
+def build_cube(df: pd.DataFrame) -> SummaryCube:
+    """
+    Construye el cubo a partir de las filas de transformadores.
+
+    Args:
+        df: Dataset de transformadores
+
+    Returns:
+        SummaryCube
+    """
+    dimensions = tuple(d for d in DIMENSIONS if d in df.columns)
+    measures = pd.DataFrame({'transformadores': 1}, index=df.index, dtype='int64')
+    for measure, column in SUM_MEASURES.items():
+        if column in df.columns:
+            measures[measure] = df[column]
+    if 'Resultado' in df.columns:
+        # Sin resultado cuenta como problema, igual que (Resultado != 'Correcta').mean()
+        measures['problemas'] = (df['Resultado'] != 'Correcta').astype('int64')
+    if 'indice_vulnerabilidad_compuesto' in df.columns:
+        measures['vulnerabilidad_suma'] = df['indice_vulnerabilidad_compuesto'].fillna(0.0)
+        measures['vulnerabilidad_n'] = df['indice_vulnerabilidad_compuesto'].notna().astype('int64')
+
+    if not dimensions:
+        cells = measures.sum().to_frame().T if len(measures) else measures.iloc[0:0]
+        return SummaryCube(cells.reset_index(drop=True), dimensions)
+
+    keys = df[list(dimensions)]
+    cells = (pd.concat([keys, measures], axis=1)
+             .groupby(list(dimensions), observed=True, dropna=False, sort=True)
+             .sum()
+             .reset_index())
+    return SummaryCube(cells, dimensions)
+
+
+def cube_path(source: Path) -> Path:
+    """Archivo del cubo de un archivo de datos (en el mismo directorio)"""
+    source = Path(source)
+    return source.with_name(source.stem + CUBE_SUFFIX)
+
+
+def _source_key(source: Path, signature: Tuple[int, int]) -> dict:
+    return {'formato': CUBE_FORMAT, 'fuente': source.name, 'mtime_ns': signature[0], 'tamano': signature[1]}
+
+
+def write_cube(cube: SummaryCube, path: Path, source: Path, signature: Tuple[int, int]) -> Path:
+    """
+    Guarda el cubo con la firma del archivo de origen.
+
+    Args:
+        cube: Cubo
+        path: Archivo de salida
+        source: Archivo de datos del que se construyó
+        signature: (mtime_ns, tamaño) de ese archivo
+
+    Returns:
+        Ruta escrita
+    """
+    table = pa.Table.from_pandas(cube.cells, preserve_index=False)
+    description = {**_source_key(source, signature), 'dimensiones': list(cube.dimensions)}
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           METADATA_KEY: json.dumps(description).encode()})
+    # Nombre único por proceso/thread: varios workers pueden construir el cubo a la vez
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        pq.write_table(table, tmp, compression='zstd')
+        tmp.replace(path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return path
+
+
+def read_cube(path: Path, source: Path, signature: Tuple[int, int]) -> Optional[SummaryCube]:
+    """
+    Lee un cubo guardado si corresponde a la versión actual del archivo de origen.
+
+    Returns:
+        SummaryCube, o None si no existe, es de otra versión o no se puede leer
+    """
+    if not path.exists():
+        return None
+    try:
+        table = pq.read_table(path)
+        description = json.loads((table.schema.metadata or {}).get(METADATA_KEY, b'{}'))
+    except Exception as e:
+        logger.warning(f"No se pudo leer el cubo {path}: {e}")
+        return None
+    expected = _source_key(source, signature)
+    if any(description.get(key) != value for key, value in expected.items()):
+        return None
+    return SummaryCube(table.to_pandas(), tuple(description['dimensiones']))
+
+
+def load_or_build_cube(df: pd.DataFrame, source: Optional[Path],
+                       signature: Optional[Tuple[int, int]]) -> SummaryCube:
+    """
+    Cubo de la versión actual: el guardado junto a los datos o uno nuevo.
+
+    Un cubo nuevo se guarda junto al archivo de origen; si no se puede
+    escribir (directorio de solo lectura) se usa solo en memoria.
+
+    Args:
+        df: Dataset de transformadores cargado
+        source: Archivo del que se cargó (None = sin archivo)
+        signature: Firma de ese archivo
+
+    Returns:
+        SummaryCube
+    """
+    if source is None or signature is None:
+        return build_cube(df)
+    path = cube_path(source)
+    cube = read_cube(path, source, signature)
+    if cube is not None:
+        logger.info(f"Cubo resumen leído de {path.name} ({len(cube.cells)} celdas)")
+        return cube
+
+    cube = build_cube(df)
+    try:
+        write_cube(cube, path, source, signature)
+        logger.info(f"Cubo resumen guardado en {path.name} ({len(cube.cells)} celdas)")
+    except OSError as e:
+        logger.warning(f"No se pudo guardar el cubo resumen en {path}: {e}")
+    return cube
@@ -19,7 +19,8 @@ def create_vulnerability_levels(df, column='criticidad_compuesta'):
     if column not in df.columns:
         # Si no existe la columna, usar Resultado como fallback
         if 'Resultado' in df.columns:
-            return df['Resultado'].map({
+            # Resultado puede ser categórica: map sobre object para admitir el fillna
+            return df['Resultado'].astype(object).map({
                 'Correcta': 'Baja',
                 'Penalizada': 'Media',
                 'Fallida': 'Alta'
@@ -23,6 +23,49 @@ from src.power_flow.dc_power_flow import DCPowerFlow, PowerFlowResult
 logger = logging.getLogger(__name__)
 
 
+IRR_SOLVER_MODULE = "gd_edersa_irr_solver"
+IRR_SOLVER_RELATIVE_PATH = Path("src") / "economics" / "irr_solver.py"
+
+
+def _load_irr_solver():
+    """Load the shared IRR kernel from the main project's src/economics.
+
+    The legacy project has its own ``src`` package, so ``src.economics`` would
+    resolve here instead of to the main project; the kernel is loaded by file
+    path. The main project is the closest parent directory that contains
+    ``src/economics/irr_solver.py`` (no fixed directory depth).
+
+    Raises:
+        ImportError: If no parent directory contains the kernel
+    """
+    if IRR_SOLVER_MODULE in sys.modules:
+        return sys.modules[IRR_SOLVER_MODULE]
+
+    import importlib.util
+    legacy_root = Path(__file__).resolve().parents[2]
+    candidates = [parent / IRR_SOLVER_RELATIVE_PATH for parent in legacy_root.parents]
+    solver_path = next((path for path in candidates if path.is_file()), None)
+    if solver_path is None:
+        raise ImportError(
+            f"Shared IRR kernel not found: expected {IRR_SOLVER_RELATIVE_PATH} in a parent "
+            f"directory of the legacy project {legacy_root} (searched: "
+            f"{', '.join(str(path) for path in candidates)})"
+        )
+
+    spec = importlib.util.spec_from_file_location(IRR_SOLVER_MODULE, solver_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[IRR_SOLVER_MODULE] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[IRR_SOLVER_MODULE]
+        raise
+    return module
+
+
+irr_solver = _load_irr_solver()
+
+
 @dataclass
 class CashFlow:
     """Represents cash flows over project lifetime."""
@@ -320,25 +363,16 @@ class EconomicEvaluator:
         return sum(cf.discounted_flow for cf in cash_flows)
     
     def _calculate_irr(self, cash_flows: List[CashFlow]) -> float:
-        """Calculate Internal Rate of Return."""
-        # Create array of net cash flows
+        """Calculate Internal Rate of Return with the shared IRR kernel."""
         flows = [cf.net_flow for cf in cash_flows]
         
-        try:
-            # Use numpy's irr function (deprecated, using npf.irr)
-            irr = np.real(np.irr(flows))  # Take real part only
-            if not np.isnan(irr) and -0.99 < irr < 10:  # Reasonable bounds
-                return float(irr)
-            else:
-                # Fallback to simple calculation
-                total_return = sum(flows[1:])  # Exclude initial investment
-                initial_investment = -flows[0] if flows[0] < 0 else 1.0
-                if initial_investment > 0 and total_return > 0:
-                    simple_return = (total_return / initial_investment) ** (1/self.project_lifetime) - 1
-                    return max(-0.99, min(simple_return, 1.0))  # Cap at reasonable values
-                return -0.99 if total_return < 0 else 0.0
-        except:
-            return 0.0
+        irr, status = irr_solver.calculate_irr_single(flows)
+        if irr is not None:
+            return irr
+        
+        # No root in the kernel's rate range: clamp deterministically
+        logger.debug(f"IRR not found: {irr_solver.IRR_STATUS_MESSAGES[status]}")
+        return -0.99 if sum(flows) < 0 else 0.0
     
     def _calculate_payback(self, cash_flows: List[CashFlow]) -> float:
         """Calculate simple payback period."""
@@ -23,6 +23,7 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
 import logging
+import sys
 
 # Configuración de logging
 logging.basicConfig(
@@ -38,6 +39,9 @@ REPORTS_DIR = BASE_DIR / "reports"
 CLUSTERING_DIR = REPORTS_DIR / "clustering"
 CLUSTERING_DIR.mkdir(exist_ok=True)
 
+sys.path.append(str(BASE_DIR))
+from src.pipeline.store import dataset_exists, read_frame, write_frame
+
 class SolarAptitudeAnalyzer:
     """
     Analizador de aptitud solar sin BESS basado en el documento teórico.
@@ -193,7 +197,7 @@ class SolarAptitudeAnalyzer:
             'Fallida': 1.0        # Urgente mejora
         }
         
-        df['C5_calidad_servicio'] = df['Resultado'].map(quality_scores).fillna(0.5)
+        df['C5_calidad_servicio'] = df['Resultado'].astype(object).map(quality_scores).fillna(0.5)
         
         return df
     
@@ -233,10 +237,10 @@ def load_transformer_data():
     logger.info("Cargando datos de transformadores...")
     
     # Cargar datos con topología de red (de Fase 1)
-    topology_path = DATA_DIR / "processed" / "network_analysis" / "transformadores_con_topologia.csv"
+    topology_path = DATA_DIR / "processed" / "network_analysis" / "transformadores_con_topologia.parquet"
     
-    if topology_path.exists():
-        df = pd.read_csv(topology_path)
+    if dataset_exists(topology_path):
+        df = read_frame(topology_path)
         
         # Filtrar solo con coordenadas
         df = df[df['Coord_X'].notna() & df['Coord_Y'].notna()]
@@ -696,8 +700,7 @@ def main():
     
     # Guardar datos procesados
     output_path = DATA_DIR / "processed" / "transformers_ias_clustering.parquet"
-    output_path.parent.mkdir(exist_ok=True)
-    df.to_parquet(output_path)
+    write_frame(df, output_path)
     logger.info(f"Datos procesados guardados en: {output_path}")
     
     # Resumen final
@@ -14,6 +14,7 @@ import numpy as np
 from pathlib import Path
 import sqlite3
 import json
+import sys
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import DBSCAN, KMeans, AgglomerativeClustering, OPTICS
 from sklearn.metrics import silhouette_score, calinski_harabasz_score, davies_bouldin_score
@@ -41,6 +42,9 @@ REPORTS_DIR = BASE_DIR / "reports"
 CLUSTERING_DIR = REPORTS_DIR / "clustering"
 CLUSTERING_DIR.mkdir(exist_ok=True)
 
+sys.path.append(str(BASE_DIR))
+from src.pipeline.store import read_frame, write_frame
+
 class ClusteringOptimizer:
     """
     Optimizador de clustering para identificar configuraciones óptimas.
@@ -358,7 +362,7 @@ def load_data_with_ias():
     processed_file = DATA_DIR / "processed" / "transformers_ias_clustering.parquet"
     
     if processed_file.exists():
-        df = pd.read_parquet(processed_file)
+        df = read_frame(processed_file, categorical=False)
         logger.info(f"Cargados {len(df)} transformadores con IAS scores")
         return df
     else:
@@ -691,7 +695,7 @@ def generate_optimization_report(best_config, df_results, df_final):
     
     # Guardar datos finales
     output_path = DATA_DIR / "processed" / "transformers_refined_clusters.parquet"
-    df_final.to_parquet(output_path)
+    write_frame(df_final, output_path)
     logger.info(f"Datos con clusters refinados guardados en: {output_path}")
     
     return report
@@ -13,6 +13,7 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 import json
+import sys
 from datetime import datetime
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
@@ -42,6 +43,9 @@ CLUSTERING_DIR = REPORTS_DIR / "clustering"
 EXECUTIVE_DIR = CLUSTERING_DIR / "executive"
 EXECUTIVE_DIR.mkdir(exist_ok=True)
 
+sys.path.append(str(BASE_DIR))
+from src.pipeline.store import read_frame
+
 class ExecutiveReportGenerator:
     """
     Generador de reportes ejecutivos para GD solar sin BESS.
@@ -665,12 +669,12 @@ def load_all_data():
     # Cargar transformadores con clusters
     transformer_file = DATA_DIR / "processed" / "transformers_refined_clusters.parquet"
     if transformer_file.exists():
-        data['transformers'] = pd.read_parquet(transformer_file)
+        data['transformers'] = read_frame(transformer_file, categorical=False)
     else:
         # Intentar con archivo de IAS
         transformer_file = DATA_DIR / "processed" / "transformers_ias_clustering.parquet"
         if transformer_file.exists():
-            data['transformers'] = pd.read_parquet(transformer_file)
+            data['transformers'] = read_frame(transformer_file, categorical=False)
         else:
             logger.warning("No se encontraron datos de transformadores con clusters")
             data['transformers'] = None
@@ -13,6 +13,7 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 import json
+import sys
 import folium
 from folium.plugins import HeatMap
 import matplotlib.pyplot as plt
@@ -32,6 +33,9 @@ DATA_DIR = BASE_DIR / "data"
 REPORTS_DIR = BASE_DIR / "reports"
 CLUSTERING_DIR = REPORTS_DIR / "clustering"
 
+sys.path.append(str(BASE_DIR))
+from src.pipeline.store import read_frame
+
 class LandAvailabilityAnalyzer:
     """
     Analizador de disponibilidad de terreno para parques solares.
@@ -574,7 +578,7 @@ def main():
     # Cargar datos de transformadores para análisis de zonas
     transformer_file = DATA_DIR / "processed" / "transformers_ias_clustering.parquet"
     if transformer_file.exists():
-        df_transformers = pd.read_parquet(transformer_file)
+        df_transformers = read_frame(transformer_file, categorical=False)
         df_transformers, zone_stats = analyze_transformer_zones(df_transformers)
         logger.info("\nEstadísticas por tipo de zona:")
         print(zone_stats)
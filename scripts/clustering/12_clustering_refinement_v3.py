@@ -14,6 +14,7 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 import json
+import sys
 from sklearn.cluster import DBSCAN, KMeans, AgglomerativeClustering
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import silhouette_score, davies_bouldin_score, calinski_harabasz_score
@@ -42,6 +43,9 @@ CLUSTERING_DIR = REPORTS_DIR / "clustering"
 REFINEMENT_V3_DIR = CLUSTERING_DIR / "refinement_v3"
 REFINEMENT_V3_DIR.mkdir(exist_ok=True)
 
+sys.path.append(str(BASE_DIR))
+from src.pipeline.store import read_frame, write_frame
+
 class ClusteringRefinementV3:
     """
     Refinamiento de clustering optimizado para IAS 3.0.
@@ -700,7 +704,7 @@ def main():
         logger.error("No se encontró archivo de transformadores. Ejecutar scripts previos.")
         return
         
-    df_transformers = pd.read_parquet(transformer_file)
+    df_transformers = read_frame(transformer_file, categorical=False)
     logger.info(f"Cargados {len(df_transformers)} transformadores")
     
     # Preparar para clustering
@@ -753,7 +757,7 @@ def main():
     # Guardar resultados
     # Transformadores con asignación refinada
     output_transformers = DATA_DIR / "processed" / "transformers_refined_ias_v3.parquet"
-    df_transformers.to_parquet(output_transformers)
+    write_frame(df_transformers, output_transformers)
     logger.info(f"\nTransformadores guardados en: {output_transformers}")
     
     # Resumen de clusters
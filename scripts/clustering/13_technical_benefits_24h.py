@@ -6,6 +6,11 @@ Calcula beneficios técnicos considerando operación diurna (generación solar)
 y nocturna (STATCOM para soporte reactivo). Incluye análisis de pérdidas,
 mejora de tensión, alivio de activos y estabilidad de red.
 
+Pérdidas y tensiones salen de un flujo de carga radial (barrido
+backward/forward, src/network/load_flow.py) sobre el alimentador
+equivalente de cada cluster, con las 24 horas de los casos base, solar y
+STATCOM resueltas en un solo lote.
+
 Autor: Asistente Claude
 Fecha: Julio 2025
 """
@@ -18,6 +23,7 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
 import logging
+import sys
 
 # Configuración de logging
 logging.basicConfig(
@@ -34,6 +40,9 @@ CLUSTERING_DIR = REPORTS_DIR / "clustering"
 BENEFITS_24H_DIR = CLUSTERING_DIR / "benefits_24h"
 BENEFITS_24H_DIR.mkdir(exist_ok=True)
 
+sys.path.append(str(BASE_DIR))
+from src.network.load_flow import equivalent_feeder_flow
+
 class TechnicalBenefits24H:
     """
     Calculador de beneficios técnicos considerando operación 24 horas.
@@ -57,6 +66,13 @@ class TechnicalBenefits24H:
         self.reactive_capacity_night = 0.3  # 30% de capacidad nominal para Q nocturno
         self.night_hours = 14  # Horas nocturnas (24 - solar_hours)
         
+        # Alimentador equivalente para el flujo de carga (13.2 kV)
+        self.feeder_length_km = 10  # Longitud promedio
+        self.feeder_r_ohm_km = 0.3
+        self.feeder_x_ohm_km = 0.4
+        self.feeder_rating_mva = 5.0  # Capacidad por alimentador en paralelo
+        self.feeder_sections = 20  # Tramos de carga distribuida
+        
         # Perfiles horarios típicos
         self.load_profiles = self._create_load_profiles()
         self.solar_profile = self._create_solar_profile()
@@ -155,14 +171,17 @@ class TechnicalBenefits24H:
         # Potencia base del cluster
         potencia_mva = cluster_data.get('potencia_mva', cluster_data.get('gd_recomendada_mw', 0) * 3)
         
+        # Flujo de carga 24h (base, solar y STATCOM)
+        flows = self._simulate_feeder_24h(gd_mw, potencia_mva, load_profile)
+        
         # Calcular beneficios diurnos (generación solar)
         day_benefits = self._calculate_day_benefits(
-            gd_mw, potencia_mva, load_profile, perfil
+            gd_mw, potencia_mva, load_profile, perfil, flows
         )
         
         # Calcular beneficios nocturnos (STATCOM)
         night_benefits = self._calculate_night_benefits(
-            gd_mw, potencia_mva, load_profile, perfil
+            gd_mw, potencia_mva, load_profile, perfil, flows
         )
         
         # Beneficios agregados 24h
@@ -176,7 +195,58 @@ class TechnicalBenefits24H:
             'gd_mw': gd_mw
         }
     
-    def _calculate_day_benefits(self, gd_mw, potencia_mva, load_profile, perfil):
+    def _night_compensation(self, gd_mw, potencia_mva, load_profile):
+        """Compensación reactiva horaria del inversor como STATCOM (MVAr)"""
+        q_capacity_mvar = gd_mw * self.reactive_capacity_night
+        q_demand = potencia_mva * load_profile * np.tan(np.arccos(self.power_factor_base))
+        night = self.solar_profile < 0.1
+        return np.where(night, np.minimum(q_capacity_mvar, q_demand * 0.5), 0.0)  # Compensar hasta 50%
+    
+    def _simulate_feeder_24h(self, gd_mw, potencia_mva, load_profile):
+        """
+        Flujo de carga horario del alimentador equivalente del cluster.
+        
+        La demanda se reparte en alimentadores de feeder_rating_mva en
+        paralelo con carga distribuida. Se resuelven en un lote las 24 horas
+        del caso base, con generación solar y con compensación nocturna.
+        
+        Returns:
+            dict con arrays de 24 horas: demanda (MW), pérdidas (kW) y
+            tensión mínima (pu) de cada caso
+        """
+        load_mw = potencia_mva * load_profile
+        gd_h = gd_mw * self.solar_profile
+        q_comp = self._night_compensation(gd_mw, potencia_mva, load_profile)
+        zeros = np.zeros(24)
+        
+        result = equivalent_feeder_flow(
+            load_mw=np.tile(load_mw, 3),
+            gd_mw=np.concatenate([zeros, gd_h, zeros]),
+            q_injection_mvar=np.concatenate([zeros, zeros, q_comp]),
+            n_feeders=int(np.ceil(potencia_mva / self.feeder_rating_mva)),
+            power_factor=self.power_factor_base,
+            length_km=self.feeder_length_km,
+            r_ohm_km=self.feeder_r_ohm_km,
+            x_ohm_km=self.feeder_x_ohm_km,
+            n_sections=self.feeder_sections,
+            v_nominal_kv=self.voltage_nominal
+        )
+        losses = result.losses_kw.reshape(3, 24)
+        v_min = result.min_voltage_pu.reshape(3, 24)
+        
+        return {
+            'load_mw': load_mw,
+            'losses_base_kw': losses[0], 'losses_solar_kw': losses[1], 'losses_statcom_kw': losses[2],
+            'v_min_base_pu': v_min[0], 'v_min_solar_pu': v_min[1], 'v_min_statcom_pu': v_min[2]
+        }
+    
+    @staticmethod
+    def _energy_pct(losses_kw, load_mw, hours):
+        """Pérdidas de las horas indicadas como % de la energía demandada"""
+        energy_kwh = load_mw[hours].sum() * 1000
+        return losses_kw[hours].sum() / energy_kwh * 100 if energy_kwh > 0 else 0.0
+    
+    def _calculate_day_benefits(self, gd_mw, potencia_mva, load_profile, perfil, flows=None):
         """Calcula beneficios durante operación solar diurna"""
         
         # Horas solares efectivas
@@ -194,19 +264,19 @@ class TechnicalBenefits24H:
         else:
             solar_penetration = 0
         
-        # Mejora de tensión diurna
-        # ΔV = (P*R + Q*X) / V²
-        # Asumiendo R = 0.3 Ω/km, longitud promedio 10 km
-        r_total = 0.3 * 10  # Ω
-        delta_v_pu = (r_total * solar_generation * 1000) / (self.voltage_nominal ** 2)
+        if flows is None:
+            flows = self._simulate_feeder_24h(gd_mw, potencia_mva, load_profile)
+        
+        # Mejora de tensión diurna: tensión mínima del alimentador con y sin GD
+        delta_v_pu = (flows['v_min_solar_pu'] - flows['v_min_base_pu'])[solar_hours].mean()
         voltage_improvement_day = min(delta_v_pu * 100, 5.0)  # Cap at 5%
         
-        # Reducción de pérdidas diurnas
-        # Pérdidas ∝ I² ∝ (P² + Q²)
-        # Con GD local, se reduce la corriente desde la subestación
-        loss_reduction_factor = solar_penetration ** 2
-        base_losses_pct = 0.08  # 8% pérdidas base
-        loss_reduction_day = base_losses_pct * loss_reduction_factor * 100
+        # Reducción de pérdidas diurnas (% de la energía demandada en horas solares)
+        # Con GD local se reduce la corriente desde la subestación; con
+        # penetración muy alta el flujo inverso puede volver a aumentarlas
+        base_losses_pct = self._energy_pct(flows['losses_base_kw'], flows['load_mw'], solar_hours)
+        loss_reduction_day = base_losses_pct - self._energy_pct(
+            flows['losses_solar_kw'], flows['load_mw'], solar_hours)
         
         # Alivio de transformadores
         transformer_relief_day = solar_penetration * 100
@@ -227,6 +297,8 @@ class TechnicalBenefits24H:
         return {
             'voltage_improvement_pct': voltage_improvement_day,
             'loss_reduction_pct': loss_reduction_day,
+            'base_losses_pct': base_losses_pct,
+            'min_voltage_base_pu': flows['v_min_base_pu'][solar_hours].min(),
             'transformer_relief_pct': transformer_relief_day,
             'solar_penetration': solar_penetration,
             'coincidence_factor': coincidence_factor,
@@ -234,14 +306,14 @@ class TechnicalBenefits24H:
             'average_power_mw': solar_generation
         }
     
-    def _calculate_night_benefits(self, gd_mw, potencia_mva, load_profile, perfil):
+    def _calculate_night_benefits(self, gd_mw, potencia_mva, load_profile, perfil, flows=None):
         """Calcula beneficios durante operación STATCOM nocturna"""
         
         # Horas nocturnas (sin sol)
         night_hours = np.where(self.solar_profile < 0.1)[0]
         
-        # Capacidad reactiva disponible de noche
-        q_capacity_mvar = gd_mw * self.reactive_capacity_night
+        if flows is None:
+            flows = self._simulate_feeder_24h(gd_mw, potencia_mva, load_profile)
         
         # Carga promedio nocturna
         night_load = potencia_mva * load_profile[night_hours].mean()
@@ -250,32 +322,23 @@ class TechnicalBenefits24H:
         # Q = P * tan(acos(pf))
         q_demand = night_load * np.tan(np.arccos(self.power_factor_base))
         
-        # Compensación reactiva efectiva
-        q_compensation = min(q_capacity_mvar, q_demand * 0.5)  # Compensar hasta 50%
+        # Compensación reactiva efectiva (promedio de las horas nocturnas)
+        q_compensation = self._night_compensation(gd_mw, potencia_mva, load_profile)[night_hours].mean()
         
         # Mejora del factor de potencia
         new_q_demand = q_demand - q_compensation
         new_pf = np.cos(np.arctan(new_q_demand / night_load))
         pf_improvement = new_pf - self.power_factor_base
         
-        # Mejora de tensión nocturna
-        # Mayor impacto en zonas residenciales con caída de tensión nocturna
-        if perfil == 'Residencial':
-            voltage_boost_factor = 1.5
-        elif perfil == 'Rural':
-            voltage_boost_factor = 1.3
-        else:
-            voltage_boost_factor = 1.0
-            
-        x_total = 0.4 * 10  # Reactancia, Ω
-        delta_v_pu = (x_total * q_compensation * 1000) / (self.voltage_nominal ** 2)
-        voltage_improvement_night = min(delta_v_pu * 100 * voltage_boost_factor, 4.0)
+        # Mejora de tensión nocturna: tensión mínima con y sin compensación
+        # (el pico nocturno residencial/rural ya está en el perfil de carga)
+        delta_v_pu = (flows['v_min_statcom_pu'] - flows['v_min_base_pu'])[night_hours].mean()
+        voltage_improvement_night = min(delta_v_pu * 100, 4.0)
         
-        # Reducción de pérdidas nocturnas
-        # Pérdidas reactivas I²X
-        q_loss_reduction = (q_compensation / q_demand) ** 2 if q_demand > 0 else 0
-        base_losses_pct = 0.08  # 8% pérdidas base
-        loss_reduction_night = base_losses_pct * 0.3 * q_loss_reduction * 100  # 30% de pérdidas son reactivas
+        # Reducción de pérdidas nocturnas (menor corriente reactiva por los tramos)
+        base_losses_pct = self._energy_pct(flows['losses_base_kw'], flows['load_mw'], night_hours)
+        loss_reduction_night = base_losses_pct - self._energy_pct(
+            flows['losses_statcom_kw'], flows['load_mw'], night_hours)
         
         # Liberación de capacidad en transformadores
         # S² = P² + Q², reducir Q libera capacidad
@@ -292,6 +355,8 @@ class TechnicalBenefits24H:
         return {
             'voltage_improvement_pct': voltage_improvement_night,
             'loss_reduction_pct': loss_reduction_night,
+            'base_losses_pct': base_losses_pct,
+            'min_voltage_base_pu': flows['v_min_base_pu'][night_hours].min(),
             'pf_improvement': pf_improvement,
             'new_power_factor': new_pf,
             'capacity_released_pct': capacity_released,
@@ -24,6 +24,11 @@ import seaborn as sns
 
 warnings.filterwarnings('ignore')
 
+# Almacenamiento intermedio Parquet (src/pipeline/store)
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.pipeline.store import read_frame, write_frame
+
 # Configuración
 BASE_DIR = Path(__file__).parent.parent.parent
 DATA_DIR = BASE_DIR / 'data'
@@ -36,7 +41,7 @@ NETWORK_DIR.mkdir(parents=True, exist_ok=True)
 
 def load_data():
     """Cargar datos de transformadores"""
-    df = pd.read_csv(PROCESSED_DIR / 'transformers_analysis.csv')
+    df = read_frame(PROCESSED_DIR / 'transformers_analysis.parquet')
     print(f"\n📊 Datos cargados: {len(df)} transformadores")
     return df
 
@@ -247,7 +252,8 @@ def enrich_transformers_data(df, feeder_stats):
     # Agregar columnas al dataframe de transformadores
     for col in ['diametro_km', 'densidad_trafos_km2', 'centroid_x', 'centroid_y', 
                 'es_lineal', 'tasa_problemas']:
-        df[f'alimentador_{col}'] = df['Alimentador'].map(
+        # Alimentador es categórica: map sobre object para no obtener categorías de floats
+        df[f'alimentador_{col}'] = df['Alimentador'].astype(object).map(
             lambda x: feeder_dict.get(x, {}).get(col, np.nan) if pd.notna(x) else np.nan
         )
     
@@ -348,12 +354,12 @@ def save_results(df, feeder_stats, patterns):
     """Guardar resultados del análisis"""
     
     # Guardar estadísticas de alimentadores
-    feeder_stats.to_csv(NETWORK_DIR / 'alimentadores_caracterizados.csv', index=False)
-    print(f"✅ Estadísticas de alimentadores guardadas: {NETWORK_DIR / 'alimentadores_caracterizados.csv'}")
+    output = write_frame(feeder_stats, NETWORK_DIR / 'alimentadores_caracterizados.parquet')
+    print(f"✅ Estadísticas de alimentadores guardadas: {output}")
     
     # Guardar transformadores enriquecidos
-    df.to_csv(NETWORK_DIR / 'transformadores_con_topologia.csv', index=False)
-    print(f"✅ Transformadores enriquecidos guardados: {NETWORK_DIR / 'transformadores_con_topologia.csv'}")
+    output = write_frame(df, NETWORK_DIR / 'transformadores_con_topologia.parquet')
+    print(f"✅ Transformadores enriquecidos guardados: {output}")
     
     # Guardar patrones de red
     with open(NETWORK_DIR / 'patrones_red.json', 'w', encoding='utf-8') as f:
@@ -28,6 +28,11 @@ import matplotlib.patches as mpatches
 
 warnings.filterwarnings('ignore')
 
+# Almacenamiento intermedio Parquet (src/pipeline/store)
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.pipeline.store import read_frame
+
 # Configuración
 BASE_DIR = Path(__file__).parent.parent.parent
 DATA_DIR = BASE_DIR / 'data'
@@ -41,8 +46,8 @@ FIGURES_DIR.mkdir(parents=True, exist_ok=True)
 
 def load_data():
     """Cargar datos enriquecidos de transformadores y alimentadores"""
-    transformers_df = pd.read_csv(NETWORK_DIR / 'transformadores_con_topologia.csv')
-    feeders_df = pd.read_csv(NETWORK_DIR / 'alimentadores_caracterizados.csv')
+    transformers_df = read_frame(NETWORK_DIR / 'transformadores_con_topologia.parquet')
+    feeders_df = read_frame(NETWORK_DIR / 'alimentadores_caracterizados.parquet')
     
     print(f"\n📊 Datos cargados:")
     print(f"   - {len(transformers_df)} transformadores con topología")
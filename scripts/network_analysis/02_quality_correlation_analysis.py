@@ -26,6 +26,11 @@ from itertools import combinations
 
 warnings.filterwarnings('ignore')
 
+# Almacenamiento intermedio Parquet (src/pipeline/store)
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.pipeline.store import read_frame
+
 # Configuración
 BASE_DIR = Path(__file__).parent.parent.parent
 DATA_DIR = BASE_DIR / 'data'
@@ -36,8 +41,8 @@ FIGURES_DIR = REPORTS_DIR / 'figures'
 
 def load_data():
     """Cargar datos enriquecidos"""
-    transformers_df = pd.read_csv(NETWORK_DIR / 'transformadores_con_topologia.csv')
-    feeders_df = pd.read_csv(NETWORK_DIR / 'alimentadores_caracterizados.csv')
+    transformers_df = read_frame(NETWORK_DIR / 'transformadores_con_topologia.parquet')
+    feeders_df = read_frame(NETWORK_DIR / 'alimentadores_caracterizados.parquet')
     spatial_patterns = pd.read_csv(NETWORK_DIR / 'patrones_espaciales_alimentadores.csv')
     
     print(f"\n📊 Datos cargados:")
@@ -24,6 +24,11 @@ import matplotlib.patches as mpatches
 
 warnings.filterwarnings('ignore')
 
+# Almacenamiento intermedio Parquet (src/pipeline/store)
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.pipeline.store import read_frame
+
 # Configuración
 BASE_DIR = Path(__file__).parent.parent.parent
 DATA_DIR = BASE_DIR / 'data'
@@ -38,8 +43,8 @@ def load_all_results():
     print("\n📊 Cargando resultados de análisis...")
     
     # Datos principales
-    transformers_df = pd.read_csv(NETWORK_DIR / 'transformadores_con_topologia.csv')
-    feeders_df = pd.read_csv(NETWORK_DIR / 'alimentadores_caracterizados.csv')
+    transformers_df = read_frame(NETWORK_DIR / 'transformadores_con_topologia.parquet')
+    feeders_df = read_frame(NETWORK_DIR / 'alimentadores_caracterizados.parquet')
     
     # Resultados de análisis espacial
     spatial_patterns = pd.read_csv(NETWORK_DIR / 'patrones_espaciales_alimentadores.csv')
@@ -520,8 +525,8 @@ def main():
         'fase': 'Fase 0 - Caracterización de Red Completada',
         'archivos_generados': {
             'datos_procesados': [
-                'alimentadores_caracterizados.csv',
-                'transformadores_con_topologia.csv',
+                'alimentadores_caracterizados.parquet',
+                'transformadores_con_topologia.parquet',
                 'patrones_espaciales_alimentadores.csv',
                 'correlacion_distancia_calidad.csv',
                 'clusters_espaciales_problemas.csv',
@@ -17,19 +17,29 @@ Objetivos:
 import pandas as pd
 import numpy as np
 import networkx as nx
-from scipy.spatial.distance import pdist, squareform
 import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
 import json
 from datetime import datetime
+from functools import partial
+import argparse
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
+# Backend MST (src/network)
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.network.mst_topology import minimum_spanning_parents, mst_to_digraph
+from src.network.tree_features import topology_features_frame
+from src.network.feeder_runner import FeederCache, add_runner_arguments, execution_summary, run_feeders
+from src.pipeline.store import read_frame, write_frame
+
 # Configuración de rutas
-BASE_DIR = Path("/Users/maxkeczeli/Proyects/gd-edersa-calidad")
-INPUT_FILE = BASE_DIR / "data/processed/network_analysis/transformadores_con_topologia.csv"
-FEEDERS_FILE = BASE_DIR / "data/processed/network_analysis/alimentadores_caracterizados.csv"
+BASE_DIR = Path(__file__).resolve().parents[2]
+INPUT_FILE = BASE_DIR / "data/processed/network_analysis/transformadores_con_topologia.parquet"
+FEEDERS_FILE = BASE_DIR / "data/processed/network_analysis/alimentadores_caracterizados.parquet"
 OUTPUT_DIR = BASE_DIR / "data/processed/electrical_analysis"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -41,8 +51,8 @@ plt.rcParams['font.size'] = 10
 def load_data():
     """Cargar datos de transformadores y alimentadores"""
     print("Cargando datos...")
-    df_transformers = pd.read_csv(INPUT_FILE)
-    df_feeders = pd.read_csv(FEEDERS_FILE)
+    df_transformers = read_frame(INPUT_FILE)
+    df_feeders = read_frame(FEEDERS_FILE)
     
     # Filtrar transformadores con coordenadas válidas
     df_transformers = df_transformers[
@@ -55,22 +65,6 @@ def load_data():
     
     return df_transformers, df_feeders
 
-def haversine_distance(lat1, lon1, lat2, lon2):
-    """
-    Calcular distancia entre dos puntos usando fórmula de Haversine
-    Retorna distancia en kilómetros
-    """
-    R = 6371  # Radio de la Tierra en km
-    
-    lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    
-    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
-    c = 2 * np.arcsin(np.sqrt(a))
-    
-    return R * c
-
 def identify_substation(df_feeder):
     """
     Identificar la ubicación probable de la subestación
@@ -102,117 +96,38 @@ def identify_substation(df_feeder):
 def build_mst_topology(df_feeder, substation_coords):
     """
     Construir MST para un alimentador
-    """
-    # Crear lista de todos los nodos (subestación + transformadores)
-    nodes = [('SUBSTATION', substation_coords[0], substation_coords[1], 0, 0)]
-    
-    for idx, row in df_feeder.iterrows():
-        nodes.append((
-            row['Codigo'],
-            row['Coord_X'],
-            row['Coord_Y'],
-            row['Potencia'],
-            row['Q_Usuarios']
-        ))
-    
-    n_nodes = len(nodes)
-    
-    # Calcular matriz de distancias
-    coords = np.array([(n[2], n[1]) for n in nodes])  # lat, lon
-    distances = np.zeros((n_nodes, n_nodes))
-    
-    for i in range(n_nodes):
-        for j in range(i+1, n_nodes):
-            dist = haversine_distance(
-                coords[i][0], coords[i][1],
-                coords[j][0], coords[j][1]
-            )
-            distances[i, j] = dist
-            distances[j, i] = dist
-    
-    # Crear grafo completo
-    G = nx.Graph()
-    for i, node in enumerate(nodes):
-        G.add_node(node[0], 
-                  x=node[1], y=node[2], 
-                  potencia=node[3], usuarios=node[4])
-    
-    # Agregar todas las aristas con pesos (distancias)
-    for i in range(n_nodes):
-        for j in range(i+1, n_nodes):
-            if distances[i, j] > 0:
-                G.add_edge(nodes[i][0], nodes[j][0], weight=distances[i, j])
-    
-    # Calcular MST
-    mst = nx.minimum_spanning_tree(G)
-    
-    # Convertir a grafo dirigido con raíz en subestación
-    mst_directed = nx.DiGraph()
-    mst_directed.add_nodes_from(mst.nodes(data=True))
-    
-    # BFS desde subestación para orientar aristas
-    visited = set()
-    queue = ['SUBSTATION']
-    
-    while queue:
-        current = queue.pop(0)
-        if current in visited:
-            continue
-        visited.add(current)
-        
-        for neighbor in mst.neighbors(current):
-            if neighbor not in visited:
-                mst_directed.add_edge(current, neighbor, 
-                                    weight=mst[current][neighbor]['weight'])
-                queue.append(neighbor)
-    
-    return mst_directed
-
-def calculate_topology_features(mst, node_id):
-    """
-    Calcular características topológicas para un nodo
-    """
-    features = {}
-    
-    # Número de saltos desde subestación
-    try:
-        path = nx.shortest_path(mst, 'SUBSTATION', node_id)
-        features['numero_saltos'] = len(path) - 1
-    except:
-        features['numero_saltos'] = -1
-    
-    # Es nodo hoja
-    features['es_nodo_hoja'] = mst.out_degree(node_id) == 0
-    
-    # Profundidad en el árbol
-    features['profundidad_arbol'] = features['numero_saltos']
     
-    # kVA aguas abajo (suma de todos los descendientes)
-    descendants = nx.descendants(mst, node_id)
-    kva_downstream = sum(mst.nodes[d]['potencia'] for d in descendants)
-    features['kVA_aguas_abajo'] = kva_downstream + mst.nodes[node_id]['potencia']
-    
-    # Usuarios aguas abajo
-    users_downstream = sum(mst.nodes[d]['usuarios'] for d in descendants)
-    features['usuarios_aguas_abajo'] = users_downstream + mst.nodes[node_id]['usuarios']
-    
-    # Número de descendientes
-    features['num_descendientes'] = len(descendants)
+    Distancias haversine vectorizadas sobre aristas candidatas (todos los
+    pares o Delaunay + kNN en alimentadores grandes), MST con scipy y
+    orientación desde la subestación por BFS sobre arrays.
+    """
+    # Nodos: subestación (índice 0) + transformadores
+    node_ids = ['SUBSTATION'] + df_feeder['Codigo'].tolist()
+    x = np.concatenate([[substation_coords[0]], df_feeder['Coord_X'].to_numpy(dtype=float)])
+    y = np.concatenate([[substation_coords[1]], df_feeder['Coord_Y'].to_numpy(dtype=float)])
+    potencia = [0] + df_feeder['Potencia'].tolist()
+    usuarios = [0] + df_feeder['Q_Usuarios'].tolist()
     
-    # Padre en el MST
-    predecessors = list(mst.predecessors(node_id))
-    features['padre_mst'] = predecessors[0] if predecessors else None
+    # MST orientado desde la subestación
+    mst = minimum_spanning_parents(lat=y, lon=x, root=0)
     
-    # Centralidad de intermediación normalizada
-    G_undirected = mst.to_undirected()
-    betweenness = nx.betweenness_centrality(G_undirected)
-    features['centralidad_intermediacion'] = betweenness.get(node_id, 0)
+    return mst_to_digraph(node_ids, mst, x, y, potencia, usuarios)
+
+def calculate_topology_features(mst):
+    """
+    Calcular características topológicas de todos los nodos del MST
     
-    return features
+    Una pasada sobre el array de padres (src/network/tree_features) en lugar
+    de shortest_path / descendants / betweenness_centrality por nodo.
+    """
+    return topology_features_frame(mst, root_node='SUBSTATION')
 
-def process_feeder(feeder_name, df_feeder, output_data):
+def process_feeder(feeder_name, df_feeder, top_feeders=(), viz_dir=None):
     """
     Procesar un alimentador completo
+    
+    Se ejecuta en un proceso del pool (src/network/feeder_runner): devuelve
+    las filas de salida del alimentador y las coordenadas de la subestación.
     """
     print(f"\n  Procesando alimentador: {feeder_name}")
     print(f"    - {len(df_feeder)} transformadores")
@@ -225,23 +140,25 @@ def process_feeder(feeder_name, df_feeder, output_data):
     mst = build_mst_topology(df_feeder, (sub_x, sub_y))
     print(f"    - MST construido: {mst.number_of_nodes()} nodos, {mst.number_of_edges()} aristas")
     
-    # Calcular features para cada transformador
-    for idx, row in df_feeder.iterrows():
-        codigo = row['Codigo']
-        if codigo in mst:
-            features = calculate_topology_features(mst, codigo)
-            
-            # Agregar a datos de salida
-            output_data['Codigo'].append(codigo)
-            output_data['Alimentador'].append(feeder_name)
-            output_data['substation_x'].append(sub_x)
-            output_data['substation_y'].append(sub_y)
-            output_data['substation_strategy'].append(strategy)
-            
-            for key, value in features.items():
-                output_data[key].append(value)
-    
-    return mst, (sub_x, sub_y)
+    # Calcular features de todos los nodos en una pasada
+    features = calculate_topology_features(mst)
+    
+    # Filas de salida (una por transformador del alimentador)
+    codigos = df_feeder['Codigo'][df_feeder['Codigo'].isin(features.index)].tolist()
+    df_output = features.loc[codigos].reset_index(drop=True)
+    df_output.insert(0, 'Codigo', codigos)
+    df_output.insert(1, 'Alimentador', feeder_name)
+    df_output.insert(2, 'substation_x', sub_x)
+    df_output.insert(3, 'substation_y', sub_y)
+    df_output.insert(4, 'substation_strategy', strategy)
+    
+    # Visualizar solo los top alimentadores
+    if viz_dir is not None and feeder_name in top_feeders:
+        viz_path = viz_dir / f"mst_topology_{feeder_name.replace('/', '_')}.png"
+        visualize_mst(mst, (sub_x, sub_y), feeder_name, viz_path)
+        print(f"    ✓ Visualización guardada")
+    
+    return df_output, (sub_x, sub_y)
 
 def visualize_mst(mst, substation_coords, feeder_name, save_path):
     """
@@ -313,7 +230,7 @@ def visualize_mst(mst, substation_coords, feeder_name, save_path):
     plt.savefig(save_path, dpi=150, bbox_inches='tight')
     plt.close()
 
-def main():
+def main(workers=1, feeder_cache=None):
     """Función principal"""
     print("=" * 80)
     print("FASE 0 - RECONSTRUCCIÓN DE TOPOLOGÍA CON MST")
@@ -322,53 +239,35 @@ def main():
     # Cargar datos
     df_transformers, df_feeders = load_data()
     
-    # Inicializar estructura de datos de salida
-    output_data = {
-        'Codigo': [],
-        'Alimentador': [],
-        'substation_x': [],
-        'substation_y': [],
-        'substation_strategy': [],
-        'numero_saltos': [],
-        'es_nodo_hoja': [],
-        'profundidad_arbol': [],
-        'kVA_aguas_abajo': [],
-        'usuarios_aguas_abajo': [],
-        'num_descendientes': [],
-        'padre_mst': [],
-        'centralidad_intermediacion': []
-    }
-    
     # Directorio para visualizaciones
     viz_dir = OUTPUT_DIR / "visualizations"
     viz_dir.mkdir(exist_ok=True)
     
-    # Procesar cada alimentador
-    topologies = {}
-    substations = {}
-    
     # Seleccionar alimentadores top para visualización
     top_feeders = df_feeders.nlargest(10, 'usuarios_totales')['Alimentador'].tolist()
     
-    for i, feeder in enumerate(df_transformers['Alimentador'].unique()):
-        df_feeder = df_transformers[df_transformers['Alimentador'] == feeder].copy()
-        
-        if len(df_feeder) < 2:
-            print(f"\n  ⚠️ Saltando alimentador {feeder} (solo {len(df_feeder)} transformador)")
-            continue
-        
-        mst, substation = process_feeder(feeder, df_feeder, output_data)
-        topologies[feeder] = mst
-        substations[feeder] = substation
-        
-        # Visualizar solo los top alimentadores
-        if feeder in top_feeders:
-            viz_path = viz_dir / f"mst_topology_{feeder.replace('/', '_')}.png"
-            visualize_mst(mst, substation, feeder, viz_path)
-            print(f"    ✓ Visualización guardada")
-    
-    # Crear DataFrame de salida
-    df_output = pd.DataFrame(output_data)
+    feeder_sizes = df_transformers['Alimentador'].value_counts(sort=False)
+    for feeder, size in feeder_sizes[feeder_sizes < 2].items():
+        print(f"\n  ⚠️ Saltando alimentador {feeder} (solo {size} transformador)")
+    
+    # Procesar alimentadores en paralelo (mayor a menor)
+    print(f"\nProcesando alimentadores con {workers} proceso(s)...")
+    start = time.perf_counter()
+    results = run_feeders(
+        partial(process_feeder, top_feeders=set(top_feeders), viz_dir=viz_dir),
+        df_transformers, workers=workers, min_rows=2,
+        cache=FeederCache(feeder_cache) if feeder_cache else None
+    )
+    execution = execution_summary(results, workers, time.perf_counter() - start)
+    
+    topologies = [r for r in results if r.ok]
+    substations = {r.feeder: r.result[1] for r in topologies}
+    for r in results:
+        if not r.ok:
+            print(f"\n  ❌ Error en alimentador {r.feeder}: {r.error.strip().splitlines()[-1]}")
+    
+    # Crear DataFrame de salida (orden de aparición de los alimentadores)
+    df_output = pd.concat([r.result[0] for r in topologies], ignore_index=True)
     
     # Merge con datos originales
     df_final = df_transformers.merge(
@@ -378,8 +277,7 @@ def main():
     )
     
     # Guardar resultados
-    output_file = OUTPUT_DIR / "transformadores_mst_topology.csv"
-    df_final.to_csv(output_file, index=False)
+    output_file = write_frame(df_final, OUTPUT_DIR / "transformadores_mst_topology.parquet")
     print(f"\n✓ Resultados guardados en: {output_file}")
     
     # Generar reporte resumen
@@ -394,10 +292,11 @@ def main():
             'promedio_kVA_aguas_abajo': df_output['kVA_aguas_abajo'].mean(),
             'max_kVA_aguas_abajo': df_output['kVA_aguas_abajo'].max()
         },
-        'estrategias_subestacion': pd.DataFrame(output_data).groupby('substation_strategy').size().to_dict(),
+        'estrategias_subestacion': df_output.groupby('substation_strategy').size().to_dict(),
         'top_nodos_criticos': df_output.nlargest(10, 'centralidad_intermediacion')[
             ['Codigo', 'Alimentador', 'centralidad_intermediacion', 'kVA_aguas_abajo']
-        ].to_dict('records')
+        ].to_dict('records'),
+        'ejecucion': execution
     }
     
     report_file = OUTPUT_DIR / "mst_topology_report.json"
@@ -426,4 +325,7 @@ def main():
               f"kVA aguas abajo={row['kVA_aguas_abajo']:.0f}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Reconstrucción de topología MST por alimentador")
+    add_runner_arguments(parser)
+    args = parser.parse_args()
+    main(workers=args.workers, feeder_cache=args.feeder_cache)
\ No newline at end of file
@@ -15,23 +15,34 @@ Valores de referencia:
 
 import pandas as pd
 import numpy as np
-import networkx as nx
 from pathlib import Path
 import json
 from datetime import datetime
 import matplotlib.pyplot as plt
 import seaborn as sns
+import argparse
+import sys
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
+# Ejecución paralela por alimentador (src/network)
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.network.feeder_runner import FeederCache, add_runner_arguments, execution_summary, run_feeders
+from src.network.load_flow import RadialNetwork, solve_load_flow
+from src.network.mst_topology import NO_PARENT
+from src.network.tree_features import accumulate_path, tree_levels
+from src.pipeline.store import read_frame, write_frame
+
 # Configuración de rutas
-BASE_DIR = Path("/Users/maxkeczeli/Proyects/gd-edersa-calidad")
-INPUT_FILE = BASE_DIR / "data/processed/electrical_analysis/transformadores_mst_topology.csv"
+BASE_DIR = Path(__file__).resolve().parents[2]
+INPUT_FILE = BASE_DIR / "data/processed/electrical_analysis/transformadores_mst_topology.parquet"
 OUTPUT_DIR = BASE_DIR / "data/processed/electrical_analysis"
 
 # Parámetros eléctricos
 VOLTAGE_NOM = 13.2  # kV nominal del sistema
 ROUTING_FACTOR = 1.3  # Factor de corrección de enrutamiento
+LOAD_FACTOR = 0.7  # Carga promedio respecto de la potencia instalada
 
 # Tabla de impedancias por tipo de conductor (Ω/km)
 IMPEDANCE_TABLE = {
@@ -51,7 +62,7 @@ POWER_FACTOR = {
 def load_data():
     """Cargar datos con topología MST"""
     print("Cargando datos...")
-    df = pd.read_csv(INPUT_FILE)
+    df = read_frame(INPUT_FILE)
     
     # Filtrar registros válidos
     df = df[df['numero_saltos'] >= 0].copy()
@@ -74,135 +85,101 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     
     return R * c
 
-def classify_line_segment(parent_kva, child_kva, is_trunk, tipo_zona='Rural'):
+def feeder_parent_index(df_feeder):
     """
-    Clasificar el tipo de segmento de línea para asignar impedancia
+    Índice de padre_mst dentro del alimentador (posición de fila).
+    
+    Returns:
+        (parent con NO_PARENT si no hay padre en el alimentador,
+        máscara de nodos que cuelgan de la subestación,
+        máscara de nodos con padre encontrado)
     """
-    # Si es línea troncal (conecta directamente con subestación o tiene mucha carga aguas abajo)
-    if is_trunk or parent_kva > 1000:
-        return 'troncal'
-    # Si es zona urbana
-    elif tipo_zona == 'Urbano':
-        return 'urbano'
-    # Por defecto, rural
-    else:
-        return 'rural'
+    codigos = df_feeder['Codigo'].to_numpy()
+    padre = df_feeder['padre_mst']
+    
+    position = pd.Series(np.arange(len(df_feeder)), index=codigos)
+    position = position[~position.index.duplicated(keep='last')]
+    parent = position.reindex(padre.to_numpy()).to_numpy()
+    from_substation = (padre.isna() | (padre == 'SUBSTATION')).to_numpy()
+    found = ~from_substation & ~np.isnan(parent)
+    parent = np.where(found, parent, NO_PARENT).astype(np.int64)
+    return parent, from_substation, found
 
 def calculate_electrical_distance(df_feeder):
     """
     Calcular distancia eléctrica acumulada para cada transformador
+    
+    Los nodos se ordenan por nivel del MST (padre_mst) y R, X y distancia se
+    acumulan nivel a nivel desde la subestación con arrays de índices de
+    padre, de modo que el resultado no depende del orden de las filas.
+    Un padre que no está en el alimentador deja al nodo en 0 (raíz propia).
     """
-    results = []
-    
-    # Crear diccionario para búsqueda rápida
-    trafo_dict = df_feeder.set_index('Codigo').to_dict('index')
-    
-    for idx, row in df_feeder.iterrows():
-        codigo = row['Codigo']
-        padre = row['padre_mst']
-        
-        # Si es conectado directamente a subestación
-        if padre == 'SUBSTATION' or pd.isna(padre):
-            # Distancia desde subestación
-            dist_geo = haversine_distance(
-                row['Coord_Y'], row['Coord_X'],
-                row['substation_y'], row['substation_x']
-            )
-            
-            # Aplicar factor de enrutamiento
-            dist_real = dist_geo * ROUTING_FACTOR
-            
-            # Clasificar segmento
-            line_type = classify_line_segment(
-                0,  # Subestación
-                row['kVA_aguas_abajo'],
-                True,  # Es troncal
-                row.get('tipo_zona', 'Rural')
-            )
-            
-            # Obtener impedancia
-            R_km = IMPEDANCE_TABLE[line_type]['R']
-            X_km = IMPEDANCE_TABLE[line_type]['X']
-            
-            # Impedancia total del segmento
-            R_total = R_km * dist_real
-            X_total = X_km * dist_real
-            Z_total = np.sqrt(R_total**2 + X_total**2)
-            
-        else:
-            # Buscar padre
-            if padre in trafo_dict:
-                padre_data = trafo_dict[padre]
-                
-                # Distancia entre padre e hijo
-                dist_geo = haversine_distance(
-                    row['Coord_Y'], row['Coord_X'],
-                    padre_data['Coord_Y'], padre_data['Coord_X']
-                )
-                
-                # Aplicar factor de enrutamiento
-                dist_real = dist_geo * ROUTING_FACTOR
-                
-                # Clasificar segmento
-                is_trunk = padre_data.get('numero_saltos', 0) <= 2
-                line_type = classify_line_segment(
-                    padre_data.get('kVA_aguas_abajo', 0),
-                    row['kVA_aguas_abajo'],
-                    is_trunk,
-                    row.get('tipo_zona', 'Rural')
-                )
-                
-                # Obtener impedancia del segmento
-                R_km = IMPEDANCE_TABLE[line_type]['R']
-                X_km = IMPEDANCE_TABLE[line_type]['X']
-                
-                R_segment = R_km * dist_real
-                X_segment = X_km * dist_real
-                
-                # Impedancia acumulada (del padre + segmento)
-                R_total = padre_data.get('R_acumulada', 0) + R_segment
-                X_total = padre_data.get('X_acumulada', 0) + X_segment
-                Z_total = np.sqrt(R_total**2 + X_total**2)
-                
-                dist_real = padre_data.get('distancia_electrica_km', 0) + dist_real
-            else:
-                # Si no se encuentra el padre, usar valores por defecto
-                dist_real = 0
-                R_total = 0
-                X_total = 0
-                Z_total = 0
-                line_type = 'rural'
-        
-        # Agregar resultados
-        results.append({
-            'Codigo': codigo,
-            'distancia_electrica_km': dist_real,
-            'R_acumulada': R_total,
-            'X_acumulada': X_total,
-            'Z_acumulada': Z_total,
-            'tipo_conductor': line_type
-        })
-        
-        # Actualizar diccionario para hijos
-        trafo_dict[codigo].update(results[-1])
-    
-    return pd.DataFrame(results)
+    n = len(df_feeder)
+    codigos = df_feeder['Codigo'].to_numpy()
+    
+    # Índice del padre dentro del alimentador
+    parent, from_substation, found = feeder_parent_index(df_feeder)
+    orphan = ~from_substation & ~found
+    parent_safe = np.where(found, parent, np.arange(n))
+    
+    # Distancia del tramo (al padre o a la subestación)
+    lat = df_feeder['Coord_Y'].to_numpy(dtype=float)
+    lon = df_feeder['Coord_X'].to_numpy(dtype=float)
+    to_lat = np.where(found, lat[parent_safe], df_feeder['substation_y'].to_numpy(dtype=float))
+    to_lon = np.where(found, lon[parent_safe], df_feeder['substation_x'].to_numpy(dtype=float))
+    dist_segment = haversine_distance(lat, lon, to_lat, to_lon) * ROUTING_FACTOR
+    
+    # Clasificar tramos (troncal si sale de la subestación, padre a ≤ 2 saltos
+    # o padre con más de 1000 kVA aguas abajo)
+    tipo_zona = df_feeder['tipo_zona'].to_numpy() if 'tipo_zona' in df_feeder.columns else 'Rural'
+    kva = df_feeder['kVA_aguas_abajo'].to_numpy(dtype=float)
+    saltos = df_feeder['numero_saltos'].to_numpy()
+    is_trunk = from_substation | (found & (saltos[parent_safe] <= 2))
+    parent_kva = np.where(found, kva[parent_safe], 0)
+    line_type = np.select(
+        [orphan, is_trunk | (parent_kva > 1000), tipo_zona == 'Urbano'],
+        ['rural', 'troncal', 'urbano'],
+        default='rural'
+    )
+    
+    # Impedancia del tramo
+    R_km = np.select([line_type == t for t in IMPEDANCE_TABLE], [v['R'] for v in IMPEDANCE_TABLE.values()])
+    X_km = np.select([line_type == t for t in IMPEDANCE_TABLE], [v['X'] for v in IMPEDANCE_TABLE.values()])
+    segments = np.column_stack([dist_segment, R_km * dist_segment, X_km * dist_segment])
+    segments[orphan] = 0
+    
+    # Acumular desde las raíces (subestación o padre fuera del alimentador)
+    _, levels = tree_levels(parent, root=np.flatnonzero(parent == NO_PARENT))
+    totals = accumulate_path(parent, levels, segments)
+    
+    return pd.DataFrame({
+        'Codigo': codigos,
+        'distancia_electrica_km': totals[:, 0],
+        'R_acumulada': totals[:, 1],
+        'X_acumulada': totals[:, 2],
+        'Z_acumulada': np.sqrt(totals[:, 1]**2 + totals[:, 2]**2),
+        'tipo_conductor': line_type
+    })
 
-def calculate_voltage_drop(row):
+def calculate_voltage_drop(df):
     """
     Calcular caída de tensión usando la fórmula trifásica:
     ΔV = √3 × I × (R×cos(φ) + X×sin(φ))
+    
+    Columna a columna sobre todos los transformadores de df.
     """
     # Obtener factor de potencia
-    fp = POWER_FACTOR.get(row.get('tipo_zona', 'Rural'), POWER_FACTOR['default'])
+    if 'tipo_zona' in df.columns:
+        fp = df['tipo_zona'].map(POWER_FACTOR).fillna(POWER_FACTOR['default']).to_numpy(dtype=float)
+    else:
+        fp = np.full(len(df), POWER_FACTOR['Rural'])
     
     # Calcular corriente nominal
-    S_kva = row['Potencia']
+    S_kva = df['Potencia'].to_numpy(dtype=float)
     I_nom = S_kva / (np.sqrt(3) * VOLTAGE_NOM)  # Corriente en A
     
     # Aplicar factor de carga estimado (asumiendo 70% de carga promedio)
-    factor_carga = 0.7
-    I_actual = I_nom * factor_carga
+    I_actual = I_nom * LOAD_FACTOR
     
     # Calcular componentes
     cos_phi = fp
@@ -210,8 +187,8 @@ def calculate_voltage_drop(row):
     
     # Caída de tensión línea a línea (V)
     delta_V = np.sqrt(3) * I_actual * (
-        row['R_acumulada'] * cos_phi + 
-        row['X_acumulada'] * sin_phi
+        df['R_acumulada'].to_numpy(dtype=float) * cos_phi + 
+        df['X_acumulada'].to_numpy(dtype=float) * sin_phi
     )
     
     # Caída porcentual
@@ -221,20 +198,20 @@ def calculate_voltage_drop(row):
     V_trafo = VOLTAGE_NOM - (delta_V / 1000)  # en kV
     
     # Índice de debilidad (0-1, donde 1 es muy débil)
-    weakness_index = min(delta_V_percent / 10, 1.0)  # Normalizado a 10% máximo
+    weakness_index = np.minimum(delta_V_percent / 10, 1.0)  # Normalizado a 10% máximo
     
-    return {
+    return pd.DataFrame({
         'corriente_estimada_A': I_actual,
         'caida_tension_V': delta_V,
         'caida_tension_percent': delta_V_percent,
         'tension_estimada_kV': V_trafo,
         'factor_potencia_estimado': fp,
         'indice_debilidad_electrica': weakness_index
-    }
+    }, index=df.index)
 
-def calculate_dynamic_sensitivity(row):
+def calculate_dynamic_sensitivity(df):
     """
-    Calcular sensibilidad a hundimientos dinámicos
+    Calcular sensibilidad a hundimientos dinámicos (columna a columna)
     """
     # Factor de arranque típico para motores (5-7 veces corriente nominal)
     motor_start_factor = 6.0
@@ -243,26 +220,70 @@ def calculate_dynamic_sensitivity(row):
     motor_fraction = 0.3
     
     # Corriente de arranque equivalente
-    I_start = row['corriente_estimada_A'] * motor_fraction * motor_start_factor
+    I_start = df['corriente_estimada_A'].to_numpy(dtype=float) * motor_fraction * motor_start_factor
     
     # Hundimiento de tensión durante arranque
-    delta_V_start = np.sqrt(3) * I_start * row['Z_acumulada']
+    delta_V_start = np.sqrt(3) * I_start * df['Z_acumulada'].to_numpy(dtype=float)
     delta_V_start_percent = (delta_V_start / (VOLTAGE_NOM * 1000)) * 100
     
     # Clasificar sensibilidad
-    if delta_V_start_percent > 15:
-        sensitivity = 'Muy Alta'
-    elif delta_V_start_percent > 10:
-        sensitivity = 'Alta'
-    elif delta_V_start_percent > 5:
-        sensitivity = 'Media'
-    else:
-        sensitivity = 'Baja'
+    sensitivity = np.select(
+        [delta_V_start_percent > 15, delta_V_start_percent > 10, delta_V_start_percent > 5],
+        ['Muy Alta', 'Alta', 'Media'],
+        default='Baja'
+    )
     
-    return {
+    return pd.DataFrame({
         'hundimiento_arranque_percent': delta_V_start_percent,
         'sensibilidad_dinamica': sensitivity
+    }, index=df.index)
+
+def calculate_load_flow(df, power_factor):
+    """
+    Flujo de carga radial (barrido backward/forward) del alimentador
+    
+    A diferencia de calculate_voltage_drop, cada tramo lleva la corriente de
+    todo su subárbol. La red es la subestación (nodo 0) más los
+    transformadores; la impedancia de cada tramo sale de la diferencia de
+    R/X acumuladas con el padre. Las cargas son Potencia × LOAD_FACTOR con el
+    factor de potencia estimado (power_factor, por transformador). Un nodo
+    sin padre en el alimentador queda como fuente propia a tensión nominal
+    (igual que su impedancia nula).
+    
+    Returns:
+        (DataFrame por transformador con tensión, corriente y pérdidas del
+        tramo de llegada, diccionario con los totales del alimentador)
+    """
+    parent, from_substation, found = feeder_parent_index(df)
+    parent_safe = np.where(found, parent, 0)
+    R = df['R_acumulada'].to_numpy(dtype=float)
+    X = df['X_acumulada'].to_numpy(dtype=float)
+    
+    # Subestación en el nodo 0; trafos corridos en uno
+    net_parent = np.r_[NO_PARENT, np.where(found, parent + 1, np.where(from_substation, 0, NO_PARENT))]
+    r_segment = np.r_[0.0, np.where(found, R - R[parent_safe], R)]
+    x_segment = np.r_[0.0, np.where(found, X - X[parent_safe], X)]
+    network = RadialNetwork(net_parent, r_segment, x_segment, VOLTAGE_NOM)
+    
+    fp = np.asarray(power_factor, dtype=float)
+    p_kw = df['Potencia'].to_numpy(dtype=float) * LOAD_FACTOR * fp
+    q_kvar = p_kw * np.tan(np.arccos(fp))
+    flow = solve_load_flow(network, np.r_[0.0, p_kw], np.r_[0.0, q_kvar])
+    
+    df_flow = pd.DataFrame({
+        'tension_flujo_pu': flow.voltage_pu[1:],
+        'caida_tension_flujo_percent': (1 - flow.voltage_pu[1:]) * 100,
+        'corriente_tramo_A': flow.current_a[1:],
+        'perdidas_tramo_kW': flow.segment_losses_kw[1:]
+    }, index=df.index)
+    
+    totals = {
+        'perdidas_flujo_kW': float(flow.losses_kw),
+        'perdidas_flujo_percent': float(flow.loss_percent),
+        'tension_min_flujo_pu': float(flow.min_voltage_pu),
+        'flujo_convergido': bool(flow.converged)
     }
+    return df_flow, totals
 
 def process_feeder(feeder_name, df_feeder):
     """Procesar un alimentador completo"""
@@ -275,22 +296,26 @@ def process_feeder(feeder_name, df_feeder):
     df_result = df_feeder.merge(df_electrical, on='Codigo', how='left')
     
     # Calcular caídas de tensión
-    voltage_drops = df_result.apply(calculate_voltage_drop, axis=1)
-    df_voltage = pd.DataFrame(list(voltage_drops))
+    df_voltage = calculate_voltage_drop(df_result)
+    
+    # Calcular sensibilidad dinámica (usa la corriente estimada)
+    df_result = pd.concat([df_result, df_voltage], axis=1)
+    df_dynamic = calculate_dynamic_sensitivity(df_result)
     
-    # Calcular sensibilidad dinámica
-    dynamic_sens = df_result.apply(calculate_dynamic_sensitivity, axis=1)
-    df_dynamic = pd.DataFrame(list(dynamic_sens))
+    # Flujo de carga con la corriente real de cada tramo
+    df_flow, flow_totals = calculate_load_flow(df_result, df_voltage['factor_potencia_estimado'])
     
     # Combinar todos los resultados
-    df_final = pd.concat([df_result, df_voltage, df_dynamic], axis=1)
+    df_final = pd.concat([df_result, df_dynamic, df_flow], axis=1)
     
     # Estadísticas del alimentador
     stats = {
         'impedancia_max_ohm': df_final['Z_acumulada'].max(),
         'caida_tension_max_percent': df_final['caida_tension_percent'].max(),
         'transformadores_fuera_limite': (df_final['caida_tension_percent'] > 5).sum(),
-        'debilidad_promedio': df_final['indice_debilidad_electrica'].mean()
+        'debilidad_promedio': df_final['indice_debilidad_electrica'].mean(),
+        'caida_tension_flujo_max_percent': df_final['caida_tension_flujo_percent'].max(),
+        **flow_totals
     }
     
     return df_final, stats
@@ -345,7 +370,7 @@ def visualize_voltage_profile(df_results, save_path):
     plt.savefig(save_path, dpi=150, bbox_inches='tight')
     plt.close()
 
-def main():
+def main(workers=1, feeder_cache=None):
     """Función principal"""
     print("=" * 80)
     print("CÁLCULO DE DISTANCIA ELÉCTRICA Y CAÍDA DE TENSIÓN")
@@ -354,26 +379,25 @@ def main():
     # Cargar datos
     df = load_data()
     
-    # Procesar por alimentador
-    all_results = []
-    feeder_stats = {}
-    
-    for feeder in df['Alimentador'].unique():
-        df_feeder = df[df['Alimentador'] == feeder].copy()
-        
-        if len(df_feeder) < 2:
-            continue
-        
-        df_result, stats = process_feeder(feeder, df_feeder)
-        all_results.append(df_result)
-        feeder_stats[feeder] = stats
-    
-    # Combinar resultados
+    # Procesar por alimentador en paralelo (mayor a menor)
+    print(f"\nProcesando alimentadores con {workers} proceso(s)...")
+    start = time.perf_counter()
+    results = run_feeders(process_feeder, df, workers=workers, min_rows=2,
+                          cache=FeederCache(feeder_cache) if feeder_cache else None)
+    execution = execution_summary(results, workers, time.perf_counter() - start)
+    
+    for r in results:
+        if not r.ok:
+            print(f"\n  ❌ Error en alimentador {r.feeder}: {r.error.strip().splitlines()[-1]}")
+    
+    all_results = [r.result[0] for r in results if r.ok]
+    feeder_stats = {r.feeder: r.result[1] for r in results if r.ok}
+    
+    # Combinar resultados (orden de aparición de los alimentadores)
     df_final = pd.concat(all_results, ignore_index=True)
     
     # Guardar resultados
-    output_file = OUTPUT_DIR / "transformadores_distancia_electrica.csv"
-    df_final.to_csv(output_file, index=False)
+    output_file = write_frame(df_final, OUTPUT_DIR / "transformadores_distancia_electrica.parquet")
     print(f"\n✓ Resultados guardados en: {output_file}")
     
     # Generar visualizaciones
@@ -401,13 +425,22 @@ def main():
             'transformadores_fuera_limite_5%': (df_final['caida_tension_percent'] > 5).sum(),
             'porcentaje_fuera_limite': ((df_final['caida_tension_percent'] > 5).sum() / len(df_final)) * 100
         },
+        'flujo_de_carga': {
+            'factor_carga': LOAD_FACTOR,
+            'perdidas_totales_kW': sum(v['perdidas_flujo_kW'] for v in feeder_stats.values()),
+            'caida_tension_maxima_percent': df_final['caida_tension_flujo_percent'].max(),
+            'transformadores_fuera_limite_5%': int((df_final['caida_tension_flujo_percent'] > 5).sum()),
+            'alimentadores_sin_convergencia': [k for k, v in feeder_stats.items()
+                                               if not v['flujo_convergido']]
+        },
         'distribucion_sensibilidad_dinamica': df_final['sensibilidad_dinamica'].value_counts().to_dict(),
         'top_10_puntos_debiles': df_final.nlargest(10, 'indice_debilidad_electrica')[
             ['Codigo', 'Alimentador', 'numero_saltos', 'Z_acumulada', 
              'caida_tension_percent', 'indice_debilidad_electrica']
         ].to_dict('records'),
         'alimentadores_criticos': {k: v for k, v in feeder_stats.items() 
-                                 if v['caida_tension_max_percent'] > 7}
+                                 if v['caida_tension_max_percent'] > 7},
+        'ejecucion': execution
     }
     
     report_file = OUTPUT_DIR / "electrical_distance_report.json"
@@ -426,6 +459,8 @@ def main():
     print(f"• Caída de tensión máxima: {df_final['caida_tension_percent'].max():.2f}%")
     print(f"• Transformadores fuera de límite (>5%): {(df_final['caida_tension_percent'] > 5).sum()} "
           f"({((df_final['caida_tension_percent'] > 5).sum() / len(df_final)) * 100:.1f}%)")
+    print(f"• Flujo de carga: pérdidas {report['flujo_de_carga']['perdidas_totales_kW']:,.0f} kW, "
+          f"caída máxima {df_final['caida_tension_flujo_percent'].max():.2f}%")
     
     # Distribución de sensibilidad
     print("\nDistribución de Sensibilidad Dinámica:")
@@ -443,4 +478,7 @@ def main():
               f"Debilidad={row['indice_debilidad_electrica']:.3f}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Distancia eléctrica y caída de tensión por alimentador")
+    add_runner_arguments(parser)
+    args = parser.parse_args()
+    main(workers=args.workers, feeder_cache=args.feeder_cache)
\ No newline at end of file
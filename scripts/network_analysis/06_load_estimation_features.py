@@ -20,9 +20,15 @@ import seaborn as sns
 import warnings
 warnings.filterwarnings('ignore')
 
+# Acceso a columnas y almacenamiento intermedio Parquet (src/network, src/pipeline)
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.network.columns import column
+from src.pipeline.store import read_frame, write_frame
+
 # Configuración de rutas
-BASE_DIR = Path("/Users/maxkeczeli/Proyects/gd-edersa-calidad")
-INPUT_FILE = BASE_DIR / "data/processed/electrical_analysis/transformadores_distancia_electrica.csv"
+BASE_DIR = Path(__file__).resolve().parents[2]
+INPUT_FILE = BASE_DIR / "data/processed/electrical_analysis/transformadores_distancia_electrica.parquet"
 OUTPUT_DIR = BASE_DIR / "data/processed/electrical_analysis"
 
 # Factores de potencia por tipo de carga (basados en documento teórico)
@@ -243,6 +249,155 @@ def calculate_overload_risk(row):
         'indice_estres_termico': thermal_stress
     }
 
+# Columnas que este script recalcula sobre nombres que ya trae la entrada: la
+# primera aparición conserva el nombre (lo que leían 07 y 08 del CSV histórico)
+# y la recalculada se guarda con un nombre propio
+RECALCULATED_COLUMNS = {
+    'factor_potencia_estimado': 'factor_potencia_tipo_carga',
+    'factor_utilizacion_pico': 'factor_utilizacion_pico_sobrecarga',
+}
+
+def resolve_recalculated_columns(df):
+    """
+    Renombra la segunda aparición de las columnas de RECALCULATED_COLUMNS.
+    
+    El almacenamiento Parquet no acepta nombres repetidos: cualquier otra
+    columna repetida es un error.
+    """
+    seen = set()
+    names = []
+    for name in df.columns:
+        if name in seen:
+            if name not in RECALCULATED_COLUMNS or RECALCULATED_COLUMNS[name] in seen:
+                raise ValueError(f"Columna repetida sin resolver: {name}")
+            name = RECALCULATED_COLUMNS[name]
+        seen.add(name)
+        names.append(name)
+    resolved = df.copy(deep=False)
+    resolved.columns = names
+    return resolved
+
+def classify_load_type_frame(df):
+    """
+    Versión columnar de classify_load_type para todos los transformadores
+    """
+    kva_per_user = column(df, 'Potencia').astype(float) / np.maximum(column(df, 'Q_Usuarios').astype(float), 1)
+    tipo_zona = column(df, 'tipo_zona', 'Rural')
+    
+    # Tramos de kVA por usuario (NaN cae en el último, como en la versión por fila)
+    tramos = [kva_per_user < 0.5, kva_per_user < 2.0, kva_per_user < 5.0, kva_per_user < 15.0]
+    urbano = tipo_zona == 'Urbano'
+    rural = tipo_zona == 'Rural'
+    load_type = np.select(
+        tramos,
+        ['residencial', 'residencial', 'mixto',
+         np.where(urbano, 'comercial', np.where(rural, 'rural_agricola', 'industrial_ligero'))],
+        default='industrial_pesado'
+    )
+    load_profile = np.select(
+        tramos,
+        ['bajo_consumo', 'residencial_tipico', 'mixto_res_com',
+         np.where(urbano, 'comercial', np.where(rural, 'agricola', 'industrial_ligero'))],
+        default='gran_consumidor'
+    )
+    
+    return pd.DataFrame({
+        'tipo_carga': load_type.astype(object),
+        'perfil_carga': load_profile.astype(object),
+        'kva_por_usuario': kva_per_user
+    }, index=df.index)
+
+def estimate_diversity_factors(df):
+    """
+    Versión columnar de estimate_diversity_factor (array por transformador)
+    """
+    n_users = column(df, 'Q_Usuarios').astype(float)
+    load_type = pd.Series(column(df, 'tipo_carga')).astype(str)
+    residencial = DIVERSITY_FACTORS['residencial']
+    
+    residential_fd = np.select(
+        [n_users <= 5, n_users <= 10, n_users <= 20, n_users <= 50],
+        [residencial['usuarios_1_5'], residencial['usuarios_6_10'],
+         residencial['usuarios_11_20'], residencial['usuarios_21_50']],
+        default=residencial['usuarios_50+']
+    )
+    return np.select(
+        [load_type.str.contains('residencial', regex=False).to_numpy(),
+         load_type.str.contains('comercial', regex=False).to_numpy(),
+         load_type.str.contains('industrial', regex=False).to_numpy()],
+        [residential_fd, DIVERSITY_FACTORS['comercial'], DIVERSITY_FACTORS['industrial']],
+        default=DIVERSITY_FACTORS['rural']
+    )
+
+def calculate_load_features_frame(df):
+    """
+    Versión columnar de calculate_load_features
+    """
+    tipo_carga = pd.Series(column(df, 'tipo_carga'))
+    fp = tipo_carga.map(POWER_FACTOR_BY_TYPE).fillna(0.85).to_numpy(dtype=float)
+    fd = estimate_diversity_factors(df)
+    
+    # Factores de utilización por categoría (industrial_* -> industrial)
+    category = np.where(tipo_carga.astype(str).str.contains('industrial', regex=False),
+                        'industrial', tipo_carga.astype(str))
+    fu = pd.Series(category).map({k: v['promedio'] for k, v in UTILIZATION_CURVE.items()})
+    fu_pico = pd.Series(category).map({k: v['pico_tarde'] for k, v in UTILIZATION_CURVE.items()})
+    fu = fu.fillna(0.60).to_numpy(dtype=float)
+    fu_pico = fu_pico.fillna(0.85).to_numpy(dtype=float)
+    
+    S_kva = column(df, 'Potencia').astype(float)
+    sin_phi = np.sqrt(1 - fp**2)
+    
+    # Carga diversificada promedio y pico
+    S_div = S_kva * fd * fu
+    P_est = S_div * fp
+    Q_est = S_div * sin_phi
+    S_pico = S_kva * fd * fu_pico
+    P_pico = S_pico * fp
+    Q_pico = S_pico * sin_phi
+    
+    return pd.DataFrame({
+        'factor_potencia_estimado': fp,
+        'factor_diversidad': fd,
+        'factor_utilizacion_promedio': fu,
+        'factor_utilizacion_pico': fu_pico,
+        'carga_activa_P_est_kW': P_est,
+        'carga_reactiva_Q_est_kVAR': Q_est,
+        'carga_aparente_S_est_kVA': S_div,
+        'carga_activa_pico_kW': P_pico,
+        'carga_reactiva_pico_kVAR': Q_pico,
+        'factor_carga': fu / fu_pico,
+        'indice_carga_reactiva': Q_est / np.maximum(P_est, 1),
+        'densidad_carga_kW_usuario': P_est / np.maximum(column(df, 'Q_Usuarios').astype(float), 1)
+    }, index=df.index)
+
+def calculate_overload_risk_frame(df):
+    """
+    Versión columnar de calculate_overload_risk
+    """
+    potencia = column(df, 'Potencia').astype(float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        utilization = column(df, 'carga_aparente_S_est_kVA').astype(float) / potencia
+        utilization_pico = (column(df, 'carga_activa_pico_kW').astype(float) /
+                            column(df, 'factor_potencia_estimado').astype(float)) / potencia
+    overload_index = utilization_pico
+    
+    levels = [overload_index > 1.2, overload_index > 1.0, overload_index > 0.85, overload_index > 0.70]
+    risk_level = np.select(levels, ['Crítico', 'Alto', 'Medio', 'Bajo'], default='Mínimo')
+    risk_score = np.select(levels, [1.0, 0.8, 0.6, 0.4], default=0.2)
+    
+    debilidad = column(df, 'indice_debilidad_electrica', 0).astype(float)
+    
+    return pd.DataFrame({
+        'factor_utilizacion_actual': utilization,
+        'factor_utilizacion_pico': utilization_pico,
+        'margen_reserva': 1 - utilization_pico,
+        'indice_sobrecarga': overload_index,
+        'nivel_riesgo_sobrecarga': risk_level.astype(object),
+        'score_riesgo_sobrecarga': risk_score,
+        'indice_estres_termico': overload_index * (1 + 0.1 * debilidad)
+    }, index=df.index)
+
 def visualize_load_analysis(df_results, save_dir):
     """Generar visualizaciones del análisis de carga"""
     fig, axes = plt.subplots(2, 2, figsize=(16, 12))
@@ -258,7 +413,7 @@ def visualize_load_analysis(df_results, save_dir):
     
     # 2. Factor de potencia por tipo
     ax2 = axes[0, 1]
-    fp_by_type = df_results.groupby('tipo_carga')['factor_potencia_estimado'].mean().sort_values()
+    fp_by_type = df_results.groupby('tipo_carga')['factor_potencia_tipo_carga'].mean().sort_values()
     fp_by_type.plot(kind='barh', ax=ax2, color='lightcoral')
     ax2.set_title('Factor de Potencia Promedio por Tipo')
     ax2.set_xlabel('Factor de Potencia')
@@ -267,7 +422,7 @@ def visualize_load_analysis(df_results, save_dir):
     
     # 3. Distribución de utilización
     ax3 = axes[1, 0]
-    df_results['factor_utilizacion_pico'].hist(bins=50, ax=ax3, alpha=0.7, color='green')
+    df_results['factor_utilizacion_pico_sobrecarga'].hist(bins=50, ax=ax3, alpha=0.7, color='green')
     ax3.axvline(x=1.0, color='red', linestyle='--', label='Capacidad nominal')
     ax3.set_title('Distribución de Factor de Utilización Pico')
     ax3.set_xlabel('Factor de Utilización')
@@ -291,7 +446,7 @@ def visualize_load_analysis(df_results, save_dir):
     # Visualización adicional: Correlación FP vs kVA/usuario
     plt.figure(figsize=(10, 6))
     scatter = plt.scatter(df_results['kva_por_usuario'], 
-                         df_results['factor_potencia_estimado'],
+                         df_results['factor_potencia_tipo_carga'],
                          c=df_results['score_riesgo_sobrecarga'],
                          cmap='RdYlGn_r', alpha=0.6)
     plt.colorbar(scatter, label='Score Riesgo Sobrecarga')
@@ -311,30 +466,24 @@ def main():
     
     # Cargar datos
     print("Cargando datos...")
-    df = pd.read_csv(INPUT_FILE)
+    df = read_frame(INPUT_FILE)
     print(f"✓ {len(df)} transformadores cargados")
     
-    # Clasificar tipos de carga
+    # Clasificar tipos de carga (columna a columna)
     print("\nClasificando tipos de carga...")
-    load_classification = df.apply(classify_load_type, axis=1)
-    df_class = pd.DataFrame(list(load_classification))
-    df = pd.concat([df, df_class], axis=1)
+    df = pd.concat([df, classify_load_type_frame(df)], axis=1)
     
     # Calcular features de carga
     print("Calculando características de carga...")
-    load_features = df.apply(calculate_load_features, axis=1)
-    df_features = pd.DataFrame(list(load_features))
-    df = pd.concat([df, df_features], axis=1)
+    df = pd.concat([df, calculate_load_features_frame(df)], axis=1)
     
     # Calcular riesgo de sobrecarga
     print("Evaluando riesgo de sobrecarga...")
-    overload_risk = df.apply(calculate_overload_risk, axis=1)
-    df_risk = pd.DataFrame(list(overload_risk))
-    df = pd.concat([df, df_risk], axis=1)
+    df = pd.concat([df, calculate_overload_risk_frame(df)], axis=1)
+    df = resolve_recalculated_columns(df)
     
     # Guardar resultados
-    output_file = OUTPUT_DIR / "transformadores_carga_estimada.csv"
-    df.to_csv(output_file, index=False)
+    output_file = write_frame(df, OUTPUT_DIR / "transformadores_carga_estimada.parquet")
     print(f"\n✓ Resultados guardados en: {output_file}")
     
     # Generar visualizaciones
@@ -355,9 +504,9 @@ def main():
         'estadisticas_carga': {
             'carga_total_estimada_MW': df['carga_activa_P_est_kW'].sum() / 1000,
             'carga_reactiva_total_MVAR': df['carga_reactiva_Q_est_kVAR'].sum() / 1000,
-            'factor_potencia_promedio_red': df['factor_potencia_estimado'].mean(),
+            'factor_potencia_promedio_red': df['factor_potencia_tipo_carga'].mean(),
             'factor_utilizacion_promedio': df['factor_utilizacion_actual'].mean(),
-            'factor_utilizacion_pico_promedio': df['factor_utilizacion_pico'].mean()
+            'factor_utilizacion_pico_promedio': df['factor_utilizacion_pico_sobrecarga'].mean()
         },
         'analisis_sobrecarga': {
             'transformadores_sobrecargados': (df['indice_sobrecarga'] > 1.0).sum(),
@@ -368,12 +517,12 @@ def main():
         },
         'transformadores_criticos_sobrecarga': df[df['nivel_riesgo_sobrecarga'] == 'Crítico'].nlargest(10, 'indice_sobrecarga')[
             ['Codigo', 'Alimentador', 'Potencia', 'Q_Usuarios', 'tipo_carga',
-             'factor_utilizacion_pico', 'indice_sobrecarga', 'indice_estres_termico']
+             'factor_utilizacion_pico_sobrecarga', 'indice_sobrecarga', 'indice_estres_termico']
         ].to_dict('records'),
         'alimentadores_bajo_fp': df.groupby('Alimentador').agg({
-            'factor_potencia_estimado': 'mean',
+            'factor_potencia_tipo_carga': 'mean',
             'carga_reactiva_Q_est_kVAR': 'sum'
-        }).nsmallest(10, 'factor_potencia_estimado').to_dict('index')
+        }).nsmallest(10, 'factor_potencia_tipo_carga').to_dict('index')
     }
     
     report_file = OUTPUT_DIR / "load_estimation_report.json"
@@ -393,7 +542,7 @@ def main():
     print(f"\nEstadísticas de Carga:")
     print(f"  - Carga activa total estimada: {df['carga_activa_P_est_kW'].sum()/1000:.1f} MW")
     print(f"  - Carga reactiva total: {df['carga_reactiva_Q_est_kVAR'].sum()/1000:.1f} MVAR")
-    print(f"  - Factor de potencia promedio: {df['factor_potencia_estimado'].mean():.3f}")
+    print(f"  - Factor de potencia promedio: {df['factor_potencia_tipo_carga'].mean():.3f}")
     print(f"  - Factor de utilización promedio: {df['factor_utilizacion_actual'].mean():.2%}")
     
     print(f"\nAnálisis de Sobrecarga:")
@@ -411,7 +560,7 @@ def main():
     top_critical = df[df['nivel_riesgo_sobrecarga'] == 'Crítico'].nlargest(5, 'indice_sobrecarga')
     for _, row in top_critical.iterrows():
         print(f"  - {row['Codigo']} ({row['Alimentador']}): "
-              f"Utilización={row['factor_utilizacion_pico']:.1%}, "
+              f"Utilización={row['factor_utilizacion_pico_sobrecarga']:.1%}, "
               f"Tipo={row['tipo_carga']}, "
               f"Estrés térmico={row['indice_estres_termico']:.2f}")
 
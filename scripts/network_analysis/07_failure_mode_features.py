@@ -18,12 +18,23 @@ from datetime import datetime
 import matplotlib.pyplot as plt
 import seaborn as sns
 from scipy.spatial.distance import cdist
+from functools import partial
+import argparse
+import sys
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
+# Ejecución paralela por alimentador (src/network)
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.network.columns import column
+from src.network.feeder_runner import FeederCache, add_runner_arguments, execution_summary, run_feeders
+from src.network.neighborhood import neighbor_lists, radius_label
+from src.pipeline.store import read_frame, write_frame
+
 # Configuración de rutas
-BASE_DIR = Path("/Users/maxkeczeli/Proyects/gd-edersa-calidad")
-INPUT_FILE = BASE_DIR / "data/processed/electrical_analysis/transformadores_carga_estimada.csv"
+BASE_DIR = Path(__file__).resolve().parents[2]
+INPUT_FILE = BASE_DIR / "data/processed/electrical_analysis/transformadores_carga_estimada.parquet"
 OUTPUT_DIR = BASE_DIR / "data/processed/electrical_analysis"
 
 # Umbrales basados en estándares y documento teórico
@@ -160,103 +171,137 @@ def calculate_dielectric_stress_index(row):
         'vulnerabilidad_transitorios': dynamic_factor
     }
 
-def calculate_neighborhood_features(df, radius_km=0.5):
+def _positive_part(values):
+    """max(0, x) elemento a elemento (NaN -> 0, como max() de Python)"""
+    return np.where(values > 0, values, 0.0)
+
+def calculate_thermal_stress_frame(df):
     """
-    Calcular features basadas en el vecindario espacial
+    Versión columnar de calculate_thermal_stress_index
     """
-    print(f"  Calculando features de vecindario (radio={radius_km}km)...")
-    
-    # Preparar coordenadas
-    coords = df[['Coord_Y', 'Coord_X']].values
-    
-    # Calcular matriz de distancias
-    from sklearn.metrics.pairwise import haversine_distances
-    from math import radians
-    
-    # Convertir a radianes
-    coords_rad = np.radians(coords)
-    
-    # Calcular distancias (resultado en radianes)
-    dist_matrix = haversine_distances(coords_rad)
-    
-    # Convertir a km (radio de la Tierra = 6371 km)
-    dist_matrix = dist_matrix * 6371
-    
-    # Crear features de vecindario
-    neighborhood_features = []
-    
-    for i in range(len(df)):
-        # Encontrar vecinos dentro del radio
-        neighbors_mask = (dist_matrix[i] <= radius_km) & (dist_matrix[i] > 0)
-        neighbors_idx = np.where(neighbors_mask)[0]
-        
-        if len(neighbors_idx) == 0:
-            features = {
-                'num_vecinos_500m': 0,
-                'tasa_fallas_vecindario': 0,
-                'potencia_vecindario_mva': 0,
-                'usuarios_vecindario': 0,
-                'tipo_vecindario': 'aislado'
-            }
-        else:
-            neighbors_data = df.iloc[neighbors_idx]
-            
-            # Calcular estadísticas del vecindario
-            total_neighbors = len(neighbors_idx)
-            failed_neighbors = (neighbors_data['Resultado'] == 'Fallida').sum()
-            problem_neighbors = (neighbors_data['Resultado'] != 'Correcta').sum()
-            
-            features = {
-                'num_vecinos_500m': total_neighbors,
-                'tasa_fallas_vecindario': failed_neighbors / total_neighbors,
-                'tasa_problemas_vecindario': problem_neighbors / total_neighbors,
-                'potencia_vecindario_mva': neighbors_data['Potencia'].sum() / 1000,
-                'usuarios_vecindario': neighbors_data['Q_Usuarios'].sum(),
-                'tipo_vecindario': 'denso' if total_neighbors > 5 else 'disperso'
-            }
-        
-        neighborhood_features.append(features)
+    utilization = column(df, 'factor_utilizacion_pico').astype(float)
+    load_type_factor = {
+        'industrial_pesado': 1.3,
+        'industrial_ligero': 1.2,
+        'rural_agricola': 1.15,
+        'comercial': 1.05,
+        'mixto': 1.0,
+        'residencial': 0.95
+    }
+    type_factor = pd.Series(column(df, 'tipo_carga')).map(load_type_factor).fillna(1.0).to_numpy()
+    fp_penalty = _positive_part((0.9 - column(df, 'factor_potencia_estimado').astype(float)) * 2)
+    z_factor = 1 + 0.1 * column(df, 'indice_debilidad_electrica', 0).astype(float)
+    
+    thermal_index = utilization * type_factor * (1 + fp_penalty) * z_factor
+    limits = THRESHOLDS['utilizacion']
+    level = np.select(
+        [thermal_index > limits['critico'], thermal_index > limits['sobrecarga'], thermal_index > limits['alto']],
+        ['Crítico', 'Sobrecarga', 'Alto'],
+        default='Normal'
+    )
+    
+    temp_rise = 65 * (thermal_index ** 2)
+    nominal = THRESHOLDS['temperatura']['nominal']
+    life_loss_factor = np.where(temp_rise > nominal, 2 ** ((temp_rise - nominal) / 10), 1.0)
+    
+    return pd.DataFrame({
+        'indice_estres_termico_v2': np.minimum(thermal_index / limits['critico'], 1.0),
+        'nivel_estres_termico': level.astype(object),
+        'temperatura_estimada_rise': temp_rise,
+        'factor_perdida_vida': life_loss_factor,
+        'años_vida_perdidos_anual': _positive_part((life_loss_factor - 1) * 0.5)
+    }, index=df.index)
+
+def calculate_dielectric_stress_frame(df):
+    """
+    Versión columnar de calculate_dielectric_stress_index
+    """
+    voltage_drop = column(df, 'caida_tension_percent').astype(float)
+    dynamic_sensitivity = column(df, 'hundimiento_arranque_percent', 0).astype(float)
+    # Verdad de Python del valor (NaN cuenta como verdadero)
+    position_factor = np.where(column(df, 'es_nodo_hoja', False).astype(bool), 1.2, 1.0)
+    hops_factor = 1 + 0.05 * column(df, 'numero_saltos', 0).astype(float)
+    
+    limits = THRESHOLDS['caida_tension']
+    base_stress = np.select(
+        [voltage_drop > limits['critico'], voltage_drop > limits['limite'],
+         voltage_drop > limits['aceptable'], voltage_drop > limits['normal']],
+        [1.0, 0.8, 0.6, 0.4],
+        default=0.2
+    )
+    dynamic_factor = np.minimum(dynamic_sensitivity / 20, 1.0)
+    dielectric_stress = np.minimum(base_stress * position_factor * hops_factor * (1 + dynamic_factor), 1.0)
+    level = np.select(
+        [dielectric_stress > 0.8, dielectric_stress > 0.6, dielectric_stress > 0.4],
+        ['Crítico', 'Alto', 'Medio'],
+        default='Bajo'
+    )
     
-    return pd.DataFrame(neighborhood_features)
+    return pd.DataFrame({
+        'indice_estres_dielectrico': dielectric_stress,
+        'nivel_estres_dielectrico': level.astype(object),
+        'probabilidad_descargas_parciales': dielectric_stress ** 2,
+        'vulnerabilidad_transitorios': dynamic_factor
+    }, index=df.index)
+
+def calculate_neighborhood_features(df, radius_km=0.5, extra_radii_km=(0.25, 1.0)):
+    """
+    Calcular features basadas en el vecindario espacial
+    
+    Vecinos con BallTree haversine (src/network/neighborhood) en una sola
+    consulta para todos los radios, sin matriz de distancias n×n. El radio
+    principal conserva los nombres de columna originales; cada radio extra
+    agrega conteo, tasas, potencia y usuarios con sufijo (p.ej. _1km).
+    """
+    radii = (radius_km,) + tuple(r for r in extra_radii_km if r != radius_km)
+    print(f"  Calculando features de vecindario (radios={', '.join(str(r) for r in radii)}km)...")
+    
+    neighbors = neighbor_lists(df['Coord_Y'].to_numpy(), df['Coord_X'].to_numpy(), radii)
+    failed = (df['Resultado'] == 'Fallida').to_numpy()
+    problem = (df['Resultado'] != 'Correcta').to_numpy()
+    potencia = df['Potencia'].to_numpy()
+    usuarios = df['Q_Usuarios'].to_numpy()
+    
+    columns = {}
+    for radius in radii:
+        lists = neighbors[float(radius)]
+        count = lists.counts
+        suffix = '' if radius == radius_km else f'_{radius_label(radius)}'
+        # El conteo del radio principal mantiene el nombre histórico
+        columns['num_vecinos_500m' if not suffix else f'num_vecinos_{radius_label(radius)}'] = count
+        columns[f'tasa_fallas_vecindario{suffix}'] = lists.mean(failed)
+        columns[f'tasa_problemas_vecindario{suffix}'] = lists.mean(problem)
+        columns[f'potencia_vecindario_mva{suffix}'] = lists.sum(potencia) / 1000
+        columns[f'usuarios_vecindario{suffix}'] = lists.sum(usuarios)
+        if not suffix:
+            columns['tipo_vecindario'] = np.select([count == 0, count > 5], ['aislado', 'denso'],
+                                                   default='disperso')
+    
+    return pd.DataFrame(columns, index=df.index)
 
 def calculate_parent_influence(df):
     """
     Calcular influencia del transformador padre en el MST
-    """
-    # Crear diccionario de estados por código
-    estado_dict = df.set_index('Codigo')['Resultado'].to_dict()
-    
-    parent_features = []
-    
-    for _, row in df.iterrows():
-        padre = row.get('padre_mst')
-        
-        if pd.isna(padre) or padre == 'SUBSTATION':
-            features = {
-                'estado_padre': 'N/A',
-                'padre_problematico': False,
-                'riesgo_cascada': 0.0
-            }
-        else:
-            estado_padre = estado_dict.get(padre, 'Desconocido')
-            
-            # Evaluar riesgo de cascada
-            if estado_padre == 'Fallida':
-                riesgo = 0.8
-            elif estado_padre == 'Penalizada':
-                riesgo = 0.5
-            else:
-                riesgo = 0.1
-            
-            features = {
-                'estado_padre': estado_padre,
-                'padre_problematico': estado_padre in ['Fallida', 'Penalizada'],
-                'riesgo_cascada': riesgo
-            }
-        
-        parent_features.append(features)
     
-    return pd.DataFrame(parent_features)
+    Estado del padre por búsqueda de índices (último Codigo repetido gana,
+    'Desconocido' si el padre no está en df) y riesgo con np.select.
+    """
+    resultados = pd.Series(column(df, 'Resultado'), index=column(df, 'Codigo'))
+    resultados = resultados[~resultados.index.duplicated(keep='last')]
+    
+    padre = pd.Series(column(df, 'padre_mst', None))
+    from_substation = (padre.isna() | (padre == 'SUBSTATION')).to_numpy()
+    found = padre.isin(resultados.index).to_numpy()
+    estado = np.where(found, resultados.reindex(padre.to_numpy()).to_numpy(), 'Desconocido')
+    estado = np.where(from_substation, 'N/A', estado).astype(object)
+    
+    riesgo = np.select([estado == 'Fallida', estado == 'Penalizada'], [0.8, 0.5], default=0.1)
+    
+    return pd.DataFrame({
+        'estado_padre': estado,
+        'padre_problematico': ~from_substation & np.isin(estado, ['Fallida', 'Penalizada']),
+        'riesgo_cascada': np.where(from_substation, 0.0, riesgo)
+    }, index=df.index)
 
 def calculate_composite_vulnerability(row):
     """
@@ -336,6 +381,65 @@ def calculate_composite_vulnerability(row):
         'score_componente_vecindario': neighborhood_score
     }
 
+def calculate_composite_vulnerability_frame(df):
+    """
+    Versión columnar de calculate_composite_vulnerability
+    """
+    weights = {
+        'termico': 0.35,
+        'dielectrico': 0.35,
+        'topologico': 0.15,
+        'vecindario': 0.15
+    }
+    thermal_component = column(df, 'indice_estres_termico_v2').astype(float)
+    dielectric_component = column(df, 'indice_estres_dielectrico').astype(float)
+    
+    # Componente topológico
+    topo_score = (0.3 * np.minimum(column(df, 'numero_saltos', 0).astype(float) / 10, 1.0)
+                  + np.where(column(df, 'es_nodo_hoja', False).astype(bool), 0.3, 0)
+                  + 0.4 * column(df, 'centralidad_intermediacion', 0).astype(float))
+    
+    # Componente de vecindario
+    neighborhood_score = (0.5 * column(df, 'tasa_problemas_vecindario', 0).astype(float)
+                          + 0.3 * column(df, 'riesgo_cascada', 0).astype(float)
+                          + np.where(column(df, 'tipo_vecindario', '') == 'denso', 0.2, 0))
+    
+    vulnerability_index = (
+        weights['termico'] * thermal_component +
+        weights['dielectrico'] * dielectric_component +
+        weights['topologico'] * topo_score +
+        weights['vecindario'] * neighborhood_score
+    )
+    
+    # Ajuste por estado actual (retroalimentación)
+    resultado = column(df, 'Resultado')
+    vulnerability_index = np.select(
+        [resultado == 'Fallida', resultado == 'Penalizada'],
+        [np.minimum(vulnerability_index * 1.2, 1.0), np.minimum(vulnerability_index * 1.1, 1.0)],
+        default=vulnerability_index
+    )
+    
+    levels = [vulnerability_index > 0.8, vulnerability_index > 0.6,
+              vulnerability_index > 0.4, vulnerability_index > 0.2]
+    vuln_level = np.select(levels, ['Crítica', 'Alta', 'Media', 'Baja'], default='Mínima')
+    priority = np.select(levels, ['Muy Alta', 'Alta', 'Media', 'Baja'], default='Muy Baja')
+    failure_mode = np.select(
+        [thermal_component > dielectric_component * 1.5, dielectric_component > thermal_component * 1.5],
+        ['Térmico', 'Dieléctrico'],
+        default='Mixto'
+    )
+    
+    return pd.DataFrame({
+        'indice_vulnerabilidad_compuesto': vulnerability_index,
+        'nivel_vulnerabilidad': vuln_level.astype(object),
+        'prioridad_intervencion': priority.astype(object),
+        'modo_falla_probable': failure_mode.astype(object),
+        'score_componente_termico': thermal_component,
+        'score_componente_dielectrico': dielectric_component,
+        'score_componente_topologico': topo_score,
+        'score_componente_vecindario': neighborhood_score
+    }, index=df.index)
+
 def visualize_vulnerability_analysis(df, save_dir):
     """Generar visualizaciones del análisis de vulnerabilidad"""
     fig, axes = plt.subplots(2, 2, figsize=(16, 12))
@@ -408,7 +512,32 @@ def visualize_vulnerability_analysis(df, save_dir):
     plt.savefig(save_dir / 'vulnerability_components_heatmap.png', dpi=150, bbox_inches='tight')
     plt.close()
 
-def main():
+def calculate_feeder_indices(feeder_name, df_feeder, neighborhood_columns=()):
+    """
+    Índices de estrés, influencia del padre y vulnerabilidad de un alimentador
+    
+    Se ejecuta en un proceso del pool (src/network/feeder_runner). El MST es
+    por alimentador, así que el padre siempre está en el mismo grupo; el
+    vecindario espacial (que cruza alimentadores) llega ya calculado en
+    neighborhood_columns.
+    """
+    df_base = df_feeder.drop(columns=list(neighborhood_columns))
+    
+    # Calcular estrés térmico y dieléctrico (columna a columna)
+    df_thermal = calculate_thermal_stress_frame(df_feeder)
+    df_dielectric = calculate_dielectric_stress_frame(df_feeder)
+    
+    # Calcular influencia del padre
+    df_parent = calculate_parent_influence(df_feeder)
+    
+    df_feeder = pd.concat([df_base, df_thermal, df_dielectric,
+                           df_feeder[list(neighborhood_columns)], df_parent], axis=1)
+    
+    # Calcular vulnerabilidad compuesta
+    df_vulnerability = calculate_composite_vulnerability_frame(df_feeder)
+    return pd.concat([df_feeder, df_vulnerability], axis=1)
+
+def main(workers=1, feeder_cache=None):
     """Función principal"""
     print("=" * 80)
     print("ANÁLISIS DE MODOS DE FALLA Y VULNERABILIDAD")
@@ -416,40 +545,33 @@ def main():
     
     # Cargar datos
     print("Cargando datos...")
-    df = pd.read_csv(INPUT_FILE)
+    df = read_frame(INPUT_FILE)
     print(f"✓ {len(df)} transformadores cargados")
     
-    # Calcular estrés térmico
-    print("\nCalculando índices de estrés térmico...")
-    thermal_features = df.apply(calculate_thermal_stress_index, axis=1)
-    df_thermal = pd.DataFrame(list(thermal_features))
-    df = pd.concat([df, df_thermal], axis=1)
-    
-    # Calcular estrés dieléctrico
-    print("Calculando índices de estrés dieléctrico...")
-    dielectric_features = df.apply(calculate_dielectric_stress_index, axis=1)
-    df_dielectric = pd.DataFrame(list(dielectric_features))
-    df = pd.concat([df, df_dielectric], axis=1)
-    
-    # Calcular features de vecindario
+    # Calcular features de vecindario (cruza alimentadores: sobre todo el dataset)
     print("Analizando vecindario espacial...")
     df_neighborhood = calculate_neighborhood_features(df)
     df = pd.concat([df, df_neighborhood], axis=1)
     
-    # Calcular influencia del padre
-    print("Evaluando influencia del transformador padre...")
-    df_parent = calculate_parent_influence(df)
-    df = pd.concat([df, df_parent], axis=1)
+    # Estrés térmico y dieléctrico, influencia del padre y vulnerabilidad por alimentador
+    print(f"Calculando índices por alimentador con {workers} proceso(s)...")
+    start = time.perf_counter()
+    results = run_feeders(
+        partial(calculate_feeder_indices, neighborhood_columns=tuple(df_neighborhood.columns)),
+        df, workers=workers, cache=FeederCache(feeder_cache) if feeder_cache else None
+    )
+    execution = execution_summary(results, workers, time.perf_counter() - start)
     
-    # Calcular vulnerabilidad compuesta
-    print("Calculando índice de vulnerabilidad compuesto...")
-    vulnerability = df.apply(calculate_composite_vulnerability, axis=1)
-    df_vulnerability = pd.DataFrame(list(vulnerability))
-    df = pd.concat([df, df_vulnerability], axis=1)
+    for r in results:
+        if not r.ok:
+            print(f"  ❌ Error en alimentador {r.feeder}: {r.error.strip().splitlines()[-1]}")
+    
+    # Orden original de filas
+    df = pd.concat([r.result for r in results if r.ok])
+    df = df.loc[df.index.sort_values()].reset_index(drop=True)
     
     # Guardar resultados
-    output_file = OUTPUT_DIR / "transformadores_indices_riesgo.csv"
-    df.to_csv(output_file, index=False)
+    output_file = write_frame(df, OUTPUT_DIR / "transformadores_indices_riesgo.parquet")
     print(f"\n✓ Resultados guardados en: {output_file}")
     
     # Generar visualizaciones
@@ -480,7 +602,11 @@ def main():
         'estadisticas_vecindario': {
             'promedio_vecinos': df['num_vecinos_500m'].mean(),
             'tasa_contagio_promedio': df['tasa_problemas_vecindario'].mean(),
-            'transformadores_aislados': (df['tipo_vecindario'] == 'aislado').sum()
+            'transformadores_aislados': (df['tipo_vecindario'] == 'aislado').sum(),
+            'promedio_vecinos_por_radio': {
+                col.replace('num_vecinos_', ''): df[col].mean()
+                for col in df.columns if col.startswith('num_vecinos_')
+            }
         },
         'top_20_mas_vulnerables': df.nlargest(20, 'indice_vulnerabilidad_compuesto')[
             ['Codigo', 'Alimentador', 'Potencia', 'Q_Usuarios',
@@ -492,7 +618,8 @@ def main():
             'indice_vulnerabilidad_compuesto': 'mean',
             'Codigo': 'count',
             'modo_falla_probable': lambda x: x.mode()[0] if len(x.mode()) > 0 else 'N/A'
-        }).nlargest(10, 'indice_vulnerabilidad_compuesto').to_dict('index')
+        }).nlargest(10, 'indice_vulnerabilidad_compuesto').to_dict('index'),
+        'ejecucion': execution
     }
     
     report_file = OUTPUT_DIR / "failure_modes_report.json"
@@ -534,4 +661,7 @@ def main():
               f"Prioridad={row['prioridad_intervencion']}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Modos de falla y vulnerabilidad por alimentador")
+    add_runner_arguments(parser)
+    args = parser.parse_args()
+    main(workers=args.workers, feeder_cache=args.feeder_cache)
\ No newline at end of file
@@ -25,9 +25,15 @@ import seaborn as sns
 import warnings
 warnings.filterwarnings('ignore')
 
+# Almacenamiento intermedio Parquet (src/pipeline/store) y matriz .npy (src/pipeline/feature_matrix)
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.pipeline.feature_matrix import write_feature_matrix
+from src.pipeline.store import read_frame
+
 # Configuración de rutas
-BASE_DIR = Path("/Users/maxkeczeli/Proyects/gd-edersa-calidad")
-INPUT_FILE = BASE_DIR / "data/processed/electrical_analysis/transformadores_indices_riesgo.csv"
+BASE_DIR = Path(__file__).resolve().parents[2]
+INPUT_FILE = BASE_DIR / "data/processed/electrical_analysis/transformadores_indices_riesgo.parquet"
 OUTPUT_DIR = BASE_DIR / "data/processed/electrical_analysis"
 
 # Features a incluir en el modelo
@@ -68,7 +74,9 @@ FEATURE_GROUPS = {
     ],
     'vecindario': [
         'num_vecinos_500m', 'tasa_fallas_vecindario', 'tasa_problemas_vecindario',
-        'potencia_vecindario_mva', 'usuarios_vecindario', 'riesgo_cascada'
+        'potencia_vecindario_mva', 'usuarios_vecindario', 'riesgo_cascada',
+        'num_vecinos_250m', 'tasa_problemas_vecindario_250m',
+        'num_vecinos_1km', 'tasa_problemas_vecindario_1km'
     ],
     'categoricas': [
         'tipo_zona', 'size_category', 'tipo_carga', 'perfil_carga',
@@ -85,7 +93,8 @@ FEATURE_GROUPS = {
 def load_and_validate_data():
     """Cargar y validar datos"""
     print("Cargando datos...")
-    df = pd.read_csv(INPUT_FILE)
+    # Codificación propia de categóricas (one-hot / label encoding): se leen como object
+    df = read_frame(INPUT_FILE, categorical=False)
     
     print(f"✓ {len(df)} registros cargados")
     print(f"✓ {len(df.columns)} columnas disponibles")
@@ -127,10 +136,16 @@ def create_additional_features(df):
     return df
 
 def encode_categorical_features(df, categorical_cols):
-    """Codificar variables categóricas"""
+    """
+    Codificar variables categóricas
+
+    Returns:
+        (df_encoded, codificación por columna para los metadatos)
+    """
     print("\nCodificando variables categóricas...")
     
     df_encoded = df.copy()
+    encoders = {}
     
     # Para cada columna categórica
     for col in categorical_cols:
@@ -145,15 +160,25 @@ def encode_categorical_features(df, categorical_cols):
             dummies = pd.get_dummies(df_encoded[col], prefix=col, drop_first=True)
             df_encoded = pd.concat([df_encoded, dummies], axis=1)
             df_encoded.drop(col, axis=1, inplace=True)
+            encoders[col] = {
+                'tipo': 'one-hot',
+                'categorias': sorted(df[col].dropna().unique().tolist()),
+                'columnas': list(dummies.columns)
+            }
             print(f"  - {col}: One-hot encoding ({n_unique} categorías)")
         else:
             # Label encoding para muchas categorías
             le = LabelEncoder()
             df_encoded[col + '_encoded'] = le.fit_transform(df_encoded[col].fillna('Unknown'))
             df_encoded.drop(col, axis=1, inplace=True)
+            encoders[col] = {
+                'tipo': 'label',
+                'clases': le.classes_.tolist(),
+                'columnas': [col + '_encoded']
+            }
             print(f"  - {col}: Label encoding ({n_unique} categorías)")
     
-    return df_encoded
+    return df_encoded, encoders
 
 def prepare_features_and_target(df_encoded):
     """Preparar features y variable objetivo"""
@@ -175,10 +200,13 @@ def prepare_features_and_target(df_encoded):
     exclude_cols = FEATURE_GROUPS['identificadores'] + [target_col]
     feature_cols = [col for col in df_encoded.columns if col not in exclude_cols]
     
-    X = df_encoded[feature_cols].select_dtypes(include=[np.number])
+    X = df_encoded[feature_cols].select_dtypes(include=[np.number, bool])
+    # Nombres de las columnas efectivamente usadas (las no numéricas quedan fuera)
+    feature_cols = list(X.columns)
     
     # Llenar valores faltantes
-    X = X.fillna(X.median())
+    imputation = X.median(numeric_only=True)
+    X = X.fillna(imputation)
     
     print(f"  - Features: {X.shape[1]}")
     print(f"  - Muestras: {X.shape[0]}")
@@ -187,7 +215,7 @@ def prepare_features_and_target(df_encoded):
         orig_label = [k for k, v in target_mapping.items() if v == label][0]
         print(f"    • {orig_label}: {count} ({count/len(y)*100:.1f}%)")
     
-    return X, y, feature_cols
+    return X, y, feature_cols, imputation.to_dict()
 
 def balance_dataset(X, y, strategy='auto'):
     """Balancear el dataset usando SMOTE"""
@@ -306,33 +334,21 @@ def visualize_data_preparation(df, X_train, y_train, importance_df, save_dir):
     plt.close()
 
 def save_ml_datasets(X_train, X_val, X_test, y_train, y_val, y_test, 
-                    feature_names, scaler, importance_df):
-    """Guardar datasets preparados para ML"""
+                    feature_names, scaler, importance_df, encoders, imputation):
+    """
+    Guardar datasets preparados para ML
+
+    Los conjuntos quedan en una matriz float32 contigua (features.npy) y un
+    vector de etiquetas (labels.npy), que los consumidores abren con
+    np.load(mmap_mode='r') / src.pipeline.feature_matrix.load_feature_matrix.
+    """
     print("\nGuardando datasets...")
     
     # Crear directorio para ML
     ml_dir = OUTPUT_DIR / "ml_datasets"
     ml_dir.mkdir(exist_ok=True)
     
-    # Guardar datasets
-    datasets = {
-        'X_train': X_train,
-        'X_val': X_val,
-        'X_test': X_test,
-        'y_train': y_train,
-        'y_val': y_val,
-        'y_test': y_test
-    }
-    
-    for name, data in datasets.items():
-        if isinstance(data, pd.DataFrame):
-            data.to_csv(ml_dir / f"{name}.csv", index=False)
-        else:
-            pd.DataFrame(data, columns=['target']).to_csv(
-                ml_dir / f"{name}.csv", index=False
-            )
-    
-    # Guardar metadatos
+    # Guardar metadatos (la descripción de la matriz la agrega write_feature_matrix)
     metadata = {
         'n_features': len(feature_names),
         'feature_names': feature_names,
@@ -344,11 +360,24 @@ def save_ml_datasets(X_train, X_val, X_test, y_train, y_val, y_test,
             'Penalizada': 1,
             'Fallida': 2
         },
-        'top_30_features': importance_df.head(30).to_dict('records')
+        'top_30_features': importance_df.head(30).to_dict('records'),
+        'codificacion': encoders,
+        'imputacion_mediana': imputation,
+        'escalado': {
+            'media': scaler.mean_.tolist(),
+            'escala': scaler.scale_.tolist()
+        }
     }
     
-    with open(ml_dir / 'metadata.json', 'w') as f:
-        json.dump(metadata, f, indent=2)
+    write_feature_matrix(
+        ml_dir,
+        {
+            'train': (X_train, y_train),
+            'val': (X_val, y_val),
+            'test': (X_test, y_test)
+        },
+        metadata
+    )
     
     # Guardar scaler
     import joblib
@@ -373,10 +402,10 @@ def main():
     
     # Codificar categóricas
     categorical_cols = [col for col in FEATURE_GROUPS['categoricas'] if col in df.columns]
-    df_encoded = encode_categorical_features(df, categorical_cols)
+    df_encoded, encoders = encode_categorical_features(df, categorical_cols)
     
     # Preparar features y target
-    X, y, feature_names = prepare_features_and_target(df_encoded)
+    X, y, feature_names, imputation = prepare_features_and_target(df_encoded)
     
     # División inicial (antes de balancear)
     X_temp, X_test, y_temp, y_test = train_test_split(
@@ -413,7 +442,7 @@ def main():
     save_ml_datasets(
         X_train_scaled, X_val_scaled, X_test_scaled,
         y_train_balanced, y_val, y_test,
-        feature_names, scaler, importance_df
+        feature_names, scaler, importance_df, encoders, imputation
     )
     
     # Generar reporte final
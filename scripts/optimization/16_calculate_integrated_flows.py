@@ -11,6 +11,8 @@ Entrada:
 - Parámetros económicos y técnicos
 
 Salida:
+- Superficies de valor por cluster (Parquet particionado por cluster_id,
+  recálculo incremental; ver src/economics/value_surface.py)
 - Matriz de flujos por configuración
 - Análisis de sensibilidad
 - Visualizaciones de superficies de valor
@@ -26,8 +28,9 @@ import json
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
+from functools import partial
 import logging
-from typing import Dict, List, Tuple
+from typing import List, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -36,8 +39,10 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 # Importar módulos económicos
+from src.economics.capex import calculate_capex
 from src.economics.integrated_cash_flow import IntegratedCashFlowCalculator
 from src.economics.network_benefits import NetworkBenefitsCalculator
+from src.economics.value_surface import SurfaceGrid, ValueSurfaceStore, evaluate_surface
 
 # Configuración de logging
 logging.basicConfig(
@@ -51,6 +56,11 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 DATA_DIR = BASE_DIR / "data"
 OPTIMIZATION_DIR = BASE_DIR / "reports" / "clustering" / "optimization"
 RESULTS_DIR = OPTIMIZATION_DIR / "integrated_flows"
+
+
+def plot_file(kind: str, cluster_id) -> Path:
+    """PNG de un gráfico por cluster ('value_surfaces' o 'flow_breakdown')"""
+    return RESULTS_DIR / f'{kind}_cluster_{cluster_id}.png'
 RESULTS_DIR.mkdir(exist_ok=True)
 
 # Configuración de visualización
@@ -70,17 +80,27 @@ class IntegratedFlowAnalyzer:
         config = get_config()
         
         # Obtener parámetros
-        self.economic_params = config.get_economic_params()
+        self.economic_params = config.get_economic_snapshot()
         self.technical_params = config.get_network_params()
         
-        # Inicializar calculadores (ya usan ConfigLoader internamente)
-        self.cash_flow_calc = IntegratedCashFlowCalculator()
+        # Inicializar calculadores (comparten el mismo snapshot económico)
+        self.cash_flow_calc = IntegratedCashFlowCalculator(self.economic_params)
         self.network_calc = NetworkBenefitsCalculator()
         
-        # Configuración de análisis
-        self.pv_ratios = [0.5, 0.75, 1.0, 1.25, 1.5, 1.75, 2.0]  # Ratio sobre demanda pico
-        self.bess_hours = [0, 1, 2, 3, 4]  # Horas de almacenamiento
-        self.q_night_ratios = [0, 0.1, 0.2, 0.3]  # Ratio sobre capacidad PV
+        # CAPEX vectorizado con economías de escala (mismo modelo que el optimizador)
+        self._capex = partial(calculate_capex, params=self.economic_params)
+        
+        # Grilla de configuraciones (resolución configurable) y dataset de superficies
+        surface_config = config.get_section('value_surface')
+        self.grid = SurfaceGrid.from_config(surface_config)
+        self.pv_ratios = list(self.grid.pv_ratios)  # Ratio sobre demanda pico
+        self.bess_hours = list(self.grid.bess_hours)  # Horas de almacenamiento
+        self.q_night_ratios = list(self.grid.q_ratios)  # Ratio sobre capacidad PV
+        self.surfaces = ValueSurfaceStore(
+            BASE_DIR / surface_config.get('store_dir', 'reports/clustering/optimization/value_surfaces'),
+            self.cash_flow_calc, self.network_calc, self._capex,
+            chunk_size=surface_config.get('chunk_size', 50000)
+        )
         
         logger.info("Analizador de flujos integrados inicializado con parámetros centralizados")
     
@@ -102,136 +122,57 @@ class IntegratedFlowAnalyzer:
         cluster_id = cluster_data['cluster_id']
         logger.info(f"Analizando cluster {cluster_id}...")
         
-        results = []
-        peak_demand_mw = cluster_data['peak_demand_mw']
-        
-        # Preparar datos del cluster para los calculadores
-        cluster_dict = cluster_data.to_dict()
+        # Grilla completa (PV × BESS × Q) evaluada con el motor vectorizado
+        df_results = evaluate_surface(
+            self.cash_flow_calc, self.network_calc, cluster_data,
+            self.grid.points(), self._capex, self.surfaces.chunk_size
+        )
+        df_results.insert(0, 'cluster_id', cluster_id)
         
-        # Iterar sobre todas las configuraciones
-        for pv_ratio in self.pv_ratios:
-            pv_mw = peak_demand_mw * pv_ratio
-            
-            for bess_hours in self.bess_hours:
-                bess_mwh = peak_demand_mw * bess_hours
-                
-                for q_ratio in self.q_night_ratios:
-                    q_night_mvar = pv_mw * q_ratio
-                    
-                    # Calcular CAPEX
-                    capex = self._calculate_capex(pv_mw, bess_mwh, q_night_mvar)
-                    
-                    try:
-                        # Calcular flujos integrados
-                        cash_flows = self.cash_flow_calc.calculate_integrated_flows(
-                            cluster_dict, pv_mw, bess_mwh, q_night_mvar, capex
-                        )
-                        
-                        # Calcular métricas financieras
-                        metrics = self.cash_flow_calc.calculate_financial_metrics(
-                            cash_flows, capex['total']
-                        )
-                        
-                        # Calcular beneficios en red detallados
-                        network_benefits = self.network_calc.calculate_all_benefits(
-                            cluster_dict, pv_mw, bess_mwh, q_night_mvar
-                        )
-                        
-                        # Agregar resultado
-                        result = {
-                            'cluster_id': cluster_id,
-                            'pv_mw': pv_mw,
-                            'pv_ratio': pv_ratio,
-                            'bess_mwh': bess_mwh,
-                            'bess_hours': bess_hours,
-                            'q_night_mvar': q_night_mvar,
-                            'q_ratio': q_ratio,
-                            'capex_musd': capex['total'] / 1e6,
-                            'npv_musd': metrics['npv_usd'] / 1e6,
-                            'irr_percent': metrics['irr_percent'],
-                            'payback_years': metrics['payback_years'],
-                            'bc_ratio': metrics['bc_ratio'],
-                            'lcoe_usd_mwh': metrics['lcoe_usd_mwh'],
-                            
-                            # Flujos promedio anuales
-                            'avg_pv_flow_musd': sum(cf.pv_flow for cf in cash_flows) / len(cash_flows) / 1e6,
-                            'avg_network_flow_musd': sum(cf.network_flow for cf in cash_flows) / len(cash_flows) / 1e6,
-                            'avg_total_flow_musd': sum(cf.total_flow for cf in cash_flows) / len(cash_flows) / 1e6,
-                            
-                            # Beneficios de red específicos
-                            'loss_reduction_musd': network_benefits['loss_reduction'].value_usd / 1e6,
-                            'voltage_support_musd': network_benefits['voltage_support'].value_usd / 1e6,
-                            'deferral_musd': network_benefits['investment_deferral'].value_usd / 1e6,
-                            
-                            # Ratio de beneficios de red
-                            'network_benefit_ratio': (
-                                sum(cf.network_flow for cf in cash_flows) / 
-                                sum(cf.total_flow for cf in cash_flows)
-                                if sum(cf.total_flow for cf in cash_flows) > 0 else 0
-                            )
-                        }
-                        
-                        results.append(result)
-                        
-                    except Exception as e:
-                        logger.warning(f"Error en configuración PV={pv_mw:.1f}, BESS={bess_mwh:.1f}, Q={q_night_mvar:.1f}: {e}")
-        
-        df_results = pd.DataFrame(results)
         logger.info(f"Cluster {cluster_id}: {len(df_results)} configuraciones analizadas")
         
         return df_results
     
-    def _calculate_capex(self, pv_mw: float, bess_mwh: float, q_night_mvar: float) -> Dict:
-        """Calcula CAPEX desglosado"""
-        # PV
-        pv_capex = pv_mw * self.economic_params['pv_capex_usd_mw']
-        
-        # BESS (energía + potencia)
-        bess_energy_capex = bess_mwh * self.economic_params['bess_capex_usd_mwh']
-        bess_power_capex = (bess_mwh / 4) * self.economic_params['bess_capex_usd_mw'] if bess_mwh > 0 else 0
-        bess_capex = bess_energy_capex + bess_power_capex
-        
-        # STATCOM/Q night
-        if q_night_mvar <= pv_mw * 0.3:
-            q_capex = q_night_mvar * self.economic_params['statcom_capex_usd_mvar'] * 0.3
-        else:
-            q_capex = q_night_mvar * self.economic_params['statcom_capex_usd_mvar']
-        
-        # BOS y conexión
-        subtotal = pv_capex + bess_capex + q_capex
-        bos_capex = subtotal * 0.15
-        
-        return {
-            'pv': pv_capex,
-            'bess': bess_capex,
-            'q_night': q_capex,
-            'bos': bos_capex,
-            'total': subtotal + bos_capex
-        }
-    
-    def create_value_surfaces(self, cluster_results: pd.DataFrame, cluster_id: str):
+    def create_value_surfaces(self, cluster_id, cluster_results: pd.DataFrame = None):
         """
         Crea visualizaciones de superficies de valor para un cluster.
+        
+        Args:
+            cluster_id: Identificador del cluster
+            cluster_results: Superficie del cluster (si None, se lee del dataset)
         """
+        if cluster_results is None:
+            cluster_results = self.surfaces.load(
+                [cluster_id],
+                columns=['pv_ratio', 'bess_hours', 'q_ratio', 'npv_musd',
+                         'network_benefit_ratio', 'irr_percent'],
+                grid=self.grid
+            )
+        
+        # Anotar celdas solo si la grilla es legible
+        annot = len(self.grid.pv_ratios) <= 12 and len(self.grid.bess_hours) <= 12
+        q_base = cluster_results['q_ratio'].min()
+        bess_base = cluster_results['bess_hours'].min()
+        
         fig, axes = plt.subplots(2, 2, figsize=(16, 12))
         fig.suptitle(f'Superficies de Valor - Cluster {cluster_id}', fontsize=16)
         
         # 1. NPV vs PV y BESS (sin Q)
         ax1 = axes[0, 0]
-        data_pivot = cluster_results[cluster_results['q_ratio'] == 0].pivot_table(
+        data_pivot = cluster_results[cluster_results['q_ratio'] == q_base].pivot_table(
             values='npv_musd', index='bess_hours', columns='pv_ratio'
         )
-        sns.heatmap(data_pivot, annot=True, fmt='.1f', cmap='RdYlGn', center=0, ax=ax1)
+        sns.heatmap(data_pivot, annot=annot, fmt='.1f', cmap='RdYlGn', center=0, ax=ax1)
         ax1.set_title('NPV (M USD) - Sin Q nocturno')
         ax1.set_xlabel('Ratio PV/Demanda')
         ax1.set_ylabel('Horas BESS')
         
         # 2. NPV vs PV y Q (sin BESS)
         ax2 = axes[0, 1]
-        data_pivot = cluster_results[cluster_results['bess_hours'] == 0].pivot_table(
+        data_pivot = cluster_results[cluster_results['bess_hours'] == bess_base].pivot_table(
             values='npv_musd', index='q_ratio', columns='pv_ratio'
         )
-        sns.heatmap(data_pivot, annot=True, fmt='.1f', cmap='RdYlGn', center=0, ax=ax2)
+        sns.heatmap(data_pivot, annot=annot and len(self.grid.q_ratios) <= 12, fmt='.1f', cmap='RdYlGn', center=0, ax=ax2)
         ax2.set_title('NPV (M USD) - Sin BESS')
         ax2.set_xlabel('Ratio PV/Demanda')
         ax2.set_ylabel('Ratio Q/PV')
@@ -243,7 +184,7 @@ class IntegratedFlowAnalyzer:
         data_pivot = best_configs.pivot_table(
             values='network_benefit_ratio', index='bess_hours', columns='pv_ratio'
         )
-        sns.heatmap(data_pivot, annot=True, fmt='.1%', cmap='YlOrRd', ax=ax3)
+        sns.heatmap(data_pivot, annot=annot, fmt='.1%', cmap='YlOrRd', ax=ax3)
         ax3.set_title('Ratio Beneficios Red/Total')
         ax3.set_xlabel('Ratio PV/Demanda')
         ax3.set_ylabel('Horas BESS')
@@ -253,13 +194,13 @@ class IntegratedFlowAnalyzer:
         data_pivot = best_configs.pivot_table(
             values='irr_percent', index='bess_hours', columns='pv_ratio'
         )
-        sns.heatmap(data_pivot, annot=True, fmt='.0f', cmap='viridis', vmin=0, vmax=30, ax=ax4)
+        sns.heatmap(data_pivot, annot=annot, fmt='.0f', cmap='viridis', vmin=0, vmax=30, ax=ax4)
         ax4.set_title('TIR (%)')
         ax4.set_xlabel('Ratio PV/Demanda')
         ax4.set_ylabel('Horas BESS')
         
         plt.tight_layout()
-        plt.savefig(RESULTS_DIR / f'value_surfaces_cluster_{cluster_id}.png', dpi=300, bbox_inches='tight')
+        plt.savefig(plot_file('value_surfaces', cluster_id), dpi=300, bbox_inches='tight')
         plt.close()
     
     def create_flow_breakdown(self, cluster_results: pd.DataFrame, cluster_id: str):
@@ -311,37 +252,40 @@ class IntegratedFlowAnalyzer:
                      label='CAPEX/10' if i == 0 else "")
         
         plt.tight_layout()
-        plt.savefig(RESULTS_DIR / f'flow_breakdown_cluster_{cluster_id}.png', dpi=300, bbox_inches='tight')
+        plt.savefig(plot_file('flow_breakdown', cluster_id), dpi=300, bbox_inches='tight')
         plt.close()
     
-    def analyze_all_clusters(self, clusters_df: pd.DataFrame) -> pd.DataFrame:
+    def analyze_all_clusters(self, clusters_df: pd.DataFrame, force: bool = False) -> pd.DataFrame:
         """
         Analiza todos los clusters y genera resultados consolidados.
-        """
-        all_results = []
         
-        # Analizar top 5 clusters por tamaño
-        top_clusters = clusters_df.nlargest(5, 'peak_demand_mw')
-        
-        for idx, cluster in top_clusters.iterrows():
-            logger.info(f"\nAnalizando cluster {cluster['cluster_id']} ({idx+1}/{len(top_clusters)})")
-            
-            # Analizar configuraciones
-            cluster_results = self.analyze_cluster(cluster)
-            all_results.append(cluster_results)
-            
-            # Crear visualizaciones
-            self.create_value_surfaces(cluster_results, cluster['cluster_id'])
-            self.create_flow_breakdown(cluster_results, cluster['cluster_id'])
-            
-            # Guardar resultados del cluster
-            cluster_results.to_csv(
-                RESULTS_DIR / f'flows_cluster_{cluster["cluster_id"]}.csv',
-                index=False
-            )
+        Solo se evalúan los clusters (o puntos de grilla) que no están al día
+        en el dataset de superficies; el resto se lee del dataset. Los
+        gráficos se rehacen solo para los clusters evaluados en esta corrida
+        o cuyo PNG no existe.
         
-        # Consolidar resultados
-        df_all = pd.concat(all_results, ignore_index=True)
+        Args:
+            clusters_df: Datos de clusters
+            force: Recalcular todas las superficies
+        """
+        evaluated = self.surfaces.update(clusters_df, self.grid, force=force)
+        logger.info(f"Superficies: {sum(evaluated.values()):,} configuraciones evaluadas, "
+                    f"{sum(n == 0 for n in evaluated.values())}/{len(evaluated)} clusters al día")
+        
+        # Consolidar resultados desde el dataset
+        df_all = self.surfaces.load(clusters_df['cluster_id'], grid=self.grid)
+        
+        rendered = 0
+        for cluster_id, cluster_results in df_all.groupby('cluster_id', sort=False):
+            # Crear visualizaciones (las de clusters al día ya están en disco)
+            changed = evaluated.get(str(cluster_id), 0) > 0
+            if changed or not plot_file('value_surfaces', cluster_id).exists():
+                self.create_value_surfaces(cluster_id, cluster_results)
+                rendered += 1
+            if changed or not plot_file('flow_breakdown', cluster_id).exists():
+                self.create_flow_breakdown(cluster_results, cluster_id)
+                rendered += 1
+        logger.info(f"Gráficos: {rendered} generados, el resto sin cambios")
         
         # Identificar configuraciones óptimas por cluster
         optimal_configs = df_all.loc[df_all.groupby('cluster_id')['npv_musd'].idxmax()]
@@ -431,6 +375,7 @@ def main():
         
         logger.info("\n✅ Análisis de flujos completado exitosamente")
         logger.info(f"Resultados guardados en: {RESULTS_DIR}")
+        logger.info(f"Superficies de valor en: {analyzer.surfaces.root}")
         
     except Exception as e:
         logger.error(f"❌ Error en análisis: {str(e)}")
@@ -36,6 +36,10 @@ REPORTS_DIR = PROJECT_ROOT / "reports"
 LOGS_DIR = PROJECT_ROOT / "logs"
 CONFIG_FILE = PROJECT_ROOT / "config" / "preprocessing_config.yaml"
 
+# Almacenamiento intermedio Parquet con esquema (src/pipeline/store)
+sys.path.append(str(PROJECT_ROOT))
+from src.pipeline.store import write_frame
+
 # Configurar logging
 log_file = LOGS_DIR / f"02_cleaning_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
 logging.basicConfig(
@@ -594,15 +598,10 @@ def main():
             
             # Determinar formato de salida
             if "quality_analysis" in dataset_file:
-                output_file = DATA_PROCESSED / "transformers_analysis.parquet"
-                df.to_parquet(output_file, index=False)
+                # Esquema tipado: lo leen 03, 04 y el análisis de red (network_analysis/00)
+                output_file = write_frame(df, DATA_PROCESSED / "transformers_analysis.parquet")
                 logger.info(f"  Dataset guardado: {output_file}")
                 
-                # También guardar en CSV para compatibilidad
-                output_csv = DATA_PROCESSED / "transformers_analysis.csv"
-                df.to_csv(output_csv, index=False)
-                logger.info(f"  CSV guardado: {output_csv}")
-                
                 # Guardar dataset para análisis
                 df_analysis = df
                 
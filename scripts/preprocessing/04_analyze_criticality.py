@@ -30,6 +30,10 @@ DATA_PROCESSED = PROJECT_ROOT / "data" / "processed"
 REPORTS_DIR = PROJECT_ROOT / "reports"
 LOGS_DIR = PROJECT_ROOT / "logs"
 
+# Almacenamiento intermedio Parquet con esquema (src/pipeline/store)
+sys.path.append(str(PROJECT_ROOT))
+from src.pipeline.store import read_frame
+
 # Crear directorios necesarios
 LOGS_DIR.mkdir(exist_ok=True)
 REPORTS_DIR.mkdir(exist_ok=True)
@@ -442,7 +446,8 @@ def main():
         # Cargar datos
         input_file = DATA_PROCESSED / "transformers_analysis.parquet"
         logger.info(f"\nCargando datos desde: {input_file}")
-        df = pd.read_parquet(input_file)
+        # Agrupa por N_Sucursal/Resultado: categorías vacías fuera (object)
+        df = read_frame(input_file, categorical=False)
         logger.info(f"  Registros cargados: {len(df):,}")
         
         # 1. Análisis de patrones de falla
@@ -28,6 +28,10 @@ DB_DIR = PROJECT_ROOT / "data" / "database"
 REPORTS_DIR = PROJECT_ROOT / "reports"
 LOGS_DIR = PROJECT_ROOT / "logs"
 
+# Almacenamiento intermedio Parquet con esquema (src/pipeline/store)
+sys.path.append(str(PROJECT_ROOT))
+from src.pipeline.store import read_frame
+
 # Crear directorios necesarios
 LOGS_DIR.mkdir(exist_ok=True)
 DB_DIR.mkdir(exist_ok=True)
@@ -255,7 +259,7 @@ def load_transformers_data(conn: sqlite3.Connection):
         # Si no existe, usar el análisis básico
         df_path = DATA_PROCESSED / "transformers_analysis.parquet"
     
-    df = pd.read_parquet(df_path)
+    df = read_frame(df_path, categorical=False)
     
     # Seleccionar columnas relevantes
     columns = [
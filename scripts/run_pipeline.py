@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Ejecución Incremental del Pipeline (scripts 00 → 16)
+====================================================
+Ejecuta solo las etapas cuyas entradas, código o configuración cambiaron
+desde la última corrida, y reporta tiempo y pico de memoria por etapa.
+
+Ejemplos:
+    python scripts/run_pipeline.py                      # todo lo desactualizado
+    python scripts/run_pipeline.py --dry-run            # qué se ejecutaría
+    python scripts/run_pipeline.py --only clustering/13_technical_benefits_24h --downstream
+    python scripts/run_pipeline.py --force --only network_analysis/05_electrical_distance
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Agregar el directorio raíz al path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.pipeline.runner import PipelineRunner, format_report, run_report
+from src.pipeline.stages import pipeline_stages
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+REPORT_FILE = BASE_DIR / 'reports' / 'pipeline_run_report.json'
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Pipeline incremental EDERSA (scripts 00 → 16)")
+    parser.add_argument('--only', nargs='+', metavar='ETAPA', help='Limitar a estas etapas')
+    parser.add_argument('--downstream', action='store_true',
+                        help='Con --only, incluir las etapas que dependen de ellas')
+    parser.add_argument('--force', action='store_true', help='Ejecutar aunque estén al día')
+    parser.add_argument('--dry-run', action='store_true', help='Solo mostrar qué se ejecutaría')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Procesos para las etapas por alimentador (04, 05 y 07)')
+    parser.add_argument('--list', action='store_true', help='Listar etapas y salir')
+    args = parser.parse_args()
+
+    stages = pipeline_stages()
+    if args.list:
+        for stage in stages:
+            print(f"{stage.name:<45} {stage.script}")
+        return 0
+
+    runner = PipelineRunner(stages, BASE_DIR, workers=args.workers)
+    runs = runner.run(only=args.only, downstream=args.downstream,
+                      force=args.force, dry_run=args.dry_run)
+
+    print("\n" + "=" * 100)
+    print("PIPELINE - RESUMEN DE EJECUCIÓN")
+    print("=" * 100)
+    print(format_report(runs))
+
+    if not args.dry_run:
+        REPORT_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+            json.dump(run_report(runs), f, indent=2, ensure_ascii=False)
+        print(f"\n✓ Reporte guardado en: {REPORT_FILE}")
+
+    return 1 if any(r.status in ('fallida', 'bloqueada') for r in runs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,13 +8,124 @@ Fecha: Julio 2025
 """
 
 import yaml
+import hashlib
+import json
+from collections.abc import Mapping
+from dataclasses import MISSING, dataclass, fields, asdict, replace
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Iterator
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class EconomicParams(Mapping):
+    """
+    Snapshot inmutable y hashable de los parámetros económicos.
+    
+    Se lee como un diccionario (params['discount_rate'], params.get(...),
+    {**params}) para ser compatible con los calculadores existentes. Dos
+    snapshots con los mismos valores son iguales, tienen el mismo hash y el
+    mismo digest, por lo que sirven como clave de cachés (flujos,
+    optimizaciones, figuras).
+    """
+    # Precios de energía
+    electricity_price: float
+    peak_electricity_price: float
+    export_price: float
+    upstream_energy_cost: float
+    
+    # Cargos
+    demand_charge: float
+    reactive_penalty: float
+    voltage_penalty: float
+    
+    # Financieros
+    discount_rate: float
+    inflation_rate: float
+    project_lifetime: int
+    
+    # CAPEX
+    pv_capex_usd_mw: float
+    bess_capex_usd_mwh: float
+    bess_capex_usd_mw: float
+    statcom_capex_usd_mvar: float
+    
+    # OPEX
+    pv_opex_rate: float
+    bess_opex_rate: float
+    
+    # Degradación
+    pv_degradation: float
+    bess_degradation: float
+    
+    # CAPEX: BOS y economías de escala PV (opcionales en from_dict)
+    bos_factor: float = 0.15
+    pv_capex_scale: bool = True
+    
+    @classmethod
+    def from_dict(cls, params: Mapping) -> 'EconomicParams':
+        """
+        Crea un snapshot desde un diccionario de parámetros.
+        
+        Args:
+            params: Diccionario con al menos los campos obligatorios del
+                snapshot (las claves adicionales se ignoran)
+            
+        Returns:
+            EconomicParams
+        """
+        if isinstance(params, cls):
+            return params
+        missing = [f.name for f in fields(cls)
+                   if f.name not in params and f.default is MISSING]
+        if missing:
+            raise KeyError(f"Parámetros económicos faltantes: {missing}")
+        return cls(**{f.name: params[f.name] for f in fields(cls) if f.name in params})
+    
+    @cached_property
+    def digest(self) -> str:
+        """Hash SHA-256 estable entre procesos y ejecuciones"""
+        payload = json.dumps(asdict(self), sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    @cached_property
+    def _mapping(self) -> Mapping:
+        return MappingProxyType(asdict(self))
+    
+    def as_mapping(self) -> Mapping:
+        """Vista de solo lectura (acceso por clave a velocidad de dict)"""
+        return self._mapping
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Copia mutable como diccionario"""
+        return dict(self._mapping)
+    
+    def replace(self, **changes) -> 'EconomicParams':
+        """Nuevo snapshot con algunos parámetros modificados"""
+        return replace(self, **changes)
+    
+    def __getitem__(self, key: str) -> Any:
+        return self._mapping[key]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._mapping)
+    
+    def __len__(self) -> int:
+        return len(self._mapping)
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Solo los campos: las cached_property (MappingProxy) no se serializan
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+    
+    def __setstate__(self, state: Dict[str, Any]):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+
 class ConfigLoader:
     """
     Cargador centralizado de configuración desde archivo YAML.
@@ -33,6 +144,8 @@ class ConfigLoader:
         
         # Cargar configuración
         self.config = self._load_yaml()
+        self._mtime = self.config_path.stat().st_mtime
+        self._economic_snapshot: Optional[EconomicParams] = None
         
         # Validar configuración
         self._validate_config()
@@ -99,11 +212,56 @@ class ConfigLoader:
             raise KeyError(f"Sección '{section}' no encontrada en configuración")
         return self.config[section].copy()
     
+    def reload_if_changed(self) -> bool:
+        """
+        Recarga el YAML si el archivo cambió en disco (p.ej. guardado desde
+        la página optimization_config del dashboard).
+        
+        Returns:
+            True si se recargó
+        """
+        try:
+            mtime = self.config_path.stat().st_mtime
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        
+        self.config = self._load_yaml()
+        self._validate_config()
+        self._mtime = mtime
+        self._economic_snapshot = None
+        logger.info(f"Configuración recargada desde: {self.config_path}")
+        return True
+    
+    def get_economic_snapshot(self) -> EconomicParams:
+        """
+        Retorna el snapshot inmutable de parámetros económicos.
+        
+        Se construye una sola vez y se reutiliza mientras la configuración no
+        cambie (update_value o modificación del archivo), por lo que es
+        barato llamarlo desde callbacks y su digest sirve como clave de caché.
+        
+        Returns:
+            EconomicParams
+        """
+        self.reload_if_changed()
+        if self._economic_snapshot is None:
+            self._economic_snapshot = EconomicParams.from_dict(self._build_economic_params())
+        return self._economic_snapshot
+    
     def get_economic_params(self) -> Dict[str, Any]:
         """
         Retorna parámetros económicos para IntegratedCashFlowCalculator.
         Mapea desde la estructura YAML a la esperada por el calculador.
+        
+        Returns:
+            Copia mutable del snapshot (ver get_economic_snapshot)
         """
+        return self.get_economic_snapshot().to_dict()
+    
+    def _build_economic_params(self) -> Dict[str, Any]:
+        """Mapea la estructura YAML a los parámetros económicos"""
         return {
             # Precios de energía
             'electricity_price': self.config['energy_prices']['electricity_price'],
@@ -129,6 +287,8 @@ class ConfigLoader:
             'bess_capex_usd_mwh': self.config['capex']['bess_capex_usd_mwh'],
             'bess_capex_usd_mw': self.config['capex']['bess_capex_usd_mw'],
             'statcom_capex_usd_mvar': self.config['capex']['statcom_capex_usd_mvar'],
+            'bos_factor': self.config['capex'].get('bos_factor', 0.15),
+            'pv_capex_scale': self.config['capex'].get('pv_capex_economies_of_scale', True),
             
             # OPEX
             'pv_opex_rate': self.config['opex']['pv_opex_rate'],
@@ -224,6 +384,7 @@ class ConfigLoader:
             config_ref = config_ref[key]
         
         config_ref[keys[-1]] = value
+        self._economic_snapshot = None
         logger.info(f"Actualizado {path} = {value}")
     
     def save_config(self, output_path: Optional[Path] = None):
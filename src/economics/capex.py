@@ -0,0 +1,129 @@
+"""
+CAPEX Vectorizado de Configuraciones PV + BESS + Q
+=================================================
+Única implementación del CAPEX desglosado usada por el optimizador de
+clusters, el análisis de flujos integrados (script 16) y el dashboard.
+
+Acepta escalares o arrays de tamaños y aplica la curva de economías de
+escala de capex_scale (850 kUSD/MW a 1 MW, 637 kUSD/MW desde 100 MW,
+interpolación lineal) en una sola operación NumPy, sin logging ni
+ramificaciones por configuración.
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from .capex_scale import CAPEX_1MW, CAPEX_100MW
+
+# Tramos de la curva de economías de escala (tamaño MW, USD/MW)
+PV_SCALE_CURVE = (np.array([1.0, 100.0]), np.array([float(CAPEX_1MW), float(CAPEX_100MW)]))
+
+# Relación de potencia del BESS (C-rate 0.25: MW = MWh / 4)
+BESS_HOURS = 4
+
+# Q nocturno hasta este ratio de PV lo aporta el inversor a costo marginal
+INVERTER_Q_RATIO = 0.3
+INVERTER_Q_COST_SHARE = 0.3
+
+DEFAULT_BOS_FACTOR = 0.15
+
+
+def load_capex_curve(csv_file: Path) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Curva de economías de escala desde un CSV (p.ej. capex_economies_of_scale.csv).
+
+    Args:
+        csv_file: Archivo con columnas size_mw y capex_per_mw
+
+    Returns:
+        (tamaños MW, USD/MW) ordenados por tamaño
+    """
+    df = pd.read_csv(csv_file).sort_values('size_mw')
+    return df['size_mw'].to_numpy(dtype=float), df['capex_per_mw'].to_numpy(dtype=float)
+
+
+def pv_capex_per_mw(pv_mw, base_capex_usd_mw: float = CAPEX_100MW,
+                    curve: Optional[Tuple[np.ndarray, np.ndarray]] = None):
+    """
+    CAPEX PV por MW con economías de escala (vectorizado).
+
+    La curva se escala para que su tramo de proyectos grandes valga
+    base_capex_usd_mw (pv_capex_usd_mw de parameters.yaml); con los valores
+    por defecto coincide con capex_scale.calculate_pv_capex_per_mw.
+
+    Args:
+        pv_mw: Escalar o array de capacidades PV en MW
+        base_capex_usd_mw: USD/MW de proyectos grandes
+        curve: Tramos (tamaños, USD/MW); por defecto PV_SCALE_CURVE
+
+    Returns:
+        USD/MW con la forma de pv_mw
+    """
+    sizes, per_mw = PV_SCALE_CURVE if curve is None else curve
+    values = np.interp(pv_mw, sizes, per_mw)
+    if base_capex_usd_mw != per_mw[-1]:
+        values = values * (base_capex_usd_mw / per_mw[-1])
+    return values
+
+
+def calculate_capex(pv_mw, bess_mwh, q_night_mvar, params: Mapping,
+                    curve: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Dict:
+    """
+    CAPEX desglosado de una o N configuraciones.
+
+    Args:
+        pv_mw: Capacidad PV en MW (escalar o array)
+        bess_mwh: Capacidad BESS en MWh (escalar o array)
+        q_night_mvar: Capacidad reactiva nocturna en MVAr (escalar o array)
+        params: Parámetros económicos (pv_capex_usd_mw, bess_capex_usd_mwh,
+            bess_capex_usd_mw, statcom_capex_usd_mvar; opcionales bos_factor,
+            pv_capex_scale e inverter_q_discount)
+        curve: Curva de economías de escala alternativa (ver load_capex_curve)
+
+    Returns:
+        Diccionario con pv, bess, q_night, bos y total en USD (floats si
+        todas las entradas son escalares, arrays si no)
+    """
+    pv = np.asarray(pv_mw, dtype=float)
+    bess = np.asarray(bess_mwh, dtype=float)
+    q = np.asarray(q_night_mvar, dtype=float)
+
+    # PV (con o sin economías de escala)
+    if params.get('pv_capex_scale', True):
+        pv_capex = pv * pv_capex_per_mw(pv, params['pv_capex_usd_mw'], curve)
+    else:
+        pv_capex = pv * params['pv_capex_usd_mw']
+
+    # BESS (energía + potencia)
+    bess_capex = (bess * params['bess_capex_usd_mwh'] +
+                  (bess / BESS_HOURS) * params['bess_capex_usd_mw'])
+
+    # STATCOM/Q nocturno: hasta 30% de PV lo cubre el inversor (30% del costo),
+    # por encima necesita STATCOM dedicado. Sin el descuento todo Q se cotiza como STATCOM
+    statcom_cost = params['statcom_capex_usd_mvar']
+    if params.get('inverter_q_discount', True):
+        q_capex = np.where(q <= pv * INVERTER_Q_RATIO,
+                           q * statcom_cost * INVERTER_Q_COST_SHARE,
+                           q * statcom_cost)
+    else:
+        q_capex = q * statcom_cost
+
+    # BOS y conexión
+    subtotal = pv_capex + bess_capex + q_capex
+    bos_capex = subtotal * params.get('bos_factor', DEFAULT_BOS_FACTOR)
+
+    capex = {
+        'pv': pv_capex,
+        'bess': bess_capex,
+        'q_night': q_capex,
+        'bos': bos_capex,
+        'total': subtotal + bos_capex
+    }
+    if pv.ndim == bess.ndim == q.ndim == 0:
+        return {key: float(value) for key, value in capex.items()}
+    return capex
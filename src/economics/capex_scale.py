@@ -61,8 +61,6 @@ def calculate_pv_capex_per_mw(pv_mw: float) -> float:
         slope = (MIN_CAPEX - MAX_CAPEX) / (MAX_SIZE_MW - MIN_SIZE_MW)
         capex_per_mw = MAX_CAPEX + slope * (pv_mw - MIN_SIZE_MW)
     
-    logger.debug(f"PV CAPEX for {pv_mw} MW: ${capex_per_mw:,.0f}/MW")
-    
     return capex_per_mw
 
 
@@ -87,7 +85,7 @@ def calculate_pv_total_capex(pv_mw: float,
     capex_bos = capex_equipment * bos_factor
     capex_total = capex_equipment + capex_bos
     
-    logger.info(f"PV CAPEX Total: {pv_mw} MW × ${capex_per_mw:,.0f}/MW × {1+bos_factor} = ${capex_total/1e6:.2f}M")
+    logger.debug(f"PV CAPEX Total: {pv_mw} MW × ${capex_per_mw:,.0f}/MW × {1+bos_factor} = ${capex_total/1e6:.2f}M")
     
     return capex_equipment, capex_bos, capex_total
 
@@ -196,7 +194,9 @@ def interpolate_capex_curve(sizes_mw: Optional[np.ndarray] = None) -> Tuple[np.n
     if sizes_mw is None:
         sizes_mw = np.linspace(1, 200, 200)
     
-    capex_values = np.array([calculate_pv_capex_per_mw(size) for size in sizes_mw])
+    # Import diferido: capex importa las constantes de este módulo
+    from .capex import pv_capex_per_mw
+    capex_values = pv_capex_per_mw(np.asarray(sizes_mw, dtype=float))
     
     return sizes_mw, capex_values
 
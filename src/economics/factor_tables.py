@@ -0,0 +1,115 @@
+"""
+Tablas de Factores Anuales (Degradación, Inflación y Descuento)
+===============================================================
+Los flujos de caja aplican en cada año los mismos factores
+(1 - d)^(año-1), (1 + i)^(año-1) y (1 + r)^-t. Este módulo los calcula una
+sola vez por (vida útil, tasas) y devuelve vectores NumPy de solo lectura
+cacheados, compartidos por los motores de flujos y las métricas financieras.
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+import numpy as np
+
+
+def _read_only(values) -> np.ndarray:
+    """Vector float inmutable (se comparte entre llamadas)"""
+    values = np.array(values, dtype=float)
+    values.setflags(write=False)
+    return values
+
+
+def _read_only_years(lifetime: int) -> np.ndarray:
+    """Vector de años 1..lifetime inmutable"""
+    years = np.arange(1, lifetime + 1)
+    years.setflags(write=False)
+    return years
+
+
+@lru_cache(maxsize=256)
+def growth_factors(rate: float, lifetime: int) -> np.ndarray:
+    """
+    Factores de crecimiento (1 + rate)^(año-1) para los años 1..lifetime.
+
+    Args:
+        rate: Tasa anual (inflación, escalamiento)
+        lifetime: Años de vida útil
+
+    Returns:
+        Vector (lifetime,) de solo lectura
+    """
+    # pow escalar de Python: idéntico bit a bit a los cálculos año a año
+    return _read_only([(1 + rate) ** t for t in range(lifetime)])
+
+
+@lru_cache(maxsize=256)
+def decay_factors(rate: float, lifetime: int) -> np.ndarray:
+    """
+    Factores de degradación (1 - rate)^(año-1) para los años 1..lifetime.
+
+    Args:
+        rate: Degradación anual
+        lifetime: Años de vida útil
+
+    Returns:
+        Vector (lifetime,) de solo lectura
+    """
+    return _read_only([(1 - rate) ** t for t in range(lifetime)])
+
+
+@lru_cache(maxsize=256)
+def discount_factors(rate: float, lifetime: int) -> np.ndarray:
+    """
+    Factores de descuento (1 + rate)^-t para t = 0..lifetime (incluye el año 0).
+
+    Args:
+        rate: Tasa de descuento
+        lifetime: Años de vida útil
+
+    Returns:
+        Vector (lifetime + 1,) de solo lectura
+    """
+    return _read_only([(1 + rate) ** -t for t in range(lifetime + 1)])
+
+
+@dataclass(frozen=True)
+class FactorTable:
+    """Factores anuales de un proyecto (años 1..N; descuento con año 0)"""
+    lifetime: int
+    years: np.ndarray
+    pv_degradation: np.ndarray
+    bess_degradation: np.ndarray
+    inflation: np.ndarray
+    discount: np.ndarray
+
+
+@lru_cache(maxsize=64)
+def get_factor_table(lifetime: int,
+                     pv_degradation: float,
+                     bess_degradation: float,
+                     inflation_rate: float,
+                     discount_rate: float) -> FactorTable:
+    """
+    Tabla de factores cacheada por (vida útil, tasas).
+
+    Args:
+        lifetime: Años de vida útil
+        pv_degradation: Degradación anual PV
+        bess_degradation: Degradación anual BESS
+        inflation_rate: Inflación anual
+        discount_rate: Tasa de descuento
+
+    Returns:
+        FactorTable con vectores de solo lectura
+    """
+    return FactorTable(
+        lifetime=lifetime,
+        years=_read_only_years(lifetime),
+        pv_degradation=decay_factors(pv_degradation, lifetime),
+        bess_degradation=decay_factors(bess_degradation, lifetime),
+        inflation=growth_factors(inflation_rate, lifetime),
+        discount=discount_factors(discount_rate, lifetime)
+    )
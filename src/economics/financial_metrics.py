@@ -14,6 +14,10 @@ from typing import Dict, List, Tuple, Optional
 import logging
 import numpy as np
 
+from .capex import calculate_capex
+from .irr_solver import calculate_irr_single, IRR_STATUS_MESSAGES
+from .factor_tables import decay_factors, discount_factors, growth_factors
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,7 +29,13 @@ def calculate_capex_total(pv_mw: float,
                          statcom_capex_usd_mvar: float,
                          bos_factor: float = 0.15) -> float:
     """
-    Calcula el CAPEX total del proyecto.
+    Calcula el CAPEX total del proyecto con costos unitarios explícitos.
+    
+    Compatibilidad: delega en capex.calculate_capex con precio PV plano (sin
+    economías de escala), sin componente de potencia BESS y con todo Q al
+    costo STATCOM (sin el descuento por Q del inversor), es decir
+    (PV + BESS + Q) × (1 + BOS). Para el CAPEX desglosado o vectorizado usar
+    capex.calculate_capex directamente.
     
     Args:
         pv_mw: Capacidad PV en MW
@@ -41,22 +51,18 @@ def calculate_capex_total(pv_mw: float,
     
     Example:
         >>> capex = calculate_capex_total(10, 5, 3, 800000, 200000, 40000)
-        >>> print(f"CAPEX: ${capex/1e6:.2f}M")
+        >>> print(f"CAPEX: ${capex/1e6:.3f}M")
+        CAPEX: $10.488M
     """
-    capex_subtotal = (
-        pv_mw * pv_capex_usd_mw +
-        bess_mwh * bess_capex_usd_mwh +
-        q_mvar * statcom_capex_usd_mvar
-    )
-    
-    capex_total = capex_subtotal * (1 + bos_factor)
-    
-    logger.debug(f"CAPEX: PV ${pv_mw * pv_capex_usd_mw/1e6:.1f}M + "
-                f"BESS ${bess_mwh * bess_capex_usd_mwh/1e6:.1f}M + "
-                f"Q ${q_mvar * statcom_capex_usd_mvar/1e6:.1f}M + "
-                f"BOS {bos_factor*100:.0f}% = ${capex_total/1e6:.1f}M")
-    
-    return capex_total
+    return calculate_capex(pv_mw, bess_mwh, q_mvar, {
+        'pv_capex_usd_mw': pv_capex_usd_mw,
+        'pv_capex_scale': False,
+        'bess_capex_usd_mwh': bess_capex_usd_mwh,
+        'bess_capex_usd_mw': 0.0,
+        'statcom_capex_usd_mvar': statcom_capex_usd_mvar,
+        'inverter_q_discount': False,
+        'bos_factor': bos_factor
+    })['total']
 
 
 def calculate_annual_opex(capex_total: float,
@@ -127,11 +133,12 @@ def calculate_cash_flows(capex: float,
         'cash_flow': -capex
     })
     
-    # Años 1 a N: Operación
-    for year in range(1, project_lifetime + 1):
+    # Años 1 a N: Operación (factores de inflación cacheados)
+    inflation = growth_factors(inflation_rate, project_lifetime).tolist()
+    for year, inflation_factor in enumerate(inflation, 1):
         # Aplicar inflación
-        revenue_year = annual_revenue * (1 + inflation_rate) ** (year - 1)
-        opex_year = annual_opex * (1 + inflation_rate) ** (year - 1)
+        revenue_year = annual_revenue * inflation_factor
+        opex_year = annual_opex * inflation_factor
         
         cash_flow_year = revenue_year - opex_year
         
@@ -177,23 +184,15 @@ def calculate_irr(cash_flows: List[Dict[str, float]]) -> float:
         cash_flows: Lista de flujos de caja
     
     Returns:
-        float: TIR como decimal (0.15 = 15%)
+        float: TIR como decimal (0.15 = 15%); 0.0 si el NPV no tiene raíz
+        en el rango de tasas del kernel
     """
     # Extraer solo los valores de flujo
     flows = [f['cash_flow'] for f in cash_flows]
     
-    try:
-        irr = np.irr(flows)
-        if np.isnan(irr) or irr < -0.99 or irr > 1.0:
-            # Fallback: estimación basada en payback
-            positive_flows = [f for f in flows[1:] if f > 0]
-            if positive_flows:
-                avg_positive = sum(positive_flows) / len(positive_flows)
-                simple_payback = abs(flows[0]) / avg_positive if avg_positive > 0 else 20
-                irr = 0.25 / (1 + simple_payback/4) if simple_payback < 20 else 0.05
-            else:
-                irr = 0.0
-    except:
+    irr, status = calculate_irr_single(flows)
+    if irr is None:
+        logger.warning(f"IRR no determinada ({IRR_STATUS_MESSAGES[status]}), se reporta 0%")
         irr = 0.0
     
     logger.debug(f"IRR: {irr*100:.1f}%")
@@ -252,22 +251,18 @@ def calculate_lcoe(capex: float,
     Returns:
         float: LCOE en USD/MWh
     """
-    # VP de costos
-    pv_costs = capex
+    # Factores anuales cacheados (años 1..N)
+    discount = discount_factors(discount_rate, project_lifetime)[1:]
     
-    # VP de generación
-    pv_generation = 0
+    # Generación con degradación
+    generation = annual_generation_mwh * decay_factors(degradation_rate, project_lifetime)
     
-    for year in range(1, project_lifetime + 1):
-        # Generación con degradación
-        generation_year = annual_generation_mwh * (1 - degradation_rate) ** (year - 1)
-        
-        # OPEX con inflación (asumiendo 3%)
-        opex_year = annual_opex * (1.03) ** (year - 1)
-        
-        # Descontar
-        pv_costs += opex_year / (1 + discount_rate) ** year
-        pv_generation += generation_year / (1 + discount_rate) ** year
+    # OPEX con inflación (asumiendo 3%)
+    opex = annual_opex * growth_factors(0.03, project_lifetime)
+    
+    # VP de costos y de generación
+    pv_costs = capex + float(opex @ discount)
+    pv_generation = float(generation @ discount)
     
     lcoe = pv_costs / pv_generation if pv_generation > 0 else 0
     
@@ -12,7 +12,7 @@ Fecha: Julio 2025
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Mapping
 from dataclasses import dataclass
 import logging
 from pathlib import Path
@@ -21,9 +21,24 @@ import sys
 # Agregar path para imports
 sys.path.append(str(Path(__file__).parent.parent.parent))
 from src.config.config_loader import get_config
+from src.economics.irr_solver import calculate_irr_batch, calculate_irr_single
+from src.economics.factor_tables import FactorTable, get_factor_table
 
 logger = logging.getLogger(__name__)
 
+# Ratio base de autoconsumo según tipo de carga predominante
+SELF_CONSUMPTION_BASE_RATIOS = {
+    'residential': 0.3,  # Bajo: pico nocturno
+    'commercial': 0.7,   # Alto: pico diurno
+    'industrial': 0.6,   # Medio: carga constante
+    'rural': 0.4,        # Bajo-medio
+    'mixed': 0.5         # Promedio
+}
+
+# STATCOM equivalente para valorizar Q nocturno
+STATCOM_EQUIVALENT_CAPEX_USD_MVAR = 50000  # USD/MVAr
+STATCOM_EQUIVALENT_LIFETIME = 15  # años
+
 
 @dataclass
 class CashFlowComponent:
@@ -79,25 +94,91 @@ class IntegratedCashFlow:
         return self.total_flow
 
 
+@dataclass
+class IntegratedCashFlowBatch:
+    """
+    Flujos de caja integrados para N configuraciones × Y años.
+    Cada componente es un array de forma (N, Y); la columna j es el año j+1.
+    """
+    years: np.ndarray
+
+    # Flujos PSFV
+    self_consumption_savings: np.ndarray
+    export_credits: np.ndarray
+    demand_charge_reduction: np.ndarray
+
+    # Flujos Red
+    loss_reduction_value: np.ndarray
+    q_night_value: np.ndarray
+    capex_deferral_value: np.ndarray
+    penalty_avoidance: np.ndarray
+
+    # Costos
+    opex: np.ndarray
+
+    @property
+    def n_configs(self) -> int:
+        return self.opex.shape[0]
+
+    @property
+    def pv_flow(self) -> np.ndarray:
+        """Flujo total del PSFV"""
+        return (self.self_consumption_savings +
+                self.export_credits +
+                self.demand_charge_reduction)
+
+    @property
+    def network_flow(self) -> np.ndarray:
+        """Flujo total de beneficios en red"""
+        return (self.loss_reduction_value +
+                self.q_night_value +
+                self.capex_deferral_value +
+                self.penalty_avoidance)
+
+    @property
+    def total_flow(self) -> np.ndarray:
+        """Flujo total integrado"""
+        return self.pv_flow + self.network_flow - self.opex
+
+    def to_cash_flows(self, index: int) -> List[IntegratedCashFlow]:
+        """Convierte la configuración `index` a la lista escalar equivalente"""
+        return [
+            IntegratedCashFlow(
+                year=int(year),
+                self_consumption_savings=float(self.self_consumption_savings[index, j]),
+                export_credits=float(self.export_credits[index, j]),
+                demand_charge_reduction=float(self.demand_charge_reduction[index, j]),
+                loss_reduction_value=float(self.loss_reduction_value[index, j]),
+                q_night_value=float(self.q_night_value[index, j]),
+                capex_deferral_value=float(self.capex_deferral_value[index, j]),
+                penalty_avoidance=float(self.penalty_avoidance[index, j]),
+                opex=float(self.opex[index, j])
+            )
+            for j, year in enumerate(self.years)
+        ]
+
+
 class IntegratedCashFlowCalculator:
     """
     Calculador de flujos de caja integrados para proyectos PSFV multipropósito.
     Considera tanto los ingresos directos como los beneficios en la red.
     """
     
-    def __init__(self, params: Optional[Dict] = None):
+    def __init__(self, params: Optional[Mapping] = None):
         """
         Inicializa el calculador con parámetros económicos.
         
         Args:
-            params: Diccionario con parámetros económicos (si None, usa ConfigLoader)
+            params: EconomicParams o diccionario con parámetros económicos
+                (si None, usa el snapshot de ConfigLoader)
         """
         if params is None:
             # Cargar desde configuración centralizada
-            config = get_config()
-            self.params = config.get_economic_params()
-        else:
-            self.params = params
+            params = get_config().get_economic_snapshot()
+        
+        # Se guarda el snapshot (o dict) tal cual: debe poder serializarse con
+        # pickle para que el optimizador viaje a los workers de DE y del pool
+        self.params = params
         
         # Validar parámetros requeridos
         required = ['discount_rate', 'project_lifetime', 'electricity_price']
@@ -107,6 +188,16 @@ class IntegratedCashFlowCalculator:
         
         logger.info("Calculador de flujos integrados inicializado")
     
+    def _factor_table(self) -> FactorTable:
+        """Factores anuales cacheados para los parámetros actuales"""
+        return get_factor_table(
+            int(self.params['project_lifetime']),
+            self.params['pv_degradation'],
+            self.params['bess_degradation'],
+            self.params['inflation_rate'],
+            self.params['discount_rate']
+        )
+    
     def calculate_integrated_flows(self,
                                    cluster_data: Dict,
                                    pv_capacity_mw: float,
@@ -128,16 +219,14 @@ class IntegratedCashFlowCalculator:
         """
         flows = []
         
-        for year in range(1, self.params['project_lifetime'] + 1):
+        # Factores de degradación e inflación (tabla cacheada)
+        factors = self._factor_table()
+        
+        for year, pv_degradation_factor, bess_degradation_factor, inflation_factor in zip(
+                factors.years.tolist(), factors.pv_degradation.tolist(),
+                factors.bess_degradation.tolist(), factors.inflation.tolist()):
             flow = IntegratedCashFlow(year=year)
             
-            # Factor de degradación
-            pv_degradation_factor = (1 - self.params['pv_degradation']) ** (year - 1)
-            bess_degradation_factor = (1 - self.params['bess_degradation']) ** (year - 1)
-            
-            # Factor de inflación
-            inflation_factor = (1 + self.params['inflation_rate']) ** (year - 1)
-            
             # 1. Flujos PSFV
             flow.self_consumption_savings = self._calculate_self_consumption_savings(
                 cluster_data, pv_capacity_mw, bess_capacity_mwh,
@@ -259,9 +348,7 @@ class IntegratedCashFlowCalculator:
         penalty_avoided = q_mvar * reactive_penalty * 12
         
         # Opción 2: Valor equivalente STATCOM
-        statcom_capex_per_mvar = 50000  # USD/MVAr
-        statcom_lifetime = 15  # años
-        statcom_annual_value = statcom_capex_per_mvar / statcom_lifetime
+        statcom_annual_value = STATCOM_EQUIVALENT_CAPEX_USD_MVAR / STATCOM_EQUIVALENT_LIFETIME
         statcom_equivalent = q_mvar * statcom_annual_value
         
         # Usar el mayor valor
@@ -312,15 +399,7 @@ class IntegratedCashFlowCalculator:
         """
         # Ratio base según tipo de carga predominante
         load_type = cluster_data.get('dominant_load_type', 'mixed')
-        base_ratios = {
-            'residential': 0.3,  # Bajo: pico nocturno
-            'commercial': 0.7,   # Alto: pico diurno
-            'industrial': 0.6,   # Medio: carga constante
-            'rural': 0.4,        # Bajo-medio
-            'mixed': 0.5         # Promedio
-        }
-        
-        base_ratio = base_ratios.get(load_type, 0.5)
+        base_ratio = SELF_CONSUMPTION_BASE_RATIOS.get(load_type, 0.5)
         
         # Ajustar por tamaño relativo PV vs demanda
         pv_to_demand = pv_mw / cluster_data.get('peak_demand_mw', pv_mw)
@@ -348,11 +427,11 @@ class IntegratedCashFlowCalculator:
             Diccionario con NPV, IRR, Payback, B/C ratio
         """
         # Preparar flujos para cálculo
-        years = [0] + [cf.year for cf in cash_flows]
         flows = [-initial_capex] + [cf.total_flow for cf in cash_flows]
+        factors = self._factor_table()
         
         # NPV
-        discount_factors = [(1 + self.params['discount_rate']) ** -t for t in range(len(years))]
+        discount_factors = factors.discount.tolist()
         npv = sum(flow * df for flow, df in zip(flows, discount_factors))
         
         # IRR
@@ -373,9 +452,10 @@ class IntegratedCashFlowCalculator:
         bc_ratio = pv_benefits / initial_capex if initial_capex > 0 else 0
         
         # LCOE (si aplica)
+        inflation = factors.inflation.tolist()
         total_energy_mwh = sum(
             cf.self_consumption_savings / self.params['electricity_price'] / 
-            ((1 + self.params['inflation_rate']) ** (cf.year - 1))
+            inflation[cf.year - 1]
             for cf in cash_flows
         )
         lcoe = (initial_capex + sum(cf.opex * df for cf, df in 
@@ -390,33 +470,197 @@ class IntegratedCashFlowCalculator:
         }
     
     def _calculate_irr(self, cash_flows: List[float], max_iterations: int = 100) -> Optional[float]:
-        """Calcula TIR usando método Newton-Raphson"""
-        if len(cash_flows) < 2:
-            return None
+        """Calcula TIR con el kernel compartido (None si no hay solución)"""
+        irr, _ = calculate_irr_single(cash_flows, max_iterations=max_iterations)
+        return irr
+    
+    # =====================
+    # MOTOR VECTORIZADO (N configuraciones × Y años)
+    # =====================
+    
+    def calculate_integrated_flows_batch(self,
+                                         cluster_data: Dict,
+                                         pv_capacity_mw,
+                                         bess_capacity_mwh,
+                                         q_night_mvar,
+                                         capex: Dict) -> IntegratedCashFlowBatch:
+        """
+        Versión vectorizada de calculate_integrated_flows para N configuraciones.
         
-        # Estimación inicial
-        irr = 0.1
+        Reproduce exactamente las fórmulas del camino escalar, pero evalúa
+        todas las configuraciones y todos los años en una sola pasada NumPy.
         
-        for _ in range(max_iterations):
-            # NPV y su derivada
-            npv = 0
-            dnpv = 0
+        Args:
+            cluster_data: Datos del cluster (demanda, perfiles, etc.)
+            pv_capacity_mw: Array (N,) o escalar con capacidad solar en MW
+            bess_capacity_mwh: Array (N,) o escalar con capacidad BESS en MWh
+            q_night_mvar: Array (N,) o escalar con capacidad reactiva en MVAr
+            capex: Diccionario con CAPEX por componente (arrays (N,) o escalares)
             
-            for t, cf in enumerate(cash_flows):
-                npv += cf / (1 + irr) ** t
-                if t > 0:
-                    dnpv -= t * cf / (1 + irr) ** (t + 1)
+        Returns:
+            IntegratedCashFlowBatch con componentes de forma (N, Y)
+        """
+        pv, bess, q = (a.ravel() for a in np.broadcast_arrays(
+            np.atleast_1d(np.asarray(pv_capacity_mw, dtype=float)),
+            np.atleast_1d(np.asarray(bess_capacity_mwh, dtype=float)),
+            np.atleast_1d(np.asarray(q_night_mvar, dtype=float))
+        ))
+        
+        # Factores por año (vectores fila de la tabla cacheada)
+        factors = self._factor_table()
+        years = factors.years
+        pv_deg = factors.pv_degradation[None, :]
+        bess_deg = factors.bess_degradation[None, :]
+        inflation = factors.inflation[None, :]
+        
+        pv_col, bess_col, q_col = pv[:, None], bess[:, None], q[:, None]
+        capacity_factor = cluster_data.get('pv_capacity_factor', 0.211)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # 1. Flujos PSFV
+            pv_energy_mwh = pv_col * 8760 * capacity_factor * pv_deg
+            self_consumption_ratio = self._estimate_self_consumption_ratio_batch(
+                cluster_data, pv, bess
+            )[:, None]
             
-            # Actualizar estimación
-            if abs(dnpv) < 1e-10:
-                break
-                
-            irr_new = irr - npv / dnpv
+            self_consumption = (pv_energy_mwh * self_consumption_ratio *
+                                (self.params['electricity_price'] * inflation))
+            exports = (pv_energy_mwh * (1 - self_consumption_ratio) *
+                       (self.params['export_price'] * inflation))
+            
+            peak_reduction_mw = np.minimum(
+                pv_col * pv_deg, cluster_data.get('peak_demand_mw', 0) * 0.3
+            )
+            peak_reduction_mw = np.where(
+                bess_col > 0,
+                peak_reduction_mw + (bess_col / 4) * bess_deg * 0.8,
+                peak_reduction_mw
+            )
+            demand_reduction = peak_reduction_mw * (self.params['demand_charge'] * inflation) * 12
+            
+            # 2. Flujos Red
+            loss_reduction_mwh = (pv_col * capacity_factor * pv_deg *
+                                  cluster_data.get('loss_sensitivity', 0.05) * 8760)
+            loss_reduction = loss_reduction_mwh * (self.params['upstream_energy_cost'] * inflation)
             
-            # Verificar convergencia
-            if abs(irr_new - irr) < 1e-6:
-                return irr_new if -1 < irr_new < 10 else None
-                
-            irr = irr_new
+            statcom_annual_value = STATCOM_EQUIVALENT_CAPEX_USD_MVAR / STATCOM_EQUIVALENT_LIFETIME
+            q_night = np.where(
+                q_col > 0,
+                np.maximum(q_col * (self.params['reactive_penalty'] * inflation) * 12,
+                           q_col * statcom_annual_value),
+                0.0
+            )
+            
+            capex_deferral = self._calculate_capex_deferral_batch(cluster_data, pv, years)
+            
+            improvement_factor = np.minimum(
+                0.8, (pv_col + q_col * 0.5) / cluster_data.get('peak_demand_mw', 10)
+            )
+            penalty_avoidance = (cluster_data.get('annual_penalties_usd', 0) *
+                                 improvement_factor * inflation)
+        
+        # 3. OPEX
+        capex_pv = np.broadcast_to(np.asarray(capex.get('pv', 0), dtype=float), pv.shape)
+        capex_bess = np.broadcast_to(np.asarray(capex.get('bess', 0), dtype=float), pv.shape)
+        opex = ((capex_pv * self.params['pv_opex_rate'] +
+                 capex_bess * self.params['bess_opex_rate'])[:, None] * inflation)
+        
+        shape = (pv.size, years.size)
+        return IntegratedCashFlowBatch(
+            years=years,
+            self_consumption_savings=np.broadcast_to(self_consumption, shape),
+            export_credits=np.broadcast_to(exports, shape),
+            demand_charge_reduction=np.broadcast_to(demand_reduction, shape),
+            loss_reduction_value=np.broadcast_to(loss_reduction, shape),
+            q_night_value=np.broadcast_to(q_night, shape),
+            capex_deferral_value=np.broadcast_to(capex_deferral, shape),
+            penalty_avoidance=np.broadcast_to(penalty_avoidance, shape),
+            opex=np.broadcast_to(opex, shape)
+        )
+    
+    def _estimate_self_consumption_ratio_batch(self, cluster_data: Dict,
+                                               pv_mw: np.ndarray,
+                                               bess_mwh: np.ndarray) -> np.ndarray:
+        """Versión vectorizada de _estimate_self_consumption_ratio"""
+        load_type = cluster_data.get('dominant_load_type', 'mixed')
+        base_ratio = np.full(pv_mw.shape, SELF_CONSUMPTION_BASE_RATIOS.get(load_type, 0.5))
+        
+        # Ajustar por tamaño relativo PV vs demanda
+        if 'peak_demand_mw' in cluster_data:
+            pv_to_demand = pv_mw / cluster_data['peak_demand_mw']
+        else:
+            pv_to_demand = np.ones_like(pv_mw)
+        base_ratio = np.where(pv_to_demand > 1, base_ratio * (1 / pv_to_demand), base_ratio)
+        
+        # Bonus por BESS
+        bess_bonus = np.minimum(0.2, bess_mwh / (pv_mw * 4))
+        base_ratio = np.where(bess_mwh > 0, base_ratio + bess_bonus, base_ratio)
         
-        return None
\ No newline at end of file
+        return np.minimum(0.95, base_ratio)
+    
+    def _calculate_capex_deferral_batch(self, cluster_data: Dict, pv_mw: np.ndarray,
+                                        years: np.ndarray) -> np.ndarray:
+        """Versión vectorizada de _calculate_capex_deferral"""
+        upgrade_mva = cluster_data.get('deferred_upgrade_mva', 0)
+        if upgrade_mva <= 0:
+            return np.zeros((pv_mw.size, years.size))
+        
+        deferral_years = np.minimum(5, pv_mw / upgrade_mva * 10)[:, None]
+        upgrade_cost = cluster_data.get('upgrade_cost_usd', 100000)
+        discount_factor = (1 + self.params['discount_rate']) ** deferral_years
+        
+        return np.where(years[None, :] <= deferral_years,
+                        upgrade_cost / discount_factor / deferral_years, 0.0)
+    
+    def calculate_financial_metrics_batch(self, batch: IntegratedCashFlowBatch,
+                                          initial_capex) -> Dict[str, np.ndarray]:
+        """
+        Versión vectorizada de calculate_financial_metrics.
+        
+        Args:
+            batch: Flujos de N configuraciones
+            initial_capex: Array (N,) o escalar con CAPEX inicial total
+            
+        Returns:
+            Diccionario con arrays (N,) de NPV, IRR, Payback, B/C y LCOE.
+            Los valores que el camino escalar devuelve como None son NaN.
+        """
+        total_flow = batch.total_flow
+        capex = np.broadcast_to(np.asarray(initial_capex, dtype=float), (batch.n_configs,))
+        flows = np.column_stack([-capex, total_flow])
+        
+        # NPV
+        factors = self._factor_table()
+        discount_factors = factors.discount
+        npv = flows @ discount_factors
+        
+        # IRR
+        irr, _ = calculate_irr_batch(flows)
+        irr_percent = np.where(np.isfinite(irr) & (irr != 0), irr * 100, np.nan)
+        
+        # Payback simple
+        reached = np.cumsum(total_flow, axis=1) >= capex[:, None]
+        payback = np.where(reached.any(axis=1), reached.argmax(axis=1) + 1.0, np.nan)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Benefit/Cost ratio
+            pv_benefits = total_flow @ discount_factors[1:]
+            bc_ratio = np.where(capex > 0, pv_benefits / capex, 0.0)
+            
+            # LCOE
+            inflation = factors.inflation[batch.years - 1]
+            total_energy_mwh = np.sum(
+                batch.self_consumption_savings / self.params['electricity_price'] / inflation,
+                axis=1
+            )
+            pv_opex = batch.opex @ discount_factors[1:]
+            lcoe = np.where(total_energy_mwh > 0,
+                            (capex + pv_opex) / total_energy_mwh, 0.0)
+        
+        return {
+            'npv_usd': npv,
+            'irr_percent': irr_percent,
+            'payback_years': payback,
+            'bc_ratio': bc_ratio,
+            'lcoe_usd_mwh': lcoe
+        }
@@ -0,0 +1,228 @@
+"""
+Kernel Vectorizado de Tasa Interna de Retorno (TIR)
+===================================================
+
+Resuelve la TIR de muchos proyectos a la vez: recibe una matriz de flujos
+(N proyectos × T períodos) y devuelve un vector de N TIRs junto con un
+código de estado determinístico por proyecto.
+
+Método:
+1. Acotamiento: se evalúa el NPV en una grilla fija de tasas y se elige el
+   intervalo con cambio de signo más cercano a la estimación inicial.
+2. Refinamiento: Newton-Raphson con salvaguarda de bisección dentro del
+   intervalo (esquema rtsafe), partiendo de la interpolación lineal. Si el paso de Newton sale del intervalo o la
+   derivada se anula, se bisecta; la convergencia está garantizada.
+
+El NPV sobre la grilla es un único producto matricial; en el refinamiento
+el NPV y su derivada se evalúan con Horner sobre v = 1/(1+r), de modo que
+cada iteración cuesta T operaciones vectoriales sobre los proyectos activos.
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+from typing import Optional, Sequence, Tuple
+from functools import lru_cache
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# Códigos de estado
+IRR_CONVERGED = 0          # TIR encontrada dentro de la tolerancia
+IRR_NO_SIGN_CHANGE = 1     # El NPV no cambia de signo en el rango de tasas
+IRR_MAX_ITERATIONS = 2     # No convergió en max_iterations
+IRR_INVALID_INPUT = 3      # Flujos no finitos o menos de 2 períodos
+
+IRR_STATUS_MESSAGES = {
+    IRR_CONVERGED: 'convergió',
+    IRR_NO_SIGN_CHANGE: 'sin cambio de signo del NPV en el rango de tasas',
+    IRR_MAX_ITERATIONS: 'máximo de iteraciones alcanzado',
+    IRR_INVALID_INPUT: 'flujos inválidos',
+}
+
+# Rango de búsqueda y grilla de acotamiento
+IRR_LOWER_BOUND = -0.99
+IRR_UPPER_BOUND = 10.0
+RATE_GRID = np.array([
+    IRR_LOWER_BOUND, -0.9, -0.75, -0.5, -0.3, -0.2, -0.1, -0.05, 0.0, 0.05, 0.1,
+    0.15, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, IRR_UPPER_BOUND
+])
+
+
+@lru_cache(maxsize=32)
+def _grid_discount_factors(n_periods: int) -> np.ndarray:
+    """Matriz (T, K) de factores (1+r_k)^-t para la grilla de acotamiento"""
+    t = np.arange(n_periods)[:, None]
+    factors = (1.0 + RATE_GRID[None, :]) ** -t.astype(float)
+    factors.setflags(write=False)
+    return factors
+
+
+def npv_and_derivative(cash_flows: np.ndarray,
+                       rate: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Evalúa NPV(r) y dNPV/dr para cada proyecto con Horner.
+
+    Args:
+        cash_flows: Matriz (N, T) de flujos; la columna t es el año t
+        rate: Tasas (N,), una por proyecto
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (npv, dnpv_dr) de forma (N,)
+    """
+    v = 1.0 / (1.0 + rate)
+
+    npv = cash_flows[:, -1].copy()
+    dnpv_dv = np.zeros_like(npv)
+
+    for t in range(cash_flows.shape[1] - 2, -1, -1):
+        dnpv_dv = dnpv_dv * v + npv
+        npv = npv * v + cash_flows[:, t]
+
+    # dv/dr = -v²
+    return npv, -dnpv_dv * v * v
+
+
+def calculate_irr_batch(cash_flows: np.ndarray,
+                        guess: float = 0.1,
+                        tol: float = 1e-10,
+                        max_iterations: int = 100,
+                        chunk_size: int = 131072) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula la TIR de N proyectos a la vez.
+
+    Args:
+        cash_flows: Matriz (N, T) de flujos (año 0 = inversión) o vector (T,)
+        guess: Estimación inicial; elige el intervalo de acotamiento si hay
+            varias raíces
+        tol: Tolerancia en la tasa
+        max_iterations: Máximo de iteraciones Newton/bisección
+        chunk_size: Proyectos procesados por bloque (limita memoria)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (irr, status). irr es NaN salvo cuando
+        status == IRR_CONVERGED.
+
+    Example:
+        >>> flows = np.array([[-100, 60, 60], [-100, 10, 10]])
+        >>> irr, status = calculate_irr_batch(flows)
+    """
+    cash_flows = np.atleast_2d(np.asarray(cash_flows, dtype=float))
+    n_projects, n_periods = cash_flows.shape
+
+    irr = np.full(n_projects, np.nan)
+    status = np.full(n_projects, IRR_INVALID_INPUT, dtype=np.int8)
+    if n_periods < 2:
+        return irr, status
+
+    for start in range(0, n_projects, chunk_size):
+        stop = min(start + chunk_size, n_projects)
+        irr[start:stop], status[start:stop] = _solve_chunk(
+            cash_flows[start:stop], guess, tol, max_iterations
+        )
+
+    return irr, status
+
+
+def _solve_chunk(cash_flows: np.ndarray, guess: float, tol: float,
+                 max_iterations: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Acota y refina la TIR de un bloque de proyectos"""
+    n_projects = cash_flows.shape[0]
+    irr = np.full(n_projects, np.nan)
+    status = np.full(n_projects, IRR_NO_SIGN_CHANGE, dtype=np.int8)
+
+    valid = np.isfinite(cash_flows).all(axis=1)
+    status[~valid] = IRR_INVALID_INPUT
+    rows = np.flatnonzero(valid)
+    if rows.size == 0:
+        return irr, status
+    flows = cash_flows[rows]
+
+    # 1. Acotamiento: NPV en toda la grilla como un único producto matricial
+    grid_npv = flows @ _grid_discount_factors(flows.shape[1])
+    sign = np.sign(grid_npv)
+
+    # Raíz exacta en un punto de la grilla
+    exact = sign == 0
+    has_exact = exact.any(axis=1)
+
+    # Intervalo con cambio de signo más cercano al guess (empates: tasa menor)
+    change = sign[:, :-1] * sign[:, 1:] < 0
+    n_intervals = RATE_GRID.size - 1
+    guess_interval = np.clip(np.searchsorted(RATE_GRID, guess, side='right') - 1, 0, n_intervals - 1)
+    interval_index = np.arange(n_intervals)
+    distance = 2 * np.abs(interval_index - guess_interval) + (interval_index > guess_interval)
+    distance = np.where(change, distance, np.iinfo(np.int64).max)
+    chosen = distance.argmin(axis=1)
+    bracketed = change[np.arange(rows.size), chosen] & ~has_exact
+
+    exact_rows = np.flatnonzero(has_exact)
+    irr[rows[exact_rows]] = RATE_GRID[exact[exact_rows].argmax(axis=1)]
+    status[rows[exact_rows]] = IRR_CONVERGED
+
+    # 2. Newton con salvaguarda de bisección
+    active = np.flatnonzero(bracketed)
+    status[rows[active]] = IRR_MAX_ITERATIONS
+    lo = RATE_GRID[chosen[active]]
+    hi = RATE_GRID[chosen[active] + 1]
+    f_lo = grid_npv[active, chosen[active]]
+    f_hi = grid_npv[active, chosen[active] + 1]
+    flows = flows[active]
+    rows = rows[active]
+
+    # Punto inicial por interpolación lineal (regula falsi) dentro del intervalo
+    x = lo - f_lo * (hi - lo) / (f_hi - f_lo)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for _ in range(max_iterations):
+            if rows.size == 0:
+                break
+
+            f, df = npv_and_derivative(flows, x)
+
+            # Actualizar intervalo manteniendo el cambio de signo
+            same_side = np.sign(f) == np.sign(f_lo)
+            lo = np.where(same_side, x, lo)
+            f_lo = np.where(same_side, f, f_lo)
+            hi = np.where(same_side, hi, x)
+
+            # Paso de Newton; bisección si sale del intervalo
+            x_new = x - f / df
+            outside = ~np.isfinite(x_new) | (x_new <= lo) | (x_new >= hi)
+            x_new = np.where(outside, 0.5 * (lo + hi), x_new)
+
+            done = (f == 0) | (np.abs(x_new - x) <= tol * (1 + np.abs(x))) | (hi - lo <= tol)
+            root = np.where(f == 0, x, x_new)
+            irr[rows[done]] = root[done]
+            status[rows[done]] = IRR_CONVERGED
+
+            keep = ~done
+            rows, flows = rows[keep], flows[keep]
+            x, lo, hi, f_lo = x_new[keep], lo[keep], hi[keep], f_lo[keep]
+
+    return irr, status
+
+
+def calculate_irr_single(cash_flows: Sequence[float],
+                         guess: float = 0.1,
+                         max_iterations: int = 100) -> Tuple[Optional[float], int]:
+    """
+    Calcula la TIR de un único proyecto con el kernel vectorizado.
+
+    Args:
+        cash_flows: Flujos por año (año 0 = inversión)
+        guess: Estimación inicial
+        max_iterations: Máximo de iteraciones
+
+    Returns:
+        Tuple[Optional[float], int]: (irr o None si no convergió, status)
+    """
+    irr, status = calculate_irr_batch(
+        np.asarray(cash_flows, dtype=float)[None, :],
+        guess=guess, max_iterations=max_iterations
+    )
+    if status[0] != IRR_CONVERGED:
+        return None, int(status[0])
+    return float(irr[0]), IRR_CONVERGED
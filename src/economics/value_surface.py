@@ -0,0 +1,424 @@
+"""
+Motor de Superficies de Valor (NPV sobre la grilla PV × BESS × Q)
+================================================================
+Evalúa grillas de resolución arbitraria de configuraciones de GD para
+todos los clusters con el motor vectorizado de flujos, y guarda los
+resultados como dataset Parquet particionado por cluster_id:
+
+    value_surfaces/
+        _manifest.json
+        cluster_id=0/part.parquet
+        cluster_id=1/part.parquet
+        ...
+
+El manifiesto guarda, por cluster, una huella de sus datos y de los
+parámetros del modelo. Al actualizar solo se recalculan los clusters cuya
+huella cambió; si solo cambió la grilla, se evalúan únicamente los puntos
+que faltan.
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import hashlib
+import json
+import logging
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# Cambiar al modificar las fórmulas del modelo (invalida todo el dataset)
+SURFACE_MODEL_VERSION = 2
+
+MANIFEST_FILE = '_manifest.json'
+PARTITION_FILE = 'part.parquet'
+
+GRID_COLUMNS = ['pv_ratio', 'bess_hours', 'q_ratio']
+
+# Columnas de cada partición (cluster_id va en el nombre del directorio)
+SURFACE_COLUMNS = [
+    'pv_mw', 'pv_ratio', 'bess_mwh', 'bess_hours', 'q_night_mvar', 'q_ratio',
+    'capex_musd', 'npv_musd', 'irr_percent', 'payback_years', 'bc_ratio', 'lcoe_usd_mwh',
+    'avg_pv_flow_musd', 'avg_network_flow_musd', 'avg_total_flow_musd',
+    'loss_reduction_musd', 'voltage_support_musd', 'deferral_musd',
+    'network_benefit_ratio',
+]
+
+
+def _axis(values: Iterable[float]) -> Tuple[float, ...]:
+    """Eje de la grilla: valores únicos, ordenados y redondeados (claves estables)"""
+    return tuple(sorted({round(float(v), 12) for v in values}))
+
+
+@dataclass(frozen=True)
+class SurfaceGrid:
+    """Grilla cartesiana de ratios: PV/demanda × horas BESS × Q/PV"""
+    pv_ratios: Tuple[float, ...]
+    bess_hours: Tuple[float, ...]
+    q_ratios: Tuple[float, ...]
+
+    def __post_init__(self):
+        for name in ('pv_ratios', 'bess_hours', 'q_ratios'):
+            object.__setattr__(self, name, _axis(getattr(self, name)))
+
+    @classmethod
+    def linspace(cls,
+                 pv_range: Sequence[float] = (0.5, 2.0), pv_points: int = 7,
+                 bess_range: Sequence[float] = (0, 4), bess_points: int = 5,
+                 q_range: Sequence[float] = (0, 0.3), q_points: int = 4) -> 'SurfaceGrid':
+        """
+        Grilla equiespaciada de la resolución pedida en cada eje.
+
+        Args:
+            pv_range: (mín, máx) del ratio PV/demanda pico
+            pv_points: Puntos en el eje PV
+            bess_range: (mín, máx) de horas de almacenamiento
+            bess_points: Puntos en el eje BESS
+            q_range: (mín, máx) del ratio Q nocturno/PV
+            q_points: Puntos en el eje Q
+
+        Returns:
+            SurfaceGrid
+        """
+        return cls(
+            pv_ratios=np.linspace(*pv_range, int(pv_points)),
+            bess_hours=np.linspace(*bess_range, int(bess_points)),
+            q_ratios=np.linspace(*q_range, int(q_points))
+        )
+
+    @classmethod
+    def from_config(cls, section: Optional[Mapping]) -> 'SurfaceGrid':
+        """Grilla desde la sección value_surface de parameters.yaml"""
+        section = section or {}
+        return cls.linspace(
+            pv_range=section.get('pv_ratio_range', (0.5, 2.0)),
+            pv_points=section.get('pv_ratio_points', 7),
+            bess_range=section.get('bess_hours_range', (0, 4)),
+            bess_points=section.get('bess_hours_points', 5),
+            q_range=section.get('q_ratio_range', (0, 0.3)),
+            q_points=section.get('q_ratio_points', 4)
+        )
+
+    @property
+    def size(self) -> int:
+        return len(self.pv_ratios) * len(self.bess_hours) * len(self.q_ratios)
+
+    def points(self) -> pd.DataFrame:
+        """Todas las combinaciones, en orden de bucles anidados (PV, BESS, Q)"""
+        pv_ratio, bess_hours, q_ratio = (
+            grid.ravel() for grid in np.meshgrid(
+                self.pv_ratios, self.bess_hours, self.q_ratios, indexing='ij'
+            )
+        )
+        return pd.DataFrame({'pv_ratio': pv_ratio, 'bess_hours': bess_hours, 'q_ratio': q_ratio})
+
+    def contains(self, df: pd.DataFrame) -> np.ndarray:
+        """Máscara de las filas de df que son puntos de la grilla"""
+        return (df['pv_ratio'].isin(self.pv_ratios).to_numpy() &
+                df['bess_hours'].isin(self.bess_hours).to_numpy() &
+                df['q_ratio'].isin(self.q_ratios).to_numpy())
+
+
+def _json_value(value):
+    """Valor serializable y estable para la huella"""
+    if isinstance(value, (np.integer, np.floating)):
+        value = value.item()
+    if isinstance(value, float):
+        return None if np.isnan(value) else round(value, 12)
+    return value if isinstance(value, (int, str, bool)) or value is None else str(value)
+
+
+def surface_fingerprint(cluster_data: Mapping, economic_params: Mapping,
+                        network_params: Mapping) -> str:
+    """
+    Huella de todo lo que determina la superficie de un cluster (salvo la grilla).
+
+    Args:
+        cluster_data: Datos del cluster
+        economic_params: Parámetros económicos (EconomicParams o dict)
+        network_params: Parámetros técnicos de red
+
+    Returns:
+        Hash SHA-256 hexadecimal
+    """
+    payload = {
+        'version': SURFACE_MODEL_VERSION,
+        'cluster': {str(k): _json_value(v) for k, v in cluster_data.items()},
+        'economic': {str(k): _json_value(v) for k, v in economic_params.items()},
+        'network': {str(k): _json_value(v) for k, v in network_params.items()},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def evaluate_surface(cash_flow_calc, network_calc, cluster_data: Mapping,
+                     configurations: pd.DataFrame, capex_fn: Callable,
+                     chunk_size: int = 50000) -> pd.DataFrame:
+    """
+    Evalúa flujos, métricas y beneficios de red de N configuraciones.
+
+    Args:
+        cash_flow_calc: IntegratedCashFlowCalculator
+        network_calc: NetworkBenefitsCalculator
+        cluster_data: Datos del cluster
+        configurations: DataFrame con pv_ratio, bess_hours y q_ratio
+        capex_fn: Función (pv_mw, bess_mwh, q_night_mvar) -> dict de CAPEX
+            por componente (acepta arrays)
+        chunk_size: Configuraciones por bloque (acota la memoria N × años)
+
+    Returns:
+        DataFrame con SURFACE_COLUMNS, en el orden de configurations
+    """
+    cluster_dict = dict(cluster_data)
+    peak_demand_mw = cluster_dict['peak_demand_mw']
+    blocks = []
+
+    for start in range(0, len(configurations), chunk_size):
+        chunk = configurations.iloc[start:start + chunk_size]
+        pv_ratio = chunk['pv_ratio'].to_numpy(dtype=float)
+        bess_hours = chunk['bess_hours'].to_numpy(dtype=float)
+        q_ratio = chunk['q_ratio'].to_numpy(dtype=float)
+
+        pv_mw = peak_demand_mw * pv_ratio
+        bess_mwh = peak_demand_mw * bess_hours
+        q_night_mvar = pv_mw * q_ratio
+
+        capex = capex_fn(pv_mw, bess_mwh, q_night_mvar)
+        cash_flows = cash_flow_calc.calculate_integrated_flows_batch(
+            cluster_dict, pv_mw, bess_mwh, q_night_mvar, capex
+        )
+        metrics = cash_flow_calc.calculate_financial_metrics_batch(cash_flows, capex['total'])
+        network = network_calc.calculate_benefit_values_batch(
+            cluster_dict, pv_mw, bess_mwh, q_night_mvar
+        )
+
+        pv_flow_sum = cash_flows.pv_flow.sum(axis=1)
+        network_flow_sum = cash_flows.network_flow.sum(axis=1)
+        total_flow_sum = cash_flows.total_flow.sum(axis=1)
+        n_years = len(cash_flows.years)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            network_benefit_ratio = np.where(total_flow_sum > 0,
+                                             network_flow_sum / total_flow_sum, 0.0)
+
+        blocks.append(pd.DataFrame({
+            'pv_mw': pv_mw,
+            'pv_ratio': pv_ratio,
+            'bess_mwh': bess_mwh,
+            'bess_hours': bess_hours,
+            'q_night_mvar': q_night_mvar,
+            'q_ratio': q_ratio,
+            'capex_musd': np.broadcast_to(capex['total'], pv_mw.shape) / 1e6,
+            'npv_musd': metrics['npv_usd'] / 1e6,
+            'irr_percent': metrics['irr_percent'],
+            'payback_years': metrics['payback_years'],
+            'bc_ratio': metrics['bc_ratio'],
+            'lcoe_usd_mwh': metrics['lcoe_usd_mwh'],
+            'avg_pv_flow_musd': pv_flow_sum / n_years / 1e6,
+            'avg_network_flow_musd': network_flow_sum / n_years / 1e6,
+            'avg_total_flow_musd': total_flow_sum / n_years / 1e6,
+            'loss_reduction_musd': network['loss_reduction'] / 1e6,
+            'voltage_support_musd': network['voltage_support'] / 1e6,
+            'deferral_musd': network['investment_deferral'] / 1e6,
+            'network_benefit_ratio': network_benefit_ratio,
+        }))
+
+    if not blocks:
+        return pd.DataFrame(columns=SURFACE_COLUMNS, dtype=float)
+    return pd.concat(blocks, ignore_index=True)
+
+
+class ValueSurfaceStore:
+    """
+    Dataset Parquet de superficies de valor, particionado por cluster_id,
+    con recálculo incremental.
+    """
+
+    def __init__(self, root: Path, cash_flow_calc=None, network_calc=None,
+                 capex_fn: Optional[Callable] = None, chunk_size: int = 50000):
+        """
+        Inicializa el almacén.
+
+        Args:
+            root: Directorio del dataset
+            cash_flow_calc: IntegratedCashFlowCalculator (define los parámetros económicos)
+            network_calc: NetworkBenefitsCalculator
+            capex_fn: Función de CAPEX por componente (acepta arrays)
+            chunk_size: Configuraciones por bloque de evaluación y por row group
+
+        Sin calculadores el almacén es de solo lectura (p.ej. el dashboard).
+        """
+        self.root = Path(root)
+        self.cash_flow_calc = cash_flow_calc
+        self.network_calc = network_calc
+        self.capex_fn = capex_fn
+        self.chunk_size = int(chunk_size)
+        self._manifest_mtime = None
+        self._manifest = self._load_manifest()
+
+    # --------------------- manifiesto ---------------------
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        manifest_file = self.root / MANIFEST_FILE
+        if manifest_file.exists():
+            self._manifest_mtime = manifest_file.stat().st_mtime
+            try:
+                with open(manifest_file, 'r', encoding='utf-8') as f:
+                    return json.load(f).get('clusters', {})
+            except (OSError, ValueError) as e:
+                logger.warning(f"Manifiesto ilegible ({e}); se recalculan todas las superficies")
+        return {}
+
+    def _save_manifest(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.root / f'.{MANIFEST_FILE}.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'model_version': SURFACE_MODEL_VERSION, 'clusters': self._manifest}, f, indent=2)
+        tmp_file.replace(self.root / MANIFEST_FILE)
+        self._manifest_mtime = (self.root / MANIFEST_FILE).stat().st_mtime
+
+    def refresh(self) -> bool:
+        """Relee el manifiesto si otro proceso actualizó el dataset"""
+        manifest_file = self.root / MANIFEST_FILE
+        mtime = manifest_file.stat().st_mtime if manifest_file.exists() else None
+        if mtime == self._manifest_mtime:
+            return False
+        self._manifest_mtime = None
+        self._manifest = self._load_manifest()
+        return True
+
+    def _partition_file(self, cluster_id) -> Path:
+        return self.root / f'cluster_id={cluster_id}' / PARTITION_FILE
+
+    def _write_partition(self, cluster_id, df: pd.DataFrame):
+        """Escritura atómica de la partición de un cluster"""
+        path = self._partition_file(cluster_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = path.parent / f'.{PARTITION_FILE}.tmp'
+        df[SURFACE_COLUMNS].to_parquet(tmp_file, index=False, row_group_size=self.chunk_size)
+        tmp_file.replace(path)
+
+    @property
+    def cluster_ids(self) -> List[str]:
+        return list(self._manifest)
+
+    def fingerprint(self, cluster_data: Mapping) -> str:
+        return surface_fingerprint(cluster_data, self.cash_flow_calc.params, self.network_calc.params)
+
+    # --------------------- actualización ---------------------
+
+    def update(self, clusters_df: pd.DataFrame, grid: SurfaceGrid,
+               force: bool = False) -> Dict[str, int]:
+        """
+        Asegura que el dataset cubre la grilla para todos los clusters.
+
+        Args:
+            clusters_df: Datos de clusters (una fila por cluster)
+            grid: Grilla a cubrir
+            force: Recalcular todo aunque las huellas coincidan
+
+        Returns:
+            Configuraciones evaluadas por cluster (0 = ya estaba al día)
+        """
+        if self.cash_flow_calc is None or self.network_calc is None or self.capex_fn is None:
+            raise ValueError("ValueSurfaceStore de solo lectura: faltan los calculadores")
+
+        evaluated = {}
+        grid_points = grid.points()
+
+        for _, cluster in clusters_df.iterrows():
+            cluster_id = str(cluster['cluster_id'])
+            fingerprint = self.fingerprint(cluster.to_dict())
+            entry = self._manifest.get(cluster_id)
+            path = self._partition_file(cluster_id)
+
+            if force or entry is None or entry['fingerprint'] != fingerprint or not path.exists():
+                # Cluster nuevo o modificado: grilla completa
+                stored = None
+                missing = grid_points
+            else:
+                # Mismo cluster y parámetros: solo los puntos que faltan
+                stored = pd.read_parquet(path)
+                known = pd.MultiIndex.from_frame(stored[GRID_COLUMNS])
+                missing = grid_points[~pd.MultiIndex.from_frame(grid_points).isin(known)]
+
+            evaluated[cluster_id] = len(missing)
+            if missing.empty:
+                continue
+
+            new_rows = evaluate_surface(self.cash_flow_calc, self.network_calc, cluster,
+                                        missing, self.capex_fn, self.chunk_size)
+            if stored is not None:
+                new_rows = pd.concat([stored, new_rows], ignore_index=True)
+            new_rows = new_rows.sort_values(GRID_COLUMNS, ignore_index=True)
+
+            self._write_partition(cluster_id, new_rows)
+            self._manifest[cluster_id] = {
+                'cluster_id': _json_value(cluster['cluster_id']),
+                'fingerprint': fingerprint,
+                'configurations': len(new_rows),
+                'updated': datetime.now().isoformat()
+            }
+            logger.info(f"Superficie cluster {cluster_id}: {len(missing)} configuraciones evaluadas "
+                        f"({len(new_rows)} en el dataset)")
+
+        # Clusters que ya no existen
+        current = {str(cid) for cid in clusters_df['cluster_id']}
+        for cluster_id in [cid for cid in self._manifest if cid not in current]:
+            path = self._partition_file(cluster_id)
+            path.unlink(missing_ok=True)
+            if path.parent.exists() and not any(path.parent.iterdir()):
+                path.parent.rmdir()
+            del self._manifest[cluster_id]
+
+        self._save_manifest()
+        return evaluated
+
+    # --------------------- lectura ---------------------
+
+    def load(self, cluster_ids: Optional[Iterable] = None,
+             columns: Optional[List[str]] = None,
+             grid: Optional[SurfaceGrid] = None) -> pd.DataFrame:
+        """
+        Lee superficies del dataset.
+
+        Args:
+            cluster_ids: Clusters a leer (None = todos)
+            columns: Columnas a leer (proyección; None = todas)
+            grid: Si se indica, solo los puntos de esa grilla
+
+        Returns:
+            DataFrame con cluster_id + columnas pedidas, ordenado por cluster y grilla
+        """
+        self.refresh()
+        ids = self.cluster_ids if cluster_ids is None else [str(cid) for cid in cluster_ids]
+        read_columns = None
+        if columns is not None:
+            read_columns = list(dict.fromkeys(
+                [c for c in columns if c != 'cluster_id'] + (GRID_COLUMNS if grid else [])
+            ))
+
+        frames = []
+        for cluster_id in ids:
+            path = self._partition_file(cluster_id)
+            if cluster_id not in self._manifest or not path.exists():
+                continue
+            df = pd.read_parquet(path, columns=read_columns)
+            if grid is not None:
+                df = df[grid.contains(df)]
+            # Tipo original del identificador (el directorio solo guarda el texto)
+            df.insert(0, 'cluster_id', self._manifest[cluster_id].get('cluster_id', cluster_id))
+            frames.append(df)
+
+        if not frames:
+            return pd.DataFrame(columns=['cluster_id'] + (columns or SURFACE_COLUMNS))
+
+        df = pd.concat(frames, ignore_index=True)
+        if columns is not None:
+            df = df[['cluster_id'] + [c for c in columns if c != 'cluster_id']]
+        return df
@@ -0,0 +1,45 @@
+"""
+Acceso a Columnas para las Features por Columna
+===============================================
+Los scripts 06 y 07 calculan sus features sobre columnas completas en
+lugar de fila a fila; column reproduce la semántica de row[name] y
+row.get(name, default) devolviendo un array del largo del DataFrame.
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+import numpy as np
+import pandas as pd
+
+REQUIRED = object()
+
+
+def column(df: pd.DataFrame, name: str, default=REQUIRED) -> np.ndarray:
+    """
+    Columna como array (equivalente a row[name] / row.get(name, default)).
+
+    Si la columna está repetida (p. ej. un feature recalculado concatenado
+    junto al original antes de guardar) se usa la última, la calculada más
+    tarde.
+
+    Args:
+        df: Datos de transformadores
+        name: Nombre de la columna
+        default: Valor para todas las filas si la columna no existe; sin
+            default una columna faltante es un error
+
+    Returns:
+        Array con los valores de la columna
+
+    Raises:
+        KeyError: Si la columna no existe y no hay default
+    """
+    if name not in df.columns:
+        if default is REQUIRED:
+            raise KeyError(name)
+        return np.full(len(df), default, dtype=object if isinstance(default, str) else None)
+    values = df[name]
+    if isinstance(values, pd.DataFrame):
+        values = values.iloc[:, -1]
+    return values.to_numpy()
@@ -0,0 +1,285 @@
+"""
+Ejecución Paralela por Alimentador
+==================================
+Los scripts de análisis de red (04, 05 y 07) procesan cada alimentador de
+forma independiente. Este módulo reparte los grupos de `Alimentador` en un
+pool de procesos:
+
+- Despacho de mayor a menor cantidad de transformadores (balance de carga)
+- Resultados devueltos en el orden de aparición de los alimentadores en los
+  datos, sin importar el orden en que terminan
+- Un alimentador que falla queda registrado con su traceback y no aborta la
+  corrida
+- workers=1 ejecuta en el mismo proceso (útil para depurar)
+- Con un FeederCache, los alimentadores cuyos datos y código no cambiaron
+  reutilizan el resultado de la corrida anterior; solo se recalculan las
+  particiones afectadas
+
+La función de trabajo debe ser de nivel módulo (picklable) y recibir
+(nombre_alimentador, df_alimentador).
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+import argparse
+import functools
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FEEDER_COLUMN = 'Alimentador'
+
+
+@dataclass
+class FeederResult:
+    """Resultado del procesamiento de un alimentador"""
+    feeder: Any
+    n_rows: int
+    result: Any = None
+    error: Optional[str] = None
+    elapsed_s: float = 0.0
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def default_workers() -> int:
+    """Un proceso por núcleo disponible"""
+    return os.cpu_count() or 1
+
+
+def add_runner_arguments(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    """Agrega --workers y --feeder-cache a la línea de comandos de un script por alimentador"""
+    parser.add_argument(
+        '--workers', type=int, default=default_workers(),
+        help='Procesos para el análisis por alimentador (1 = secuencial, '
+             'por defecto un proceso por núcleo)'
+    )
+    parser.add_argument(
+        '--feeder-cache', type=Path, default=None,
+        help='Directorio de resultados por alimentador: solo se recalculan '
+             'los alimentadores cuyos datos o código cambiaron'
+    )
+    return parser
+
+
+def _normalize(value):
+    """Representación estable de un argumento (los sets no tienen orden fijo)"""
+    if isinstance(value, (set, frozenset)):
+        return sorted(repr(_normalize(v)) for v in value)
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return sorted((repr(k), _normalize(v)) for k, v in value.items())
+    return repr(value)
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """Hash del contenido de un DataFrame (columnas, tipos y valores, sin índice)"""
+    h = hashlib.sha256()
+    h.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+@dataclass
+class FeederCache:
+    """
+    Resultados de run_feeders guardados por alimentador.
+
+    La clave de cada alimentador combina el contenido de sus filas, la
+    función con sus argumentos fijos (functools.partial) y el código fuente
+    del script y de los módulos de src/ cargados; un cambio en cualquiera
+    de ellos invalida la entrada.
+    """
+    directory: Path
+    hits: int = 0
+    misses: int = 0
+    _used: set = field(default_factory=set, repr=False)
+
+    def __post_init__(self):
+        self.directory = Path(self.directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def code_digest(func: Callable) -> str:
+        """Función (nombre y argumentos fijos) + código fuente del proyecto"""
+        h = hashlib.sha256()
+        args, keywords = (), {}
+        while isinstance(func, functools.partial):
+            args, keywords = func.args + args, {**func.keywords, **keywords}
+            func = func.func
+        h.update(f"{func.__module__}.{func.__qualname__}".encode())
+        h.update(repr((_normalize(args), _normalize(keywords))).encode())
+
+        src_dir = Path(__file__).resolve().parent.parent
+        sources = {Path(m.__file__).resolve() for m in list(sys.modules.values())
+                   if getattr(m, '__file__', None) and Path(m.__file__).resolve().is_relative_to(src_dir)}
+        module_file = getattr(sys.modules.get(func.__module__), '__file__', None)
+        if module_file:
+            sources.add(Path(module_file).resolve())
+        for path in sorted(sources):
+            h.update(str(path.name).encode())
+            h.update(path.read_bytes())
+        return h.hexdigest()
+
+    def key(self, code: str, feeder, df_feeder: pd.DataFrame) -> str:
+        h = hashlib.sha256(code.encode())
+        h.update(repr(feeder).encode())
+        h.update(frame_digest(df_feeder).encode())
+        return h.hexdigest()[:32]
+
+    def load(self, key: str) -> Optional['FeederResult']:
+        path = self.directory / f"{key}.pkl"
+        self._used.add(key)
+        if not path.exists():
+            self.misses += 1
+            return None
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+        except Exception:
+            logger.warning(f"Entrada de caché ilegible, se recalcula: {path.name}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        result.cached = True
+        return result
+
+    def store(self, key: str, result: 'FeederResult'):
+        # Escritura atómica: un proceso interrumpido no deja entradas truncadas
+        tmp = self.directory / f"{key}.pkl.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.directory / f"{key}.pkl")
+
+    def prune(self) -> int:
+        """Borra las entradas que la última corrida no usó (alimentadores que cambiaron)"""
+        removed = 0
+        for path in self.directory.glob("*.pkl"):
+            if path.stem not in self._used:
+                path.unlink()
+                removed += 1
+        return removed
+
+
+def _run_feeder(func: Callable, feeder, df_feeder: pd.DataFrame) -> FeederResult:
+    """Ejecuta func sobre un alimentador capturando cualquier error"""
+    start = time.perf_counter()
+    try:
+        result = func(feeder, df_feeder)
+        error = None
+    except Exception:
+        result = None
+        error = traceback.format_exc()
+    return FeederResult(feeder=feeder, n_rows=len(df_feeder), result=result,
+                        error=error, elapsed_s=time.perf_counter() - start)
+
+
+def run_feeders(func: Callable, df: pd.DataFrame, workers: int = 1,
+                group_col: str = FEEDER_COLUMN, min_rows: int = 1,
+                cache: Optional[FeederCache] = None) -> List[FeederResult]:
+    """
+    Aplica func(alimentador, df_alimentador) a cada grupo de df.
+
+    Args:
+        func: Función de nivel módulo a ejecutar por alimentador
+        df: Datos de todos los alimentadores
+        workers: Procesos del pool (<= 1 ejecuta en el proceso actual)
+        group_col: Columna que define los grupos
+        min_rows: Los alimentadores con menos filas no se procesan
+        cache: Caché por alimentador (opcional); los fallidos no se guardan
+
+    Returns:
+        Lista de FeederResult en el orden de aparición de los alimentadores
+    """
+    groups = [(feeder, df_feeder) for feeder, df_feeder
+              in df.groupby(group_col, sort=False, dropna=False)
+              if len(df_feeder) >= min_rows]
+    if not groups:
+        return []
+
+    results: List[Optional[FeederResult]] = [None] * len(groups)
+    keys: List[Optional[str]] = [None] * len(groups)
+    if cache is not None:
+        code = cache.code_digest(func)
+        for i, (feeder, df_feeder) in enumerate(groups):
+            keys[i] = cache.key(code, feeder, df_feeder)
+            results[i] = cache.load(keys[i])
+            # La clave no incluye el índice: un DataFrame por fila toma el índice actual
+            cached = results[i].result if results[i] is not None else None
+            if isinstance(cached, pd.DataFrame) and len(cached) == len(df_feeder):
+                cached.index = df_feeder.index
+    pending = [i for i in range(len(groups)) if results[i] is None]
+
+    # Mayor a menor: los alimentadores grandes no quedan para el final
+    dispatch = sorted(pending, key=lambda i: len(groups[i][1]), reverse=True)
+
+    workers = min(workers or 1, max(len(dispatch), 1))
+    if workers <= 1:
+        for i in dispatch:
+            results[i] = _run_feeder(func, *groups[i])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(_run_feeder, func, *groups[i]): i for i in dispatch}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception:
+                    # El proceso murió o el resultado no se pudo transferir
+                    feeder, df_feeder = groups[i]
+                    results[i] = FeederResult(feeder=feeder, n_rows=len(df_feeder),
+                                              error=traceback.format_exc())
+
+    for result in results:
+        if not result.ok:
+            logger.error(f"Alimentador {result.feeder} falló:\n{result.error}")
+    if cache is not None:
+        for i in dispatch:
+            if results[i].ok:
+                cache.store(keys[i], results[i])
+        cache.prune()
+    return results
+
+
+def execution_summary(results: List[FeederResult], workers: int,
+                      elapsed_s: Optional[float] = None) -> Dict:
+    """
+    Resumen de ejecución para los reportes JSON de los scripts.
+
+    Args:
+        results: Resultados de run_feeders
+        workers: Procesos utilizados
+        elapsed_s: Tiempo total de pared (opcional)
+
+    Returns:
+        Diccionario con alimentadores procesados, fallidos y tiempos
+    """
+    failed = [r for r in results if not r.ok]
+    slowest = sorted(results, key=lambda r: r.elapsed_s, reverse=True)[:5]
+    summary = {
+        'workers': workers,
+        'alimentadores_procesados': len(results) - len(failed),
+        'alimentadores_desde_cache': sum(r.cached for r in results),
+        'alimentadores_fallidos': {str(r.feeder): r.error.strip().splitlines()[-1] for r in failed},
+        'tiempo_cpu_s': round(sum(r.elapsed_s for r in results if not r.cached), 3),
+        'alimentadores_mas_lentos': {str(r.feeder): round(r.elapsed_s, 3) for r in slowest}
+    }
+    if elapsed_s is not None:
+        summary['tiempo_total_s'] = round(elapsed_s, 3)
+    return summary
@@ -0,0 +1,268 @@
+"""
+Flujo de Carga Radial (Barrido Backward/Forward)
+================================================
+Resuelve el flujo de potencia trifásico balanceado de un alimentador radial
+(MST reconstruido en el script 04) con el método de barrido:
+
+- Backward: corriente de cada tramo = suma de las corrientes de carga de su
+  subárbol, J = BIBC · I
+- Forward: tensión de cada nodo = tensión de la fuente menos las caídas de
+  todos los tramos del camino, V = V0 - BIBCᵀ · (Z · J)
+
+BIBC (Branch Injection to Branch Current) es la matriz dispersa de
+ancestros del árbol: BIBC[k, j] = 1 si el nodo j cuelga del tramo que llega
+a k. Se arma una sola vez por red a partir del array de padres, de modo que
+cada iteración son dos productos matriz dispersa-matriz densa.
+
+Los escenarios de carga/GD se resuelven juntos en un lote: p_kw y q_kvar
+de forma (S, n) dan tensiones, corrientes y pérdidas (S, n). Las cargas son
+de potencia constante (kW, kvar trifásicos; valores negativos = inyección
+de GD o compensación reactiva).
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+from dataclasses import dataclass, field
+import numpy as np
+from scipy import sparse
+
+from .mst_topology import NO_PARENT
+
+DEFAULT_TOLERANCE_PU = 1e-6
+DEFAULT_MAX_ITER = 30
+
+
+def ancestor_matrix(parent: np.ndarray) -> sparse.csr_matrix:
+    """
+    Matriz BIBC de un bosque radial.
+
+    Args:
+        parent: Índice del padre de cada nodo (NO_PARENT en las fuentes)
+
+    Returns:
+        Matriz dispersa (n, n) con 1 en [k, j] si k es j o un ancestro de j
+        con tramo propio (las fuentes no tienen tramo y quedan en cero)
+    """
+    parent = np.asarray(parent, dtype=np.int64)
+    n = len(parent)
+
+    # Subir todos los nodos un nivel por vez hasta llegar a una fuente
+    rows, cols = [], []
+    cur = np.flatnonzero(parent != NO_PARENT)
+    col = cur.copy()
+    for _ in range(n):
+        if len(cur) == 0:
+            break
+        rows.append(cur)
+        cols.append(col)
+        up = parent[cur]
+        keep = parent[up] != NO_PARENT
+        cur, col = up[keep], col[keep]
+    else:
+        if len(cur):
+            raise ValueError("El array de padres tiene ciclos")
+
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+    cols = np.concatenate(cols) if cols else np.empty(0, dtype=np.int64)
+    return sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+
+
+@dataclass
+class RadialNetwork:
+    """Alimentador radial: array de padres e impedancia del tramo padre -> nodo"""
+    parent: np.ndarray
+    r_ohm: np.ndarray
+    x_ohm: np.ndarray
+    v_nominal_kv: float = 13.2
+    bibc: sparse.csr_matrix = field(init=False, repr=False)
+    bibc_t: sparse.csr_matrix = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.parent = np.asarray(self.parent, dtype=np.int64)
+        is_source = self.parent == NO_PARENT
+        self.r_ohm = np.where(is_source, 0.0, np.asarray(self.r_ohm, dtype=float))
+        self.x_ohm = np.where(is_source, 0.0, np.asarray(self.x_ohm, dtype=float))
+        self.bibc = ancestor_matrix(self.parent)
+        self.bibc_t = self.bibc.T.tocsr()
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.parent)
+
+    @property
+    def z_ohm(self) -> np.ndarray:
+        return self.r_ohm + 1j * self.x_ohm
+
+    @classmethod
+    def uniform_line(cls, n_sections: int, length_km: float, r_ohm_km: float,
+                     x_ohm_km: float, v_nominal_kv: float = 13.2) -> 'RadialNetwork':
+        """
+        Alimentador equivalente: línea de n_sections tramos iguales.
+
+        Args:
+            n_sections: Tramos de la línea (nodos de carga)
+            length_km: Longitud total
+            r_ohm_km, x_ohm_km: Impedancia del conductor
+            v_nominal_kv: Tensión nominal línea-línea
+
+        Returns:
+            RadialNetwork con el nodo 0 como cabecera (subestación)
+        """
+        parent = np.arange(-1, n_sections)
+        parent[0] = NO_PARENT
+        section_km = length_km / n_sections
+        r = np.r_[0.0, np.full(n_sections, r_ohm_km * section_km)]
+        x = np.r_[0.0, np.full(n_sections, x_ohm_km * section_km)]
+        return cls(parent, r, x, v_nominal_kv)
+
+
+@dataclass
+class LoadFlowResult:
+    """Resultado del flujo de carga, una fila por escenario (load_kw = carga neta de GD)"""
+    voltage_pu: np.ndarray
+    voltage_angle_deg: np.ndarray
+    current_a: np.ndarray
+    segment_losses_kw: np.ndarray
+    losses_kw: np.ndarray
+    load_kw: np.ndarray
+    iterations: int
+    converged: np.ndarray
+
+    @property
+    def min_voltage_pu(self) -> np.ndarray:
+        return self.voltage_pu.min(axis=-1)
+
+    @property
+    def substation_kw(self) -> np.ndarray:
+        """Potencia activa entregada por la(s) fuente(s)"""
+        return self.load_kw + self.losses_kw
+
+    @property
+    def loss_percent(self) -> np.ndarray:
+        """Pérdidas como % de la potencia entregada por la fuente"""
+        supplied = self.substation_kw
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(supplied > 0, self.losses_kw / supplied * 100, 0.0)
+
+
+def solve_load_flow(network: RadialNetwork, p_kw, q_kvar=None, v_source_pu: float = 1.0,
+                    tol: float = DEFAULT_TOLERANCE_PU,
+                    max_iter: int = DEFAULT_MAX_ITER) -> LoadFlowResult:
+    """
+    Flujo de carga por barrido backward/forward, en lote sobre escenarios.
+
+    Args:
+        network: Red radial
+        p_kw: Potencia activa por nodo, (n,) o (S, n) para S escenarios
+        q_kvar: Potencia reactiva por nodo (misma forma, 0 si se omite)
+        v_source_pu: Tensión en las fuentes (cabecera)
+        tol: Cambio máximo de tensión entre iteraciones para converger (pu)
+        max_iter: Iteraciones máximas
+
+    Returns:
+        LoadFlowResult con la forma de entrada: tensión (pu y ángulo) por
+        nodo, corriente (A) y pérdidas (kW) del tramo que llega a cada nodo,
+        pérdidas y carga totales por escenario
+    """
+    p_kw = np.asarray(p_kw, dtype=float)
+    single = p_kw.ndim == 1
+    p = np.atleast_2d(p_kw)
+    q = np.zeros_like(p) if q_kvar is None else np.broadcast_to(np.atleast_2d(np.asarray(q_kvar, dtype=float)), p.shape)
+    if p.shape[1] != network.n_nodes:
+        raise ValueError(f"Se esperaban {network.n_nodes} nodos, llegaron {p.shape[1]}")
+
+    # Nodos en filas, escenarios en columnas; potencia por fase en VA
+    s_phase = (p + 1j * q).T * 1000 / 3
+    v_base = network.v_nominal_kv * 1000 / np.sqrt(3)
+    v_source = v_source_pu * v_base
+    z = network.z_ohm[:, None]
+    bibc, bibc_t = network.bibc, network.bibc_t
+
+    # Solo se siguen iterando los escenarios que no convergieron
+    v = np.full(s_phase.shape, v_source, dtype=complex)
+    converged = np.zeros(s_phase.shape[1], dtype=bool)
+    active = np.arange(s_phase.shape[1])
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        current_inj = np.conj(s_phase[:, active] / v[:, active])
+        branch = bibc @ current_inj
+        v_new = v_source - bibc_t @ (z * branch)
+        change = np.abs(v_new - v[:, active]).max(axis=0, initial=0.0) / v_base
+        v[:, active] = v_new
+        done = change < tol
+        converged[active[done]] = True
+        active = active[~done]
+        if len(active) == 0:
+            break
+
+    # Corriente final consistente con las tensiones devueltas
+    branch = bibc @ np.conj(s_phase / v)
+    current = np.abs(branch)
+    segment_losses = 3 * current ** 2 * network.r_ohm[:, None] / 1000
+
+    result = LoadFlowResult(
+        voltage_pu=(np.abs(v) / v_base).T,
+        voltage_angle_deg=np.degrees(np.angle(v)).T,
+        current_a=current.T,
+        segment_losses_kw=segment_losses.T,
+        losses_kw=segment_losses.sum(axis=0),
+        load_kw=p.sum(axis=1),
+        iterations=iterations,
+        converged=converged & np.isfinite(v).all(axis=0)
+    )
+    if single:
+        for name in ('voltage_pu', 'voltage_angle_deg', 'current_a', 'segment_losses_kw',
+                     'losses_kw', 'load_kw', 'converged'):
+            setattr(result, name, getattr(result, name)[0])
+    return result
+
+
+def equivalent_feeder_flow(load_mw, gd_mw=0.0, q_mvar=None, n_feeders: int = 1,
+                           power_factor: float = 0.9, length_km: float = 10.0,
+                           r_ohm_km: float = 0.3, x_ohm_km: float = 0.4,
+                           n_sections: int = 20, v_nominal_kv: float = 13.2,
+                           q_injection_mvar=0.0) -> LoadFlowResult:
+    """
+    Flujo de carga en alimentadores equivalentes con carga distribuida.
+
+    Representa una zona sin topología detallada como n_feeders líneas
+    uniformes iguales en paralelo, con la carga, la GD y la compensación
+    reactiva repartidas en partes iguales entre los tramos.
+
+    Args:
+        load_mw: Demanda activa total, escalar o (S,) por escenario
+        gd_mw: Generación distribuida total (misma forma o escalar)
+        q_mvar: Demanda reactiva total (si se omite sale de power_factor)
+        n_feeders: Alimentadores en paralelo que comparten la carga
+        power_factor: Factor de potencia de la demanda
+        length_km, r_ohm_km, x_ohm_km, n_sections, v_nominal_kv: Línea equivalente
+        q_injection_mvar: Inyección reactiva total (STATCOM / inversores)
+
+    Returns:
+        LoadFlowResult por alimentador equivalente; losses_kw y load_kw se
+        devuelven ya multiplicados por n_feeders (totales de la zona)
+    """
+    load = np.atleast_1d(np.asarray(load_mw, dtype=float))
+    if q_mvar is None:
+        q_mvar = load * np.tan(np.arccos(power_factor))
+    net_p = np.broadcast_to(load - np.asarray(gd_mw, dtype=float), load.shape)
+    net_q = np.broadcast_to(np.asarray(q_mvar, dtype=float) - np.asarray(q_injection_mvar, dtype=float),
+                            load.shape)
+
+    network = RadialNetwork.uniform_line(n_sections, length_km, r_ohm_km, x_ohm_km, v_nominal_kv)
+    n_feeders = max(int(n_feeders), 1)
+    per_node = 1000 / (n_feeders * n_sections)
+    p = np.zeros((len(load), network.n_nodes))
+    q = np.zeros_like(p)
+    p[:, 1:] = (net_p * per_node)[:, None]
+    q[:, 1:] = (net_q * per_node)[:, None]
+
+    result = solve_load_flow(network, p, q)
+    result.losses_kw = result.losses_kw * n_feeders
+    result.load_kw = result.load_kw * n_feeders
+    if np.ndim(load_mw) == 0:
+        for name in ('voltage_pu', 'voltage_angle_deg', 'current_a', 'segment_losses_kw',
+                     'losses_kw', 'load_kw', 'converged'):
+            setattr(result, name, getattr(result, name)[0])
+    return result
@@ -0,0 +1,231 @@
+"""
+Reconstrucción Rápida de Topología MST por Alimentador
+=====================================================
+Backend del script 04 (04_mst_topology_reconstruction): calcula el árbol
+de expansión mínima (MST) de un alimentador sin la matriz de distancias en
+bucles Python ni el grafo completo de NetworkX.
+
+1. Aristas candidatas con distancia haversine vectorizada:
+   - Alimentadores chicos: todos los pares (mismo MST que el grafo completo).
+   - Alimentadores grandes: triangulación de Delaunay + k vecinos más
+     cercanos sobre coordenadas proyectadas (el MST euclídeo está contenido
+     en la triangulación de Delaunay).
+2. MST con scipy.sparse.csgraph.minimum_spanning_tree.
+3. Orientación desde la subestación (nodo 0) con BFS sobre arrays.
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+from dataclasses import dataclass
+from typing import Sequence, Tuple
+import numpy as np
+import networkx as nx
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import breadth_first_order, connected_components, minimum_spanning_tree
+from scipy.spatial import Delaunay, cKDTree
+
+EARTH_RADIUS_KM = 6371
+
+# Hasta este tamaño se usan todos los pares (n² / 2 aristas)
+DENSE_MAX_NODES = 1500
+
+# Vecinos por nodo que se agregan a la triangulación (robustez frente a
+# puntos colineales, duplicados y la distorsión de la proyección)
+K_NEIGHBORS = 8
+
+ROOT = 0
+NO_PARENT = -1
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Distancia haversine en km, elemento a elemento.
+
+    Args:
+        lat1, lon1: Latitudes y longitudes de origen (grados)
+        lat2, lon2: Latitudes y longitudes de destino (grados)
+
+    Returns:
+        Array de distancias en km
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
+    return EARTH_RADIUS_KM * 2 * np.arcsin(np.sqrt(a))
+
+
+def project_km(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Proyección equirectangular local (km) centrada en la latitud media"""
+    lat0 = np.radians(np.mean(lat))
+    return np.column_stack([
+        np.radians(lon) * np.cos(lat0) * EARTH_RADIUS_KM,
+        np.radians(lat) * EARTH_RADIUS_KM
+    ])
+
+
+def _sparse_candidate_pairs(xy: np.ndarray, k_neighbors: int) -> np.ndarray:
+    """Pares (i < j) de Delaunay + kNN, sin repetir"""
+    n = len(xy)
+    k = min(k_neighbors + 1, n)
+    _, neighbors = cKDTree(xy).query(xy, k=k)
+    pairs = [np.column_stack([np.repeat(np.arange(n), k - 1), neighbors[:, 1:].ravel()])]
+
+    try:
+        simplices = Delaunay(xy).simplices
+        pairs.append(simplices[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2))
+    except Exception:
+        # Puntos colineales o degenerados: alcanza con los vecinos
+        pass
+
+    pairs = np.sort(np.vstack(pairs), axis=1)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    return np.unique(pairs, axis=0)
+
+
+def _connect_components(xy: np.ndarray, i: np.ndarray, j: np.ndarray,
+                        weight: np.ndarray, lat: np.ndarray, lon: np.ndarray):
+    """Agrega la arista más corta entre cada componente y el resto hasta conectar el grafo"""
+    n = len(xy)
+    while True:
+        graph = coo_matrix((weight, (i, j)), shape=(n, n))
+        n_components, labels = connected_components(graph, directed=False)
+        if n_components == 1:
+            return i, j, weight
+
+        new_i, new_j = [], []
+        for component in range(n_components):
+            inside = np.flatnonzero(labels == component)
+            outside = np.flatnonzero(labels != component)
+            dist, nearest = cKDTree(xy[outside]).query(xy[inside])
+            best = np.argmin(dist)
+            new_i.append(inside[best])
+            new_j.append(outside[nearest[best]])
+
+        new_i, new_j = np.array(new_i), np.array(new_j)
+        new_weight = haversine_km(lat[new_i], lon[new_i], lat[new_j], lon[new_j])
+        # Coordenadas idénticas: distancia mínima positiva para que sea arista
+        new_weight = np.maximum(new_weight, np.finfo(float).tiny)
+        i = np.concatenate([i, new_i])
+        j = np.concatenate([j, new_j])
+        weight = np.concatenate([weight, new_weight])
+
+
+def candidate_edges(lat: np.ndarray, lon: np.ndarray,
+                    dense_max_nodes: int = DENSE_MAX_NODES,
+                    k_neighbors: int = K_NEIGHBORS) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Aristas candidatas del MST con su distancia haversine.
+
+    Como en el grafo completo original, los pares a distancia 0 (coordenadas
+    repetidas) no son aristas.
+
+    Args:
+        lat: Latitudes (grados)
+        lon: Longitudes (grados)
+        dense_max_nodes: Tamaño máximo para usar todos los pares
+        k_neighbors: Vecinos por nodo en el grafo disperso
+
+    Returns:
+        (i, j, distancia_km) con i < j
+    """
+    n = len(lat)
+    if n <= dense_max_nodes:
+        i, j = np.triu_indices(n, k=1)
+        xy = None
+    else:
+        xy = project_km(lat, lon)
+        i, j = _sparse_candidate_pairs(xy, k_neighbors).T
+
+    weight = haversine_km(lat[i], lon[i], lat[j], lon[j])
+    keep = weight > 0
+    i, j, weight = i[keep], j[keep], weight[keep]
+
+    if xy is not None:
+        i, j, weight = _connect_components(xy, i, j, weight, lat, lon)
+    return i, j, weight
+
+
+@dataclass
+class MSTArrays:
+    """MST orientado desde la raíz, como arrays indexados por nodo"""
+    parent: np.ndarray   # Índice del padre (NO_PARENT en la raíz y nodos no alcanzados)
+    weight: np.ndarray   # Distancia al padre en km (NaN sin padre)
+    order: np.ndarray    # Nodos alcanzados en orden BFS desde la raíz
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.parent)
+
+    @property
+    def n_edges(self) -> int:
+        return int(np.count_nonzero(self.parent != NO_PARENT))
+
+
+def minimum_spanning_parents(lat: np.ndarray, lon: np.ndarray, root: int = ROOT,
+                             dense_max_nodes: int = DENSE_MAX_NODES,
+                             k_neighbors: int = K_NEIGHBORS) -> MSTArrays:
+    """
+    MST haversine de un conjunto de puntos, orientado desde root.
+
+    Args:
+        lat: Latitudes (grados)
+        lon: Longitudes (grados)
+        root: Índice del nodo raíz (subestación)
+        dense_max_nodes: Tamaño máximo para usar todos los pares
+        k_neighbors: Vecinos por nodo en el grafo disperso
+
+    Returns:
+        MSTArrays
+    """
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    n = len(lat)
+
+    i, j, weight = candidate_edges(lat, lon, dense_max_nodes, k_neighbors)
+    tree = minimum_spanning_tree(coo_matrix((weight, (i, j)), shape=(n, n)).tocsr())
+    tree = (tree + tree.T).tocsr()
+
+    order, predecessors = breadth_first_order(tree, root, directed=False,
+                                              return_predecessors=True)
+
+    parent = np.where(predecessors < 0, NO_PARENT, predecessors).astype(np.int64)
+    has_parent = parent != NO_PARENT
+    parent_weight = np.full(n, np.nan)
+    children = np.flatnonzero(has_parent)
+    parent_weight[children] = np.asarray(tree[parent[children], children]).ravel()
+
+    return MSTArrays(parent=parent, weight=parent_weight, order=order)
+
+
+def mst_to_digraph(node_ids: Sequence, mst: MSTArrays, x: Sequence[float],
+                   y: Sequence[float], potencia: Sequence[float],
+                   usuarios: Sequence[float]) -> nx.DiGraph:
+    """
+    DiGraph padre -> hijo con los atributos que usa el script 04.
+
+    Args:
+        node_ids: Identificadores de nodo (el índice 0 es la subestación)
+        mst: MST orientado
+        x, y: Coordenadas (longitud, latitud)
+        potencia: kVA por nodo
+        usuarios: Usuarios por nodo
+
+    Returns:
+        nx.DiGraph con nodos en el orden de node_ids
+    """
+    graph = nx.DiGraph()
+    graph.add_nodes_from(
+        (node, {'x': xi, 'y': yi, 'potencia': p, 'usuarios': u})
+        for node, xi, yi, p, u in zip(node_ids, x, y, potencia, usuarios)
+    )
+
+    children = mst.order[1:]
+    graph.add_weighted_edges_from(
+        (node_ids[p], node_ids[c], w)
+        for p, c, w in zip(mst.parent[children].tolist(), children.tolist(),
+                           mst.weight[children].tolist())
+    )
+    return graph
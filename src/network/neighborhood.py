@@ -0,0 +1,113 @@
+"""
+Vecindario Espacial con Índice BallTree (Haversine)
+===================================================
+Backend de las features de vecindario del script 07: encuentra los
+transformadores dentro de uno o varios radios sin la matriz de distancias
+n×n (≈1.5 GB para 14k transformadores).
+
+1. BallTree(metric='haversine') sobre coordenadas en radianes.
+2. Una sola consulta query_radius con el radio mayor; los radios menores
+   se obtienen filtrando esas distancias.
+3. Vecinos en listas dispersas (offsets + índices, formato CSR) por radio;
+   las sumas por nodo se agregan con np.add.reduceat.
+
+La memoria es O(n·k), con k los vecinos por nodo en el radio mayor.
+Como en el cálculo original, los puntos a distancia 0 (el propio nodo y
+transformadores en las mismas coordenadas) no cuentan como vecinos.
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Sequence
+import numpy as np
+from sklearn.neighbors import BallTree
+
+from .mst_topology import EARTH_RADIUS_KM
+
+DEFAULT_RADII_KM = (0.25, 0.5, 1.0)
+
+
+def radius_label(radius_km: float) -> str:
+    """Sufijo de columna para un radio: 0.25 -> '250m', 1.0 -> '1km'"""
+    meters = radius_km * 1000
+    if meters >= 1000 and meters % 1000 == 0:
+        return f"{int(meters // 1000)}km"
+    return f"{meters:g}m"
+
+
+@dataclass
+class NeighborLists:
+    """Vecinos de cada nodo dentro de un radio (CSR: offsets + índices)"""
+    radius_km: float
+    offsets: np.ndarray
+    indices: np.ndarray
+    distances_km: np.ndarray
+
+    @property
+    def counts(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def sum(self, values) -> np.ndarray:
+        """
+        Suma de values sobre los vecinos de cada nodo.
+
+        Args:
+            values: Array (n,) por nodo (bool, entero o float)
+
+        Returns:
+            Array (n,) con la suma (0 en nodos sin vecinos)
+        """
+        values = np.asarray(values)
+        if values.dtype == bool:
+            values = values.astype(np.int64)
+        counts = self.counts
+        totals = np.zeros(len(counts), dtype=values.dtype)
+        has_neighbors = counts > 0
+        if has_neighbors.any():
+            # reduceat con segmentos vacíos devuelve el valor del índice: se excluyen
+            totals[has_neighbors] = np.add.reduceat(values[self.indices],
+                                                    self.offsets[:-1][has_neighbors])
+        return totals
+
+    def mean(self, values) -> np.ndarray:
+        """Promedio de values sobre los vecinos (0 en nodos sin vecinos)"""
+        counts = self.counts
+        return self.sum(values) / np.maximum(counts, 1)
+
+
+def neighbor_lists(lat, lon, radii_km: Sequence[float] = DEFAULT_RADII_KM) -> Dict[float, NeighborLists]:
+    """
+    Vecinos dentro de cada radio con una sola consulta al BallTree.
+
+    Args:
+        lat: Latitudes (grados)
+        lon: Longitudes (grados)
+        radii_km: Radios de búsqueda en km
+
+    Returns:
+        Diccionario radio -> NeighborLists
+    """
+    coords = np.radians(np.column_stack([np.asarray(lat, dtype=float), np.asarray(lon, dtype=float)]))
+    n = len(coords)
+    radii_km = sorted(set(float(r) for r in radii_km))
+    if n == 0:
+        empty = np.zeros(1, dtype=np.int64)
+        return {r: NeighborLists(r, empty, np.empty(0, dtype=np.int64), np.empty(0)) for r in radii_km}
+
+    # Radio mayor con un margen: el corte exacto se hace en km más abajo
+    tree = BallTree(coords, metric='haversine')
+    ind, dist = tree.query_radius(coords, r=max(radii_km) / EARTH_RADIUS_KM * (1 + 1e-9),
+                                  return_distance=True, sort_results=True)
+    counts = np.fromiter((len(i) for i in ind), dtype=np.int64, count=n)
+    rows = np.repeat(np.arange(n), counts)
+    indices = np.concatenate(ind).astype(np.int64) if counts.sum() else np.empty(0, dtype=np.int64)
+    distances_km = (np.concatenate(dist) if counts.sum() else np.empty(0)) * EARTH_RADIUS_KM
+
+    result = {}
+    for radius in radii_km:
+        keep = (distances_km <= radius) & (distances_km > 0)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(rows[keep], minlength=n))])
+        result[radius] = NeighborLists(radius, offsets, indices[keep], distances_km[keep])
+    return result
@@ -0,0 +1,228 @@
+"""
+Características Topológicas de Árboles Radiales en O(n)
+=======================================================
+Calcula para todos los nodos de un alimentador (MST orientado desde la
+subestación) las características del script 04 a partir del array de
+padres, sin consultas por nodo a NetworkX:
+
+- Saltos / profundidad desde la raíz
+- Nodo hoja
+- kVA y usuarios aguas abajo (incluye el propio nodo)
+- Número de descendientes
+- Centralidad de intermediación exacta del árbol
+
+Los nodos se agrupan por nivel (profundidad) y las sumas de subárbol se
+acumulan del nivel más profundo hacia la raíz; accumulate_path hace el
+recorrido inverso para magnitudes por tramo (impedancia acumulada del
+script 05). En un árbol, la intermediación de v sale de los tamaños de
+las componentes que quedan al quitarlo: B(v) = ((N-1)² - Σ s_i²) / 2,
+con s_i los subárboles de sus hijos y N - tamaño(v) del lado del padre.
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+import pandas as pd
+import networkx as nx
+
+from .mst_topology import NO_PARENT, ROOT
+
+FEATURE_COLUMNS = [
+    'numero_saltos', 'es_nodo_hoja', 'profundidad_arbol', 'kVA_aguas_abajo',
+    'usuarios_aguas_abajo', 'num_descendientes', 'padre_mst',
+    'centralidad_intermediacion'
+]
+
+
+def tree_levels(parent: np.ndarray, root=ROOT) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """
+    Niveles del árbol desde root (BFS vectorizado sobre el array de padres).
+
+    Args:
+        parent: Índice del padre de cada nodo (NO_PARENT si no tiene)
+        root: Índice de la raíz, o array de raíces de un bosque
+
+    Returns:
+        (profundidad por nodo con -1 en los no alcanzados, lista de arrays
+        de nodos por nivel empezando por las raíces)
+    """
+    parent = np.asarray(parent, dtype=np.int64)
+    n = len(parent)
+
+    # Hijos agrupados por padre (CSR)
+    child_idx = np.flatnonzero(parent != NO_PARENT)
+    children = child_idx[np.argsort(parent[child_idx], kind='stable')]
+    counts = np.bincount(parent[children], minlength=n)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    roots = np.atleast_1d(np.asarray(root, dtype=np.int64))
+    depth = np.full(n, -1, dtype=np.int64)
+    depth[roots] = 0
+    levels = [roots]
+    while True:
+        frontier = levels[-1]
+        n_children = counts[frontier]
+        total = int(n_children.sum())
+        if total == 0:
+            break
+        # Concatenar los tramos CSR de todos los nodos del nivel
+        offsets = np.repeat(starts[frontier] - np.cumsum(n_children) + n_children, n_children)
+        level = children[offsets + np.arange(total)]
+        depth[level] = len(levels)
+        levels.append(level)
+
+    return depth, levels
+
+
+def accumulate_subtree(parent: np.ndarray, levels: List[np.ndarray], values: np.ndarray) -> np.ndarray:
+    """
+    Suma de values sobre cada subárbol (el nodo más sus descendientes).
+
+    Args:
+        parent: Array de padres
+        levels: Niveles de tree_levels
+        values: Array (n,) o (n, k) de valores por nodo
+
+    Returns:
+        Array con la forma de values con las sumas de subárbol
+    """
+    totals = np.array(values, dtype=float, copy=True)
+    for level in reversed(levels[1:]):
+        np.add.at(totals, parent[level], totals[level])
+    return totals
+
+
+def accumulate_path(parent: np.ndarray, levels: List[np.ndarray], values: np.ndarray) -> np.ndarray:
+    """
+    Suma de values sobre el camino desde la raíz hasta cada nodo.
+
+    Recorre los niveles de la raíz hacia las hojas: cada nivel suma el
+    acumulado de sus padres (ya completo) a su propio valor.
+
+    Args:
+        parent: Array de padres
+        levels: Niveles de tree_levels
+        values: Array (n,) o (n, k) de valores por nodo (p.ej. por tramo)
+
+    Returns:
+        Array con la forma de values con los acumulados desde la raíz
+    """
+    totals = np.array(values, dtype=float, copy=True)
+    for level in levels[1:]:
+        totals[level] += totals[parent[level]]
+    return totals
+
+
+def calculate_tree_features(parent: np.ndarray, potencia: Sequence[float],
+                            usuarios: Sequence[float], root: int = ROOT) -> Dict[str, np.ndarray]:
+    """
+    Características topológicas de todos los nodos de un árbol radial.
+
+    Equivalente a consultar nx.shortest_path, nx.descendants y
+    nx.betweenness_centrality (normalizada, grafo no dirigido) nodo por nodo.
+
+    Args:
+        parent: Índice del padre de cada nodo (NO_PARENT en la raíz)
+        potencia: kVA por nodo
+        usuarios: Usuarios por nodo
+        root: Índice de la raíz (subestación)
+
+    Returns:
+        Diccionario de arrays: numero_saltos (-1 si no alcanzable),
+        es_nodo_hoja, profundidad_arbol, kVA_aguas_abajo,
+        usuarios_aguas_abajo, num_descendientes, padre (índice) y
+        centralidad_intermediacion
+    """
+    parent = np.asarray(parent, dtype=np.int64)
+    n = len(parent)
+    depth, levels = tree_levels(parent, root)
+
+    # Sumas de subárbol en una pasada (kVA, usuarios, tamaño)
+    potencia = np.asarray(potencia)
+    usuarios = np.asarray(usuarios)
+    values = np.column_stack([potencia.astype(float), usuarios.astype(float), np.ones(n)])
+    totals = accumulate_subtree(parent, levels, values)
+    size = totals[:, 2]
+
+    # Sumas enteras si los datos lo son (mismo tipo que sum() por nodo)
+    kva = totals[:, 0].round().astype(np.int64) if potencia.dtype.kind in 'iub' else totals[:, 0]
+    users = totals[:, 1].round().astype(np.int64) if usuarios.dtype.kind in 'iub' else totals[:, 1]
+
+    has_parent = parent != NO_PARENT
+    n_children = np.bincount(parent[has_parent], minlength=n)
+
+    # Intermediación: pares separados al quitar cada nodo de su componente
+    reached = depth >= 0
+    component = size[root]
+    children = np.flatnonzero(has_parent & reached)
+    child_sq = np.bincount(parent[children], weights=size[children] ** 2, minlength=n)
+    upstream = np.where(reached, component - size, 0)
+    pairs = ((component - 1) ** 2 - child_sq - upstream ** 2) / 2
+    betweenness = np.where(reached, pairs, 0.0)
+    if n > 2:
+        betweenness = 2 * betweenness / ((n - 1) * (n - 2))
+
+    return {
+        'numero_saltos': depth,
+        'es_nodo_hoja': n_children == 0,
+        'profundidad_arbol': depth.copy(),
+        'kVA_aguas_abajo': kva,
+        'usuarios_aguas_abajo': users,
+        'num_descendientes': (size - 1).astype(np.int64),
+        'padre': parent,
+        'centralidad_intermediacion': betweenness
+    }
+
+
+def digraph_parents(graph: nx.DiGraph) -> Tuple[List, np.ndarray]:
+    """
+    Array de padres de un árbol dirigido padre -> hijo.
+
+    Args:
+        graph: DiGraph (p.ej. build_mst_topology del script 04)
+
+    Returns:
+        (nodos en el orden del grafo, índice del padre de cada uno)
+    """
+    nodes = list(graph.nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+    parent = np.full(len(nodes), NO_PARENT, dtype=np.int64)
+    for u, v in graph.edges:
+        parent[index[v]] = index[u]
+    return nodes, parent
+
+
+def topology_features_frame(graph: nx.DiGraph, root_node='SUBSTATION') -> pd.DataFrame:
+    """
+    Características del script 04 para todos los nodos de un MST dirigido.
+
+    Args:
+        graph: DiGraph con atributos potencia y usuarios por nodo
+        root_node: Nodo raíz
+
+    Returns:
+        DataFrame indexado por nodo con las columnas FEATURE_COLUMNS
+    """
+    nodes, parent = digraph_parents(graph)
+    potencia = [graph.nodes[node]['potencia'] for node in nodes]
+    usuarios = [graph.nodes[node]['usuarios'] for node in nodes]
+    features = calculate_tree_features(parent, potencia, usuarios, root=nodes.index(root_node))
+
+    # Padre como identificador (None en la raíz)
+    node_array = np.empty(len(nodes), dtype=object)
+    node_array[:] = nodes
+    padre = np.where(parent == NO_PARENT, None, node_array[np.maximum(parent, 0)])
+
+    df = pd.DataFrame({
+        'numero_saltos': features['numero_saltos'],
+        'es_nodo_hoja': features['es_nodo_hoja'],
+        'profundidad_arbol': features['profundidad_arbol'],
+        'kVA_aguas_abajo': features['kVA_aguas_abajo'],
+        'usuarios_aguas_abajo': features['usuarios_aguas_abajo'],
+        'num_descendientes': features['num_descendientes'],
+        'padre_mst': padre,
+        'centralidad_intermediacion': features['centralidad_intermediacion']
+    }, index=pd.Index(nodes, dtype=object))
+    return df[FEATURE_COLUMNS]
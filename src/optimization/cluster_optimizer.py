@@ -12,20 +12,30 @@ import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple, Optional, Callable
 from dataclasses import dataclass
-from scipy.optimize import minimize, differential_evolution
+from scipy.optimize import minimize, differential_evolution, NonlinearConstraint, OptimizeResult
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 import logging
+import time
+import zlib
 
 # Importar módulos económicos y config
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from economics.capex import calculate_capex
 from economics.integrated_cash_flow import IntegratedCashFlowCalculator
 from economics.network_benefits import NetworkBenefitsCalculator
+from optimization.surrogate_search import surrogate_minimize
+from optimization.warm_start import WarmStartCache, seeded_population
 from config.config_loader import get_config
 
 logger = logging.getLogger(__name__)
 
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
 
 @dataclass
 class OptimizationResult:
@@ -44,32 +54,123 @@ class OptimizationResult:
     network_flow_usd: float
     optimization_status: str
     iterations: int
+
+
+@dataclass
+class OptimizationRun:
+    """
+    Estado de una corrida de optimización.
+    
+    Se crea uno por llamada a optimize_cluster, de modo que una misma
+    instancia de ClusterOptimizer puede atender corridas concurrentes.
+    Se actualiza desde el callback del optimizador (proceso principal), por
+    lo que también es válido con DE workers > 1.
+    """
+    cluster_id: str
+    deadline: Optional[float] = None
+    objective: Optional['ClusterObjective'] = None
+    iteration_count: int = 0
+    best_value: float = -np.inf
+    best_config: Optional[np.ndarray] = None
+    
+    def timed_out(self) -> bool:
+        """Indica si se superó el tiempo máximo de la corrida"""
+        return self.deadline is not None and time.monotonic() > self.deadline
     
+    def callback(self, xk=None, *args, intermediate_result=None, **kwargs):
+        """
+        Callback por iteración: registra el mejor punto y corta por timeout.
+        
+        Acepta tanto callback(intermediate_result=OptimizeResult) como las
+        firmas clásicas callback(xk, ...) de DE, SLSQP, TNC o COBYLA; en ese
+        caso el valor se obtiene evaluando el objetivo en xk.
+        """
+        self.iteration_count += 1
+        if intermediate_result is None and args and isinstance(args[0], OptimizeResult):
+            intermediate_result = args[0]  # trust-constr: callback(xk, state)
+        if intermediate_result is not None:
+            x, fun = intermediate_result.x, intermediate_result.fun
+        elif xk is not None and self.objective is not None:
+            x, fun = xk, self.objective.evaluate(xk)
+        else:
+            x, fun = None, np.inf
+        value = -float(fun)
+        if x is not None and value > self.best_value:
+            self.best_value = value
+            self.best_config = np.array(x, dtype=float)
+        
+        if self.iteration_count % 10 == 0:
+            logger.info(f"Cluster {self.cluster_id} - iteración {self.iteration_count}: "
+                        f"mejor valor = {self.best_value:.2f}")
+        
+        if self.timed_out():
+            raise StopIteration
+
+
+class ClusterObjective:
+    """
+    Función objetivo (a minimizar) de un cluster.
+    
+    Es pura y serializable con pickle: no modifica el optimizador, por lo que
+    scipy puede evaluarla en procesos worker. Acepta x de forma (3,) o una
+    población (3, S) cuando DE usa vectorized=True.
+    
+    Cuenta las configuraciones evaluadas (con vectorized=True el nfev de scipy
+    cuenta llamadas, no configuraciones); con workers > 1 el conteo queda en
+    las copias de cada proceso y vale 0.
+    """
+    
+    def __init__(self, optimizer: 'ClusterOptimizer', cluster_data: Dict):
+        self.optimizer = optimizer
+        self.cluster_data = cluster_data
+        self.evaluations = 0
+    
+    def __call__(self, x: np.ndarray):
+        x = np.asarray(x, dtype=float)
+        if x.ndim == 1:
+            self.evaluations += 1
+            return self.evaluate(x)
+        self.evaluations += x.shape[1]
+        return -self.optimizer._evaluate_configurations(x.T, self.cluster_data)
+    
+    def evaluate(self, x: np.ndarray) -> float:
+        """Valor del objetivo en una configuración sin contarla (seguimiento del callback)"""
+        return -self.optimizer._evaluate_configuration(np.asarray(x, dtype=float), self.cluster_data)
+
 
 class ClusterOptimizer:
     """
     Optimizador para encontrar el dimensionamiento óptimo de GD
     que maximiza el valor económico total (PV + Red).
+    
+    No guarda estado entre corridas: el progreso de cada optimización vive en
+    un OptimizationRun, por lo que una instancia puede usarse desde varios
+    threads a la vez.
     """
     
     def __init__(self, 
                  economic_params: Optional[Dict] = None,
                  technical_constraints: Optional[Dict] = None,
-                 optimization_params: Optional[Dict] = None):
+                 optimization_params: Optional[Dict] = None,
+                 warm_start_cache: Optional[WarmStartCache] = None):
         """
         Inicializa el optimizador.
         
         Args:
-            economic_params: Parámetros económicos (si None, usa ConfigLoader)
+            economic_params: EconomicParams o diccionario (si None, usa el snapshot de ConfigLoader)
             technical_constraints: Restricciones técnicas (si None, usa ConfigLoader)
             optimization_params: Parámetros del algoritmo (si None, usa ConfigLoader)
+            warm_start_cache: Caché de soluciones previas (si None y
+                optimization_algorithm.warm_start está activo, usa warm_start_file;
+                desactivado por defecto, se activa por corrida con
+                optimization_params={..., 'warm_start': True})
         """
         # Cargar configuración centralizada
         config = get_config()
         
         # Usar parámetros proporcionados o cargar desde config
         if economic_params is None:
-            self.economic_params = config.get_economic_params()
+            self.economic_params = config.get_economic_snapshot()
         else:
             self.economic_params = economic_params
             
@@ -87,69 +188,147 @@ class ClusterOptimizer:
         self.cash_flow_calc = IntegratedCashFlowCalculator(self.economic_params)
         self.network_calc = NetworkBenefitsCalculator()
         
-        # Contadores para tracking
-        self.iteration_count = 0
-        self.best_value = -np.inf
+        # Arranque en caliente desde soluciones previas
+        if warm_start_cache is None and self.opt_params.get('warm_start', False):
+            warm_start_cache = WarmStartCache(
+                PROJECT_ROOT / self.opt_params.get(
+                    'warm_start_file', 'reports/clustering/optimization/warm_start_cache.json')
+            )
+        self.warm_start_cache = warm_start_cache
         
         logger.info("Optimizador de clusters inicializado con parámetros centralizados")
     
-    def optimize_cluster(self, cluster_data: Dict) -> OptimizationResult:
+    def optimize_cluster(self, cluster_data: Dict,
+                         seed: Optional[int] = None,
+                         timeout: Optional[float] = None) -> OptimizationResult:
         """
         Optimiza dimensionamiento para un cluster específico.
         
         Args:
             cluster_data: Datos del cluster incluyendo demanda, usuarios, etc.
+            seed: Semilla del algoritmo (si None, usa optimization_algorithm.seed)
+            timeout: Segundos máximos; al vencer se devuelve el mejor punto
+                encontrado con estado 'suboptimal'
             
         Returns:
             Resultado de optimización con configuración óptima
         """
         logger.info(f"Optimizando cluster {cluster_data.get('cluster_id', 'unknown')}")
         
-        # Reset contadores
-        self.iteration_count = 0
-        self.best_value = -np.inf
-        self.current_cluster = cluster_data
+        if seed is None:
+            seed = self.opt_params['seed']
         
         # Definir límites de variables
         bounds = self._get_optimization_bounds(cluster_data)
         
-        # Función objetivo
-        def objective(x):
-            return -self._evaluate_configuration(x, cluster_data)
+        # Función objetivo pura (serializable para DE con workers > 1)
+        objective = ClusterObjective(self, cluster_data)
+        
+        # Estado de esta corrida
+        run = OptimizationRun(
+            cluster_id=cluster_data.get('cluster_id', 'unknown'),
+            deadline=time.monotonic() + timeout if timeout else None,
+            objective=objective
+        )
+        
+        # Solución del caso resuelto más cercano (si hay caché)
+        warm_start = None
+        if self.warm_start_cache is not None:
+            warm_start = self.warm_start_cache.lookup(cluster_data, self._warm_start_params())
         
         # Restricciones
         constraints = self._get_optimization_constraints(cluster_data)
         
         # Optimizar según método
         if self.opt_params['method'] == 'differential_evolution':
+            vectorized = self.opt_params['workers'] == 1
+            
+            # Población inicial: alrededor de la solución previa o hipercubo latino
+            init = 'latinhypercube'
+            if warm_start is not None:
+                x0, exact = warm_start
+                init = seeded_population(
+                    x0, bounds,
+                    size=self.opt_params['popsize'] * len(bounds),
+                    spread=0.02 if exact else 0.1,
+                    seed=seed
+                )
+                logger.info(f"Arranque en caliente {'exacto' if exact else 'desde caso cercano'}: "
+                            f"x0 = {np.round(x0, 3)}")
+            
             result = differential_evolution(
                 objective,
                 bounds,
                 maxiter=self.opt_params['maxiter'],
                 popsize=self.opt_params['popsize'],
                 tol=self.opt_params['tol'],
-                seed=self.opt_params['seed'],
+                seed=seed,
                 workers=self.opt_params['workers'],
-                disp=self.opt_params['disp'],
-                constraints=constraints,
-                callback=self._optimization_callback
+                vectorized=vectorized,
+                updating='deferred',
+                init=init,
+                # El pulido se hace abajo, solo si queda tiempo (el de scipy ignora el timeout)
+                polish=False,
+                disp=self.opt_params.get('disp', False),
+                constraints=self._to_de_constraints(constraints, vectorized),
+                callback=run.callback
             )
-        else:
-            # Punto inicial
-            x0 = self._get_initial_guess(cluster_data)
             
-            result = minimize(
+            # Pulido local (el arranque exacto ya viene pulido de la caché).
+            # Sin arranque en caliente, trust-constr como el polish de scipy, cortado
+            # por el callback; desde un caso cercano, SLSQP evita su costo
+            if (warm_start is None or not warm_start[1]) and not run.timed_out():
+                try:
+                    if warm_start is None:
+                        polished = minimize(objective, result.x, method='trust-constr',
+                                            bounds=bounds, constraints=constraints,
+                                            callback=run.callback)
+                    else:
+                        polished = minimize(objective, result.x, method='SLSQP',
+                                            bounds=bounds, constraints=constraints)
+                except StopIteration:
+                    polished = None
+                if polished is not None and polished.success and polished.fun < result.fun:
+                    result.x, result.fun = polished.x, polished.fun
+        elif self.opt_params['method'] == 'surrogate':
+            # Búsqueda asistida por GP: pocas evaluaciones del modelo completo
+            result = surrogate_minimize(
                 objective,
-                x0,
-                method=self.opt_params['method'],
-                bounds=bounds,
+                bounds,
                 constraints=constraints,
-                options={
-                    'maxiter': self.opt_params['maxiter'],
-                    'disp': self.opt_params['disp']
-                },
-                callback=self._optimization_callback
+                initial_samples=self.opt_params.get('surrogate_initial_samples', 15),
+                max_evaluations=self.opt_params.get('surrogate_max_evaluations', 90),
+                seed=seed,
+                callback=run.callback
             )
+        else:
+            # Punto inicial
+            if warm_start is not None:
+                lower, upper = np.array(bounds, dtype=float).T
+                x0 = np.clip(warm_start[0], lower, upper)
+            else:
+                x0 = self._get_initial_guess(cluster_data)
+            
+            try:
+                result = minimize(
+                    objective,
+                    x0,
+                    method=self.opt_params['method'],
+                    bounds=bounds,
+                    constraints=constraints,
+                    options={
+                        'maxiter': self.opt_params['maxiter'],
+                        'disp': self.opt_params.get('disp', False)
+                    },
+                    callback=run.callback
+                )
+            except StopIteration:
+                # SLSQP, TNC y COBYLA no atrapan el StopIteration del callback
+                result = OptimizeResult(
+                    x=run.best_config if run.best_config is not None else x0,
+                    fun=-run.best_value, success=False,
+                    message='Detenido por callback', nfev=objective.evaluations
+                )
         
         # Extraer solución óptima
         if result.success:
@@ -158,10 +337,17 @@ class ClusterOptimizer:
             status = 'optimal'
         else:
             # Usar mejor punto encontrado
-            pv_mw, bess_mwh, q_night_mvar = self._get_feasible_point(cluster_data)
+            pv_mw, bess_mwh, q_night_mvar = self._get_feasible_point(cluster_data, run)
             metrics = self._calculate_final_metrics([pv_mw, bess_mwh, q_night_mvar], cluster_data)
             status = f'suboptimal: {result.message}'
         
+        if run.timed_out():
+            status = f'suboptimal: timeout ({timeout:g} s)'
+        
+        if self.warm_start_cache is not None and status == 'optimal':
+            self.warm_start_cache.store(cluster_data, self._warm_start_params(),
+                                        result.x, metrics['npv_usd'])
+        
         return OptimizationResult(
             cluster_id=cluster_data.get('cluster_id', 'unknown'),
             pv_mw_optimal=pv_mw,
@@ -176,9 +362,18 @@ class ClusterOptimizer:
             pv_flow_usd=metrics['pv_flow_usd'],
             network_flow_usd=metrics['network_flow_usd'],
             optimization_status=status,
-            iterations=self.iteration_count
+            iterations=objective.evaluations or int(result.nfev)
         )
     
+    def _warm_start_params(self) -> Dict:
+        """Parámetros que definen el óptimo (clave de la caché de arranque en caliente)"""
+        weights = ('npv_weight', 'irr_weight', 'network_benefit_weight')
+        return {
+            **{f'economic.{k}': v for k, v in self.economic_params.items()},
+            **{f'constraint.{k}': v for k, v in self.constraints.items()},
+            **{f'weight.{k}': self.opt_params[k] for k in weights}
+        }
+    
     def _get_optimization_bounds(self, cluster_data: Dict) -> List[Tuple[float, float]]:
         """Define límites para variables de decisión"""
         peak_demand_mw = cluster_data.get('peak_demand_mw', 10)
@@ -219,6 +414,18 @@ class ClusterOptimizer:
         
         return constraints
     
+    def _to_de_constraints(self, constraints: List[Dict],
+                           vectorized: bool) -> List[NonlinearConstraint]:
+        """Convierte restricciones estilo minimize (dicts) a NonlinearConstraint para DE"""
+        de_constraints = []
+        for constraint in constraints:
+            fun = constraint['fun']
+            if vectorized:
+                # Con vectorized=True DE envía x (N, S) y espera (M, S)
+                fun = lambda x, f=fun: np.atleast_2d(f(x)) if np.ndim(x) == 2 else f(x)
+            de_constraints.append(NonlinearConstraint(fun, 0, np.inf))
+        return de_constraints
+    
     def _evaluate_configuration(self, x: np.ndarray, cluster_data: Dict) -> float:
         """
         Evalúa una configuración específica.
@@ -230,93 +437,71 @@ class ClusterOptimizer:
         Returns:
             Valor de función objetivo (a maximizar)
         """
-        pv_mw, bess_mwh, q_night_mvar = x
+        return float(self._evaluate_configurations(np.atleast_2d(x), cluster_data)[0])
+    
+    def _evaluate_configurations(self, X: np.ndarray, cluster_data: Dict) -> np.ndarray:
+        """
+        Evalúa N configuraciones en una sola pasada del motor vectorizado.
+        
+        Args:
+            X: Array (N, 3) con filas [pv_mw, bess_mwh, q_night_mvar]
+            cluster_data: Datos del cluster
+            
+        Returns:
+            Array (N,) con el valor de función objetivo (a maximizar)
+        """
+        X = np.asarray(X, dtype=float)
+        pv_mw, bess_mwh, q_night_mvar = X[:, 0], X[:, 1], X[:, 2]
         
         # Calcular CAPEX
-        capex = self._calculate_capex(pv_mw, bess_mwh, q_night_mvar)
+        capex = calculate_capex(pv_mw, bess_mwh, q_night_mvar, self.economic_params)
         
         # Calcular flujos de caja
         try:
-            cash_flows = self.cash_flow_calc.calculate_integrated_flows(
+            cash_flows = self.cash_flow_calc.calculate_integrated_flows_batch(
                 cluster_data, pv_mw, bess_mwh, q_night_mvar, capex
             )
             
             # Métricas financieras
-            metrics = self.cash_flow_calc.calculate_financial_metrics(
+            metrics = self.cash_flow_calc.calculate_financial_metrics_batch(
                 cash_flows, capex['total']
             )
-            
-            # Verificar restricciones
-            if metrics['irr_percent'] and metrics['irr_percent'] < self.constraints['min_irr'] * 100:
-                penalty = -1e6 * (self.constraints['min_irr'] * 100 - metrics['irr_percent'])
-            else:
-                penalty = 0
-            
-            if metrics['payback_years'] and metrics['payback_years'] > self.constraints['max_payback']:
-                penalty -= 1e5 * (metrics['payback_years'] - self.constraints['max_payback'])
-            
-            # Función objetivo ponderada
-            npv_norm = metrics['npv_usd'] / 1e6  # Normalizar a millones
-            irr_norm = (metrics['irr_percent'] or 0) / 100
-            
-            # Calcular proporción de beneficios de red
-            network_ratio = sum(cf.network_flow for cf in cash_flows) / sum(cf.total_flow for cf in cash_flows)
-            
-            objective = (
-                self.opt_params['npv_weight'] * npv_norm +
-                self.opt_params['irr_weight'] * irr_norm * 10 +  # Escalar IRR
-                self.opt_params['network_benefit_weight'] * network_ratio * 100
-            ) + penalty
-            
-            # Actualizar mejor valor
-            if objective > self.best_value:
-                self.best_value = objective
-                self.best_config = x.copy()
-            
-            self.iteration_count += 1
-            
-            return objective
-            
         except Exception as e:
-            logger.warning(f"Error evaluando configuración {x}: {e}")
-            return -1e9  # Penalización severa
-    
-    def _calculate_capex(self, pv_mw: float, bess_mwh: float, q_night_mvar: float) -> Dict:
-        """Calcula CAPEX desglosado"""
-        # PV
-        pv_capex = pv_mw * self.economic_params['pv_capex_usd_mw']
-        
-        # BESS (energía + potencia)
-        bess_energy_capex = bess_mwh * self.economic_params['bess_capex_usd_mwh']
-        bess_power_capex = (bess_mwh / 4) * self.economic_params['bess_capex_usd_mw']  # C-rate 0.25
-        bess_capex = bess_energy_capex + bess_power_capex
-        
-        # STATCOM/Q night
-        # Si Q_night <= 0.3 * PV, se incluye en inversor (costo marginal)
-        if q_night_mvar <= pv_mw * 0.3:
-            q_capex = q_night_mvar * self.economic_params['statcom_capex_usd_mvar'] * 0.3  # 30% costo
-        else:
-            # Necesita STATCOM dedicado
-            q_capex = q_night_mvar * self.economic_params['statcom_capex_usd_mvar']
-        
-        # BOS y conexión (15% del total)
-        subtotal = pv_capex + bess_capex + q_capex
-        bos_capex = subtotal * 0.15
-        
-        return {
-            'pv': pv_capex,
-            'bess': bess_capex,
-            'q_night': q_capex,
-            'bos': bos_capex,
-            'total': subtotal + bos_capex
-        }
+            logger.warning(f"Error evaluando configuraciones {X}: {e}")
+            return np.full(len(X), -1e9)  # Penalización severa
+        
+        irr_percent = metrics['irr_percent']
+        payback_years = metrics['payback_years']
+        
+        # Verificar restricciones (NaN equivale a None en el camino escalar)
+        min_irr_percent = self.constraints['min_irr'] * 100
+        penalty = np.where(irr_percent < min_irr_percent,
+                           -1e6 * (min_irr_percent - irr_percent), 0.0)
+        penalty -= np.where(payback_years > self.constraints['max_payback'],
+                            1e5 * (payback_years - self.constraints['max_payback']), 0.0)
+        
+        # Función objetivo ponderada
+        npv_norm = metrics['npv_usd'] / 1e6  # Normalizar a millones
+        irr_norm = np.nan_to_num(irr_percent, nan=0.0) / 100
+        
+        # Calcular proporción de beneficios de red
+        with np.errstate(divide='ignore', invalid='ignore'):
+            network_ratio = (cash_flows.network_flow.sum(axis=1) /
+                             cash_flows.total_flow.sum(axis=1))
+        
+        objective = (
+            self.opt_params['npv_weight'] * npv_norm +
+            self.opt_params['irr_weight'] * irr_norm * 10 +  # Escalar IRR
+            self.opt_params['network_benefit_weight'] * network_ratio * 100
+        ) + penalty
+        return np.where(np.isfinite(objective), objective, -1e9)
     
     def _calculate_final_metrics(self, x: np.ndarray, cluster_data: Dict) -> Dict:
         """Calcula métricas finales para configuración óptima"""
         pv_mw, bess_mwh, q_night_mvar = x
         
         # CAPEX
-        capex = self._calculate_capex(pv_mw, bess_mwh, q_night_mvar)
+        capex = calculate_capex(pv_mw, bess_mwh, q_night_mvar, self.economic_params)
         
         # Flujos
         cash_flows = self.cash_flow_calc.calculate_integrated_flows(
@@ -335,7 +520,7 @@ class ClusterOptimizer:
         
         return {
             **financial_metrics,
-            'total_capex_usd': capex['total'],
+            'total_capex_usd': float(capex['total']),
             'annual_flow_usd': avg_annual_flow,
             'pv_flow_usd': avg_pv_flow,
             'network_flow_usd': avg_network_flow
@@ -352,41 +537,88 @@ class ClusterOptimizer:
         
         return np.array([pv_mw, bess_mwh, q_night_mvar])
     
-    def _get_feasible_point(self, cluster_data: Dict) -> np.ndarray:
+    def _get_feasible_point(self, cluster_data: Dict, run: OptimizationRun) -> np.ndarray:
         """Retorna un punto factible si optimización falla"""
-        if hasattr(self, 'best_config'):
-            return self.best_config
+        if run.best_config is not None:
+            return run.best_config
         else:
             return self._get_initial_guess(cluster_data)
     
-    def _optimization_callback(self, xk, convergence=None):
-        """Callback para monitorear progreso"""
-        if self.iteration_count % 10 == 0:
-            logger.info(f"Iteración {self.iteration_count}: mejor valor = {self.best_value:.2f}")
+    def _optimize_cluster_isolated(self, cluster_data: Dict, seed: Optional[int],
+                                   timeout: Optional[float]) -> OptimizationResult:
+        """Optimiza un cluster convirtiendo cualquier error en un resultado 'suboptimal'"""
+        try:
+            return self.optimize_cluster(cluster_data, seed=seed, timeout=timeout)
+        except Exception as e:
+            logger.error(f"Error optimizando cluster {cluster_data.get('cluster_id', 'unknown')}: {e}")
+            return _failed_result(cluster_data, f'suboptimal: error: {type(e).__name__}: {e}')
     
     def optimize_multiple_clusters(self, clusters_data: List[Dict],
-                                 parallel: bool = True) -> pd.DataFrame:
+                                 parallel: bool = True,
+                                 progress_callback: Optional[Callable[[int, int, OptimizationResult], None]] = None
+                                 ) -> pd.DataFrame:
         """
         Optimiza múltiples clusters.
         
+        Cada cluster usa una semilla derivada de optimization_algorithm.seed y
+        su cluster_id, por lo que los resultados no dependen del modo de
+        ejecución. Un cluster que falla o excede cluster_timeout devuelve una
+        fila con estado 'suboptimal' sin interrumpir al resto.
+        
+        En paralelo el timeout es además un límite de pared: un cluster que
+        no termina en cluster_timeout + cluster_timeout_grace segundos (colgado
+        dentro del objetivo o de SLSQP) se aborta matando su proceso, y uno
+        cuyo proceso muere (OOM, segfault) se registra como fallido.
+        
         Args:
             clusters_data: Lista de datos de clusters
-            parallel: Si ejecutar en paralelo
+            parallel: Si ejecutar en paralelo (usa optimization_algorithm.workers procesos)
+            progress_callback: Función (completados, total, resultado) llamada al
+                terminar cada cluster
             
         Returns:
             DataFrame con resultados de optimización
         """
-        results = []
-        
-        if parallel and self.opt_params['workers'] > 1:
-            # TODO: Implementar paralelización con multiprocessing
-            pass
-        
-        # Ejecución secuencial
-        for cluster in clusters_data:
-            logger.info(f"Optimizando cluster {cluster.get('cluster_id')}...")
-            result = self.optimize_cluster(cluster)
-            results.append(result)
+        workers = self.opt_params['workers']
+        timeout = self.opt_params.get('cluster_timeout')
+        tasks = [
+            (i, cluster, cluster_seed(self.opt_params['seed'], cluster.get('cluster_id')), timeout)
+            for i, cluster in enumerate(clusters_data)
+        ]
+        
+        results = [None] * len(tasks)
+        completed = 0
+        
+        def report(index: int, result: OptimizationResult):
+            nonlocal completed
+            completed += 1
+            results[index] = result
+            logger.info(f"Progreso: {completed}/{len(tasks)} clusters "
+                        f"(cluster {result.cluster_id}: {result.optimization_status})")
+            if progress_callback is not None:
+                progress_callback(completed, len(tasks), result)
+        
+        if parallel and workers > 1 and len(tasks) > 1:
+            n_processes = min(workers, len(tasks))
+            hard_timeout = timeout + self.opt_params.get('cluster_timeout_grace', 60) if timeout else None
+            logger.info(f"Optimizando {len(tasks)} clusters con {n_processes} procesos")
+            
+            def pool_result(index: int, result: OptimizationResult):
+                # Los workers usan una copia de la caché: se registra aquí
+                if self.warm_start_cache is not None and result.optimization_status == 'optimal':
+                    self.warm_start_cache.store(
+                        tasks[index][1], self._warm_start_params(),
+                        [result.pv_mw_optimal, result.bess_mwh_optimal, result.q_night_mvar_optimal],
+                        result.npv_usd
+                    )
+                report(index, result)
+            
+            self._run_cluster_pool(tasks, n_processes, hard_timeout, pool_result)
+        else:
+            # Ejecución secuencial
+            for index, cluster, seed, cluster_timeout in tasks:
+                logger.info(f"Optimizando cluster {cluster.get('cluster_id')}...")
+                report(index, self._optimize_cluster_isolated(cluster, seed, cluster_timeout))
         
         # Convertir a DataFrame
         df_results = pd.DataFrame([
@@ -413,4 +645,156 @@ class ClusterOptimizer:
         # Ordenar por NPV
         df_results = df_results.sort_values('npv_musd', ascending=False)
         
-        return df_results
\ No newline at end of file
+        return df_results
+    
+    def _run_cluster_pool(self, tasks: List[Tuple], n_processes: int,
+                          hard_timeout: Optional[float],
+                          on_result: Callable[[int, OptimizationResult], None]):
+        """
+        Ejecuta las tareas en un pool de procesos con límite de pared por cluster.
+        
+        Hay a lo sumo un cluster en curso por proceso, así que su plazo corre
+        desde que se envía. Al vencer un plazo se mata el pool (no se puede
+        matar un solo worker) y los clusters que seguían en curso se reenvían.
+        Si un proceso muere, los clusters en curso se reintentan de a uno:
+        el que vuelve a romper el pool estando solo es el responsable.
+        """
+        pending = deque(tasks)
+        suspects = deque()
+        running = {}  # future -> (tarea, plazo, sospechoso)
+        
+        def new_pool() -> ProcessPoolExecutor:
+            return ProcessPoolExecutor(
+                max_workers=n_processes,
+                initializer=_init_worker,
+                initargs=(self.economic_params, self.constraints, self.opt_params,
+                          self.warm_start_cache.snapshot() if self.warm_start_cache is not None else None)
+            )
+        
+        def fail(task: Tuple, status: str):
+            logger.error(f"Cluster {task[1].get('cluster_id', 'unknown')}: {status}")
+            on_result(task[0], _failed_result(task[1], status))
+        
+        executor = new_pool()
+        try:
+            while pending or suspects or running:
+                # Los sospechosos corren solos; el resto llena los procesos libres
+                queue, limit = (suspects, 1) if suspects else (pending, n_processes)
+                while queue and len(running) < limit:
+                    task = queue.popleft()
+                    try:
+                        future = executor.submit(_optimize_cluster_task, task)
+                    except BrokenProcessPool:
+                        # El pool se rompió tras la última espera: los clusters en
+                        # curso lo reportan en wait; sin ninguno se crea otro pool
+                        queue.appendleft(task)
+                        if running:
+                            break
+                        _terminate_pool(executor)
+                        executor = new_pool()
+                        continue
+                    running[future] = (task, _deadline(hard_timeout), queue is suspects)
+                
+                deadlines = [deadline for _, deadline, _ in running.values() if deadline is not None]
+                wait_s = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+                done, _ = wait(running, timeout=wait_s, return_when=FIRST_COMPLETED)
+                
+                broken = False
+                for future in done:
+                    task, _, suspect = running.pop(future)
+                    try:
+                        index, result = future.result()
+                    except BrokenProcessPool:
+                        # El proceso murió: no se sabe qué cluster lo causó
+                        broken = True
+                        if suspect:
+                            fail(task, 'suboptimal: error: BrokenProcessPool: el proceso del cluster murió')
+                        else:
+                            suspects.append(task)
+                        continue
+                    except Exception as e:
+                        # El resultado no se pudo transferir desde el worker
+                        fail(task, f'suboptimal: error: {type(e).__name__}: {e}')
+                        continue
+                    on_result(index, result)
+                
+                now = time.monotonic()
+                expired = [future for future, (_, deadline, _) in running.items()
+                           if deadline is not None and now >= deadline]
+                for future in expired:
+                    task, _, _ = running.pop(future)
+                    fail(task, f'suboptimal: timeout ({hard_timeout:g} s, proceso abortado)')
+                
+                if broken or expired:
+                    # Los clusters en curso vuelven a la cola (de a uno si el pool se rompió)
+                    for task, _, suspect in running.values():
+                        (suspects if broken or suspect else pending).appendleft(task)
+                    running.clear()
+                    _terminate_pool(executor)
+                    executor = new_pool()
+        finally:
+            _terminate_pool(executor)
+
+
+def _failed_result(cluster_data: Dict, status: str) -> OptimizationResult:
+    """Fila 'suboptimal' sin configuración para un cluster que no pudo optimizarse"""
+    return OptimizationResult(
+        cluster_id=cluster_data.get('cluster_id', 'unknown'),
+        pv_mw_optimal=np.nan,
+        bess_mwh_optimal=np.nan,
+        q_night_mvar_optimal=np.nan,
+        npv_usd=np.nan,
+        irr_percent=None,
+        payback_years=None,
+        bc_ratio=np.nan,
+        total_capex_usd=np.nan,
+        annual_flow_usd=np.nan,
+        pv_flow_usd=np.nan,
+        network_flow_usd=np.nan,
+        optimization_status=status,
+        iterations=0
+    )
+
+
+def _deadline(timeout: Optional[float]) -> Optional[float]:
+    """Instante monotónico en que vence un plazo (None sin límite)"""
+    return time.monotonic() + timeout if timeout else None
+
+
+def _terminate_pool(executor: ProcessPoolExecutor):
+    """Cierra el pool sin esperar a los clusters en curso (pueden estar colgados)"""
+    processes = list((executor._processes or {}).values())
+    for process in processes:
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.join(timeout=5)
+
+
+def cluster_seed(base_seed: Optional[int], cluster_id) -> Optional[int]:
+    """Semilla determinística por cluster derivada de la semilla base"""
+    if base_seed is None:
+        return None
+    key = zlib.crc32(str(cluster_id).encode('utf-8'))
+    return int(np.random.SeedSequence([base_seed, key]).generate_state(1)[0])
+
+
+# Optimizador de cada proceso del pool (creado una vez por proceso)
+_worker_optimizer: Optional[ClusterOptimizer] = None
+
+
+def _init_worker(economic_params: Dict, constraints: Dict, opt_params: Dict,
+                 warm_start_entries: Optional[Dict] = None):
+    """Inicializa el optimizador del proceso; DE corre sin paralelismo interno"""
+    global _worker_optimizer
+    warm_start_cache = WarmStartCache(entries=warm_start_entries) if warm_start_entries is not None else None
+    _worker_optimizer = ClusterOptimizer(economic_params, constraints,
+                                         {**opt_params, 'workers': 1, 'warm_start': False},
+                                         warm_start_cache=warm_start_cache)
+
+
+def _optimize_cluster_task(task: Tuple) -> Tuple[int, OptimizationResult]:
+    """Tarea del pool: (índice, cluster, semilla, timeout) -> (índice, resultado)"""
+    index, cluster_data, seed, timeout = task
+    return index, _worker_optimizer._optimize_cluster_isolated(cluster_data, seed, timeout)
+
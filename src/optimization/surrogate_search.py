@@ -0,0 +1,203 @@
+"""
+Búsqueda Asistida por Modelo Sustituto
+======================================
+Minimiza una función objetivo costosa usando un proceso gaussiano
+(scikit-learn) como modelo sustituto:
+
+1. Muestra inicial por hipercubo latino sobre los límites.
+2. Se ajusta el GP sobre los valores evaluados (transformación log-simétrica
+   para acotar el efecto de las penalizaciones).
+3. En cada ronda se elige, entre un conjunto de candidatos (globales y
+   alrededor del mejor punto), el de mayor mejora esperada (EI) y solo ese
+   se evalúa con la función real.
+4. Pulido final por búsqueda de patrón con la función real,
+   que resuelve los quiebres que el GP suaviza (p.ej. Q nocturno = 30% PV).
+
+Interfaz análoga a scipy.optimize: devuelve un OptimizeResult con x, fun,
+nfev, success y message, y acepta callback(intermediate_result).
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+import warnings
+import numpy as np
+from scipy.optimize import OptimizeResult
+from scipy.stats import norm, qmc
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import ConstantKernel, Matern, WhiteKernel
+
+logger = logging.getLogger(__name__)
+
+
+def _symlog(y: np.ndarray) -> np.ndarray:
+    """Transformación log-simétrica: comprime penalizaciones de órdenes altos"""
+    return np.sign(y) * np.log1p(np.abs(y))
+
+
+def _feasible(X: np.ndarray, constraints: Sequence[Dict]) -> np.ndarray:
+    """Máscara de filas que cumplen todas las restricciones 'ineq' (fun(x) >= 0)"""
+    mask = np.ones(len(X), dtype=bool)
+    for constraint in constraints:
+        mask &= np.array([np.all(np.asarray(constraint['fun'](x)) >= 0) for x in X])
+    return mask
+
+
+def _build_model(seed: int) -> GaussianProcessRegressor:
+    """GP con kernel Matern 5/2 anisotrópico sobre el cubo unitario"""
+    kernel = (ConstantKernel(1.0, (1e-3, 1e3)) *
+              Matern(length_scale=[0.3, 0.3, 0.3], length_scale_bounds=(1e-2, 1e1), nu=2.5) +
+              WhiteKernel(1e-6, (1e-10, 1e-2)))
+    return GaussianProcessRegressor(kernel=kernel, normalize_y=True,
+                                    n_restarts_optimizer=2, random_state=seed)
+
+
+def _expected_improvement(mean: np.ndarray, std: np.ndarray, best: float) -> np.ndarray:
+    """Mejora esperada para minimización"""
+    std = np.maximum(std, 1e-12)
+    z = (best - mean) / std
+    return (best - mean) * norm.cdf(z) + std * norm.pdf(z)
+
+
+def surrogate_minimize(fun: Callable[[np.ndarray], np.ndarray],
+                       bounds: List[Tuple[float, float]],
+                       constraints: Sequence[Dict] = (),
+                       initial_samples: int = 15,
+                       max_evaluations: int = 90,
+                       polish_evaluations: int = 40,
+                       n_candidates: int = 2000,
+                       patience: int = 15,
+                       tol: float = 1e-6,
+                       seed: Optional[int] = None,
+                       callback: Optional[Callable] = None) -> OptimizeResult:
+    """
+    Minimiza fun usando un GP como sustituto de la función real.
+
+    Args:
+        fun: Función vectorizada: recibe x (D, S) y devuelve (S,)
+        bounds: Límites [(min, max), ...] de cada variable
+        constraints: Restricciones estilo minimize ({'type': 'ineq', 'fun': f})
+        initial_samples: Puntos del hipercubo latino inicial
+        max_evaluations: Máximo de evaluaciones de la función real
+        polish_evaluations: Evaluaciones reservadas para el pulido final
+        n_candidates: Candidatos puntuados en el sustituto por ronda
+        patience: Rondas sin mejora relativa > tol antes de detenerse
+        tol: Mejora relativa mínima
+        seed: Semilla
+        callback: callback(intermediate_result) por ronda; StopIteration detiene
+
+    Returns:
+        OptimizeResult con x, fun, nfev, nit, success y message
+    """
+    rng = np.random.default_rng(seed)
+    lower, upper = np.array(bounds, dtype=float).T
+    span = np.where(upper > lower, upper - lower, 1.0)
+    dim = len(bounds)
+
+    def to_unit(X: np.ndarray) -> np.ndarray:
+        return (X - lower) / span
+
+    def from_unit(U: np.ndarray) -> np.ndarray:
+        return lower + U * span
+
+    # 1. Muestra inicial (hipercubo latino)
+    sampler = qmc.LatinHypercube(d=dim, seed=rng)
+    X = from_unit(sampler.random(initial_samples))
+    y = np.asarray(fun(X.T), dtype=float)
+    feasible = _feasible(X, constraints)
+
+    def incumbent() -> int:
+        scores = np.where(feasible, y, np.inf)
+        return int(np.argmin(scores)) if np.isfinite(scores).any() else int(np.argmin(y))
+
+    best = incumbent()
+    stall = 0
+    nit = 0
+    message = 'Máximo de evaluaciones alcanzado'
+    model = _build_model(0 if seed is None else seed)
+
+    # 2-3. Ajuste del sustituto y evaluación del candidato de mayor EI
+    while len(y) < max_evaluations - polish_evaluations:
+        nit += 1
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', ConvergenceWarning)
+            model.fit(to_unit(X), _symlog(y))
+        # La próxima ronda parte de los hiperparámetros ya ajustados
+        model.set_params(kernel=model.kernel_, n_restarts_optimizer=0)
+
+        # Candidatos globales y locales (alrededor del mejor, escala decreciente)
+        radius = max(0.01, 0.25 * (1 - len(y) / max_evaluations))
+        n_local = n_candidates // 2
+        local = to_unit(X[best]) + rng.normal(0, radius, (n_local, dim))
+        candidates = np.clip(np.vstack([rng.random((n_candidates - n_local, dim)), local]), 0, 1)
+        candidates = candidates[_feasible(from_unit(candidates), constraints)]
+        if len(candidates) == 0:
+            message = 'Sin candidatos factibles'
+            break
+
+        mean, std = model.predict(candidates, return_std=True)
+        ei = _expected_improvement(mean, std, _symlog(y[best]))
+        x_next = from_unit(candidates[np.argmax(ei)])
+
+        y_next = float(np.asarray(fun(x_next[:, None]), dtype=float)[0])
+        X = np.vstack([X, x_next])
+        y = np.append(y, y_next)
+        feasible = np.append(feasible, True)
+
+        previous = y[best]
+        best = incumbent()
+        improvement = (previous - y[best]) / max(1.0, abs(previous))
+        stall = 0 if improvement > tol else stall + 1
+
+        if callback is not None:
+            try:
+                callback(intermediate_result=OptimizeResult(x=X[best].copy(), fun=y[best]))
+            except StopIteration:
+                message = 'Detenido por callback'
+                break
+
+        if stall >= patience:
+            message = f'Sin mejora en {patience} rondas'
+            break
+
+    # 4. Pulido: búsqueda de patrón (Hooke-Jeeves) con paso decreciente;
+    #    el movimiento de patrón sigue crestas diagonales entre variables
+    step = 0.05
+    directions = np.vstack([np.eye(dim), -np.eye(dim)])
+    move = np.zeros(dim)
+    while (message != 'Detenido por callback' and step > 1e-3
+           and len(y) + len(directions) + 1 <= max_evaluations):
+        center = to_unit(X[best])
+        trial = np.clip(center + step * directions, 0, 1)
+        if move.any():
+            trial = np.vstack([trial, np.clip(center + move, 0, 1)])
+        trial = from_unit(trial[_feasible(from_unit(trial), constraints)])
+        if len(trial) == 0:
+            break
+        y_trial = np.asarray(fun(trial.T), dtype=float)
+        X = np.vstack([X, trial])
+        y = np.append(y, y_trial)
+        feasible = np.append(feasible, np.ones(len(trial), dtype=bool))
+
+        previous = best
+        best = incumbent()
+        if best == previous:
+            step /= 2
+            move = np.zeros(dim)
+        else:
+            move = to_unit(X[best]) - center
+
+    logger.debug(f"Búsqueda sustituta: {len(y)} evaluaciones, mejor = {y[best]:.4f}")
+
+    return OptimizeResult(
+        x=X[best].copy(),
+        fun=float(y[best]),
+        nfev=len(y),
+        nit=nit,
+        success=bool(feasible[best]) and message != 'Detenido por callback',
+        message=message
+    )
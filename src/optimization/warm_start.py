@@ -0,0 +1,271 @@
+"""
+Caché de Arranque en Caliente para la Optimización de Clusters
+==============================================================
+Guarda el óptimo (PV, BESS, Q) de cada cluster resuelto, indexado por un
+hash de las características del cluster y de los parámetros económicos.
+
+Al optimizar un cluster nuevo (o el mismo con parámetros modificados) se
+busca el caso resuelto más cercano y su solución, escalada a la demanda
+pico del cluster, se usa como semilla de la población inicial de DE o
+como x0 de minimize.
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+import hashlib
+import json
+import os
+import logging
+import threading
+from contextlib import contextmanager
+import numpy as np
+from scipy.stats import qmc
+
+try:
+    import fcntl
+except ImportError:  # Windows: sólo la escritura atómica, sin lock entre procesos
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+# Características del cluster que afectan al modelo de flujos
+CLUSTER_FEATURES = [
+    'peak_demand_mw',
+    'transformer_capacity_mva',
+    'pv_capacity_factor',
+    'loss_sensitivity',
+    'annual_penalties_usd',
+    'upgrade_cost_usd',
+    'deferred_upgrade_mva',
+]
+
+
+def _numeric_items(params: Dict) -> List[Tuple[str, float]]:
+    """Parámetros numéricos ordenados por nombre (ignora textos y anidados)"""
+    return sorted(
+        (key, float(value)) for key, value in params.items()
+        if isinstance(value, (int, float, np.number)) and not isinstance(value, bool)
+    )
+
+
+def _cluster_vector(cluster_data: Dict) -> np.ndarray:
+    """Vector de características del cluster en escala log (comparable entre tamaños)"""
+    return np.log1p(np.abs([float(cluster_data.get(name) or 0.0) for name in CLUSTER_FEATURES]))
+
+
+def _params_vector(params: Dict) -> Dict[str, float]:
+    """Parámetros en escala log para medir cambios relativos"""
+    return {key: float(np.log1p(abs(value))) for key, value in _numeric_items(params)}
+
+
+class WarmStartCache:
+    """
+    Caché de soluciones óptimas por cluster y juego de parámetros.
+
+    Las soluciones se guardan normalizadas por la demanda pico del cluster
+    (MW de PV, MWh de BESS y MVAr de Q por MW de demanda) para poder
+    transferirlas entre clusters de distinto tamaño. Es segura entre threads.
+    """
+
+    def __init__(self, cache_file: Optional[Path] = None,
+                 entries: Optional[Dict[str, Dict]] = None):
+        """
+        Inicializa la caché.
+
+        Args:
+            cache_file: Archivo JSON de persistencia (si None, solo en memoria)
+            entries: Entradas iniciales (p.ej. snapshot de otra caché); se
+                combinan con las del archivo y tienen prioridad sobre ellas
+        """
+        self.cache_file = Path(cache_file) if cache_file else None
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+        if self.cache_file and self.cache_file.exists():
+            self._entries = self._read_file()
+            logger.info(f"Caché de arranque en caliente: {len(self._entries)} soluciones cargadas")
+        self._entries.update(entries or {})
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getstate__(self) -> Dict:
+        # El lock no es serializable (la caché viaja con el objetivo a los workers)
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Copia de las entradas, para enviar a procesos worker"""
+        with self._lock:
+            return dict(self._entries)
+
+    @staticmethod
+    def make_key(cluster_data: Dict, params: Dict) -> str:
+        """
+        Hash estable de las características del cluster y los parámetros.
+
+        Args:
+            cluster_data: Datos del cluster
+            params: Parámetros económicos, restricciones y pesos del objetivo
+
+        Returns:
+            Hash SHA-256 hexadecimal
+        """
+        payload = {
+            'cluster': [round(float(cluster_data.get(name) or 0.0), 9) for name in CLUSTER_FEATURES],
+            'load_type': str(cluster_data.get('dominant_load_type', 'mixed')),
+            'params': [(key, round(value, 12)) for key, value in _numeric_items(params)],
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def lookup(self, cluster_data: Dict, params: Dict) -> Optional[Tuple[np.ndarray, bool]]:
+        """
+        Busca la solución del caso resuelto más cercano.
+
+        Args:
+            cluster_data: Datos del cluster a optimizar
+            params: Parámetros económicos, restricciones y pesos del objetivo
+
+        Returns:
+            (x, exacto) con x = [pv_mw, bess_mwh, q_night_mvar] escalado a la
+            demanda del cluster, o None si la caché está vacía
+        """
+        key = self.make_key(cluster_data, params)
+        peak_demand = float(cluster_data.get('peak_demand_mw', 10))
+
+        with self._lock:
+            if not self._entries:
+                return None
+
+            entry = self._entries.get(key)
+            exact = entry is not None
+            if not exact:
+                entry = self._nearest(cluster_data, params)
+
+        return np.asarray(entry['x_per_mw'], dtype=float) * peak_demand, exact
+
+    def _nearest(self, cluster_data: Dict, params: Dict) -> Dict:
+        """Entrada a menor distancia (características + parámetros, escala log)"""
+        target_cluster = _cluster_vector(cluster_data)
+        target_params = _params_vector(params)
+        load_type = str(cluster_data.get('dominant_load_type', 'mixed'))
+
+        def distance(entry: Dict) -> float:
+            d_cluster = np.sum((np.asarray(entry['cluster_vector']) - target_cluster) ** 2)
+            names = set(entry['params_vector']) | set(target_params)
+            d_params = sum((entry['params_vector'].get(n, 0.0) - target_params.get(n, 0.0)) ** 2
+                           for n in names)
+            # Penalizar otro tipo de carga (cambia la curva de autoconsumo)
+            return d_cluster + d_params + (entry['load_type'] != load_type)
+
+        return min(self._entries.values(), key=distance)
+
+    def store(self, cluster_data: Dict, params: Dict, x: np.ndarray, npv_usd: float):
+        """
+        Guarda la solución óptima de un cluster.
+
+        Args:
+            cluster_data: Datos del cluster
+            params: Parámetros económicos, restricciones y pesos del objetivo
+            x: Solución [pv_mw, bess_mwh, q_night_mvar]
+            npv_usd: NPV de la solución (informativo)
+        """
+        peak_demand = float(cluster_data.get('peak_demand_mw', 10)) or 1.0
+        entry = {
+            'cluster_id': str(cluster_data.get('cluster_id', 'unknown')),
+            'load_type': str(cluster_data.get('dominant_load_type', 'mixed')),
+            'cluster_vector': _cluster_vector(cluster_data).tolist(),
+            'params_vector': _params_vector(params),
+            'x_per_mw': (np.asarray(x, dtype=float) / peak_demand).tolist(),
+            'npv_usd': float(npv_usd),
+        }
+
+        with self._lock:
+            self._entries[self.make_key(cluster_data, params)] = entry
+            if self.cache_file:
+                self._save()
+
+    def _read_file(self) -> Dict[str, Dict]:
+        """Entradas guardadas en el archivo ({} si no existe o no se puede leer)"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"No se pudo leer {self.cache_file}: {e}")
+            return {}
+
+    @contextmanager
+    def _file_lock(self):
+        """Lock exclusivo entre procesos sobre <cache_file>.lock"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.cache_file.with_name(f"{self.cache_file.name}.lock"), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _save(self):
+        """
+        Persiste la caché combinada con el archivo (escritura atómica).
+
+        Otras instancias (workers, corridas en paralelo) pueden haber guardado
+        soluciones desde la carga: se releen bajo el lock y las propias tienen
+        prioridad, así ningún guardado pisa los de los demás.
+        """
+        # Nombre único por proceso/thread: varias instancias pueden guardar a la vez
+        tmp_file = self.cache_file.with_name(
+            f"{self.cache_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with self._file_lock():
+                merged = self._read_file()
+                merged.update(self._entries)
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(merged, f)
+                tmp_file.replace(self.cache_file)
+            self._entries = merged
+        except OSError as e:
+            logger.warning(f"No se pudo guardar {self.cache_file}: {e}")
+            tmp_file.unlink(missing_ok=True)
+
+
+def seeded_population(x0: np.ndarray, bounds: List[Tuple[float, float]],
+                      size: int, spread: float, seed: Optional[int],
+                      local_fraction: float = 0.5) -> np.ndarray:
+    """
+    Población inicial de DE sembrada con una solución conocida.
+
+    Args:
+        x0: Solución semilla
+        bounds: Límites de cada variable
+        size: Individuos de la población
+        spread: Desvío de las perturbaciones, relativo al rango de cada variable
+        seed: Semilla
+        local_fraction: Fracción de individuos alrededor de x0; el resto cubre
+            todo el dominio por hipercubo latino (evita quedar en un óptimo local)
+
+    Returns:
+        Array (size, D) con x0 en la primera fila
+    """
+    rng = np.random.default_rng(seed)
+    lower, upper = np.array(bounds, dtype=float).T
+    n_local = max(1, int(round(size * local_fraction)))
+
+    local = x0 + rng.normal(0, spread, (n_local, len(bounds))) * (upper - lower)
+    local[0] = x0
+    global_ = lower + qmc.LatinHypercube(d=len(bounds), seed=rng).random(size - n_local) * (upper - lower)
+    return np.clip(np.vstack([local, global_]), lower, upper)
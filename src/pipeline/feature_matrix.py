@@ -0,0 +1,206 @@
+"""
+Matriz de Features para Machine Learning (.npy mapeable en memoria)
+===================================================================
+Formato de salida del script 08 para entrenamiento, análisis de importancia
+y el dashboard:
+
+- features.npy: matriz float32 contigua (filas = muestras), con los
+  conjuntos train/val/test uno detrás del otro.
+- labels.npy: vector de etiquetas int32 alineado con las filas.
+- metadata.json: columnas, rango de filas de cada conjunto, codificación de
+  las categóricas, imputación y escalado.
+
+np.load(mmap_mode='r') no lee el archivo: las páginas se cargan al
+accederlas y son compartidas entre procesos (el sistema operativo las
+mantiene una sola vez en su caché). Un conjunto es un rango de filas, así
+que tomarlo es una vista sin copia.
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+FEATURES_FILE = 'features.npy'
+LABELS_FILE = 'labels.npy'
+METADATA_FILE = 'metadata.json'
+
+FEATURE_DTYPE = np.float32
+LABEL_DTYPE = np.int32
+
+PathLike = Union[str, Path]
+
+
+@dataclass
+class FeatureMatrix:
+    """Matriz de features con sus etiquetas y metadatos"""
+    features: np.ndarray
+    labels: np.ndarray
+    columns: List[str]
+    splits: Dict[str, Tuple[int, int]]
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def split(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Features y etiquetas de un conjunto (vistas, sin copia).
+
+        Args:
+            name: Nombre del conjunto ('train', 'val', 'test')
+
+        Returns:
+            (X, y) del conjunto
+        """
+        if name not in self.splits:
+            raise KeyError(f"Conjunto desconocido: {name} (disponibles: {list(self.splits)})")
+        start, stop = self.splits[name]
+        return self.features[start:stop], self.labels[start:stop]
+
+    def column_index(self, columns: Sequence[str]) -> np.ndarray:
+        """Posición de cada columna en la matriz"""
+        position = {column: i for i, column in enumerate(self.columns)}
+        missing = [c for c in columns if c not in position]
+        if missing:
+            raise KeyError(f"Columnas inexistentes en la matriz: {missing}")
+        return np.array([position[c] for c in columns], dtype=np.intp)
+
+    def frame(self, name: Optional[str] = None, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        DataFrame de un conjunto (o de todas las filas) para análisis.
+
+        Copia solo las columnas pedidas.
+
+        Args:
+            name: Conjunto (None = todas las filas)
+            columns: Columnas (None = todas)
+
+        Returns:
+            DataFrame con las features
+        """
+        features = self.features if name is None else self.split(name)[0]
+        columns = list(self.columns if columns is None else columns)
+        return pd.DataFrame(np.asarray(features[:, self.column_index(columns)]), columns=columns)
+
+
+def _json_default(value):
+    """Tipos numpy en los metadatos"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def write_feature_matrix(directory: PathLike,
+                         splits: Dict[str, Tuple[pd.DataFrame, Sequence]],
+                         metadata: Optional[Dict[str, Any]] = None) -> Path:
+    """
+    Guarda los conjuntos como una matriz float32 contigua y un vector de etiquetas.
+
+    Todos los conjuntos deben tener las mismas columnas en el mismo orden.
+    Las filas se escriben directamente en el archivo destino (sin armar la
+    matriz completa en memoria).
+
+    Args:
+        directory: Directorio de salida
+        splits: {nombre: (X, y)} en el orden en que se escriben las filas
+        metadata: Metadatos adicionales (codificación, escalado, ...)
+
+    Returns:
+        Ruta de metadata.json
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    if not splits:
+        raise ValueError("No hay conjuntos para guardar")
+
+    columns = [str(c) for c in next(iter(splits.values()))[0].columns]
+    for name, (X, y) in splits.items():
+        if [str(c) for c in X.columns] != columns:
+            raise ValueError(f"El conjunto {name} no tiene las mismas columnas que el primero")
+        if len(X) != len(y):
+            raise ValueError(f"El conjunto {name} tiene {len(X)} filas y {len(y)} etiquetas")
+
+    n_rows = sum(len(X) for X, _ in splits.values())
+    features_tmp = directory / (FEATURES_FILE + '.tmp')
+    labels_tmp = directory / (LABELS_FILE + '.tmp')
+    features = np.lib.format.open_memmap(features_tmp, mode='w+', dtype=FEATURE_DTYPE,
+                                         shape=(n_rows, len(columns)))
+    labels = np.lib.format.open_memmap(labels_tmp, mode='w+', dtype=LABEL_DTYPE, shape=(n_rows,))
+
+    ranges = {}
+    start = 0
+    for name, (X, y) in splits.items():
+        stop = start + len(X)
+        features[start:stop] = X.to_numpy(dtype=np.float64)
+        labels[start:stop] = np.asarray(y, dtype=LABEL_DTYPE)
+        ranges[name] = [start, stop]
+        start = stop
+    features.flush()
+    labels.flush()
+    del features, labels
+
+    document = {
+        **(metadata or {}),
+        'matriz': {
+            'features': FEATURES_FILE,
+            'labels': LABELS_FILE,
+            'dtype_features': np.dtype(FEATURE_DTYPE).name,
+            'dtype_labels': np.dtype(LABEL_DTYPE).name,
+            'forma': [n_rows, len(columns)],
+            'conjuntos': ranges,
+            'columnas': columns,
+        },
+    }
+    metadata_tmp = directory / (METADATA_FILE + '.tmp')
+    with open(metadata_tmp, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2, ensure_ascii=False, default=_json_default)
+
+    # Metadatos al final: un lector nunca ve una matriz sin su descripción
+    features_tmp.replace(directory / FEATURES_FILE)
+    labels_tmp.replace(directory / LABELS_FILE)
+    metadata_tmp.replace(directory / METADATA_FILE)
+    return directory / METADATA_FILE
+
+
+def load_feature_matrix(directory: PathLike, mmap: bool = True) -> FeatureMatrix:
+    """
+    Abre la matriz de features de un directorio.
+
+    Args:
+        directory: Directorio con features.npy, labels.npy y metadata.json
+        mmap: True mapea los archivos en memoria (solo lectura); False los
+            lee completos
+
+    Returns:
+        FeatureMatrix
+
+    Raises:
+        FileNotFoundError: Falta alguno de los archivos
+        ValueError: La matriz no coincide con sus metadatos
+    """
+    directory = Path(directory)
+    with open(directory / METADATA_FILE, encoding='utf-8') as f:
+        metadata = json.load(f)
+    if 'matriz' not in metadata:
+        raise ValueError(f"{directory / METADATA_FILE} no describe una matriz de features")
+    description = metadata['matriz']
+
+    mode = 'r' if mmap else None
+    features = np.load(directory / description['features'], mmap_mode=mode)
+    labels = np.load(directory / description['labels'], mmap_mode=mode)
+    if list(features.shape) != description['forma'] or len(labels) != features.shape[0]:
+        raise ValueError(f"La matriz {features.shape} no coincide con los metadatos {description['forma']}")
+
+    return FeatureMatrix(
+        features=features,
+        labels=labels,
+        columns=list(description['columnas']),
+        splits={name: tuple(bounds) for name, bounds in description['conjuntos'].items()},
+        metadata=metadata,
+    )
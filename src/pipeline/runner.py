@@ -0,0 +1,404 @@
+"""
+Ejecución Incremental del Pipeline
+==================================
+Cada etapa (un script numerado) declara sus entradas, salidas, archivos de
+configuración y código del que depende. Antes de ejecutarla se calcula su
+huella:
+
+    huella = SHA-256(script + código + contenido de las entradas
+                     + configuración + argumentos)
+
+Si la huella coincide con la de la última corrida exitosa y las salidas
+siguen en disco sin modificar, la etapa se saltea. Como las salidas de una
+etapa son entradas de las siguientes, un cambio se propaga solo hacia
+abajo; y si una etapa re-ejecutada produce exactamente los mismos archivos,
+las posteriores vuelven a quedar al día (corte temprano).
+
+Las etapas por alimentador (scripts 04, 05 y 07 de network_analysis)
+reciben además un directorio de caché por alimentador
+(src/network/feeder_runner.FeederCache): cuando cambian los datos de un
+alimentador, solo esa partición se recalcula dentro de la etapa.
+
+Por cada etapa se registra el tiempo de pared y el pico de memoria (RSS
+máximo del proceso hijo). El estado (huellas y hashes de archivos) se
+guarda en un JSON después de cada etapa, de modo que una corrida
+interrumpida retoma desde donde quedó.
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_BYTES = 1 << 20
+MISSING = 'ausente'
+
+
+@dataclass
+class Stage:
+    """Etapa del pipeline: rutas relativas a la raíz del proyecto"""
+    name: str
+    script: str
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    config: List[str] = field(default_factory=list)
+    code: List[str] = field(default_factory=list)
+    args: List[str] = field(default_factory=list)
+    per_feeder: bool = False
+
+
+@dataclass
+class StageRun:
+    """Resultado de una etapa en una corrida"""
+    name: str
+    status: str
+    reason: str = ''
+    wall_time_s: float = 0.0
+    peak_memory_mb: float = 0.0
+    returncode: Optional[int] = None
+
+
+def validate_stages(stages: List[Stage]):
+    """
+    Verifica nombres únicos y que cada entrada producida por el pipeline
+    venga de una etapa anterior (el orden declarado es el de ejecución).
+
+    Args:
+        stages: Etapas en orden de ejecución
+
+    Raises:
+        ValueError: Nombre repetido, salida duplicada o dependencia hacia adelante
+    """
+    producers = {}
+    for position, stage in enumerate(stages):
+        for output in stage.outputs:
+            if output in producers:
+                raise ValueError(f"{output} es salida de {stages[producers[output]].name} y de {stage.name}")
+            producers[output] = position
+    names = set()
+    for position, stage in enumerate(stages):
+        if stage.name in names:
+            raise ValueError(f"Etapa repetida: {stage.name}")
+        names.add(stage.name)
+        for path in stage.inputs:
+            if producers.get(path, -1) >= position:
+                raise ValueError(f"{stage.name} lee {path}, que produce una etapa posterior "
+                                 f"({stages[producers[path]].name})")
+
+
+def _peak_rss_mb(rusage) -> float:
+    # ru_maxrss: kilobytes en Linux, bytes en macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return rusage.ru_maxrss * scale / 1e6
+
+
+class PipelineRunner:
+    """Ejecuta las etapas desactualizadas y registra tiempos y memoria"""
+
+    def __init__(self, stages: List[Stage], root: Path, state_file: Optional[Path] = None,
+                 cache_dir: Optional[Path] = None, workers: Optional[int] = None,
+                 python: str = sys.executable):
+        """
+        Args:
+            stages: Etapas en orden de ejecución
+            root: Raíz del proyecto (las rutas de las etapas son relativas a ella)
+            state_file: JSON con huellas y hashes (por defecto data/.pipeline_state.json)
+            cache_dir: Caché por alimentador (por defecto data/.pipeline_cache)
+            workers: --workers para las etapas por alimentador (None = el del script)
+            python: Intérprete con el que se ejecutan los scripts
+        """
+        validate_stages(stages)
+        self.stages = stages
+        self.root = Path(root)
+        self.state_file = Path(state_file) if state_file else self.root / 'data' / '.pipeline_state.json'
+        self.cache_dir = Path(cache_dir) if cache_dir else self.root / 'data' / '.pipeline_cache'
+        self.workers = workers
+        self.python = python
+        self.state = self._load_state()
+
+    # ------------------------------------------------------------------
+    # Estado y hashes
+    # ------------------------------------------------------------------
+
+    def _load_state(self) -> Dict:
+        if self.state_file.exists():
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                state.setdefault('stages', {})
+                state.setdefault('hashes', {})
+                return state
+            except (json.JSONDecodeError, OSError):
+                logger.warning(f"Estado ilegible, se recalcula todo: {self.state_file}")
+        return {'stages': {}, 'hashes': {}}
+
+    def _save_state(self):
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_file.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.state_file)
+
+    def file_digest(self, relative: str) -> str:
+        """
+        SHA-256 del contenido de un archivo o directorio (recursivo).
+
+        El hash de cada archivo se reutiliza mientras no cambien su tamaño ni
+        su fecha de modificación, de modo que solo se releen los archivos
+        tocados desde la corrida anterior.
+
+        Args:
+            relative: Ruta relativa a la raíz
+
+        Returns:
+            Hash hexadecimal, o 'ausente' si la ruta no existe
+        """
+        path = self.root / relative
+        if path.is_dir():
+            h = hashlib.sha256()
+            for child in sorted(p for p in path.rglob('*') if p.is_file() and '__pycache__' not in p.parts):
+                child_relative = child.relative_to(self.root).as_posix()
+                h.update(child_relative.encode())
+                h.update(self.file_digest(child_relative).encode())
+            return h.hexdigest()
+        if not path.is_file():
+            return MISSING
+
+        stat = path.stat()
+        cached = self.state['hashes'].get(relative)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+                h.update(chunk)
+        digest = h.hexdigest()
+        self.state['hashes'][relative] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def stage_args(self, stage: Stage) -> List[str]:
+        """Argumentos de línea de comandos (más workers y caché por alimentador)"""
+        args = list(stage.args)
+        if stage.per_feeder:
+            if self.workers is not None:
+                args += ['--workers', str(self.workers)]
+            args += ['--feeder-cache', str(self.cache_dir / stage.name)]
+        return args
+
+    def fingerprint(self, stage: Stage) -> str:
+        """
+        Huella de una etapa: código, entradas, configuración y argumentos.
+
+        Args:
+            stage: Etapa
+
+        Returns:
+            Hash hexadecimal
+        """
+        # workers y el directorio de caché no cambian el resultado
+        payload = {
+            'script': self.file_digest(stage.script),
+            'code': {path: self.file_digest(path) for path in stage.code},
+            'inputs': {path: self.file_digest(path) for path in stage.inputs},
+            'config': {path: self.file_digest(path) for path in stage.config},
+            'args': stage.args
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def outdated_reason(self, stage: Stage) -> Optional[str]:
+        """
+        Motivo por el que la etapa debe ejecutarse (None si está al día).
+
+        Args:
+            stage: Etapa
+
+        Returns:
+            Descripción breve del motivo o None
+        """
+        previous = self.state['stages'].get(stage.name)
+        if previous is None:
+            return 'sin corrida previa'
+        if previous.get('fingerprint') != self.fingerprint(stage):
+            changed = [path for path in [stage.script] + stage.code + stage.inputs + stage.config
+                       if previous.get('files', {}).get(path) != self.file_digest(path)]
+            if changed:
+                return 'cambió ' + ', '.join(changed[:3]) + (' ...' if len(changed) > 3 else '')
+            return 'cambiaron los argumentos'
+        for path in stage.outputs:
+            digest = self.file_digest(path)
+            if digest == MISSING:
+                return f'falta {path}'
+            if previous.get('outputs', {}).get(path) != digest:
+                return f'{path} fue modificado fuera del pipeline'
+        return None
+
+    # ------------------------------------------------------------------
+    # Ejecución
+    # ------------------------------------------------------------------
+
+    def execute(self, stage: Stage) -> StageRun:
+        """
+        Ejecuta el script de una etapa en un proceso hijo.
+
+        Args:
+            stage: Etapa
+
+        Returns:
+            StageRun con código de salida, tiempo de pared y pico de RSS
+        """
+        command = [self.python, str(self.root / stage.script)] + self.stage_args(stage)
+        env = {**os.environ, 'PYTHONPATH': os.pathsep.join(
+            p for p in [str(self.root), os.environ.get('PYTHONPATH', '')] if p)}
+        logger.info(f"▶ {stage.name}: {' '.join(command[1:])}")
+
+        start = time.perf_counter()
+        process = subprocess.Popen(command, cwd=self.root, env=env)
+        # wait4 devuelve el uso de recursos de este hijo (no el acumulado)
+        _, status, rusage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        elapsed = time.perf_counter() - start
+
+        run = StageRun(stage.name, 'ejecutada', wall_time_s=round(elapsed, 3),
+                       peak_memory_mb=round(_peak_rss_mb(rusage), 1),
+                       returncode=process.returncode)
+        if process.returncode != 0:
+            run.status = 'fallida'
+            run.reason = f'código de salida {process.returncode}'
+            return run
+        missing = [path for path in stage.outputs if not (self.root / path).exists()]
+        if missing:
+            # Varios scripts registran el error y terminan con código 0
+            run.status = 'fallida'
+            run.reason = 'no generó ' + ', '.join(missing)
+        return run
+
+    def _record(self, stage: Stage, run: StageRun):
+        files = {path: self.file_digest(path) for path in [stage.script] + stage.code + stage.inputs + stage.config}
+        self.state['stages'][stage.name] = {
+            'fingerprint': self.fingerprint(stage),
+            'files': files,
+            'outputs': {path: self.file_digest(path) for path in stage.outputs},
+            'finished_at': datetime.now().isoformat(),
+            'wall_time_s': run.wall_time_s,
+            'peak_memory_mb': run.peak_memory_mb
+        }
+
+    def select(self, only: Optional[Iterable[str]] = None, downstream: bool = False) -> List[Stage]:
+        """
+        Etapas a considerar: todas, las indicadas, o las indicadas y las que
+        dependen de ellas.
+
+        Args:
+            only: Nombres de etapas (None = todas)
+            downstream: Incluir las etapas que leen sus salidas (transitivo)
+
+        Returns:
+            Etapas en orden de ejecución
+        """
+        if only is None:
+            return list(self.stages)
+        names = set(only)
+        unknown = names - {s.name for s in self.stages}
+        if unknown:
+            raise ValueError(f"Etapas desconocidas: {', '.join(sorted(unknown))}")
+        if downstream:
+            produced = set()
+            for stage in self.stages:
+                if stage.name in names or produced.intersection(stage.inputs):
+                    names.add(stage.name)
+                    produced.update(stage.outputs)
+        return [s for s in self.stages if s.name in names]
+
+    def run(self, only: Optional[Iterable[str]] = None, downstream: bool = False,
+            force: bool = False, dry_run: bool = False) -> List[StageRun]:
+        """
+        Ejecuta en orden las etapas desactualizadas.
+
+        Una etapa que falla bloquea a las que leen sus salidas; las etapas
+        independientes siguen ejecutándose.
+
+        Args:
+            only: Limitar a estas etapas (None = todas)
+            downstream: Con only, incluir también las etapas dependientes
+            force: Ejecutar aunque estén al día
+            dry_run: Solo informar qué se ejecutaría
+
+        Returns:
+            Lista de StageRun en orden
+        """
+        runs = []
+        blocked_paths = set()
+        for stage in self.select(only, downstream):
+            blocked_by = blocked_paths.intersection(stage.inputs)
+            if blocked_by:
+                runs.append(StageRun(stage.name, 'bloqueada', f'falló la etapa que genera {sorted(blocked_by)[0]}'))
+                blocked_paths.update(stage.outputs)
+                continue
+
+            reason = 'forzada' if force else self.outdated_reason(stage)
+            if reason is None:
+                runs.append(StageRun(stage.name, 'al día'))
+                continue
+            if dry_run:
+                runs.append(StageRun(stage.name, 'pendiente', reason))
+                continue
+
+            run = self.execute(stage)
+            if run.status == 'ejecutada':
+                run.reason = reason
+                self._record(stage, run)
+            else:
+                logger.error(f"✗ {stage.name}: {run.reason}")
+                self.state['stages'].pop(stage.name, None)
+                blocked_paths.update(stage.outputs)
+            self._save_state()
+            runs.append(run)
+
+        if not dry_run:
+            self._save_state()
+        return runs
+
+
+def run_report(runs: List[StageRun]) -> Dict:
+    """
+    Reporte de una corrida para guardar en JSON.
+
+    Args:
+        runs: Resultados de PipelineRunner.run
+
+    Returns:
+        Diccionario con conteos por estado, totales y detalle por etapa
+    """
+    executed = [r for r in runs if r.status == 'ejecutada']
+    statuses = {}
+    for r in runs:
+        statuses[r.status] = statuses.get(r.status, 0) + 1
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'etapas_por_estado': statuses,
+        'tiempo_total_s': round(sum(r.wall_time_s for r in runs), 3),
+        'pico_memoria_max_mb': max((r.peak_memory_mb for r in executed), default=0.0),
+        'etapas': [asdict(r) for r in runs]
+    }
+
+
+def format_report(runs: List[StageRun]) -> str:
+    """Tabla de texto con estado, tiempo y memoria por etapa"""
+    lines = [f"{'Etapa':<42} {'Estado':<10} {'Tiempo':>9} {'Memoria':>10}  Motivo", '-' * 100]
+    for r in runs:
+        time_text = f"{r.wall_time_s:8.1f}s" if r.status in ('ejecutada', 'fallida') else f"{'-':>9}"
+        memory_text = f"{r.peak_memory_mb:7.0f} MB" if r.peak_memory_mb else f"{'-':>10}"
+        lines.append(f"{r.name:<42} {r.status:<10} {time_text} {memory_text}  {r.reason}")
+    return '\n'.join(lines)
@@ -0,0 +1,226 @@
+"""
+Etapas del Pipeline EDERSA (scripts 00 → 16)
+============================================
+Declaración de entradas y salidas de cada script numerado, en orden de
+ejecución. Solo se declaran las salidas que el script genera siempre; los
+archivos opcionales (p. ej. excluded_records.csv) y las figuras no
+participan de las huellas. En code van los módulos de src que el script
+importa, directa o indirectamente. Los datasets de transformadores que
+pasan de una etapa a otra están en el almacenamiento Parquet
+(src/pipeline/store).
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+from typing import List
+
+from .runner import Stage
+
+PROCESSED = 'data/processed'
+NETWORK = f'{PROCESSED}/network_analysis'
+ELECTRICAL = f'{PROCESSED}/electrical_analysis'
+CLUSTERING = 'reports/clustering'
+OPTIMIZATION = f'{CLUSTERING}/optimization'
+
+PREPROCESSING_CONFIG = 'config/preprocessing_config.yaml'
+PARAMETERS_CONFIG = 'config/parameters.yaml'
+
+# Módulos de src que importan los scripts (directa o indirectamente)
+STORE = 'src/pipeline/store.py'
+FEATURE_MATRIX = 'src/pipeline/feature_matrix.py'
+COLUMNS = 'src/network/columns.py'
+LOAD_FLOW = ['src/network/load_flow.py', 'src/network/mst_topology.py']
+
+ML_DATASETS = [f'{ELECTRICAL}/ml_datasets/{name}' for name in ('features.npy', 'labels.npy')]
+
+
+def pipeline_stages() -> List[Stage]:
+    """
+    Etapas del estudio completo: preprocesamiento, análisis de red,
+    clustering y optimización.
+
+    Returns:
+        Lista de Stage en orden de ejecución
+    """
+    return [
+        # --- Preprocesamiento -------------------------------------------------
+        Stage('preprocessing/00_excel_to_csv', 'scripts/preprocessing/00_excel_to_csv.py',
+              inputs=['data/raw/Mediciones Originales EDERSA.xlsx'],
+              outputs=['data/interim/transformers_raw.csv',
+                       'reports/00_conversion_stats.json']),
+        Stage('preprocessing/01_validate_data', 'scripts/preprocessing/01_validate_data.py',
+              inputs=['data/interim/transformers_raw.csv'],
+              outputs=[f'{PROCESSED}/dataset_a_quality_analysis.csv',
+                       f'{PROCESSED}/dataset_b_full_inventory.csv',
+                       'reports/01_validation_report.json'],
+              config=[PREPROCESSING_CONFIG]),
+        Stage('preprocessing/02_clean_enrich_data', 'scripts/preprocessing/02_clean_enrich_data.py',
+              inputs=[f'{PROCESSED}/dataset_a_quality_analysis.csv',
+                      f'{PROCESSED}/dataset_b_full_inventory.csv'],
+              outputs=[f'{PROCESSED}/transformers_analysis.parquet',
+                       f'{PROCESSED}/circuits_inventory.parquet',
+                       'reports/02_cleaning_report.json'],
+              config=[PREPROCESSING_CONFIG],
+              code=[STORE]),
+        Stage('preprocessing/03_create_aggregations', 'scripts/preprocessing/03_create_aggregations.py',
+              inputs=[f'{PROCESSED}/transformers_analysis.parquet'],
+              outputs=[f'{PROCESSED}/aggregations/by_sucursal.parquet',
+                       f'{PROCESSED}/aggregations/by_localidad.parquet',
+                       f'{PROCESSED}/aggregations/critical_zones.json',
+                       'reports/03_aggregations_report.json'],
+              code=[STORE]),
+        Stage('preprocessing/04_analyze_criticality', 'scripts/preprocessing/04_analyze_criticality.py',
+              inputs=[f'{PROCESSED}/transformers_analysis.parquet'],
+              outputs=[f'{PROCESSED}/transformers_gd_analysis.parquet',
+                       f'{PROCESSED}/gd_recommendations.json',
+                       'reports/04_criticality_report.json'],
+              code=[STORE]),
+        Stage('preprocessing/05_create_database', 'scripts/preprocessing/05_create_database.py',
+              inputs=[f'{PROCESSED}/transformers_gd_analysis.parquet',
+                      f'{PROCESSED}/circuits_inventory.parquet',
+                      f'{PROCESSED}/aggregations/by_sucursal.parquet',
+                      f'{PROCESSED}/aggregations/by_localidad.parquet',
+                      f'{PROCESSED}/aggregations/critical_zones.json',
+                      f'{PROCESSED}/gd_recommendations.json',
+                      'reports/04_criticality_report.json'],
+              outputs=['data/database/edersa_quality.db'],
+              code=[STORE]),
+
+        # --- Análisis de red --------------------------------------------------
+        Stage('network_analysis/00_network_topology', 'scripts/network_analysis/00_network_topology_analysis.py',
+              inputs=[f'{PROCESSED}/transformers_analysis.parquet'],
+              outputs=[f'{NETWORK}/alimentadores_caracterizados.parquet',
+                       f'{NETWORK}/transformadores_con_topologia.parquet',
+                       f'{NETWORK}/patrones_red.json',
+                       'reports/00_network_topology_report.json'],
+              code=[STORE]),
+        Stage('network_analysis/01_spatial_correlation', 'scripts/network_analysis/01_spatial_correlation_analysis.py',
+              inputs=[f'{NETWORK}/transformadores_con_topologia.parquet',
+                      f'{NETWORK}/alimentadores_caracterizados.parquet'],
+              outputs=[f'{NETWORK}/patrones_espaciales_alimentadores.csv',
+                       'reports/01_spatial_correlation_report.json'],
+              code=[STORE]),
+        Stage('network_analysis/02_quality_correlation', 'scripts/network_analysis/02_quality_correlation_analysis.py',
+              inputs=[f'{NETWORK}/transformadores_con_topologia.parquet',
+                      f'{NETWORK}/alimentadores_caracterizados.parquet',
+                      f'{NETWORK}/patrones_espaciales_alimentadores.csv'],
+              outputs=['reports/02_quality_correlation_report.json'],
+              code=[STORE]),
+        Stage('network_analysis/03_characterization_report',
+              'scripts/network_analysis/03_network_characterization_report.py',
+              inputs=[f'{NETWORK}/transformadores_con_topologia.parquet',
+                      f'{NETWORK}/alimentadores_caracterizados.parquet',
+                      f'{NETWORK}/patrones_espaciales_alimentadores.csv',
+                      'reports/00_network_topology_report.json',
+                      'reports/01_spatial_correlation_report.json',
+                      'reports/02_quality_correlation_report.json'],
+              outputs=['reports/fase0_caracterizacion_completa.json',
+                       'reports/resumen_ejecutivo_fase0.json',
+                       'reports/resumen_ejecutivo_fase0.md'],
+              code=[STORE]),
+        Stage('network_analysis/04_mst_topology', 'scripts/network_analysis/04_mst_topology_reconstruction.py',
+              inputs=[f'{NETWORK}/transformadores_con_topologia.parquet',
+                      f'{NETWORK}/alimentadores_caracterizados.parquet'],
+              outputs=[f'{ELECTRICAL}/transformadores_mst_topology.parquet',
+                       f'{ELECTRICAL}/mst_topology_report.json'],
+              code=['src/network', STORE], per_feeder=True),
+        Stage('network_analysis/05_electrical_distance', 'scripts/network_analysis/05_electrical_distance_calculation.py',
+              inputs=[f'{ELECTRICAL}/transformadores_mst_topology.parquet'],
+              outputs=[f'{ELECTRICAL}/transformadores_distancia_electrica.parquet',
+                       f'{ELECTRICAL}/electrical_distance_report.json'],
+              code=['src/network', STORE], per_feeder=True),
+        Stage('network_analysis/06_load_estimation', 'scripts/network_analysis/06_load_estimation_features.py',
+              inputs=[f'{ELECTRICAL}/transformadores_distancia_electrica.parquet'],
+              outputs=[f'{ELECTRICAL}/transformadores_carga_estimada.parquet',
+                       f'{ELECTRICAL}/load_estimation_report.json'],
+              code=[COLUMNS, STORE]),
+        Stage('network_analysis/07_failure_modes', 'scripts/network_analysis/07_failure_mode_features.py',
+              inputs=[f'{ELECTRICAL}/transformadores_carga_estimada.parquet'],
+              outputs=[f'{ELECTRICAL}/transformadores_indices_riesgo.parquet',
+                       f'{ELECTRICAL}/failure_modes_report.json'],
+              code=['src/network', STORE], per_feeder=True),
+        Stage('network_analysis/08_ml_ready_dataset', 'scripts/network_analysis/08_ml_ready_dataset.py',
+              inputs=[f'{ELECTRICAL}/transformadores_indices_riesgo.parquet'],
+              outputs=ML_DATASETS + [f'{ELECTRICAL}/ml_datasets/metadata.json',
+                                     f'{ELECTRICAL}/ml_datasets/feature_importance.csv',
+                                     f'{ELECTRICAL}/ml_preparation_report.json'],
+              code=[STORE, FEATURE_MATRIX]),
+
+        # --- Clustering -------------------------------------------------------
+        Stage('clustering/06_profile_clustering', 'scripts/clustering/06_profile_based_clustering.py',
+              inputs=[f'{NETWORK}/transformadores_con_topologia.parquet'],
+              outputs=[f'{CLUSTERING}/cluster_report_ias.json',
+                       f'{CLUSTERING}/cluster_ranking_ias.csv',
+                       f'{PROCESSED}/transformers_ias_clustering.parquet'],
+              code=[STORE]),
+        Stage('clustering/07_technical_benefits', 'scripts/clustering/07_technical_benefits_calculator.py',
+              inputs=[f'{CLUSTERING}/cluster_ranking_ias.csv'],
+              outputs=[f'{CLUSTERING}/technical_benefits_report.json',
+                       f'{CLUSTERING}/technical_benefits_all.csv']),
+        Stage('clustering/08_clustering_refinement', 'scripts/clustering/08_clustering_refinement.py',
+              inputs=[f'{PROCESSED}/transformers_ias_clustering.parquet'],
+              outputs=[f'{CLUSTERING}/clustering_optimization_report.json',
+                       f'{PROCESSED}/transformers_refined_clusters.parquet'],
+              code=[STORE]),
+        Stage('clustering/09_executive_report', 'scripts/clustering/09_executive_report_generator.py',
+              inputs=[f'{CLUSTERING}/cluster_ranking_ias.csv',
+                      f'{CLUSTERING}/technical_benefits_all.csv',
+                      f'{PROCESSED}/transformers_refined_clusters.parquet'],
+              outputs=[f'{CLUSTERING}/executive/executive_report.json',
+                       f'{CLUSTERING}/executive/RESUMEN_EJECUTIVO.md'],
+              code=[STORE]),
+        Stage('clustering/10_land_availability', 'scripts/clustering/10_land_availability_scoring.py',
+              inputs=[f'{CLUSTERING}/cluster_ranking_ias.csv',
+                      f'{PROCESSED}/transformers_ias_clustering.parquet'],
+              outputs=[f'{CLUSTERING}/land_availability_report.json',
+                       f'{CLUSTERING}/land_availability_detailed.csv',
+                       f'{PROCESSED}/land_availability_scores.parquet'],
+              code=[STORE]),
+        Stage('clustering/11_ias_v3', 'scripts/clustering/11_ias_v3_seven_criteria.py',
+              inputs=[f'{CLUSTERING}/cluster_ranking_ias.csv',
+                      f'{PROCESSED}/land_availability_scores.parquet'],
+              outputs=[f'{CLUSTERING}/ias_v3/ias_v3_analysis_report.json',
+                       f'{CLUSTERING}/ias_v3/IAS_V3_RESUMEN_EJECUTIVO.md',
+                       f'{CLUSTERING}/ias_v3/cluster_ranking_ias_v3.csv',
+                       f'{PROCESSED}/clusters_ias_v3.parquet']),
+        Stage('clustering/12_refinement_v3', 'scripts/clustering/12_clustering_refinement_v3.py',
+              inputs=[f'{PROCESSED}/transformers_ias_clustering.parquet'],
+              outputs=[f'{CLUSTERING}/refinement_v3/clustering_refinement_report.json',
+                       f'{CLUSTERING}/refinement_v3/refined_clusters_ias_v3.csv',
+                       f'{PROCESSED}/transformers_refined_ias_v3.parquet'],
+              code=[STORE]),
+        Stage('clustering/13_technical_benefits_24h', 'scripts/clustering/13_technical_benefits_24h.py',
+              inputs=[f'{CLUSTERING}/ias_v3/cluster_ranking_ias_v3.csv'],
+              outputs=[f'{CLUSTERING}/benefits_24h/technical_benefits_24h_report.json',
+                       f'{CLUSTERING}/benefits_24h/technical_benefits_24h.csv',
+                       f'{PROCESSED}/technical_benefits_24h.parquet'],
+              code=[*LOAD_FLOW]),
+        Stage('clustering/14_comprehensive_report', 'scripts/clustering/14_comprehensive_executive_report.py',
+              inputs=[f'{CLUSTERING}/ias_v3/cluster_ranking_ias_v3.csv',
+                      f'{CLUSTERING}/land_availability_detailed.csv',
+                      f'{CLUSTERING}/benefits_24h/technical_benefits_24h.csv',
+                      f'{CLUSTERING}/refinement_v3/refined_clusters_ias_v3.csv',
+                      f'{CLUSTERING}/ias_v3/ias_v3_analysis_report.json',
+                      f'{CLUSTERING}/land_availability_report.json',
+                      f'{CLUSTERING}/benefits_24h/technical_benefits_24h_report.json',
+                      f'{CLUSTERING}/refinement_v3/clustering_refinement_report.json'],
+              outputs=[f'{CLUSTERING}/executive_final/final_executive_summary.json',
+                       f'{CLUSTERING}/executive_final/APENDICE_TECNICO_IAS_V3.md']),
+
+        # --- Optimización -----------------------------------------------------
+        Stage('optimization/15_prepare_data', 'scripts/optimization/15_prepare_optimization_data.py',
+              inputs=[f'{PROCESSED}/clusters_ias_v3.parquet'],
+              outputs=[f'{OPTIMIZATION}/clusters_optimization_data.parquet',
+                       f'{OPTIMIZATION}/load_profiles.csv',
+                       f'{OPTIMIZATION}/economic_parameters.json',
+                       f'{OPTIMIZATION}/technical_parameters.json',
+                       f'{OPTIMIZATION}/preparation_summary.json'],
+              config=[PARAMETERS_CONFIG], code=['src/config']),
+        Stage('optimization/16_integrated_flows', 'scripts/optimization/16_calculate_integrated_flows.py',
+              inputs=[f'{OPTIMIZATION}/clusters_optimization_data.parquet'],
+              outputs=[f'{OPTIMIZATION}/integrated_flows/analysis_summary.json',
+                       f'{OPTIMIZATION}/integrated_flows/all_integrated_flows.parquet',
+                       f'{OPTIMIZATION}/integrated_flows/optimal_configurations.csv'],
+              config=[PARAMETERS_CONFIG], code=['src/config', 'src/economics']),
+    ]
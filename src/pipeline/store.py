@@ -0,0 +1,207 @@
+"""
+Almacenamiento Intermedio Columnar (Parquet)
+============================================
+Formato de intercambio entre las etapas del pipeline en lugar de los CSV:
+
+- Esquema explícito para las columnas compartidas por todas las etapas
+  (COLUMN_SCHEMA): Alimentador, N_Sucursal y Resultado como categóricas
+  (codificación por diccionario en disco), coordenadas float64 y banderas
+  booleanas. El resto de las columnas conserva el tipo del DataFrame, que el
+  CSV perdía (booleanos con faltantes, enteros, categorías).
+- Proyección de columnas en la lectura: solo se leen del disco las
+  columnas pedidas.
+- Compatibilidad: si una etapa todavía no generó el .parquet, se lee el CSV
+  de una corrida anterior con el mismo nombre y se le aplica el esquema.
+
+Las rutas se pueden dar con extensión .parquet o .csv indistintamente: el
+archivo en disco siempre es el .parquet del mismo nombre.
+
+Autor: Asistente Claude
+Fecha: Julio 2025
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+PARQUET_COMPRESSION = 'zstd'
+
+# Columnas con tipo fijo en todos los datasets intermedios de transformadores
+CATEGORICAL_COLUMNS = ('Alimentador', 'N_Sucursal', 'Resultado')
+COLUMN_SCHEMA: Dict[str, str] = {
+    **{column: 'category' for column in CATEGORICAL_COLUMNS},
+    'Coord_X': 'float64',
+    'Coord_Y': 'float64',
+    'Potencia': 'float64',
+    'es_nodo_hoja': 'bool',
+    'es_lineal': 'bool',
+    'padre_problematico': 'bool',
+}
+
+PathLike = Union[str, Path]
+
+
+def parquet_path(path: PathLike) -> Path:
+    """Ruta del archivo Parquet de un dataset (acepta la ruta .csv histórica)"""
+    return Path(path).with_suffix('.parquet')
+
+
+def csv_path(path: PathLike) -> Path:
+    """Ruta del CSV histórico de un dataset"""
+    return Path(path).with_suffix('.csv')
+
+
+def dataset_exists(path: PathLike) -> bool:
+    """Hay datos del dataset en Parquet o en CSV"""
+    return parquet_path(path).exists() or csv_path(path).exists()
+
+
+def apply_schema(df: pd.DataFrame, categorical: bool = True) -> pd.DataFrame:
+    """
+    Aplica COLUMN_SCHEMA a las columnas presentes.
+
+    Las categorías se recalculan con los valores observados (sin categorías
+    vacías de filtros anteriores). Una columna booleana con faltantes queda
+    como está: forzarla a bool convertiría NaN en True.
+
+    Args:
+        df: Datos
+        categorical: False deja las columnas categóricas como object
+
+    Returns:
+        Copia de df con los tipos del esquema
+    """
+    df = df.copy()
+    for column, dtype in COLUMN_SCHEMA.items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if dtype == 'category':
+            if categorical:
+                df[column] = values.astype(object).astype('category')
+            elif isinstance(values.dtype, pd.CategoricalDtype):
+                df[column] = values.astype(object)
+        elif dtype == 'bool':
+            if values.dtype != bool and values.notna().all() and values.isin([True, False, 0, 1]).all():
+                df[column] = values.astype(bool)
+        elif values.dtype != dtype:
+            df[column] = pd.to_numeric(values, errors='coerce').astype(dtype)
+    return df
+
+
+def _arrow_ready(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ajustes para Parquet que el CSV resolvía implícitamente.
+
+    - Columnas repetidas: el CSV las renombraba en silencio ('x.1'); acá
+      son un error y cada script resuelve las suyas antes de guardar.
+    - Columnas object con tipos mezclados (códigos numéricos y
+      'SUBSTATION'): se guardan como texto, como quedaban al releer el CSV.
+    """
+    duplicated = df.columns.duplicated()
+    if duplicated.any():
+        raise ValueError(f"Columnas repetidas: {sorted(set(df.columns[duplicated]))}")
+    for column in df.columns:
+        values = df[column]
+        if values.dtype == object and pd.api.types.infer_dtype(values, skipna=True).startswith('mixed'):
+            df[column] = values.where(values.isna(), values.astype(str))
+    return df
+
+
+def write_frame(df: pd.DataFrame, path: PathLike) -> Path:
+    """
+    Guarda un dataset intermedio en Parquet con el esquema aplicado.
+
+    Args:
+        df: Datos (el índice no se guarda)
+        path: Ruta del dataset (.parquet o .csv)
+
+    Returns:
+        Ruta del archivo escrito
+    """
+    target = parquet_path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    df = apply_schema(_arrow_ready(df.reset_index(drop=True)))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Escritura atómica: un lector nunca ve un archivo a medio escribir
+    tmp = target.with_suffix('.parquet.tmp')
+    pq.write_table(table, tmp, compression=PARQUET_COMPRESSION)
+    tmp.replace(target)
+    return target
+
+
+def dataset_columns(path: PathLike) -> List[str]:
+    """Columnas del dataset sin leer los datos"""
+    source = parquet_path(path)
+    if source.exists():
+        return list(pq.read_schema(source).names)
+    return list(pd.read_csv(csv_path(path), nrows=0).columns)
+
+
+def read_frame(path: PathLike, columns: Optional[Sequence[str]] = None,
+               categorical: bool = True) -> pd.DataFrame:
+    """
+    Lee un dataset intermedio.
+
+    Args:
+        path: Ruta del dataset (.parquet o .csv)
+        columns: Columnas a leer (None = todas); en Parquet solo se leen
+            esas columnas del disco
+        categorical: False devuelve Alimentador/N_Sucursal/Resultado como object
+
+    Returns:
+        DataFrame con los tipos del esquema
+
+    Raises:
+        FileNotFoundError: No existe ni el Parquet ni el CSV
+        KeyError: Alguna de las columnas pedidas no existe
+    """
+    source = parquet_path(path)
+    if not source.exists():
+        source = csv_path(path)
+        if not source.exists():
+            raise FileNotFoundError(f"No existe {parquet_path(path)} ni {source}")
+        logger.info(f"{parquet_path(path).name} no existe, leyendo {source.name}")
+
+    if columns is not None:
+        columns = list(dict.fromkeys(columns))
+        missing = [c for c in columns if c not in dataset_columns(source)]
+        if missing:
+            raise KeyError(f"{source.name} no tiene las columnas {missing}")
+
+    if source.suffix == '.parquet':
+        df = pq.read_table(source, columns=columns).to_pandas()
+        if not categorical:
+            df = apply_schema(df, categorical=False)
+        return df
+    return apply_schema(pd.read_csv(source, usecols=columns), categorical=categorical)
+
+
+def convert_csv(path: PathLike, remove_csv: bool = False) -> Path:
+    """
+    Convierte un CSV histórico al formato intermedio.
+
+    Args:
+        path: Ruta del dataset
+        remove_csv: Borrar el CSV después de convertirlo
+
+    Returns:
+        Ruta del Parquet generado
+    """
+    source = csv_path(path)
+    target = write_frame(pd.read_csv(source), source)
+    if remove_csv:
+        source.unlink()
+    return target
+
+
+def memory_mb(df: pd.DataFrame) -> float:
+    """Memoria del DataFrame en MB (incluye el contenido de las cadenas)"""
+    return float(np.sum(df.memory_usage(deep=True))) / 1e6
@@ -0,0 +1,108 @@
+"""
+Script de Testing del Módulo Único de CAPEX
+===========================================
+Objetivo: Validar src/economics/capex.py contra la curva escalar de
+capex_scale y el modelo plano anterior, y medir el costo por configuración
+frente al cálculo escalar con economías de escala (micro-benchmark).
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+import numpy as np
+import pytest
+
+from src.config.config_loader import get_config
+from src.economics.capex import calculate_capex, load_capex_curve, pv_capex_per_mw
+from src.economics.capex_scale import calculate_pv_capex_per_mw
+from src.economics.financial_metrics import calculate_capex_total
+
+SIZES_MW = [0.3, 1.0, 2.5, 7.0, 33.3, 99.9, 100.0, 250.0]
+
+
+def test_curve_matches_capex_scale():
+    """La curva vectorizada es idéntica a la función escalar de capex_scale"""
+    values = pv_capex_per_mw(np.array(SIZES_MW))
+    assert values.tolist() == [calculate_pv_capex_per_mw(size) for size in SIZES_MW]
+
+    # La curva tabulada en CSV coincide en sus puntos
+    curve = load_capex_curve(BASE_DIR / "capex_economies_of_scale.csv")
+    np.testing.assert_allclose(pv_capex_per_mw(curve[0], curve=curve), curve[1])
+    np.testing.assert_allclose(pv_capex_per_mw(np.array(SIZES_MW), curve=curve), values, rtol=1e-12)
+
+
+def test_arrays_match_scalars():
+    """N configuraciones a la vez = N llamadas escalares; escalares devuelven floats"""
+    params = get_config().get_economic_snapshot()
+    rng = np.random.default_rng(1)
+    pv, bess, q = rng.uniform([0.2, 0, 0], [150, 40, 30], (200, 3)).T
+
+    batch = calculate_capex(pv, bess, q, params)
+    for i in range(len(pv)):
+        scalar = calculate_capex(pv[i], bess[i], q[i], params)
+        assert isinstance(scalar['total'], float)
+        for key, value in scalar.items():
+            assert batch[key][i] == value
+
+
+def test_flat_pricing_reproduces_previous_model():
+    """Sin economías de escala se reproduce el CAPEX plano anterior"""
+    params = {**get_config().get_economic_snapshot(), 'pv_capex_scale': False}
+    pv, bess, q = 12.0, 24.0, 3.0
+
+    capex = calculate_capex(pv, bess, q, params)
+    pv_capex = pv * params['pv_capex_usd_mw']
+    bess_capex = bess * params['bess_capex_usd_mwh'] + (bess / 4) * params['bess_capex_usd_mw']
+    q_capex = q * params['statcom_capex_usd_mvar'] * 0.3
+    subtotal = pv_capex + bess_capex + q_capex
+    assert capex['total'] == subtotal + subtotal * 0.15
+
+    # Sin descuento por Q del inversor: todo Q al costo STATCOM
+    params_full_q = {**params, 'inverter_q_discount': False}
+    assert calculate_capex(pv, bess, q, params_full_q)['q_night'] == q * params['statcom_capex_usd_mvar']
+
+    # Wrapper histórico: precios planos y Q completo (ejemplo del docstring)
+    assert calculate_capex_total(10, 5, 3, 800000, 200000, 40000) == pytest.approx(10_488_000)
+
+
+def benchmark_capex(n_configs: int = 100_000):
+    """CAPEX de n configuraciones: bucle escalar con capex_scale vs vectorizado"""
+    print("=" * 80)
+    print(f"MICRO-BENCHMARK CAPEX - {n_configs:,} configuraciones")
+    print("=" * 80)
+
+    params = get_config().get_economic_snapshot()
+    rng = np.random.default_rng(0)
+    pv, bess, q = rng.uniform([0.5, 0, 0], [60, 40, 18], (n_configs, 3)).T
+
+    start = time.perf_counter()
+    for i in range(n_configs):
+        per_mw = calculate_pv_capex_per_mw(pv[i])
+        subtotal = (pv[i] * per_mw +
+                    bess[i] * params['bess_capex_usd_mwh'] +
+                    bess[i] / 4 * params['bess_capex_usd_mw'] +
+                    q[i] * params['statcom_capex_usd_mvar'] * (0.3 if q[i] <= pv[i] * 0.3 else 1.0))
+        subtotal + subtotal * 0.15
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    calculate_capex(pv, bess, q, params)
+    batch_time = time.perf_counter() - start
+
+    print(f"Bucle escalar: {loop_time * 1e9 / n_configs:8.0f} ns/configuración")
+    print(f"Vectorizado:   {batch_time * 1e9 / n_configs:8.0f} ns/configuración "
+          f"({loop_time / batch_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    test_curve_matches_capex_scale()
+    test_arrays_match_scalars()
+    test_flat_pricing_reproduces_previous_model()
+    print("Tests de CAPEX: OK")
+
+    benchmark_capex()
@@ -0,0 +1,144 @@
+"""
+Script de Testing del Optimizador de Clusters
+=============================================
+Objetivo: Verificar el callback por iteración con las distintas firmas de
+scipy, el corte por timeout de optimize_cluster con DE y SLSQP, y el
+aislamiento de fallos de optimize_multiple_clusters en paralelo.
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+sys.path.append(str(BASE_DIR / "src"))
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.optimize import OptimizeResult
+
+from src.config.config_loader import get_config
+from src.optimization.cluster_optimizer import ClusterObjective, ClusterOptimizer, OptimizationRun
+
+CLUSTERS_FILE = BASE_DIR / "reports" / "clustering" / "optimization" / "clusters_optimization_data.parquet"
+
+
+def load_clusters():
+    """Carga los datos de clusters usados por el optimizador"""
+    return [row.to_dict() for _, row in pd.read_parquet(CLUSTERS_FILE).iterrows()]
+
+
+def make_optimizer(**overrides):
+    """Optimizador sin arranque en caliente con parámetros del algoritmo modificados"""
+    opt_params = {**get_config().get_section('optimization_algorithm'),
+                  'warm_start': False, 'maxiter': 5, **overrides}
+    return ClusterOptimizer(optimization_params=opt_params)
+
+
+def test_callback_signatures():
+    """El callback acepta OptimizeResult (scipy >= 1.12) y xk suelto (DE clásico, SLSQP)"""
+    cluster = load_clusters()[0]
+    optimizer = make_optimizer()
+    objective = ClusterObjective(optimizer, cluster)
+    x_good = optimizer._get_initial_guess(cluster)
+    x_bad = np.array(optimizer._get_optimization_bounds(cluster))[:, 1]
+    good, bad = objective.evaluate(x_good), objective.evaluate(x_bad)
+    best_x, best_fun = (x_good, good) if good <= bad else (x_bad, bad)
+
+    calls = [
+        lambda run, x, f: run.callback(intermediate_result=OptimizeResult(x=x, fun=f)),
+        lambda run, x, f: run.callback(x, 0.5),                              # DE: callback(xk, convergence)
+        lambda run, x, f: run.callback(x),                                   # SLSQP/TNC/COBYLA: callback(xk)
+        lambda run, x, f: run.callback(x, OptimizeResult(x=x, fun=f)),       # trust-constr: callback(xk, state)
+    ]
+    for call in calls:
+        run = OptimizationRun(cluster_id='C', objective=objective)
+        call(run, x_good, good)
+        call(run, x_bad, bad)
+        assert run.iteration_count == 2
+        assert np.allclose(run.best_config, best_x) and np.isclose(run.best_value, -best_fun)
+    # El seguimiento del callback no cuenta como evaluación del modelo
+    assert objective.evaluations == 0
+
+
+def test_timeout_with_de_and_slsqp():
+    """Con timeout vencido DE y SLSQP devuelven el mejor punto como 'suboptimal: timeout'"""
+    cluster = load_clusters()[0]
+    for method in ('differential_evolution', 'SLSQP'):
+        optimizer = make_optimizer(method=method)
+
+        result = optimizer.optimize_cluster(cluster, timeout=1e-6)
+        assert result.optimization_status.startswith('suboptimal: timeout'), result.optimization_status
+        assert np.isfinite([result.pv_mw_optimal, result.bess_mwh_optimal,
+                            result.q_night_mvar_optimal, result.npv_usd]).all()
+
+        # Con tiempo de sobra el callback no interrumpe la corrida
+        result = optimizer.optimize_cluster(cluster, timeout=3600)
+        assert 'timeout' not in result.optimization_status
+        assert 'error' not in result.optimization_status
+
+
+def test_parallel_matches_sequential():
+    """Con la misma semilla el pool de procesos reproduce la ejecución secuencial"""
+    clusters = load_clusters()[:3]
+    optimizer = make_optimizer(workers=2)
+    sequential = optimizer.optimize_multiple_clusters(clusters, parallel=False).set_index('cluster_id').sort_index()
+    parallel = optimizer.optimize_multiple_clusters(clusters, parallel=True).set_index('cluster_id').sort_index()
+
+    assert list(parallel.index) == list(sequential.index)
+    assert (parallel['status'] == sequential['status']).all()
+    columns = ['pv_mw_optimal', 'bess_mwh_optimal', 'q_night_mvar_optimal', 'npv_musd']
+    assert np.allclose(parallel[columns], sequential[columns], rtol=1e-6, equal_nan=True)
+
+
+def test_failing_clusters_do_not_block_the_rest(monkeypatch):
+    """Un cluster colgado, uno que falla y uno que mata su proceso dan filas 'suboptimal'"""
+    if multiprocessing.get_start_method() != 'fork':
+        pytest.skip("El parche del optimizador llega a los workers sólo con fork")
+
+    clusters = load_clusters()[:4]
+    slow, raising, crashing, healthy = (c['cluster_id'] for c in clusters)
+    original = ClusterOptimizer._get_optimization_bounds
+
+    # Plazos según lo que tarda un cluster en esta máquina (runners de 1 CPU)
+    start = time.monotonic()
+    make_optimizer().optimize_cluster(clusters[3])
+    per_cluster_s = time.monotonic() - start
+    cluster_timeout = 5 + 4 * per_cluster_s
+    grace = 1 + per_cluster_s
+
+    def bounds(self, cluster_data):
+        cluster_id = cluster_data.get('cluster_id')
+        if cluster_id == slow:
+            time.sleep(600)      # Colgado antes de que DE llame al callback
+        elif cluster_id == raising:
+            raise ValueError("datos de cluster inválidos")
+        elif cluster_id == crashing:
+            os._exit(1)          # Proceso muerto (OOM, segfault)
+        return original(self, cluster_data)
+
+    monkeypatch.setattr(ClusterOptimizer, '_get_optimization_bounds', bounds)
+    optimizer = make_optimizer(workers=2, cluster_timeout=cluster_timeout, cluster_timeout_grace=grace)
+
+    start = time.monotonic()
+    df = optimizer.optimize_multiple_clusters(clusters, parallel=True).set_index('cluster_id')
+    assert time.monotonic() - start < 120 + 4 * (cluster_timeout + grace)
+    assert len(df) == 4
+
+    assert df.loc[slow, 'status'].startswith('suboptimal: timeout')
+    assert df.loc[raising, 'status'].startswith('suboptimal: error: ValueError')
+    assert df.loc[crashing, 'status'].startswith('suboptimal: error: BrokenProcessPool')
+    assert 'error' not in df.loc[healthy, 'status'] and 'abortado' not in df.loc[healthy, 'status']
+    assert np.isfinite(df.loc[healthy, 'npv_musd'])
+
+
+if __name__ == "__main__":
+    test_callback_signatures()
+    test_timeout_with_de_and_slsqp()
+    test_parallel_matches_sequential()
+    print("Tests del optimizador de clusters: OK")
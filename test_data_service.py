@@ -0,0 +1,309 @@
+"""
+Script de Testing del Servicio de Datos del Dashboard
+=====================================================
+Objetivo: Validar dashboard/utils/data_service.py (una lectura por proceso,
+selección por sucursal/alimentador como vista, recarga al cambiar el
+archivo, selecciones consistentes durante una recarga, resultados
+derivados por versión, aislamiento copy-on-write) y medir un callback
+típico frente a leer el CSV y filtrar en cada llamada.
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.utils import data_service as data_service_module
+from dashboard.utils.data_service import (
+    DataService, build_index, copy_on_write_enabled, enable_copy_on_write, read_csv, read_json
+)
+from src.pipeline.store import read_frame, write_frame
+from test_feeder_runner import synthetic_network
+
+
+def network(n_feeders=8, seed=0):
+    """Red sintética con sucursales intercaladas (filas no ordenadas)"""
+    df = synthetic_network(n_feeders=n_feeders, mean_size=30, seed=seed)
+    df['N_Sucursal'] = np.where(df.index % 3 == 0, 'BARILOCHE', 'VIEDMA')
+    return df.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+
+def counting(loader):
+    """Loader que cuenta sus lecturas"""
+    def wrapped(path):
+        wrapped.calls += 1
+        return loader(path)
+    wrapped.calls = 0
+    return wrapped
+
+
+def touch(path, delta_ns=10**9):
+    """Adelanta la fecha de modificación (el sistema de archivos puede no distinguir escrituras seguidas)"""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + delta_ns))
+
+
+def test_load_once_and_indexed_views(tmp_path):
+    """Una sola lectura; sucursal y alimentador se entregan como vistas"""
+    df = network()
+    path = write_frame(df, tmp_path / 'datos.parquet')
+    service = DataService(check_interval_s=0.0)
+    loader = counting(read_frame)
+    service.register('transformadores', [(path, loader)], index_by=('N_Sucursal', 'Alimentador'))
+
+    full = service.frame('transformadores')
+    for _ in range(3):
+        service.subset('transformadores', N_Sucursal='VIEDMA')
+    assert loader.calls == 1 and isinstance(full['Alimentador'].dtype, pd.CategoricalDtype)
+
+    # La primera columna de índice queda contigua: con copy-on-write la sucursal no copia datos
+    branch = service.subset('transformadores', N_Sucursal='VIEDMA')
+    assert np.shares_memory(branch['Potencia'].to_numpy(), full['Potencia'].to_numpy()) == copy_on_write_enabled()
+    assert sorted(branch['Codigo']) == sorted(df.loc[df['N_Sucursal'] == 'VIEDMA', 'Codigo'])
+
+    feeder = df['Alimentador'].iloc[0]
+    selected = service.subset('transformadores', Alimentador=feeder)
+    assert sorted(selected['Codigo']) == sorted(df.loc[df['Alimentador'] == feeder, 'Codigo'])
+
+    # Filtros combinados, "sin filtro" y valores inexistentes
+    both = service.subset('transformadores', N_Sucursal='VIEDMA', Alimentador=feeder, Resultado='Correcta')
+    expected = df[(df['N_Sucursal'] == 'VIEDMA') & (df['Alimentador'] == feeder) & (df['Resultado'] == 'Correcta')]
+    assert sorted(both['Codigo']) == sorted(expected['Codigo'])
+    assert len(service.subset('transformadores', N_Sucursal='all', Alimentador='')) == len(df)
+    assert service.subset('transformadores', N_Sucursal='NO_EXISTE').empty
+    assert len(service.subset('transformadores', columna_inexistente='x')) == len(df)
+
+    assert service.values('transformadores', 'N_Sucursal') == ['BARILOCHE', 'VIEDMA']
+    assert service.counts('transformadores', 'Alimentador') == df['Alimentador'].value_counts().to_dict()
+    with pytest.raises(KeyError):
+        service.values('transformadores', 'Resultado')
+
+
+@pytest.mark.parametrize('copy_on_write', [True, False])
+def test_copy_on_write_isolation(tmp_path, monkeypatch, copy_on_write):
+    """Lo que una página agrega o modifica no llega al dataset compartido (con o sin copy-on-write)"""
+    monkeypatch.setattr(data_service_module, 'copy_on_write_enabled', lambda: copy_on_write)
+    path = write_frame(network(), tmp_path / 'datos.parquet')
+    service = DataService()
+    service.register('transformadores', [(path, read_frame)], index_by=('N_Sucursal',))
+    original = service.frame('transformadores')['Potencia'].copy()
+
+    page = service.frame('transformadores')
+    page['Potencia'] = 0.0
+    page['color'] = 'red'
+    branch = service.subset('transformadores', N_Sucursal='VIEDMA')
+    branch.loc[:, 'Potencia'] = -1.0
+
+    shared = service.frame('transformadores')
+    pd.testing.assert_series_equal(shared['Potencia'], original)
+    assert 'color' not in shared.columns
+    # Sin copy-on-write cada página recibe una copia completa
+    fresh = service.frame('transformadores')
+    assert np.shares_memory(fresh['Potencia'].to_numpy(), shared['Potencia'].to_numpy()) == copy_on_write
+
+
+def test_app_configuration_shares_data(tmp_path):
+    """Con la configuración de las aplicaciones frame, subset y get no copian datos"""
+    path = write_frame(network(), tmp_path / 'datos.parquet')
+    service = DataService()
+    service.register('transformadores', [(path, read_frame)], index_by=('N_Sucursal', 'Alimentador'))
+
+    with pd.option_context('mode.copy_on_write', pd.get_option('mode.copy_on_write')):
+        enable_copy_on_write()
+        assert copy_on_write_enabled()
+        shared = service.frame('transformadores')['Potencia'].to_numpy()
+        for frame in (service.frame('transformadores'), service.get('transformadores'),
+                      service.subset('transformadores', N_Sucursal='VIEDMA')):
+            assert np.shares_memory(frame['Potencia'].to_numpy(), shared)
+
+
+@pytest.mark.parametrize('app', ['app_multipagina', 'app_edersa'])
+def test_apps_enable_copy_on_write(app):
+    """Cada aplicación activa copy-on-write al importarse (proceso aparte: es una opción global)"""
+    pytest.importorskip('dash')
+    code = f"import pandas as pd; import dashboard.{app}; print(pd.get_option('mode.copy_on_write'))"
+    completed = subprocess.run([sys.executable, '-c', code], cwd=BASE_DIR,
+                               capture_output=True, text=True, check=True)
+    assert completed.stdout.strip().splitlines()[-1] == 'True'
+
+
+def test_benefits_24h_page_renders_every_tab():
+    """La página de beneficios 24h arma cada pestaña y cada perfil horario (proceso aparte: registra páginas)"""
+    pytest.importorskip('dash')
+    code = (
+        "from dash import Dash; app = Dash(__name__, use_pages=True)\n"
+        "from dashboard.pages import benefits_24h as page\n"
+        "page.update_metrics('profiles')\n"
+        "for tab in ('profiles', 'comparison', 'modes', 'economics'):\n"
+        "    assert page.update_tab_content(tab) is not None, tab\n"
+        "for profile in ('Residencial', 'Comercial', 'Industrial', 'Mixto', 'desconocido'):\n"
+        "    assert page.update_profile_graph(profile).data, profile\n"
+        "print('OK')\n"
+    )
+    completed = subprocess.run([sys.executable, '-c', code], cwd=BASE_DIR, capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip().splitlines()[-1] == 'OK'
+
+
+def test_reload_on_change_and_derived_cache(tmp_path):
+    """Un archivo nuevo se recarga una vez y descarta los resultados derivados"""
+    path = write_frame(network(n_feeders=4), tmp_path / 'datos.parquet')
+    service = DataService(check_interval_s=0.0)
+    loader = counting(read_frame)
+    service.register('transformadores', [(path, loader)], index_by=('Alimentador',))
+
+    computed = []
+    def total():
+        computed.append(1)
+        return len(service.frame('transformadores'))
+
+    assert service.cached('transformadores', 'total', total) == service.cached('transformadores', 'total', total)
+    assert len(computed) == 1 and service.version('transformadores') == 1
+
+    bigger = network(n_feeders=10, seed=1)
+    write_frame(bigger, path)
+    touch(path)
+    assert service.cached('transformadores', 'total', total) == len(bigger)
+    assert len(computed) == 2 and loader.calls == 2 and service.version('transformadores') == 2
+    assert service.counts('transformadores', 'Alimentador') == bigger['Alimentador'].value_counts().to_dict()
+
+    # Dentro del intervalo de revisión no se mira el disco
+    throttled = DataService(check_interval_s=3600)
+    throttled.register('transformadores', [(path, read_frame)])
+    throttled.frame('transformadores')
+    touch(path)
+    assert throttled.version('transformadores') == 1
+
+
+def test_subset_consistent_during_reload(tmp_path):
+    """Con recargas concurrentes cada selección usa valor e índices de la misma versión"""
+    frames = [network(n_feeders=4, seed=0), network(n_feeders=12, seed=1)]
+    path = write_frame(frames[0], tmp_path / 'datos.parquet')
+    loads = []
+
+    def alternating(path):
+        loads.append(1)
+        return frames[len(loads) % 2].copy()
+
+    service = DataService(check_interval_s=0.0)
+    service.register('transformadores', [(path, alternating)], index_by=('N_Sucursal',))
+    service.frame('transformadores')
+    stop = threading.Event()
+    errors = []
+
+    def reload():
+        while not stop.is_set():
+            touch(path)
+            service.version('transformadores')
+
+    def select():
+        for _ in range(200):
+            branch = service.subset('transformadores', N_Sucursal='BARILOCHE')
+            if not (branch['N_Sucursal'] == 'BARILOCHE').all():
+                errors.append(len(branch))
+
+    writer = threading.Thread(target=reload)
+    readers = [threading.Thread(target=select) for _ in range(4)]
+    writer.start()
+    for thread in readers:
+        thread.start()
+    for thread in readers:
+        thread.join()
+    stop.set()
+    writer.join()
+    assert len(loads) > 2 and not errors
+
+
+def test_sources_fallback_and_defaults(tmp_path):
+    """Primera fuente existente, CSV de una corrida anterior, error de lectura y valor por defecto"""
+    df = network()
+    df.to_csv(tmp_path / 'datos.csv', index=False)
+    (tmp_path / 'roto.csv').write_text('')
+    service = DataService()
+    service.register('transformadores', [(tmp_path / 'roto.csv', read_csv),
+                                         (tmp_path / 'datos.parquet', read_frame)])
+    loaded = service.frame('transformadores')
+    assert len(loaded) == len(df) and isinstance(loaded['Resultado'].dtype, pd.CategoricalDtype)
+    assert service.stats()['transformadores']['fuente'].endswith('datos.csv')
+
+    service.register('reporte', [(tmp_path / 'no_existe.json', read_json)], default=lambda: {'ejemplo': True})
+    assert service.get('reporte') == {'ejemplo': True}
+    service.register('vacio', [(tmp_path / 'no_existe.csv', read_csv)])
+    assert service.frame('vacio').empty and service.subset('vacio', Alimentador='A').empty
+    with pytest.raises(KeyError):
+        service.get('no_registrado')
+
+
+def test_build_index_non_contiguous():
+    """Valores dispersos se indexan por posiciones; los faltantes se omiten"""
+    frame = pd.DataFrame({'Alimentador': ['A', 'B', 'A', None, 'C', 'C']})
+    index = build_index(frame, 'Alimentador')
+    assert set(index) == {'A', 'B', 'C'}
+    np.testing.assert_array_equal(index['A'], [0, 2])
+    assert index['B'] == slice(1, 2) and index['C'] == slice(4, 6)
+
+
+def benchmark_callback(n_transformers=14000, n_calls=20):
+    """Callback típico (filtrar un alimentador y contar por resultado): CSV por llamada vs servicio"""
+    import tempfile
+    df = synthetic_network(n_feeders=140, mean_size=n_transformers / 140, seed=7)
+    df['N_Sucursal'] = np.where(df.index % 3 == 0, 'BARILOCHE', 'VIEDMA')
+    for i in range(30):
+        df[f'feature_{i}'] = np.random.default_rng(i).normal(size=len(df))
+    feeders = df['Alimentador'].unique()[:n_calls]
+
+    print("=" * 80)
+    print(f"SERVICIO DE DATOS - {len(df):,} transformadores, {n_calls} llamadas")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_file = Path(tmp) / 'csv' / 'datos.csv'
+        csv_file.parent.mkdir()
+        df.to_csv(csv_file, index=False)
+        parquet_file = write_frame(df, Path(tmp) / 'datos.parquet')
+
+        def per_call(feeder):
+            data = pd.read_csv(csv_file)
+            return data[data['Alimentador'] == feeder]['Resultado'].value_counts()
+
+        service = DataService()
+        service.register('transformadores', [(parquet_file, read_frame)], index_by=('N_Sucursal', 'Alimentador'))
+
+        def shared(feeder):
+            return service.subset('transformadores', Alimentador=feeder)['Resultado'].astype(object).value_counts()
+
+        baseline = None
+        for label, callback in (('CSV por llamada', per_call), ('servicio compartido', shared)):
+            start = time.perf_counter()
+            results = [callback(feeder) for feeder in feeders]
+            elapsed = (time.perf_counter() - start) / n_calls
+            baseline = baseline or elapsed
+            print(f"{label:<22} {elapsed * 1000:8.2f} ms/llamada ({baseline / elapsed:7.1f}x)")
+        assert all(r.sum() > 0 for r in results)
+        print(f"{'Memoria compartida':<22} {service.stats()['transformadores']['memoria_mb']:8.2f} MB")
+
+
+if __name__ == "__main__":
+    import tempfile
+    for test in (test_load_once_and_indexed_views, test_app_configuration_shares_data,
+                 test_reload_on_change_and_derived_cache, test_subset_consistent_during_reload,
+                 test_sources_fallback_and_defaults):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    for copy_on_write in (True, False):
+        with tempfile.TemporaryDirectory() as tmp, pytest.MonkeyPatch.context() as monkeypatch:
+            test_copy_on_write_isolation(Path(tmp), monkeypatch, copy_on_write)
+    test_build_index_non_contiguous()
+    print("Tests del servicio de datos: OK")
+
+    benchmark_callback()
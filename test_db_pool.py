@@ -0,0 +1,245 @@
+"""
+Script de Testing del Acceso de Solo Lectura a SQLite
+=====================================================
+Objetivo: Validar dashboard/utils/db_pool.py (pool acotado de conexiones
+mode=ro compartido entre hilos, WAL, resultados invalidados por metricas_resumen.fecha_actualizacion,
+reapertura al reemplazar la base, una ronda compartida por los callbacks
+de la URL en app_edersa) y medir los cuatro callbacks de la página
+principal con una conexión por callback vs la ronda compartida.
+"""
+
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.utils import figure_cache as figure_cache_module
+from dashboard.utils.db_pool import Query, ReadOnlyPool
+from dashboard.utils.figure_cache import FigureCache
+
+QUERIES = [
+    Query('calidad', "SELECT resultado, COUNT(*) AS cantidad FROM transformadores GROUP BY resultado"),
+    Query('por_sucursal', "SELECT codigoct FROM transformadores WHERE n_sucursal = ? ORDER BY codigoct"),
+]
+
+
+def create_database(path, n_transformers=200, seed=7, fecha='2025-07-01T10:00:00'):
+    """Base con las tablas que usa la página principal de app_edersa"""
+    rng = np.random.default_rng(seed)
+    sucursales = np.array(['BARILOCHE', 'VIEDMA', 'GENERAL ROCA', 'CIPOLLETTI'])
+    transformers = pd.DataFrame({
+        'codigoct': [f'CT{i:05d}' for i in range(n_transformers)],
+        'n_sucursal': rng.choice(sucursales, n_transformers),
+        'n_localida': rng.choice(['CENTRO', 'NORTE', 'SUR'], n_transformers),
+        'coord_x': rng.uniform(-71.5, -63.0, n_transformers),
+        'coord_y': rng.uniform(-41.8, -38.9, n_transformers),
+        'potencia': rng.choice([25, 63, 100, 160, 315, 500], n_transformers),
+        'q_usuarios': rng.integers(1, 300, n_transformers),
+        'resultado': rng.choice(['Correcta', 'Penalizada', 'Fallida'], n_transformers, p=[0.4, 0.35, 0.25]),
+        'tipo_zona': rng.choice(['Urbana', 'Rural', 'Periurbana'], n_transformers),
+        'criticidad_compuesta': rng.uniform(0, 1, n_transformers),
+    })
+    branches = (transformers.groupby('n_sucursal')
+                .agg(criticidad_promedio=('criticidad_compuesta', 'mean'),
+                     num_transformadores=('codigoct', 'size'),
+                     usuarios_totales=('q_usuarios', 'sum'))
+                .reset_index())
+    conn = sqlite3.connect(path)
+    try:
+        transformers.to_sql('transformadores', conn, index=False)
+        branches.to_sql('sucursales', conn, index=False)
+        conn.execute("CREATE TABLE metricas_resumen (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                     "fecha_actualizacion TIMESTAMP, total_transformadores INTEGER)")
+        conn.execute("INSERT INTO metricas_resumen (fecha_actualizacion, total_transformadores) VALUES (?, ?)",
+                     (fecha, n_transformers))
+        conn.commit()
+    finally:
+        conn.close()
+    return path
+
+
+def update_metrics(path, fecha):
+    """Nueva fila de métricas (lo que hace el recálculo de la base)"""
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("INSERT INTO metricas_resumen (fecha_actualizacion) VALUES (?)", (fecha,))
+        conn.execute("UPDATE transformadores SET resultado = 'Correcta'")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_read_only_pooled_connections(tmp_path):
+    """mode=ro, WAL y la conexión devuelta al pool se reutiliza desde otro hilo"""
+    pool = ReadOnlyPool(create_database(tmp_path / 'edersa.db'), QUERIES)
+    with pool.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM transformadores")
+
+    def checkout():
+        with pool.connection() as other:
+            others.append(other)
+
+    others = []
+    thread = threading.Thread(target=checkout)
+    thread.start()
+    thread.join()
+    assert others[0] is conn and pool.stats()['conexiones_abiertas'] == 1
+    pool.close()
+    assert pool.stats()['conexiones_en_pool'] == 0
+
+
+def test_connections_bounded_across_short_lived_threads(tmp_path):
+    """Un hilo por request (como werkzeug): las conexiones abiertas no crecen con los hilos"""
+    pool = ReadOnlyPool(create_database(tmp_path / 'edersa.db'), QUERIES, max_connections=3)
+    sucursales = ['BARILOCHE', 'VIEDMA', 'GENERAL ROCA', 'CIPOLLETTI']
+    errors = []
+
+    def request(i):
+        try:
+            pool.query('por_sucursal', [sucursales[i % len(sucursales)]])
+            pool.round(['calidad'], params={})
+            with pool.connection() as conn:
+                conn.execute("SELECT COUNT(*) FROM transformadores").fetchone()
+        except Exception as e:  # pragma: no cover - se reporta en el assert
+            errors.append(e)
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(200)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = pool.stats()
+    assert not errors
+    assert stats['conexiones_abiertas'] <= 3 and stats['conexiones_en_pool'] <= 3
+    pool.close()
+    assert pool.stats()['conexiones_en_pool'] == 0
+
+
+def test_results_invalidated_by_metrics_date(tmp_path):
+    """Misma versión = sin consultas; nueva fecha de métricas = se relee"""
+    path = create_database(tmp_path / 'edersa.db')
+    pool = ReadOnlyPool(path, QUERIES, check_interval_s=0)
+    first = pool.query('calidad')
+    assert pool.query('calidad') is first and pool.stats()['consultas_ejecutadas'] == 1
+    viedma = pool.query('por_sucursal', ['VIEDMA'])
+    assert len(viedma) < first['cantidad'].sum() and pool.stats()['consultas_ejecutadas'] == 2
+    assert pool.version() == '2025-07-01T10:00:00'
+
+    update_metrics(path, '2025-07-02T10:00:00')
+    updated = pool.query('calidad')
+    assert pool.version() == '2025-07-02T10:00:00'
+    assert updated['resultado'].tolist() == ['Correcta'] and pool.stats()['consultas_ejecutadas'] == 3
+
+    # La base se borra y se crea de nuevo: se reabre la conexión
+    path.unlink()
+    create_database(path, n_transformers=50, fecha='2025-07-03T10:00:00')
+    assert pool.query('calidad')['cantidad'].sum() == 50
+    assert pool.stats()['conexiones_abiertas'] == 2
+    pool.close()
+
+
+def test_overview_callbacks_share_one_round(tmp_path, monkeypatch):
+    """Los cuatro callbacks de la URL hacen una sola ronda de consultas"""
+    pytest.importorskip('dash')
+    import dashboard.app_edersa as app_edersa
+
+    pool = ReadOnlyPool(create_database(tmp_path / 'edersa.db'), app_edersa.db.queries.values())
+    monkeypatch.setattr(app_edersa, 'db', pool)
+    monkeypatch.setattr(figure_cache_module, 'figure_cache', FigureCache())
+    app_edersa.load_map_points.cache_clear()
+
+    outputs = {}
+    callbacks = {
+        'calidad': lambda: app_edersa.update_quality_distribution('/'),
+        'zonas': lambda: app_edersa.update_criticality_zones('/'),
+        # Lo que lee update_transformers_map (fuera de Dash no hay callback_context)
+        'mapa': lambda: app_edersa.load_map_points(app_edersa.normalize(app_edersa.database_digest())),
+        'tabla': lambda: app_edersa.update_critical_branches_table('/'),
+    }
+    threads = [threading.Thread(target=lambda k=k, f=f: outputs.__setitem__(k, f())) for k, f in callbacks.items()]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert set(outputs) == set(callbacks)
+    assert pool.stats()['consultas_ejecutadas'] == len(app_edersa.OVERVIEW_QUERIES)
+    assert len(outputs['mapa']) == 200 and outputs['tabla'] is not None
+    app_edersa.load_map_points.cache_clear()
+    pool.close()
+
+
+def benchmark_overview(n_transformers=14000, n_loads=10):
+    """Página principal: conexión y consulta por callback vs ronda compartida"""
+    import tempfile
+
+    import dashboard.app_edersa as app_edersa
+
+    print("=" * 80)
+    print(f"ACCESO A SQLITE - página principal, {n_transformers:,} transformadores, {n_loads} cargas")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = create_database(Path(tmp) / 'edersa.db', n_transformers=n_transformers)
+        queries = [app_edersa.db.queries[name] for name in app_edersa.OVERVIEW_QUERIES]
+        params = {'sucursales_criticas': [app_edersa.CRITICIDAD_SUCURSAL_MINIMA]}
+
+        start = time.perf_counter()
+        for _ in range(n_loads):
+            for query in queries:
+                conn = sqlite3.connect(path)
+                pd.read_sql_query(query.sql, conn, params=params.get(query.name))
+                conn.close()
+        per_callback_s = (time.perf_counter() - start) / n_loads
+
+        pool = ReadOnlyPool(path, queries)
+        start = time.perf_counter()
+        pool.round(app_edersa.OVERVIEW_QUERIES, params=params)
+        round_s = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(n_loads):
+            for _ in queries:
+                pool.round(app_edersa.OVERVIEW_QUERIES, params=params)
+        cached_s = (time.perf_counter() - start) / n_loads
+
+        print(f"{'conexión por callback':<24} {per_callback_s * 1000:8.2f} ms/carga")
+        print(f"{'ronda compartida':<24} {round_s * 1000:8.2f} ms/carga ({per_callback_s / round_s:6.1f}x)")
+        print(f"{'misma versión':<24} {cached_s * 1000:8.2f} ms/carga ({per_callback_s / cached_s:6.1f}x)")
+        print(f"Contadores: {pool.stats()}")
+        pool.close()
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    class _Patch:
+        def __init__(self):
+            self.undo = []
+
+        def setattr(self, target, name, value):
+            self.undo.append((target, name, getattr(target, name)))
+            setattr(target, name, value)
+
+    for test in (test_read_only_pooled_connections, test_connections_bounded_across_short_lived_threads,
+                 test_results_invalidated_by_metrics_date, test_overview_callbacks_share_one_round):
+        with tempfile.TemporaryDirectory() as tmp:
+            patch = _Patch()
+            args = (Path(tmp), patch) if test is test_overview_callbacks_share_one_round else (Path(tmp),)
+            test(*args)
+            for target, name, value in reversed(patch.undo):
+                setattr(target, name, value)
+    print("Tests de acceso a SQLite: OK")
+
+    benchmark_overview()
@@ -0,0 +1,104 @@
+"""
+Script de Testing del Snapshot de Parámetros Económicos
+=======================================================
+Objetivo: Verificar que EconomicParams es inmutable, hashable, con digest
+estable, memoizado por ConfigLoader y compatible con los calculadores.
+"""
+
+import sys
+import pickle
+import dataclasses
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+import numpy as np
+import pytest
+
+from src.config.config_loader import ConfigLoader, EconomicParams
+from src.economics.integrated_cash_flow import IntegratedCashFlowCalculator
+from src.optimization.cluster_optimizer import ClusterObjective, ClusterOptimizer
+
+
+def test_snapshot_is_memoized_and_matches_dict():
+    """El snapshot se reutiliza y coincide con get_economic_params()"""
+    config = ConfigLoader()
+    snapshot = config.get_economic_snapshot()
+
+    assert config.get_economic_snapshot() is snapshot
+    assert dict(snapshot) == config.get_economic_params()
+    assert snapshot['discount_rate'] == snapshot.discount_rate
+    assert snapshot.get('bos_factor', 0.15) == 0.15
+
+
+def test_snapshot_is_immutable_and_hashable():
+    """Igualdad por valor, hash y digest estables (también tras pickle)"""
+    snapshot = ConfigLoader().get_economic_snapshot()
+    copy = EconomicParams.from_dict(snapshot.to_dict())
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snapshot.discount_rate = 0.2
+
+    assert copy == snapshot and hash(copy) == hash(snapshot)
+    assert copy.digest == snapshot.digest
+    assert pickle.loads(pickle.dumps(snapshot)).digest == snapshot.digest
+
+    changed = snapshot.replace(discount_rate=0.12)
+    assert changed != snapshot and changed.digest != snapshot.digest
+    assert len({snapshot, copy, changed}) == 2
+
+
+def test_update_value_invalidates_snapshot():
+    """Modificar la configuración genera un snapshot nuevo"""
+    config = ConfigLoader()
+    before = config.get_economic_snapshot()
+    config.update_value('financial.discount_rate', before.discount_rate + 0.01)
+    after = config.get_economic_snapshot()
+
+    assert after is not before
+    assert after.discount_rate == pytest.approx(before.discount_rate + 0.01)
+
+
+def test_calculator_accepts_snapshot():
+    """El calculador da el mismo resultado con snapshot o dict"""
+    snapshot = ConfigLoader().get_economic_snapshot()
+    cluster = {'peak_demand_mw': 5.0, 'dominant_load_type': 'mixed'}
+    capex = {'total': 4e6}
+
+    flows_snapshot = IntegratedCashFlowCalculator(snapshot).calculate_integrated_flows(
+        cluster, 4.0, 4.0, 1.0, capex)
+    flows_dict = IntegratedCashFlowCalculator(snapshot.to_dict()).calculate_integrated_flows(
+        cluster, 4.0, 4.0, 1.0, capex)
+
+    assert [f.total_flow for f in flows_snapshot] == [f.total_flow for f in flows_dict]
+
+
+def test_optimizer_with_snapshot_is_picklable():
+    """Calculador, objetivo y optimizador con snapshot se serializan (DE con workers > 1)"""
+    config = ConfigLoader()
+    snapshot = config.get_economic_snapshot()
+    cluster = {'cluster_id': 'test', 'peak_demand_mw': 2.0, 'dominant_load_type': 'mixed',
+               'n_transformers': 20, 'total_users': 500}
+    opt_params = {**config.get_section('optimization_algorithm'),
+                  'workers': 2, 'maxiter': 3, 'popsize': 5, 'warm_start': False}
+    optimizer = ClusterOptimizer(snapshot, optimization_params=opt_params)
+
+    calculator = pickle.loads(pickle.dumps(optimizer.cash_flow_calc))
+    assert calculator.params == snapshot
+    objective = ClusterObjective(optimizer, cluster)
+    x = np.array([1.0, 0.5, 0.3])
+    assert pickle.loads(pickle.dumps(objective))(x) == pytest.approx(objective(x))
+
+    result = optimizer.optimize_cluster(cluster, seed=1)
+    assert result.cluster_id == 'test' and np.isfinite(result.npv_usd)
+
+
+if __name__ == "__main__":
+    test_snapshot_is_memoized_and_matches_dict()
+    test_snapshot_is_immutable_and_hashable()
+    test_update_value_invalidates_snapshot()
+    test_calculator_accepts_snapshot()
+    test_optimizer_with_snapshot_is_picklable()
+    print("Tests de EconomicParams: OK")
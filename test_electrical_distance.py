@@ -0,0 +1,153 @@
+"""
+Script de Testing de la Distancia Eléctrica Vectorizada (Script 05)
+===================================================================
+Objetivo: Validar la acumulación de R, X y distancia por niveles del MST
+contra el recorrido fila a fila original (cuando los padres preceden a
+los hijos), verificar que el resultado no depende del orden de las filas
+y medir el costo por alimentador.
+"""
+
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+import numpy as np
+import pandas as pd
+
+from test_feeder_runner import load_script, synthetic_network
+
+script = load_script("05_electrical_distance_calculation.py")
+
+
+def classify_line_segment(parent_kva, child_kva, is_trunk, tipo_zona='Rural'):
+    """Clasificación original por tramo (troncal, urbano o rural)"""
+    if is_trunk or parent_kva > 1000:
+        return 'troncal'
+    elif tipo_zona == 'Urbano':
+        return 'urbano'
+    else:
+        return 'rural'
+
+
+def reference_electrical_distance(df_feeder):
+    """Versión original fila a fila (diccionario mutado en el recorrido)"""
+    results = []
+    trafo_dict = df_feeder.set_index('Codigo').to_dict('index')
+    for _, row in df_feeder.iterrows():
+        padre = row['padre_mst']
+        if padre == 'SUBSTATION' or pd.isna(padre):
+            dist_real = script.haversine_distance(row['Coord_Y'], row['Coord_X'],
+                                                  row['substation_y'], row['substation_x']) * script.ROUTING_FACTOR
+            line_type = classify_line_segment(0, row['kVA_aguas_abajo'], True, row.get('tipo_zona', 'Rural'))
+            R_total = script.IMPEDANCE_TABLE[line_type]['R'] * dist_real
+            X_total = script.IMPEDANCE_TABLE[line_type]['X'] * dist_real
+        elif padre in trafo_dict:
+            padre_data = trafo_dict[padre]
+            dist = script.haversine_distance(row['Coord_Y'], row['Coord_X'],
+                                             padre_data['Coord_Y'], padre_data['Coord_X']) * script.ROUTING_FACTOR
+            line_type = classify_line_segment(padre_data.get('kVA_aguas_abajo', 0), row['kVA_aguas_abajo'],
+                                              padre_data.get('numero_saltos', 0) <= 2,
+                                              row.get('tipo_zona', 'Rural'))
+            R_total = padre_data.get('R_acumulada', 0) + script.IMPEDANCE_TABLE[line_type]['R'] * dist
+            X_total = padre_data.get('X_acumulada', 0) + script.IMPEDANCE_TABLE[line_type]['X'] * dist
+            dist_real = padre_data.get('distancia_electrica_km', 0) + dist
+        else:
+            dist_real, R_total, X_total, line_type = 0, 0, 0, 'rural'
+        results.append({'Codigo': row['Codigo'], 'distancia_electrica_km': dist_real,
+                        'R_acumulada': R_total, 'X_acumulada': X_total,
+                        'Z_acumulada': np.sqrt(R_total**2 + X_total**2), 'tipo_conductor': line_type})
+        trafo_dict[row['Codigo']].update(results[-1])
+    return pd.DataFrame(results)
+
+
+def feeder(seed=0, orphans=0):
+    """Un alimentador sintético con los padres antes que los hijos"""
+    df = synthetic_network(n_feeders=1, mean_size=300, seed=seed)
+    df = df.sort_values('numero_saltos', kind='stable').reset_index(drop=True)
+    if orphans:
+        # Padres filtrados (p.ej. numero_saltos < 0 en load_data)
+        df = df.drop(index=df.index[df['numero_saltos'] == 3][:orphans]).reset_index(drop=True)
+    return df
+
+
+def test_matches_row_loop_when_parents_first():
+    """Mismo resultado que el recorrido original con filas ordenadas por saltos"""
+    for seed, orphans in ((0, 0), (1, 2)):
+        df = feeder(seed, orphans)
+        expected = reference_electrical_distance(df)
+        actual = script.calculate_electrical_distance(df)
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False, rtol=1e-12)
+
+
+def test_independent_of_row_order():
+    """Filas mezcladas: el recorrido original se equivoca, el nuevo no"""
+    df = feeder(2)
+    expected = script.process_feeder('ALIM', df)[0].set_index('Codigo')
+
+    shuffled = df.sample(frac=1, random_state=0).reset_index(drop=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        actual = script.process_feeder('ALIM', shuffled)[0].set_index('Codigo')
+    pd.testing.assert_frame_equal(actual.loc[expected.index], expected)
+
+    wrong = reference_electrical_distance(shuffled).set_index('Codigo')
+    assert not np.allclose(wrong.loc[expected.index, 'R_acumulada'], expected['R_acumulada'])
+
+
+def test_voltage_and_sensitivity_match_row_formulas():
+    """Caída de tensión y sensibilidad dinámica columna a columna"""
+    df = feeder(3)
+    df = df.merge(script.calculate_electrical_distance(df), on='Codigo')
+    df.loc[df.index[:5], 'tipo_zona'] = np.nan
+
+    voltage = script.calculate_voltage_drop(df)
+    dynamic = script.calculate_dynamic_sensitivity(pd.concat([df, voltage], axis=1))
+
+    for i in range(0, len(df), 17):
+        row = df.iloc[i]
+        fp = script.POWER_FACTOR.get(row.get('tipo_zona', 'Rural'), script.POWER_FACTOR['default'])
+        current = row['Potencia'] / (np.sqrt(3) * script.VOLTAGE_NOM) * 0.7
+        drop = np.sqrt(3) * current * (row['R_acumulada'] * fp + row['X_acumulada'] * np.sqrt(1 - fp**2))
+        percent = drop / (script.VOLTAGE_NOM * 1000) * 100
+        assert voltage['factor_potencia_estimado'].iloc[i] == fp
+        assert np.isclose(voltage['caida_tension_percent'].iloc[i], percent, rtol=1e-12)
+        assert voltage['indice_debilidad_electrica'].iloc[i] == min(percent / 10, 1.0)
+
+        start = np.sqrt(3) * current * 1.8 * row['Z_acumulada'] / (script.VOLTAGE_NOM * 1000) * 100
+        level = 'Muy Alta' if start > 15 else 'Alta' if start > 10 else 'Media' if start > 5 else 'Baja'
+        assert dynamic['sensibilidad_dinamica'].iloc[i] == level
+
+
+def benchmark_electrical_distance(sizes=(100, 1000, 5000)):
+    """Distancia eléctrica por alimentador: fila a fila vs por niveles"""
+    print("=" * 80)
+    print("DISTANCIA ELÉCTRICA - fila a fila vs por niveles del MST")
+    print("=" * 80)
+
+    for n in sizes:
+        df = synthetic_network(n_feeders=1, mean_size=n, seed=n, fixed_size=True)
+        df = df.sort_values('numero_saltos', kind='stable').reset_index(drop=True)
+
+        start = time.perf_counter()
+        reference_electrical_distance(df)
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        script.calculate_electrical_distance(df)
+        fast_time = time.perf_counter() - start
+        print(f"{len(df):>6} trafos: fila a fila {loop_time:7.3f} s | niveles {fast_time:7.4f} s "
+              f"({loop_time / fast_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    test_matches_row_loop_when_parents_first()
+    test_independent_of_row_order()
+    test_voltage_and_sensitivity_match_row_formulas()
+    print("Tests de distancia eléctrica: OK")
+
+    benchmark_electrical_distance()
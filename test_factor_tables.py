@@ -0,0 +1,138 @@
+"""
+Script de Testing de las Tablas de Factores Anuales
+===================================================
+Objetivo: Validar src/economics/factor_tables.py contra el cálculo año a
+año y medir el costo por evaluación de los motores de flujos con y sin
+tablas cacheadas (micro-benchmark).
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+import numpy as np
+import pytest
+
+from src.economics.factor_tables import (
+    decay_factors,
+    discount_factors,
+    get_factor_table,
+    growth_factors
+)
+from src.economics.financial_metrics import calculate_cash_flows, calculate_lcoe
+from src.economics.integrated_cash_flow import IntegratedCashFlowCalculator
+
+CLUSTER = {
+    'peak_demand_mw': 8.0,
+    'dominant_load_type': 'mixed',
+    'loss_sensitivity': 0.05,
+    'annual_penalties_usd': 250000,
+    'upgrade_cost_usd': 1.5e6,
+    'deferred_upgrade_mva': 4.0
+}
+
+
+def test_factors_match_year_by_year():
+    """Los vectores son idénticos a las potencias calculadas año a año"""
+    lifetime = 25
+    assert growth_factors(0.04, lifetime).tolist() == [1.04 ** (y - 1) for y in range(1, lifetime + 1)]
+    assert decay_factors(0.005, lifetime).tolist() == [0.995 ** (y - 1) for y in range(1, lifetime + 1)]
+    assert discount_factors(0.1, lifetime).tolist() == [1.1 ** -t for t in range(lifetime + 1)]
+
+
+def test_tables_are_cached_and_read_only():
+    """Misma clave devuelve el mismo objeto; los vectores no se pueden modificar"""
+    table = get_factor_table(25, 0.005, 0.02, 0.04, 0.1)
+    assert get_factor_table(25, 0.005, 0.02, 0.04, 0.1) is table
+    assert table.years.tolist() == list(range(1, 26))
+
+    with pytest.raises(ValueError):
+        table.inflation[0] = 2.0
+
+
+def test_financial_metrics_use_tables():
+    """calculate_cash_flows y calculate_lcoe reproducen las fórmulas anuales"""
+    flows = calculate_cash_flows(10e6, 2e6, 0.2e6, 25, 0.04)
+    assert flows[10]['cash_flow'] == 2e6 * 1.04 ** 9 - 0.2e6 * 1.04 ** 9
+
+    expected_costs = 10e6 + sum(0.2e6 * 1.03 ** (y - 1) / 1.1 ** y for y in range(1, 26))
+    expected_generation = sum(20000 * 0.995 ** (y - 1) / 1.1 ** y for y in range(1, 26))
+    assert calculate_lcoe(10e6, 20000, 0.2e6, 25, 0.1, 0.005) == pytest.approx(
+        expected_costs / expected_generation, rel=1e-12)
+
+
+def _evaluate(calculator, pv_mw, bess_mwh, q_mvar):
+    """Una evaluación completa del camino escalar (flujos + métricas)"""
+    capex = {'total': pv_mw * 8e5 + bess_mwh * 2.5e5 + q_mvar * 4e4}
+    flows = calculator.calculate_integrated_flows(CLUSTER, pv_mw, bess_mwh, q_mvar, capex)
+    return calculator.calculate_financial_metrics(flows, capex['total'])
+
+
+def benchmark_factor_tables(n_evaluations: int = 5000):
+    """Costo por evaluación: factores recalculados en cada llamada vs tabla cacheada"""
+    print("=" * 80)
+    print(f"MICRO-BENCHMARK TABLAS DE FACTORES - {n_evaluations:,} evaluaciones")
+    print("=" * 80)
+
+    calculator = IntegratedCashFlowCalculator()
+    params = calculator.params
+    lifetime = int(params['project_lifetime'])
+
+    # 1. Solo los factores: potencias por año (como antes) vs tabla cacheada
+    start = time.perf_counter()
+    for _ in range(n_evaluations):
+        for year in range(1, lifetime + 1):
+            (1 - params['pv_degradation']) ** (year - 1)
+            (1 - params['bess_degradation']) ** (year - 1)
+            (1 + params['inflation_rate']) ** (year - 1)
+        [(1 + params['discount_rate']) ** -t for t in range(lifetime + 1)]
+    pow_cost = (time.perf_counter() - start) / n_evaluations
+
+    start = time.perf_counter()
+    for _ in range(n_evaluations):
+        calculator._factor_table()
+    table_cost = (time.perf_counter() - start) / n_evaluations
+    print(f"Factores por año (pow): {pow_cost * 1e6:8.1f} µs/evaluación")
+    print(f"Tabla cacheada:         {table_cost * 1e6:8.1f} µs/evaluación "
+          f"({pow_cost / table_cost:.0f}x)")
+
+    # 2. Evaluación completa: tabla recalculada en cada llamada vs cacheada
+    rng = np.random.default_rng(0)
+    configs = rng.uniform([1, 0, 0], [15, 30, 4], (n_evaluations, 3))
+
+    start = time.perf_counter()
+    for pv_mw, bess_mwh, q_mvar in configs:
+        get_factor_table.cache_clear()
+        growth_factors.cache_clear()
+        decay_factors.cache_clear()
+        discount_factors.cache_clear()
+        _evaluate(calculator, pv_mw, bess_mwh, q_mvar)
+    cold_cost = (time.perf_counter() - start) / n_evaluations
+
+    start = time.perf_counter()
+    for pv_mw, bess_mwh, q_mvar in configs:
+        _evaluate(calculator, pv_mw, bess_mwh, q_mvar)
+    warm_cost = (time.perf_counter() - start) / n_evaluations
+    print(f"Evaluación escalar, tablas recalculadas: {cold_cost * 1e6:8.1f} µs")
+    print(f"Evaluación escalar, tablas cacheadas:    {warm_cost * 1e6:8.1f} µs")
+
+    # 3. Motor vectorizado
+    capex = {'total': configs[:, 0] * 8e5 + configs[:, 1] * 2.5e5 + configs[:, 2] * 4e4}
+    start = time.perf_counter()
+    batch = calculator.calculate_integrated_flows_batch(CLUSTER, *configs.T, capex)
+    calculator.calculate_financial_metrics_batch(batch, capex['total'])
+    batch_cost = (time.perf_counter() - start) / n_evaluations
+    print(f"Evaluación vectorizada:                  {batch_cost * 1e6:8.1f} µs")
+
+
+if __name__ == "__main__":
+    test_factors_match_year_by_year()
+    test_tables_are_cached_and_read_only()
+    test_financial_metrics_use_tables()
+    print("Tests de tablas de factores: OK")
+
+    benchmark_factor_tables()
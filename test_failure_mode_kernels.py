@@ -0,0 +1,217 @@
+"""
+Script de Testing de las Versiones Columnares de los Scripts 06 y 07
+====================================================================
+Objetivo: Verificar que cada función de scoring columnar (np.select /
+np.where) reproduce exactamente la función por fila original
+(df.apply(..., axis=1) / iterrows), incluidos umbrales exactos, NaN,
+columnas opcionales ausentes y columnas repetidas, y medir la
+regeneración de features sobre la red completa.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+import numpy as np
+import pandas as pd
+
+from test_feeder_runner import load_script, synthetic_network
+
+loads = load_script("06_load_estimation_features.py")
+failure = load_script("07_failure_mode_features.py")
+
+
+def row_wise(func, df):
+    """Aplicación original: un diccionario por fila"""
+    return pd.DataFrame(list(df.apply(func, axis=1)), index=df.index)
+
+
+def assert_same(actual, expected):
+    pd.testing.assert_frame_equal(actual[list(expected.columns)], expected,
+                                  check_dtype=False, rtol=1e-12)
+
+
+def reference_parent_influence(df):
+    """Versión original de calculate_parent_influence (iterrows)"""
+    estado_dict = df.set_index('Codigo')['Resultado'].to_dict()
+    rows = []
+    for _, row in df.iterrows():
+        padre = row.get('padre_mst')
+        if pd.isna(padre) or padre == 'SUBSTATION':
+            rows.append({'estado_padre': 'N/A', 'padre_problematico': False, 'riesgo_cascada': 0.0})
+            continue
+        estado_padre = estado_dict.get(padre, 'Desconocido')
+        riesgo = 0.8 if estado_padre == 'Fallida' else 0.5 if estado_padre == 'Penalizada' else 0.1
+        rows.append({'estado_padre': estado_padre,
+                     'padre_problematico': estado_padre in ['Fallida', 'Penalizada'],
+                     'riesgo_cascada': riesgo})
+    return pd.DataFrame(rows, index=df.index)
+
+
+def raw_network(seed=0, n_feeders=8):
+    """Entrada del script 06 (salida del 05) con casos borde"""
+    df = synthetic_network(n_feeders=n_feeders, mean_size=80, seed=seed)
+    df = df.drop(columns=['tipo_carga', 'factor_utilizacion_pico'])
+    edge = [
+        # Umbrales exactos de kVA/usuario: 0.5, 2, 5 y 15
+        (50, 100, 'Urbano'), (200, 100, 'Rural'), (500, 100, 'Periurbano'),
+        (1500, 100, 'Urbano'), (1500, 100, 'Rural'), (1500, 100, 'Periurbano'),
+        # Sin usuarios, zona faltante, usuarios en los cortes de diversidad
+        (63, 0, 'Urbano'), (100, 5, np.nan), (100, 10, 'Rural'), (100, 20, 'Urbano'),
+        (100, 50, 'Periurbano'), (315, np.nan, 'Urbano'),
+    ]
+    for i, (potencia, usuarios, zona) in enumerate(edge):
+        df.loc[i, ['Potencia', 'Q_Usuarios', 'tipo_zona']] = [potencia, usuarios, zona]
+    df.loc[len(edge):len(edge) + 3, 'indice_debilidad_electrica'] = np.nan
+    return df
+
+
+def load_pipeline(df, columnar):
+    """Pipeline del script 06: clasificación, features de carga y sobrecarga"""
+    steps = ((loads.classify_load_type, loads.classify_load_type_frame),
+             (loads.calculate_load_features, loads.calculate_load_features_frame),
+             (loads.calculate_overload_risk, loads.calculate_overload_risk_frame))
+    for row_func, frame_func in steps:
+        new = frame_func(df) if columnar else row_wise(row_func, df)
+        # Las columnas recalculadas reemplazan a las anteriores
+        df = pd.concat([df.drop(columns=[c for c in new.columns if c in df.columns]), new], axis=1)
+    return df
+
+
+def failure_input(seed=0):
+    """Entrada del script 07 con NaN, padres ausentes y umbrales exactos"""
+    df = load_pipeline(raw_network(seed), columnar=True)
+    df.loc[0:3, 'caida_tension_percent'] = [3.0, 5.0, 7.0, 10.0]
+    df.loc[4, 'caida_tension_percent'] = np.nan
+    df.loc[5, 'hundimiento_arranque_percent'] = np.nan
+    df.loc[6, 'factor_potencia_estimado'] = np.nan
+    df.loc[7, 'factor_utilizacion_pico'] = 1.2 / 0.95
+    df.loc[8, 'padre_mst'] = 'NO_EXISTE'
+    df.loc[9, 'padre_mst'] = np.nan
+    df['es_nodo_hoja'] = df['es_nodo_hoja'].astype(object)
+    df.loc[10, 'es_nodo_hoja'] = np.nan
+    return df
+
+
+def test_load_type_and_diversity():
+    """classify_load_type y estimate_diversity_factor"""
+    df = raw_network()
+    assert_same(loads.classify_load_type_frame(df), row_wise(loads.classify_load_type, df))
+
+    # tipo_zona ausente: 'Rural' por defecto
+    no_zone = df.drop(columns=['tipo_zona'])
+    assert_same(loads.classify_load_type_frame(no_zone), row_wise(loads.classify_load_type, no_zone))
+
+    df = pd.concat([df, loads.classify_load_type_frame(df)], axis=1)
+    df.loc[0, 'tipo_carga'] = 'otro'
+    np.testing.assert_array_equal(loads.estimate_diversity_factors(df),
+                                  df.apply(loads.estimate_diversity_factor, axis=1).to_numpy())
+
+
+def test_load_pipeline_matches_row_functions():
+    """calculate_load_features y calculate_overload_risk encadenados"""
+    df = raw_network(seed=1)
+    expected = load_pipeline(df, columnar=False)
+    actual = load_pipeline(df, columnar=True)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False, rtol=1e-12)
+
+    # Sin índice de debilidad eléctrica: 0 por defecto
+    no_weakness = actual.drop(columns=['indice_debilidad_electrica'])
+    assert_same(loads.calculate_overload_risk_frame(no_weakness),
+                row_wise(loads.calculate_overload_risk, no_weakness))
+
+
+def test_duplicated_columns_use_latest():
+    """Columna repetida (salida del 05 + recalculada): se usa la última"""
+    df = load_pipeline(raw_network(seed=2), columnar=True)
+    stale = df[['factor_potencia_estimado']] * 0 + 0.5
+    duplicated = pd.concat([stale, df], axis=1)
+    assert isinstance(duplicated['factor_potencia_estimado'], pd.DataFrame)
+    assert_same(loads.calculate_overload_risk_frame(duplicated), loads.calculate_overload_risk_frame(df))
+    assert_same(failure.calculate_thermal_stress_frame(duplicated), failure.calculate_thermal_stress_frame(df))
+
+
+def test_stress_indices_match_row_functions():
+    """Estrés térmico y dieléctrico, con y sin columnas opcionales"""
+    df = failure_input()
+    assert_same(failure.calculate_thermal_stress_frame(df), row_wise(failure.calculate_thermal_stress_index, df))
+    assert_same(failure.calculate_dielectric_stress_frame(df),
+                row_wise(failure.calculate_dielectric_stress_index, df))
+
+    optional = df.drop(columns=['indice_debilidad_electrica', 'hundimiento_arranque_percent',
+                                'es_nodo_hoja', 'numero_saltos'])
+    assert_same(failure.calculate_thermal_stress_frame(optional),
+                row_wise(failure.calculate_thermal_stress_index, optional))
+    assert_same(failure.calculate_dielectric_stress_frame(optional),
+                row_wise(failure.calculate_dielectric_stress_index, optional))
+
+
+def test_parent_influence_and_vulnerability():
+    """Influencia del padre (códigos repetidos, padres ausentes) y vulnerabilidad"""
+    df = failure_input(seed=3)
+    df.loc[11, 'Codigo'] = df.loc[12, 'Codigo']
+    assert_same(failure.calculate_parent_influence(df), reference_parent_influence(df))
+
+    df = pd.concat([df, failure.calculate_thermal_stress_frame(df), failure.calculate_dielectric_stress_frame(df),
+                    failure.calculate_neighborhood_features(df), failure.calculate_parent_influence(df)], axis=1)
+    df.loc[0, 'indice_estres_termico_v2'] = 1.0
+    df.loc[0, 'indice_estres_dielectrico'] = 1.0
+    assert_same(failure.calculate_composite_vulnerability_frame(df),
+                row_wise(failure.calculate_composite_vulnerability, df))
+
+    # Sin columnas de vecindario ni topología
+    minimal = df.drop(columns=['tasa_problemas_vecindario', 'riesgo_cascada', 'tipo_vecindario',
+                               'numero_saltos', 'es_nodo_hoja', 'centralidad_intermediacion'])
+    assert_same(failure.calculate_composite_vulnerability_frame(minimal),
+                row_wise(failure.calculate_composite_vulnerability, minimal))
+
+
+def benchmark_feature_kernels(n_transformers=14000):
+    """Regeneración de features de los scripts 06 y 07: por fila vs columnar"""
+    df = raw_network(seed=4, n_feeders=n_transformers // 80)
+    print("=" * 80)
+    print(f"FEATURES DE CARGA Y MODOS DE FALLA - {len(df):,} transformadores")
+    print("=" * 80)
+
+    # El vecindario (BallTree) es común a ambas versiones
+    import contextlib
+    import io
+    with contextlib.redirect_stdout(io.StringIO()):
+        neighborhood = failure.calculate_neighborhood_features(df)
+
+    def regenerate(columnar):
+        data = load_pipeline(df, columnar)
+        if columnar:
+            parts = [failure.calculate_thermal_stress_frame(data), failure.calculate_dielectric_stress_frame(data),
+                     neighborhood, failure.calculate_parent_influence(data)]
+        else:
+            parts = [row_wise(failure.calculate_thermal_stress_index, data),
+                     row_wise(failure.calculate_dielectric_stress_index, data),
+                     neighborhood, reference_parent_influence(data)]
+        data = pd.concat([data] + parts, axis=1)
+        vulnerability = (failure.calculate_composite_vulnerability_frame(data) if columnar
+                         else row_wise(failure.calculate_composite_vulnerability, data))
+        return pd.concat([data, vulnerability], axis=1)
+
+    timings = {}
+    for columnar in (False, True):
+        start = time.perf_counter()
+        regenerate(columnar)
+        timings[columnar] = time.perf_counter() - start
+    print(f"Por fila: {timings[False]:7.2f} s | columnar: {timings[True]:6.3f} s "
+          f"({timings[False] / timings[True]:.0f}x)")
+
+
+if __name__ == "__main__":
+    test_load_type_and_diversity()
+    test_load_pipeline_matches_row_functions()
+    test_duplicated_columns_use_latest()
+    test_stress_indices_match_row_functions()
+    test_parent_influence_and_vulnerability()
+    print("Tests de funciones columnares: OK")
+
+    benchmark_feature_kernels()
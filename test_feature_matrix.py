@@ -0,0 +1,164 @@
+"""
+Script de Testing de la Matriz de Features ML (.npy)
+====================================================
+Objetivo: Validar src/pipeline/feature_matrix.py (conjuntos como rangos de
+filas de una matriz float32 contigua, lectura mapeada en memoria sin copias,
+metadatos de columnas y codificación, validaciones) y medir la carga frente
+a los CSV X_*/y_* que generaba el script 08.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline.feature_matrix import load_feature_matrix, write_feature_matrix
+from src.pipeline.stages import pipeline_stages
+
+
+def ml_splits(n_rows=600, n_features=12, seed=0):
+    """Conjuntos train/val/test con columnas float, enteras y booleanas (one-hot)"""
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n_rows, n_features)),
+                     columns=[f'feature_{i}' for i in range(n_features)])
+    X['num_vecinos_500m'] = rng.integers(0, 30, n_rows)
+    X['tipo_zona_Urbano'] = rng.random(n_rows) < 0.4
+    y = pd.Series(rng.integers(0, 3, n_rows), name='Resultado')
+    bounds = {'train': (0, int(n_rows * 0.7)), 'val': (int(n_rows * 0.7), int(n_rows * 0.85)),
+              'test': (int(n_rows * 0.85), n_rows)}
+    return {name: (X.iloc[a:b].reset_index(drop=True), y.iloc[a:b]) for name, (a, b) in bounds.items()}
+
+
+def test_round_trip_and_zero_copy_splits(tmp_path):
+    """Cada conjunto vuelve como vista float32 de la matriz mapeada"""
+    splits = ml_splits()
+    encoders = {'tipo_zona': {'tipo': 'one-hot', 'categorias': ['Rural', 'Urbano'],
+                              'columnas': ['tipo_zona_Urbano']}}
+    write_feature_matrix(tmp_path, splits, {'codificacion': encoders, 'escala': np.float64(1.5)})
+
+    matrix = load_feature_matrix(tmp_path)
+    assert isinstance(matrix.features, np.memmap) and matrix.features.dtype == np.float32
+    assert matrix.features.flags['C_CONTIGUOUS'] and matrix.labels.dtype == np.int32
+    assert matrix.columns == [str(c) for c in splits['train'][0].columns]
+    assert matrix.metadata['codificacion'] == encoders and matrix.metadata['escala'] == 1.5
+
+    for name, (X, y) in splits.items():
+        X_split, y_split = matrix.split(name)
+        assert np.shares_memory(X_split, matrix.features) and np.shares_memory(y_split, matrix.labels)
+        np.testing.assert_array_equal(X_split, X.to_numpy(dtype=np.float32))
+        np.testing.assert_array_equal(y_split, y.to_numpy())
+
+    # Solo lectura: un consumidor no puede modificar el archivo compartido
+    with pytest.raises(ValueError):
+        matrix.features[0, 0] = 1.0
+
+    frame = matrix.frame('val', ['tipo_zona_Urbano', 'feature_3'])
+    pd.testing.assert_frame_equal(
+        frame, splits['val'][0][['tipo_zona_Urbano', 'feature_3']].astype(np.float32))
+
+    in_memory = load_feature_matrix(tmp_path, mmap=False)
+    assert not isinstance(in_memory.features, np.memmap)
+    np.testing.assert_array_equal(in_memory.features, matrix.features)
+
+
+def test_validation(tmp_path):
+    """Columnas distintas, etiquetas faltantes y metadatos inconsistentes"""
+    splits = ml_splits()
+    X_val, y_val = splits['val']
+    with pytest.raises(ValueError, match='mismas columnas'):
+        write_feature_matrix(tmp_path, {**splits, 'val': (X_val.iloc[:, ::-1], y_val)})
+    with pytest.raises(ValueError, match='etiquetas'):
+        write_feature_matrix(tmp_path, {**splits, 'val': (X_val, y_val.iloc[:-1])})
+
+    write_feature_matrix(tmp_path, splits)
+    matrix = load_feature_matrix(tmp_path)
+    with pytest.raises(KeyError):
+        matrix.split('holdout')
+    with pytest.raises(KeyError, match='no_existe'):
+        matrix.column_index(['feature_0', 'no_existe'])
+
+    metadata = json.loads((tmp_path / 'metadata.json').read_text())
+    metadata['matriz']['forma'][0] += 1
+    (tmp_path / 'metadata.json').write_text(json.dumps(metadata))
+    with pytest.raises(ValueError, match='no coincide'):
+        load_feature_matrix(tmp_path)
+
+
+def test_rewrite_replaces_previous_matrix(tmp_path):
+    """Una segunda escritura reemplaza archivos y metadatos sin restos temporales"""
+    write_feature_matrix(tmp_path, ml_splits(n_rows=600))
+    write_feature_matrix(tmp_path, ml_splits(n_rows=200, seed=1))
+    matrix = load_feature_matrix(tmp_path)
+    assert matrix.features.shape[0] == 200 and matrix.splits['test'][1] == 200
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_registry_declares_matrix():
+    """El script 08 declara la matriz y el vector como salidas"""
+    stage = next(s for s in pipeline_stages() if s.name == 'network_analysis/08_ml_ready_dataset')
+    assert any(path.endswith('ml_datasets/features.npy') for path in stage.outputs)
+    assert not any(path.endswith('X_train.csv') for path in stage.outputs)
+
+
+def benchmark_matrix_load(n_rows=14000, n_features=120):
+    """Carga de los conjuntos: CSV X_*/y_* vs .npy completo vs .npy mapeado"""
+    import tempfile
+    splits = ml_splits(n_rows=n_rows, n_features=n_features, seed=7)
+
+    print("=" * 80)
+    print(f"MATRIZ DE FEATURES ML - {n_rows:,} filas x {n_features + 2} columnas")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for name, (X, y) in splits.items():
+            X.to_csv(tmp / f'X_{name}.csv', index=False)
+            y.to_frame('target').to_csv(tmp / f'y_{name}.csv', index=False)
+        write_feature_matrix(tmp / 'npy', splits)
+
+        def from_csv():
+            return {name: (pd.read_csv(tmp / f'X_{name}.csv'), pd.read_csv(tmp / f'y_{name}.csv'))
+                    for name in splits}
+
+        def train_mean(matrix):
+            return matrix.split('train')[0].mean(axis=0)
+
+        cases = (
+            ('CSV', from_csv, lambda data: data['train'][0].to_numpy().mean(axis=0)),
+            ('.npy en memoria', lambda: load_feature_matrix(tmp / 'npy', mmap=False), train_mean),
+            ('.npy mapeado', lambda: load_feature_matrix(tmp / 'npy'), train_mean),
+        )
+        baseline = None
+        for label, load, use in cases:
+            start = time.perf_counter()
+            for _ in range(5):
+                data = load()
+            load_s = (time.perf_counter() - start) / 5
+            start = time.perf_counter()
+            use(data)
+            use_s = time.perf_counter() - start
+            baseline = baseline or load_s
+            print(f"{label:<18} carga {load_s * 1000:8.2f} ms ({baseline / load_s:7.1f}x) | "
+                  f"media de train {use_s * 1000:6.2f} ms")
+        size = sum(f.stat().st_size for f in (tmp / 'npy').glob('*.npy')) / 1e6
+        csv_size = sum(f.stat().st_size for f in tmp.glob('*.csv')) / 1e6
+        print(f"{'Tamaño en disco':<18} CSV {csv_size:.2f} MB | .npy {size:.2f} MB")
+
+
+if __name__ == "__main__":
+    import tempfile
+    for test in (test_round_trip_and_zero_copy_splits, test_validation, test_rewrite_replaces_previous_matrix):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    test_registry_declares_matrix()
+    print("Tests de matriz de features: OK")
+
+    benchmark_matrix_load()
@@ -0,0 +1,185 @@
+"""
+Script de Testing de la Ejecución Paralela por Alimentador
+==========================================================
+Objetivo: Validar src/network/feeder_runner.py (orden determinístico,
+aislamiento de fallas, equivalencia secuencial/paralelo) y su uso en los
+scripts 05 y 07 sobre una red sintética, y medir la escala con procesos.
+"""
+
+import importlib.util
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+import numpy as np
+import pandas as pd
+
+from src.network.feeder_runner import execution_summary, run_feeders
+from src.network.mst_topology import minimum_spanning_parents
+from src.network.tree_features import calculate_tree_features
+
+SCRIPTS_DIR = BASE_DIR / "scripts" / "network_analysis"
+
+
+def load_script(filename):
+    """Importa un script numerado de scripts/network_analysis"""
+    name = "network_" + Path(filename).stem.split('_', 1)[1]
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_network(n_feeders=12, mean_size=60, seed=0, fixed_size=False):
+    """
+    Transformadores sintéticos con la salida de los scripts 04 y 06.
+
+    Returns:
+        DataFrame con coordenadas, topología MST y columnas eléctricas
+    """
+    rng = np.random.default_rng(seed)
+    frames = []
+    for f in range(n_feeders):
+        n = mean_size if fixed_size else max(2, int(rng.exponential(mean_size)))
+        center = np.array([-40.8, -63.0]) + rng.normal(0, 0.5, 2)
+        lat = center[0] + rng.normal(0, 0.03, n)
+        lon = center[1] + rng.normal(0, 0.03, n)
+        potencia = rng.choice([25, 63, 100, 160, 315, 500], n)
+        usuarios = rng.integers(1, 200, n)
+        codigos = [f"F{f:03d}T{i:04d}" for i in range(n)]
+
+        mst = minimum_spanning_parents(np.r_[lat.mean(), lat], np.r_[lon.mean(), lon])
+        features = calculate_tree_features(mst.parent, np.r_[0, potencia], np.r_[0, usuarios])
+        ids = np.array(['SUBSTATION'] + codigos, dtype=object)
+
+        frames.append(pd.DataFrame({
+            'Codigo': codigos,
+            'Alimentador': f"ALIM-{f:03d}",
+            'Coord_X': lon,
+            'Coord_Y': lat,
+            'Potencia': potencia,
+            'Q_Usuarios': usuarios,
+            'Resultado': rng.choice(['Correcta', 'Penalizada', 'Fallida'], n, p=[0.6, 0.3, 0.1]),
+            'tipo_zona': rng.choice(['Rural', 'Urbano', 'Periurbano'], n),
+            'substation_x': lon.mean(),
+            'substation_y': lat.mean(),
+            'numero_saltos': features['numero_saltos'][1:],
+            'es_nodo_hoja': features['es_nodo_hoja'][1:],
+            'kVA_aguas_abajo': features['kVA_aguas_abajo'][1:],
+            'padre_mst': ids[mst.parent[1:]],
+            'centralidad_intermediacion': features['centralidad_intermediacion'][1:],
+            'factor_utilizacion_pico': rng.uniform(0.2, 1.5, n),
+            'tipo_carga': rng.choice(['residencial', 'comercial', 'industrial_ligero',
+                                      'rural_agricola', 'mixto'], n),
+            'factor_potencia_estimado': rng.uniform(0.8, 0.95, n),
+            'indice_debilidad_electrica': rng.uniform(0, 1, n),
+            'caida_tension_percent': rng.uniform(0, 12, n),
+            'hundimiento_arranque_percent': rng.uniform(0, 25, n)
+        }))
+
+    # Filas intercaladas entre alimentadores, como en los CSV reales
+    df = pd.concat(frames, ignore_index=True)
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def _size_or_fail(feeder, df_feeder):
+    if feeder == 'ALIM-003':
+        raise ValueError("alimentador corrupto")
+    return feeder, len(df_feeder), df_feeder.index.min()
+
+
+def test_order_and_failure_isolation():
+    """Orden de aparición, alimentadores chicos omitidos y fallas aisladas"""
+    df = synthetic_network()
+    expected_order = [f for f in df['Alimentador'].unique() if (df['Alimentador'] == f).sum() >= 3]
+
+    for workers in (1, 3):
+        results = run_feeders(_size_or_fail, df, workers=workers, min_rows=3)
+        assert [r.feeder for r in results] == expected_order
+        failed = [r for r in results if not r.ok]
+        assert [r.feeder for r in failed] == ['ALIM-003']
+        assert 'alimentador corrupto' in failed[0].error
+        assert all(r.result[1] == r.n_rows for r in results if r.ok)
+
+    summary = execution_summary(results, workers=3, elapsed_s=1.0)
+    assert summary['alimentadores_procesados'] == len(expected_order) - 1
+    assert summary['alimentadores_fallidos'] == {'ALIM-003': 'ValueError: alimentador corrupto'}
+
+
+def test_script_05_matches_serial_loop():
+    """El script 05 con el runner reproduce el bucle secuencial original"""
+    script = load_script("05_electrical_distance_calculation.py")
+    df = synthetic_network(seed=1)
+
+    expected = []
+    for feeder in df['Alimentador'].unique():
+        df_feeder = df[df['Alimentador'] == feeder].copy()
+        if len(df_feeder) >= 2:
+            expected.append(script.process_feeder(feeder, df_feeder)[0])
+    expected = pd.concat(expected, ignore_index=True)
+
+    for workers in (1, 2):
+        results = run_feeders(script.process_feeder, df, workers=workers, min_rows=2)
+        actual = pd.concat([r.result[0] for r in results], ignore_index=True)
+        pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_script_07_matches_global_pipeline():
+    """Los índices del script 07 por alimentador = cálculo sobre todo el dataset"""
+    script = load_script("07_failure_mode_features.py")
+    df = synthetic_network(seed=2)
+
+    # Pipeline original (secuencial, todo el dataset)
+    expected = df.copy()
+    for func in (script.calculate_thermal_stress_index, script.calculate_dielectric_stress_index):
+        expected = pd.concat([expected, pd.DataFrame(list(expected.apply(func, axis=1)))], axis=1)
+    neighborhood = script.calculate_neighborhood_features(df)
+    expected = pd.concat([expected, neighborhood, script.calculate_parent_influence(expected)], axis=1)
+    vulnerability = expected.apply(script.calculate_composite_vulnerability, axis=1)
+    expected = pd.concat([expected, pd.DataFrame(list(vulnerability))], axis=1)
+
+    # Runner por alimentador
+    func = script.partial(script.calculate_feeder_indices,
+                          neighborhood_columns=tuple(neighborhood.columns))
+    results = run_feeders(func, pd.concat([df, neighborhood], axis=1), workers=2)
+    actual = pd.concat([r.result for r in results])
+    actual = actual.loc[actual.index.sort_values()].reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def benchmark_feeder_runner(n_transformers=14000):
+    """Script 05 sobre una red del tamaño de EDERSA con 1..N procesos"""
+    script = load_script("05_electrical_distance_calculation.py")
+    df = synthetic_network(n_feeders=140, mean_size=n_transformers / 140, seed=3)
+
+    print("=" * 80)
+    print(f"EJECUCIÓN POR ALIMENTADOR - {len(df):,} transformadores, "
+          f"{df['Alimentador'].nunique()} alimentadores, {os.cpu_count()} núcleos")
+    print("=" * 80)
+
+    import contextlib
+    import io
+    base_time = None
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            run_feeders(script.process_feeder, df, workers=workers, min_rows=2)
+        elapsed = time.perf_counter() - start
+        base_time = base_time or elapsed
+        print(f"{workers:>3} proceso(s): {elapsed:7.2f} s (speedup {base_time / elapsed:4.1f}x)")
+
+
+if __name__ == "__main__":
+    test_order_and_failure_isolation()
+    test_script_05_matches_serial_loop()
+    test_script_07_matches_global_pipeline()
+    print("Tests de ejecución por alimentador: OK")
+
+    benchmark_feeder_runner()
@@ -0,0 +1,194 @@
+"""
+Script de Testing de la Caché de Figuras del Dashboard
+======================================================
+Objetivo: Validar dashboard/utils/figure_cache.py (clave por callback,
+entradas normalizadas y digest de datos, LRU con contadores, copia en disco
+compartida entre instancias, excepciones sin guardar, /cache-stats sólo en
+diagnóstico) y medir un mapa de transformadores reconstruido vs servido
+desde la caché.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+from dash.exceptions import PreventUpdate
+
+from dashboard.utils.figure_cache import (DIAGNOSTICS_ENV, FigureCache, diagnostics_enabled, file_digest,
+                                          memoize_figure)
+from test_feeder_runner import synthetic_network
+
+
+def counted(cache, **options):
+    """Callback de prueba memorizado que cuenta sus ejecuciones"""
+    calls = []
+
+    @memoize_figure(cache=cache, **options)
+    def update_chart(feeder, selection=None):
+        if feeder is None:
+            raise PreventUpdate
+        calls.append(feeder)
+        return go.Figure(go.Bar(x=[feeder], y=[len(selection or [])]))
+    return update_chart, calls
+
+
+def test_memoizes_by_inputs_and_counts():
+    """Mismas entradas = misma figura; entradas distintas recalculan"""
+    cache = FigureCache(max_entries=2)
+    update_chart, calls = counted(cache)
+
+    first = update_chart('ALIM-001', {'b': 2, 'a': 1})
+    assert update_chart('ALIM-001', {'a': 1, 'b': 2}) is first
+    update_chart('ALIM-002')
+    assert calls == ['ALIM-001', 'ALIM-002']
+    assert cache.stats()['aciertos'] == 1 and cache.stats()['fallos'] == 2
+
+    # LRU: ALIM-003 descarta la entrada menos usada (ALIM-001)
+    update_chart('ALIM-002')
+    update_chart('ALIM-003')
+    update_chart('ALIM-001')
+    assert calls == ['ALIM-001', 'ALIM-002', 'ALIM-003', 'ALIM-001']
+    assert cache.stats()['descartes'] == 2 and cache.stats()['entradas'] == 2
+
+    # Las excepciones (PreventUpdate) no se guardan
+    with pytest.raises(PreventUpdate):
+        update_chart(None)
+    with pytest.raises(PreventUpdate):
+        update_chart(None)
+
+
+def test_digest_and_ignored_arguments(tmp_path):
+    """Un cambio en los datos invalida; argumentos ignorados no forman la clave"""
+    data = tmp_path / 'base.db'
+    data.write_text('v1')
+    cache = FigureCache()
+    update_chart, calls = counted(cache, digest=lambda: file_digest(data), ignore=(1,))
+
+    update_chart('ALIM-001', ['/inicio'])
+    update_chart('ALIM-001', ['/mapa'])
+    assert len(calls) == 1
+
+    data.write_text('versión 2')
+    stat = data.stat()
+    os.utime(data, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    update_chart('ALIM-001', ['/inicio'])
+    assert len(calls) == 2
+
+    # Dos callbacks con las mismas entradas no comparten entradas
+    other, other_calls = counted(cache, name='otro_callback')
+    other('ALIM-001')
+    assert len(other_calls) == 1
+
+
+def test_disk_entries_shared_between_instances(tmp_path):
+    """Otro proceso (otra instancia) lee del disco lo que calculó el primero"""
+    writer = FigureCache(disk_dir=tmp_path, max_disk_entries=3)
+    update_chart, calls = counted(writer, name='grafico')
+    for i in range(5):
+        update_chart(f'ALIM-{i:03d}')
+    assert len(list(tmp_path.glob('*.pkl'))) == 3 and not list(tmp_path.glob('*.tmp'))
+
+    reader = FigureCache(disk_dir=tmp_path)
+    read_chart, read_calls = counted(reader, name='grafico')
+    figure = read_chart('ALIM-004')
+    assert read_calls == [] and reader.stats()['aciertos_disco'] == 1
+    assert figure.data[0].x == ('ALIM-004',)
+    read_chart('ALIM-004')
+    assert reader.stats()['aciertos'] == 1
+
+    # Entrada corrupta: se recalcula
+    for path in tmp_path.glob('*.pkl'):
+        path.write_bytes(b'no es un pickle')
+    read_chart('ALIM-003')
+    assert read_calls == ['ALIM-003']
+
+    reader.clear(disk=True)
+    assert not list(tmp_path.glob('*.pkl')) and reader.stats()['entradas'] == 0
+
+
+def test_cache_stats_only_in_diagnostics(monkeypatch):
+    """/cache-stats responde sólo en debug o con DASHBOARD_DIAGNOSTICS, sin rutas absolutas"""
+    import dashboard.app_edersa as app_edersa
+    server = app_edersa.app.server
+    client = server.test_client()
+    monkeypatch.delenv(DIAGNOSTICS_ENV, raising=False)
+    monkeypatch.setattr(server, 'debug', False)
+    assert not diagnostics_enabled(server)
+    assert client.get('/cache-stats').status_code == 404
+
+    monkeypatch.setenv(DIAGNOSTICS_ENV, '1')
+    response = client.get('/cache-stats')
+    assert response.status_code == 200
+    assert str(BASE_DIR) not in response.get_data(as_text=True)
+    assert response.get_json()['figuras']['disco'] == app_edersa.DISK_DIR.name
+
+    monkeypatch.delenv(DIAGNOSTICS_ENV)
+    monkeypatch.setattr(server, 'debug', True)
+    assert client.get('/cache-stats').status_code == 200
+
+
+def benchmark_map(n_transformers=14000, n_views=10):
+    """Mapa de transformadores (textos por fila con apply) reconstruido vs caché"""
+    df = synthetic_network(n_feeders=140, mean_size=n_transformers / 140, seed=7)
+    df['N_Sucursal'] = np.where(df.index % 3 == 0, 'BARILOCHE', 'VIEDMA')
+
+    print("=" * 80)
+    print(f"CACHÉ DE FIGURAS - mapa de {len(df):,} transformadores, {n_views} vistas")
+    print("=" * 80)
+
+    def update_map(sucursal):
+        data = df[df['N_Sucursal'] == sucursal] if sucursal != 'all' else df
+        fig = go.Figure(go.Scattergl(
+            x=data['Coord_X'], y=data['Coord_Y'], mode='markers',
+            text=data.apply(lambda row: f"<b>{row['Codigo']}</b><br>Potencia: {row['Potencia']} kVA<br>"
+                                        f"Usuarios: {row['Q_Usuarios']}<br>Estado: {row['Resultado']}", axis=1),
+            hovertemplate='%{text}<extra></extra>'))
+        fig.update_layout(height=500, margin=dict(l=0, r=0, t=0, b=0))
+        return fig
+
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = FigureCache(disk_dir=Path(tmp))
+        cached_map = memoize_figure(cache=cache, name='mapa')(update_map)
+        selections = ['all', 'VIEDMA', 'BARILOCHE']
+
+        start = time.perf_counter()
+        for i in range(n_views):
+            update_map(selections[i % 3])
+        rebuild_s = (time.perf_counter() - start) / n_views
+        for selection in selections:
+            cached_map(selection)
+        start = time.perf_counter()
+        for i in range(n_views):
+            cached_map(selections[i % 3])
+        cached_s = (time.perf_counter() - start) / n_views
+        disk = FigureCache(disk_dir=Path(tmp))
+        start = time.perf_counter()
+        memoize_figure(cache=disk, name='mapa')(update_map)('all')
+        disk_s = time.perf_counter() - start
+
+        print(f"{'reconstruida':<22} {rebuild_s * 1000:8.2f} ms/vista")
+        print(f"{'caché (memoria)':<22} {cached_s * 1000:8.2f} ms/vista ({rebuild_s / cached_s:7.1f}x)")
+        print(f"{'caché (disco)':<22} {disk_s * 1000:8.2f} ms primera lectura en otro proceso")
+        print(f"Contadores: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    import tempfile
+    test_memoizes_by_inputs_and_counts()
+    for test in (test_digest_and_ignored_arguments, test_disk_entries_shared_between_instances):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_cache_stats_only_in_diagnostics(monkeypatch)
+    print("Tests de la caché de figuras: OK")
+
+    benchmark_map()
@@ -0,0 +1,112 @@
+"""
+Script de Testing del Kernel de TIR Vectorizado
+===============================================
+Objetivo: Validar src/economics/irr_solver.py contra scipy (brentq),
+verificar los códigos de falla y medir throughput para 10^6 proyectos.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+import numpy as np
+from scipy.optimize import brentq
+
+from src.economics.irr_solver import (
+    calculate_irr_batch,
+    calculate_irr_single,
+    IRR_CONVERGED,
+    IRR_NO_SIGN_CHANGE,
+    IRR_INVALID_INPUT,
+    IRR_STATUS_MESSAGES
+)
+from src.economics.financial_metrics import calculate_cash_flows, calculate_irr
+
+
+def generate_projects(n_projects: int, lifetime: int = 25, seed: int = 42) -> np.ndarray:
+    """Genera flujos convencionales: inversión en año 0 y flujos positivos"""
+    rng = np.random.default_rng(seed)
+    capex = rng.uniform(1e6, 1e8, n_projects)
+    annual = rng.uniform(0.02, 0.4, n_projects) * capex
+    growth = (1.04 ** np.arange(lifetime))[None, :]
+    return np.column_stack([-capex, annual[:, None] * growth])
+
+
+def test_irr_matches_brentq():
+    """Compara el kernel con brentq proyecto a proyecto"""
+    flows = generate_projects(500)
+    irr, status = calculate_irr_batch(flows)
+    t = np.arange(flows.shape[1])
+
+    for i in range(len(flows)):
+        reference = brentq(lambda r: np.sum(flows[i] / (1 + r) ** t), -0.99, 10, xtol=1e-14)
+        assert status[i] == IRR_CONVERGED
+        assert abs(irr[i] - reference) < 1e-9, (i, irr[i], reference)
+
+
+def test_failure_codes():
+    """Los casos sin solución devuelven NaN con un código determinístico"""
+    flows = np.array([
+        [100.0, 10.0, 10.0],       # Sin inversión: NPV siempre positivo
+        [-100.0, 60.0, 60.0],      # Caso normal
+        [-100.0, 0.0, 0.0],        # Nunca recupera
+        [np.nan, 1.0, 1.0],        # Flujo inválido
+    ])
+    irr, status = calculate_irr_batch(flows)
+
+    assert list(status) == [IRR_NO_SIGN_CHANGE, IRR_CONVERGED, IRR_NO_SIGN_CHANGE, IRR_INVALID_INPUT]
+    assert np.isnan(irr[[0, 2, 3]]).all()
+    assert abs(irr[1] - 0.1306623862918075) < 1e-12
+
+    # Menos de 2 períodos
+    _, status = calculate_irr_batch(np.ones((3, 1)))
+    assert (status == IRR_INVALID_INPUT).all()
+
+
+def test_single_and_financial_metrics():
+    """calculate_irr_single y financial_metrics.calculate_irr usan el mismo kernel"""
+    irr, status = calculate_irr_single([-100, 110])
+    assert status == IRR_CONVERGED and abs(irr - 0.1) < 1e-12
+
+    cash_flows = calculate_cash_flows(10e6, 2e6, 0.2e6, 25, 0.04)
+    expected, _ = calculate_irr_single([f['cash_flow'] for f in cash_flows])
+    assert calculate_irr(cash_flows) == expected
+
+
+def benchmark_irr_throughput(n_projects: int = 1_000_000):
+    """Mide proyectos/segundo del kernel para n_projects de 25 años"""
+    print("=" * 80)
+    print(f"BENCHMARK TIR VECTORIZADA - {n_projects:,} proyectos")
+    print("=" * 80)
+
+    flows = generate_projects(n_projects)
+
+    start = time.perf_counter()
+    irr, status = calculate_irr_batch(flows)
+    elapsed = time.perf_counter() - start
+
+    print(f"Tiempo total: {elapsed:.2f} s")
+    print(f"Throughput: {n_projects / elapsed:,.0f} proyectos/s")
+    for code, count in zip(*np.unique(status, return_counts=True)):
+        print(f"  {IRR_STATUS_MESSAGES[code]}: {count:,}")
+
+    # Referencia: una llamada por proyecto (muestra de 2,000 proyectos)
+    sample = flows[:2000]
+    start = time.perf_counter()
+    for row in sample:
+        calculate_irr_single(row)
+    single_rate = len(sample) / (time.perf_counter() - start)
+    print(f"Una llamada por proyecto: {single_rate:,.0f} proyectos/s")
+
+
+if __name__ == "__main__":
+    test_irr_matches_brentq()
+    test_failure_codes()
+    test_single_and_financial_metrics()
+    print("Tests de TIR: OK")
+
+    benchmark_irr_throughput()
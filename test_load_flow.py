@@ -0,0 +1,254 @@
+"""
+Script de Testing del Flujo de Carga Radial (Barrido Backward/Forward)
+======================================================================
+Objetivo: Validar src/network/load_flow.py contra la solución analítica de
+dos barras y un barrido nodo a nodo de referencia, verificar que el lote de
+escenarios coincide con las corridas individuales y el balance de
+potencia, y medir alimentadores resueltos por segundo.
+"""
+
+import contextlib
+import importlib.util
+import io
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+import numpy as np
+import pytest
+
+from src.economics import network_benefits_modular
+from src.network.load_flow import RadialNetwork, equivalent_feeder_flow, solve_load_flow
+from src.network.mst_topology import NO_PARENT, minimum_spanning_parents
+from test_feeder_runner import load_script, synthetic_network
+
+
+def synthetic_feeder(n, seed=0, spread=0.01):
+    """Red radial sobre el MST de n transformadores (nodo 0 = subestación)"""
+    rng = np.random.default_rng(seed)
+    lat = np.r_[-40.8, -40.8 + rng.normal(0, spread, n)]
+    lon = np.r_[-63.0, -63.0 + rng.normal(0, spread, n)]
+    mst = minimum_spanning_parents(lat, lon)
+    km = np.nan_to_num(mst.weight) * 1.3
+    network = RadialNetwork(mst.parent, 0.55 * km, 0.48 * km)
+    # Demanda total de un alimentador típico (4 MW) repartida por kVA
+    kva = rng.choice([25, 63, 100, 160, 315], n)
+    p_kw = np.r_[0.0, 4000 * kva / kva.sum()]
+    return network, p_kw, p_kw * 0.5
+
+
+def reference_sweep(network, p_kw, q_kvar, tol=1e-10, max_iter=100):
+    """Barrido nodo a nodo con listas de hijos (versión de libro)"""
+    n = network.n_nodes
+    parent = network.parent
+    children = [[] for _ in range(n)]
+    for k in range(n):
+        if parent[k] != NO_PARENT:
+            children[parent[k]].append(k)
+    order = []
+    stack = [k for k in range(n) if parent[k] == NO_PARENT]
+    while stack:
+        k = stack.pop()
+        order.append(k)
+        stack.extend(children[k])
+
+    v_base = network.v_nominal_kv * 1000 / np.sqrt(3)
+    v = np.full(n, v_base, dtype=complex)
+    for _ in range(max_iter):
+        injection = np.conj((p_kw + 1j * q_kvar) * 1000 / 3 / v)
+        branch = injection.copy()
+        for k in reversed(order):
+            if parent[k] != NO_PARENT:
+                branch[parent[k]] += branch[k]
+        new_v = v.copy()
+        for k in order:
+            if parent[k] == NO_PARENT:
+                new_v[k] = v_base
+            else:
+                new_v[k] = new_v[parent[k]] - complex(network.r_ohm[k], network.x_ohm[k]) * branch[k]
+        done = np.abs(new_v - v).max() / v_base < tol
+        v = new_v
+        if done:
+            break
+    branch = np.where(parent != NO_PARENT, branch, 0)
+    return np.abs(v) / v_base, np.abs(branch)
+
+
+def test_two_bus_matches_analytic_solution():
+    """Una carga detrás de una impedancia: V⁴ + (2(PR+QX) - Vs²)V² + S²Z² = 0"""
+    r, x, p, q, kv = 2.0, 3.0, 3000.0, 1500.0, 13.2
+    network = RadialNetwork([NO_PARENT, 0], [0, r], [0, x], kv)
+    flow = solve_load_flow(network, [0, p], [0, q], tol=1e-12, max_iter=100)
+
+    vs2 = (kv * 1000) ** 2
+    b = 2 * (p * r + q * x) * 1000 - vs2
+    c = ((p ** 2 + q ** 2) * 1e6) * (r ** 2 + x ** 2)
+    v_r = np.sqrt((-b + np.sqrt(b ** 2 - 4 * c)) / 2)
+    current = np.sqrt(p ** 2 + q ** 2) * 1000 / (np.sqrt(3) * v_r)
+
+    assert flow.converged
+    assert flow.voltage_pu[1] == pytest.approx(v_r / (kv * 1000), rel=1e-9)
+    assert flow.current_a[1] == pytest.approx(current, rel=1e-9)
+    assert flow.losses_kw == pytest.approx(3 * current ** 2 * r / 1000, rel=1e-9)
+    assert flow.voltage_pu[0] == 1.0 and flow.current_a[0] == 0.0
+
+
+def test_matches_node_by_node_sweep():
+    """Mismas tensiones y corrientes que el barrido nodo a nodo, con bosque"""
+    network, p_kw, q_kvar = synthetic_feeder(300, seed=1)
+    # Un subárbol colgado de una segunda fuente (padre fuera del alimentador)
+    parent = network.parent.copy()
+    parent[parent == 7] = 7
+    parent[7] = NO_PARENT
+    network = RadialNetwork(parent, network.r_ohm, network.x_ohm)
+
+    flow = solve_load_flow(network, p_kw, q_kvar, tol=1e-10, max_iter=100)
+    v_ref, i_ref = reference_sweep(network, p_kw, q_kvar)
+    np.testing.assert_allclose(flow.voltage_pu, v_ref, rtol=1e-9)
+    np.testing.assert_allclose(flow.current_a, i_ref, rtol=1e-8, atol=1e-9)
+    assert flow.voltage_pu[7] == 1.0
+
+    # Balance: potencia de las fuentes = carga + pérdidas
+    v_base = network.v_nominal_kv * 1000 / np.sqrt(3)
+    v = flow.voltage_pu * v_base * np.exp(1j * np.radians(flow.voltage_angle_deg))
+    injection = np.conj((p_kw + 1j * q_kvar) * 1000 / 3 / v)
+    heads = np.flatnonzero(np.isin(network.parent, np.flatnonzero(network.parent == NO_PARENT)))
+    branch = network.bibc @ injection
+    supplied_kw = 3 * np.real(v_base * np.conj(branch[heads])).sum() / 1000
+    supplied_kw += 3 * np.real(v[parent == NO_PARENT] * np.conj(injection[parent == NO_PARENT])).sum() / 1000
+    assert supplied_kw == pytest.approx(flow.substation_kw, rel=1e-8)
+
+
+def test_batch_equals_individual_solves():
+    """Un lote (S, n) reproduce cada escenario resuelto por separado"""
+    network, p_kw, q_kvar = synthetic_feeder(120, seed=2)
+    scale = np.linspace(0.2, 1.5, 6)[:, None]
+    gd = np.zeros_like(p_kw)
+    gd[-10:] = 200.0
+    p = scale * p_kw - gd * (scale > 1)
+
+    batch = solve_load_flow(network, p, scale * q_kvar, tol=1e-10)
+    assert batch.voltage_pu.shape == (6, network.n_nodes)
+    assert batch.losses_kw.shape == (6,) and batch.converged.all()
+    for s in range(len(scale)):
+        single = solve_load_flow(network, p[s], scale[s] * q_kvar, tol=1e-10)
+        np.testing.assert_allclose(batch.voltage_pu[s], single.voltage_pu, rtol=1e-9)
+        np.testing.assert_allclose(batch.segment_losses_kw[s], single.segment_losses_kw, rtol=1e-7, atol=1e-12)
+
+
+def test_equivalent_feeder_gd_and_reactive_support():
+    """GD y compensación reactiva bajan pérdidas y suben la tensión mínima"""
+    flow = equivalent_feeder_flow(np.array([4.0, 4.0, 4.0, 8.0]),
+                                  gd_mw=np.array([0.0, 2.0, 0.0, 0.0]),
+                                  q_injection_mvar=np.array([0.0, 0.0, 1.0, 0.0]))
+    base, gd, statcom, heavy = flow.losses_kw
+    assert gd < base and statcom < base
+    assert flow.min_voltage_pu[1] > flow.min_voltage_pu[0] and flow.min_voltage_pu[2] > flow.min_voltage_pu[0]
+    # Pérdidas ∝ I²: duplicar la carga da algo más de 4 veces (tensión más baja)
+    assert 4 < heavy / base < 5
+
+    # Dos alimentadores en paralelo con la carga doble = la mitad de carga cada uno
+    split = equivalent_feeder_flow(8.0, n_feeders=2)
+    assert split.losses_kw == pytest.approx(2 * base, rel=1e-5)
+
+
+def test_script_05_load_flow_columns():
+    """El script 05 agrega tensión, corriente y pérdidas del flujo de carga"""
+    script = load_script("05_electrical_distance_calculation.py")
+    df = synthetic_network(n_feeders=1, mean_size=40, seed=4, fixed_size=True)
+    df = df.drop(columns=['factor_potencia_estimado', 'indice_debilidad_electrica',
+                          'caida_tension_percent', 'hundimiento_arranque_percent'])
+    with contextlib.redirect_stdout(io.StringIO()):
+        result, stats = script.process_feeder('ALIM', df)
+
+    assert stats['flujo_convergido']
+    assert stats['perdidas_flujo_kW'] == pytest.approx(result['perdidas_tramo_kW'].sum())
+    assert (result['tension_flujo_pu'] <= 1).all()
+    # La corriente de cabecera lleva todo el alimentador: mayor que la del trafo solo
+    heads = result['padre_mst'] == 'SUBSTATION'
+    assert (result.loc[heads, 'corriente_tramo_A'] >= result.loc[heads, 'corriente_estimada_A'] * 0.99).all()
+
+
+def test_script_13_physics_benefits():
+    """Beneficios 24h: sin GD no hay mejora; con GD bajan pérdidas y sube tensión"""
+    path = BASE_DIR / "scripts" / "clustering" / "13_technical_benefits_24h.py"
+    spec = importlib.util.spec_from_file_location("clustering_benefits_24h", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    calculator = module.TechnicalBenefits24H()
+
+    cluster = {'cluster_id': 1, 'perfil_dominante': 'Residencial', 'potencia_mva': 10.0}
+    without = calculator.calculate_24h_benefits({**cluster, 'gd_recomendada_mw': 0.0})
+    with_gd = calculator.calculate_24h_benefits({**cluster, 'gd_recomendada_mw': 3.0})
+
+    for period in ('day_benefits', 'night_benefits'):
+        assert without[period]['loss_reduction_pct'] == pytest.approx(0, abs=1e-12)
+        assert without[period]['voltage_improvement_pct'] == pytest.approx(0, abs=1e-12)
+        assert with_gd[period]['base_losses_pct'] == without[period]['base_losses_pct'] > 0
+        assert with_gd[period]['loss_reduction_pct'] > 0
+        assert with_gd[period]['voltage_improvement_pct'] > 0
+
+
+def test_network_benefits_base_losses(monkeypatch):
+    """Pérdidas base: el valor explícito no resuelve el flujo; sin él se usa la demanda, no la PV"""
+    def no_flow(load_mw):
+        raise AssertionError("flujo de carga innecesario")
+    with monkeypatch.context() as patched:
+        patched.setattr(network_benefits_modular, 'estimate_base_losses_mw', no_flow)
+        explicit = network_benefits_modular.calculate_total_network_benefits(
+            10.0, 0.0, 0.0, {'base_losses_mw': 0.5})
+
+    params = network_benefits_modular.estimate_network_parameters({'total_kva': 20000})
+    assert params['base_losses_mw'] == network_benefits_modular.estimate_base_losses_mw(params['load_mw'])
+    del params['base_losses_mw']
+    for pv_mw in (1.0, 8.0, 40.0):
+        benefits = network_benefits_modular.calculate_total_network_benefits(pv_mw, 0.0, 0.0, params)
+        _, expected = network_benefits_modular.calculate_loss_reduction(
+            pv_mw, network_benefits_modular.estimate_base_losses_mw(params['load_mw']))
+        assert benefits['loss_reduction'] == pytest.approx(expected)
+    assert explicit['loss_reduction'] > 0
+    assert network_benefits_modular.calculate_total_network_benefits(
+        10.0, 0.0, 0.0, {})['loss_reduction'] == 0
+
+
+def benchmark_load_flow(sizes=(50, 200, 1000), scenarios=(1, 24, 96)):
+    """Alimentadores resueltos por segundo según tamaño y escenarios por lote"""
+    print("=" * 80)
+    print("FLUJO DE CARGA RADIAL - barrido nodo a nodo vs lote vectorizado")
+    print("=" * 80)
+
+    for n in sizes:
+        network, p_kw, q_kvar = synthetic_feeder(n, seed=n)
+
+        start = time.perf_counter()
+        reference_sweep(network, p_kw, q_kvar, tol=1e-6)
+        reference_time = time.perf_counter() - start
+        line = f"{n:>6} nodos: nodo a nodo {1 / reference_time:8.0f} sol/s"
+
+        for s in scenarios:
+            p = np.tile(p_kw, (s, 1)) * np.linspace(0.3, 1.0, s)[:, None]
+            repeats = max(1, 200 // s)
+            start = time.perf_counter()
+            for _ in range(repeats):
+                solve_load_flow(network, p, p * 0.5)
+            elapsed = (time.perf_counter() - start) / repeats
+            line += f" | lote {s:>3}: {s / elapsed:8.0f} sol/s"
+        print(line)
+
+
+if __name__ == "__main__":
+    test_two_bus_matches_analytic_solution()
+    test_matches_node_by_node_sweep()
+    test_batch_equals_individual_solves()
+    test_equivalent_feeder_gd_and_reactive_support()
+    test_script_05_load_flow_columns()
+    test_script_13_physics_benefits()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_network_benefits_base_losses(monkeypatch)
+    print("Tests de flujo de carga: OK")
+
+    benchmark_load_flow()
@@ -0,0 +1,169 @@
+"""
+Script de Testing de los Mapas con Agregación por Vista
+=======================================================
+Objetivo: Validar dashboard/utils/map_render.py (vista desde relayoutData,
+vista redondeada estable, agregación exacta por celdas, puntos visibles con
+hover en customdata, figura serializable) y medir tiempo y tamaño del mapa
+de la red completa frente a enviar todos los puntos con texto por fila.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+import numpy as np
+import pandas as pd
+
+from dashboard.utils.map_render import (PROBLEM_INDEX, PROBLEM_SCALE, Viewport, aggregate_cells,
+                                        cell_size_deg, fit_viewport, map_figure, map_layer,
+                                        valid_coordinates, viewport_from_relayout)
+from test_feeder_runner import synthetic_network
+
+HOVER_FIELDS = [('Código', 'Codigo', ''), ('Potencia (kVA)', 'Potencia', ''),
+                ('Usuarios', 'Q_Usuarios', ''), ('Estado', 'Resultado', '')]
+SUM_FIELDS = [('Usuarios', 'Q_Usuarios'), ('Potencia (kVA)', 'Potencia')]
+
+
+def network(n_feeders=140, mean_size=100, seed=7):
+    """Red sintética del tamaño de la real, con algunas coordenadas inválidas"""
+    df = synthetic_network(n_feeders=n_feeders, mean_size=mean_size, seed=seed)
+    df.loc[df.index % 97 == 0, 'Coord_X'] = 0.0
+    df.loc[df.index % 89 == 0, 'Coord_Y'] = np.nan
+    return df
+
+
+def test_viewport_from_relayout():
+    """Esquinas de mapbox._derived, centro y zoom, y eventos sin datos del mapa"""
+    default = Viewport(-70, -60, -45, -38, 5)
+    assert viewport_from_relayout(None, default) is default
+    assert viewport_from_relayout({'autosize': True}, default) is default
+
+    derived = {'mapbox.center': {'lon': -63.0, 'lat': -40.8}, 'mapbox.zoom': 11.2,
+               'mapbox._derived': {'coordinates': [[-63.1, -40.7], [-62.9, -40.7], [-62.9, -40.9], [-63.1, -40.9]]}}
+    viewport = viewport_from_relayout(derived, default)
+    assert (viewport.lon_min, viewport.lon_max, viewport.lat_min, viewport.lat_max) == (-63.1, -62.9, -40.9, -40.7)
+    assert viewport.zoom == 11.2
+
+    estimated = viewport_from_relayout({'mapbox.zoom': 9}, default)
+    assert estimated.zoom == 9 and estimated.center == default.center
+    assert estimated.lon_max - estimated.lon_min < default.lon_max - default.lon_min
+
+
+def test_fit_and_snapped_viewport():
+    """La vista inicial contiene la red; vistas casi iguales comparten la vista redondeada"""
+    df = valid_coordinates(network(n_feeders=20, mean_size=40))
+    lon, lat = df['Coord_X'].to_numpy(), df['Coord_Y'].to_numpy()
+    viewport = fit_viewport(lon, lat)
+    assert viewport.contains(lon, lat, margin=0).all() and 0 < viewport.zoom < 18
+
+    snapped = viewport.snapped()
+    assert snapped.contains(lon, lat, margin=0).all()
+    # Un desplazamiento menor que la grilla, sin cruzar una línea, da la misma clave
+    step = cell_size_deg(snapped.zoom) * 4
+    inner = Viewport(snapped.lon_min + step / 4, snapped.lon_max - step / 4,
+                     snapped.lat_min + step / 4, snapped.lat_max - step / 4, snapped.zoom + 0.2)
+    nudged = Viewport(inner.lon_min + step / 8, inner.lon_max + step / 8,
+                      inner.lat_min, inner.lat_max, inner.zoom + 0.1)
+    assert inner.snapped().as_key() == nudged.snapped().as_key() == snapped.as_key()
+    assert Viewport.from_key(snapped.as_key()).as_key() == snapped.as_key()
+
+
+def test_cells_are_exact_aggregates():
+    """Cantidades, sumas y promedios por celda coinciden con un groupby"""
+    df = valid_coordinates(network(n_feeders=30, mean_size=60))
+    color = np.array(df['Resultado'].map(PROBLEM_INDEX), dtype=float)
+    color[::7] = np.nan
+    cell = cell_size_deg(8)
+    cells = aggregate_cells(df['Coord_X'].to_numpy(), df['Coord_Y'].to_numpy(), color,
+                            {'Q_Usuarios': df['Q_Usuarios'].to_numpy()}, cell)
+
+    keys = pd.DataFrame({'ix': np.floor(df['Coord_X'] / cell), 'iy': np.floor(df['Coord_Y'] / cell),
+                         'usuarios': df['Q_Usuarios'], 'color': color})
+    expected = keys.groupby(['ix', 'iy']).agg(n=('usuarios', 'size'), usuarios=('usuarios', 'sum'),
+                                              color=('color', 'mean'))
+    assert len(cells) == len(expected) and cells['transformadores'].sum() == len(df)
+    np.testing.assert_array_equal(np.sort(cells['transformadores']), np.sort(expected['n']))
+    np.testing.assert_allclose(np.sort(cells['Q_Usuarios']), np.sort(expected['usuarios']))
+    np.testing.assert_allclose(np.sort(cells['color'].dropna()), np.sort(expected['color'].dropna()))
+
+
+def test_layer_switches_between_cells_and_points():
+    """Red completa en celdas; zoom alto con los puntos visibles y hover en customdata"""
+    df = valid_coordinates(network())
+    color = df['Resultado'].map(PROBLEM_INDEX).to_numpy(dtype=float)
+    full = fit_viewport(df['Coord_X'], df['Coord_Y']).snapped()
+    cells = map_layer(df, full, color, HOVER_FIELDS, 'Problemas', sum_fields=SUM_FIELDS)
+    assert cells['meta']['modo'] == 'celdas' and cells['meta']['transformadores'] == len(df)
+    assert cells['meta']['marcas'] < len(df) / 5
+    assert 'Usuarios: %{customdata[1]:,.0f}<br>Potencia (kVA): %{customdata[2]' in cells['hovertemplate']
+    assert np.isclose(sum(row[1] for row in cells['customdata']), df['Q_Usuarios'].sum())
+
+    # Las sumas usan las columnas indicadas (app_edersa lee la base en minúsculas)
+    lower = df.rename(columns={'Q_Usuarios': 'q_usuarios', 'Potencia': 'potencia'})
+    lower_cells = map_layer(lower, full, color, HOVER_FIELDS[:1], 'Problemas',
+                            sum_fields=[('Usuarios', 'q_usuarios'), ('Potencia (kVA)', 'potencia')])
+    assert lower_cells['customdata'] == cells['customdata']
+
+    first = df.iloc[0]
+    zoomed = Viewport(first['Coord_X'] - 0.02, first['Coord_X'] + 0.02,
+                      first['Coord_Y'] - 0.01, first['Coord_Y'] + 0.01, 13).snapped()
+    points = map_layer(df, zoomed, color, HOVER_FIELDS, 'Problemas', size_column='Q_Usuarios')
+    visible = zoomed.contains(df['Coord_X'].to_numpy(), df['Coord_Y'].to_numpy())
+    assert points['meta']['modo'] == 'puntos' and len(points['lon']) == visible.sum()
+    assert points['customdata'][0] == [first['Codigo'], first['Potencia'], first['Q_Usuarios'], first['Resultado']]
+    assert points['hovertemplate'].startswith('<b>%{customdata[0]}</b><br>Potencia (kVA): %{customdata[1]}')
+
+    figure = map_figure(points, zoomed, PROBLEM_SCALE, 'Problemas')
+    assert figure['layout']['uirevision'] == 'mapa' and figure['data'][0]['marker']['colorscale'] == PROBLEM_SCALE
+    json.dumps(figure, allow_nan=False)
+
+
+def benchmark_map(n_views=5):
+    """Mapa de la red completa: todos los puntos con texto por fila vs agregación por vista"""
+    df = valid_coordinates(network(mean_size=100))
+
+    print("=" * 80)
+    print(f"MAPA POR VISTA - {len(df):,} transformadores")
+    print("=" * 80)
+
+    def all_points():
+        text = df.apply(lambda row: f"<b>{row['Codigo']}</b><br>Potencia: {row['Potencia']} kVA<br>"
+                                    f"Usuarios: {row['Q_Usuarios']}<br>Estado: {row['Resultado']}", axis=1)
+        return {'data': [{'type': 'scattermapbox', 'lat': df['Coord_Y'].tolist(), 'lon': df['Coord_X'].tolist(),
+                          'text': text.tolist(), 'hovertemplate': '%{text}<extra></extra>'}]}
+
+    color = df['Resultado'].map(PROBLEM_INDEX).to_numpy(dtype=float)
+    full = fit_viewport(df['Coord_X'], df['Coord_Y']).snapped()
+    first = df.iloc[len(df) // 2]
+    zoomed = Viewport(first['Coord_X'] - 0.05, first['Coord_X'] + 0.05,
+                      first['Coord_Y'] - 0.025, first['Coord_Y'] + 0.025, 12).snapped()
+
+    def layer(viewport):
+        return lambda: map_figure(map_layer(df, viewport, color, HOVER_FIELDS, 'Problemas'),
+                                  viewport, PROBLEM_SCALE, 'Problemas')
+
+    baseline = None
+    for label, render in (('todos los puntos', all_points), ('vista inicial (celdas)', layer(full)),
+                          ('zoom 12 (puntos)', layer(zoomed))):
+        start = time.perf_counter()
+        for _ in range(n_views):
+            payload = json.dumps(render())
+        elapsed = (time.perf_counter() - start) / n_views
+        baseline = baseline or (elapsed, len(payload))
+        print(f"{label:<24} {elapsed * 1000:8.2f} ms ({baseline[0] / elapsed:6.1f}x) | "
+              f"{len(payload) / 1e3:9.1f} kB ({baseline[1] / len(payload):6.1f}x)")
+
+
+if __name__ == "__main__":
+    test_viewport_from_relayout()
+    test_fit_and_snapped_viewport()
+    test_cells_are_exact_aggregates()
+    test_layer_switches_between_cells_and_points()
+    print("Tests de mapas por vista: OK")
+
+    benchmark_map()
@@ -0,0 +1,150 @@
+"""
+Script de Testing de la Reconstrucción MST Rápida
+=================================================
+Objetivo: Validar src/network/mst_topology.py contra el MST del grafo
+completo de NetworkX que usaba el script 04 (mismas aristas y distancias,
+orientación desde la subestación) y medir ambos en alimentadores
+sintéticos de distinto tamaño.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from src.network.mst_topology import (NO_PARENT, haversine_km, minimum_spanning_parents,
+                                      mst_to_digraph)
+
+
+def synthetic_feeder(n, seed=0, spread=0.05):
+    """Subestación (nodo 0) + n transformadores alrededor de Río Negro"""
+    rng = np.random.default_rng(seed)
+    lat = np.concatenate([[-40.81], -40.81 + rng.normal(0, spread, n)])
+    lon = np.concatenate([[-62.99], -62.99 + rng.normal(0, spread, n)])
+    return lat, lon
+
+
+def reference_mst(lat, lon):
+    """MST del grafo completo como en la versión original del script 04"""
+    n = len(lat)
+    G = nx.Graph()
+    G.add_nodes_from(range(n))
+    for i in range(n):
+        for j in range(i + 1, n):
+            dist = float(haversine_km(lat[i], lon[i], lat[j], lon[j]))
+            if dist > 0:
+                G.add_edge(i, j, weight=dist)
+    return nx.minimum_spanning_tree(G)
+
+
+def _edges(mst):
+    children = np.flatnonzero(mst.parent != NO_PARENT)
+    return {tuple(sorted(e)) for e in zip(mst.parent[children].tolist(), children.tolist())}
+
+
+def test_dense_matches_networkx():
+    """Mismo árbol y distancias que el grafo completo, orientado desde la raíz"""
+    lat, lon = synthetic_feeder(300)
+    mst = minimum_spanning_parents(lat, lon)
+    reference = reference_mst(lat, lon)
+
+    assert _edges(mst) == {tuple(sorted(e)) for e in reference.edges()}
+    assert mst.n_edges == len(lat) - 1
+    assert mst.order[0] == 0 and mst.parent[0] == NO_PARENT
+    for child in np.flatnonzero(mst.parent != NO_PARENT):
+        parent = mst.parent[child]
+        assert mst.weight[child] == pytest.approx(reference[parent][child]['weight'], rel=1e-12)
+
+    # El padre siempre aparece antes que el hijo en el orden BFS
+    position = np.empty(len(lat), dtype=int)
+    position[mst.order] = np.arange(len(mst.order))
+    children = mst.order[1:]
+    assert np.all(position[mst.parent[children]] < position[children])
+
+
+def test_sparse_matches_total_weight():
+    """Delaunay + kNN da el mismo peso total que todos los pares"""
+    lat, lon = synthetic_feeder(2000, seed=3)
+    dense = minimum_spanning_parents(lat, lon, dense_max_nodes=len(lat))
+    sparse = minimum_spanning_parents(lat, lon, dense_max_nodes=100)
+
+    assert sparse.n_edges == dense.n_edges == len(lat) - 1
+    assert np.nansum(sparse.weight) == pytest.approx(np.nansum(dense.weight), rel=1e-9)
+    assert len(_edges(sparse) ^ _edges(dense)) == 0
+
+
+def test_degenerate_coordinates():
+    """Puntos colineales y coordenadas repetidas"""
+    # Colineales: la cadena ordenada es el único MST
+    lat = np.linspace(-40.8, -40.7, 50)
+    lon = np.full(50, -63.0)
+    for dense_max_nodes in (1000, 10):
+        mst = minimum_spanning_parents(lat, lon, dense_max_nodes=dense_max_nodes)
+        assert mst.parent[1:].tolist() == list(range(49))
+
+    # Duplicados: sin aristas de distancia 0, como en el grafo completo
+    lat, lon = synthetic_feeder(40, seed=5)
+    lat = np.concatenate([lat, lat[5:10]])
+    lon = np.concatenate([lon, lon[5:10]])
+    mst = minimum_spanning_parents(lat, lon)
+    reference = reference_mst(lat, lon)
+    assert mst.n_edges == reference.number_of_edges()
+    assert np.nansum(mst.weight) == pytest.approx(reference.size(weight='weight'), rel=1e-12)
+
+
+def test_digraph_interface():
+    """El DiGraph conserva nodos, atributos y aristas padre -> hijo"""
+    lat, lon = synthetic_feeder(30, seed=7)
+    node_ids = ['SUBSTATION'] + [f'T{i}' for i in range(30)]
+    potencia = [0] + list(range(30))
+    usuarios = [0] + list(range(100, 130))
+
+    mst = minimum_spanning_parents(lat, lon)
+    graph = mst_to_digraph(node_ids, mst, lon, lat, potencia, usuarios)
+
+    assert list(graph.nodes) == node_ids
+    assert graph.in_degree('SUBSTATION') == 0
+    assert all(graph.in_degree(node) == 1 for node in node_ids[1:])
+    assert graph.nodes['T3']['potencia'] == 3 and graph.nodes['T3']['usuarios'] == 103
+    assert graph.nodes['T3']['x'] == lon[4] and graph.nodes['T3']['y'] == lat[4]
+    assert nx.is_arborescence(graph)
+
+
+def benchmark_mst(sizes=(200, 800, 1500, 5000, 20000)):
+    """Grafo completo NetworkX (hasta 800 nodos) vs backend scipy"""
+    print("=" * 80)
+    print("RECONSTRUCCIÓN MST - grafo completo NetworkX vs scipy")
+    print("=" * 80)
+
+    for n in sizes:
+        lat, lon = synthetic_feeder(n, seed=n)
+
+        start = time.perf_counter()
+        minimum_spanning_parents(lat, lon)
+        fast_time = time.perf_counter() - start
+
+        if n <= 800:
+            start = time.perf_counter()
+            reference_mst(lat, lon)
+            reference_time = time.perf_counter() - start
+            print(f"{n:>6} nodos: NetworkX {reference_time:8.2f} s | scipy {fast_time:7.3f} s "
+                  f"({reference_time / fast_time:.0f}x)")
+        else:
+            print(f"{n:>6} nodos: NetworkX        - | scipy {fast_time:7.3f} s")
+
+
+if __name__ == "__main__":
+    test_dense_matches_networkx()
+    test_sparse_matches_total_weight()
+    test_degenerate_coordinates()
+    test_digraph_interface()
+    print("Tests de MST: OK")
+
+    benchmark_mst()
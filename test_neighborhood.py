@@ -0,0 +1,135 @@
+"""
+Script de Testing del Vecindario Espacial con BallTree (Script 07)
+==================================================================
+Objetivo: Validar src/network/neighborhood.py y calculate_neighborhood_features
+contra la versión original (matriz haversine n×n y bucle por fila), varios
+radios en una consulta, coordenadas duplicadas, y medir tiempo y memoria
+sobre una red del tamaño de EDERSA.
+"""
+
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics.pairwise import haversine_distances
+
+from src.network.neighborhood import neighbor_lists, radius_label
+from test_feeder_runner import load_script, synthetic_network
+
+script = load_script("07_failure_mode_features.py")
+
+
+def reference_neighborhood(df, radius_km=0.5):
+    """Versión original: matriz de distancias completa y df.iloc por fila"""
+    dist_matrix = haversine_distances(np.radians(df[['Coord_Y', 'Coord_X']].values)) * 6371
+    rows = []
+    for i in range(len(df)):
+        neighbors_idx = np.where((dist_matrix[i] <= radius_km) & (dist_matrix[i] > 0))[0]
+        if len(neighbors_idx) == 0:
+            rows.append({'num_vecinos_500m': 0, 'tasa_fallas_vecindario': 0,
+                         'potencia_vecindario_mva': 0, 'usuarios_vecindario': 0,
+                         'tipo_vecindario': 'aislado'})
+            continue
+        neighbors_data = df.iloc[neighbors_idx]
+        total = len(neighbors_idx)
+        rows.append({
+            'num_vecinos_500m': total,
+            'tasa_fallas_vecindario': (neighbors_data['Resultado'] == 'Fallida').sum() / total,
+            'tasa_problemas_vecindario': (neighbors_data['Resultado'] != 'Correcta').sum() / total,
+            'potencia_vecindario_mva': neighbors_data['Potencia'].sum() / 1000,
+            'usuarios_vecindario': neighbors_data['Q_Usuarios'].sum(),
+            'tipo_vecindario': 'denso' if total > 5 else 'disperso'
+        })
+    return pd.DataFrame(rows)
+
+
+def network_with_duplicates(seed=0):
+    """Red sintética con algunos transformadores en las mismas coordenadas"""
+    df = synthetic_network(n_feeders=6, mean_size=120, seed=seed)
+    df.loc[df.index[:20], ['Coord_X', 'Coord_Y']] = df.loc[df.index[20:40], ['Coord_X', 'Coord_Y']].to_numpy()
+    return df
+
+
+def test_matches_full_distance_matrix():
+    """Mismas features que la matriz n×n (aislados: tasa de problemas 0, no NaN)"""
+    df = network_with_duplicates()
+    expected = reference_neighborhood(df)
+    expected['tasa_problemas_vecindario'] = expected['tasa_problemas_vecindario'].fillna(0)
+
+    actual = script.calculate_neighborhood_features(df)
+    assert (actual['tipo_vecindario'] == 'aislado').any()
+    pd.testing.assert_frame_equal(actual[expected.columns], expected, check_dtype=False, rtol=1e-12)
+
+
+def test_several_radii_in_one_query():
+    """Cada radio coincide con el filtro directo de la matriz de distancias"""
+    df = network_with_duplicates(seed=1)
+    dist = haversine_distances(np.radians(df[['Coord_Y', 'Coord_X']].values)) * 6371
+    potencia = df['Potencia'].to_numpy()
+
+    lists = neighbor_lists(df['Coord_Y'], df['Coord_X'], (1.0, 0.25, 0.5))
+    assert sorted(lists) == [0.25, 0.5, 1.0]
+    for radius, neighbors in lists.items():
+        mask = (dist <= radius) & (dist > 0)
+        np.testing.assert_array_equal(neighbors.counts, mask.sum(axis=1))
+        np.testing.assert_array_equal(neighbors.sum(potencia), mask @ potencia)
+        for i in (0, 25, len(df) - 1):
+            row = neighbors.indices[neighbors.offsets[i]:neighbors.offsets[i + 1]]
+            assert set(row) == set(np.flatnonzero(mask[i]))
+
+    features = script.calculate_neighborhood_features(df, extra_radii_km=(0.25, 1.0))
+    for radius in (0.25, 1.0):
+        label = radius_label(radius)
+        np.testing.assert_array_equal(features[f'num_vecinos_{label}'], lists[radius].counts)
+    assert radius_label(0.25) == '250m' and radius_label(1.0) == '1km'
+
+
+def test_empty_and_isolated():
+    """Sin transformadores o todos aislados: ceros sin errores de reduceat"""
+    assert neighbor_lists([], [], (0.5,))[0.5].counts.tolist() == []
+    lists = neighbor_lists([-40.0, -41.0, -42.0], [-63.0, -64.0, -65.0], (0.5,))[0.5]
+    assert lists.counts.tolist() == [0, 0, 0]
+    assert lists.sum([1.0, 2.0, 3.0]).tolist() == [0, 0, 0]
+
+
+def benchmark_neighborhood(n_transformers=14000):
+    """Matriz n×n + bucle (hasta 3000 trafos) vs BallTree en la red completa"""
+    print("=" * 80)
+    print("VECINDARIO ESPACIAL - matriz haversine n×n vs BallTree")
+    print("=" * 80)
+
+    for n in (3000, n_transformers):
+        df = synthetic_network(n_feeders=max(n // 100, 1), mean_size=100, seed=n, fixed_size=True)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        script.calculate_neighborhood_features(df)
+        fast_time = time.perf_counter() - start
+        fast_peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+
+        line = f"{len(df):>6} trafos: BallTree 3 radios {fast_time:6.2f} s, pico {fast_peak:7.1f} MB"
+        if n <= 3000:
+            start = time.perf_counter()
+            reference_neighborhood(df)
+            reference_time = time.perf_counter() - start
+            line += f" | matriz n×n {reference_time:6.2f} s ({reference_time / fast_time:.0f}x)"
+        else:
+            line += f" | matriz n×n: {len(df) ** 2 * 8 / 1e9:.1f} GB solo en distancias"
+        print(line)
+
+
+if __name__ == "__main__":
+    test_matches_full_distance_matrix()
+    test_several_radii_in_one_query()
+    test_empty_and_isolated()
+    print("Tests de vecindario espacial: OK")
+
+    benchmark_neighborhood()
@@ -0,0 +1,213 @@
+"""
+Script de Testing del Almacenamiento Intermedio Parquet
+=======================================================
+Objetivo: Validar src/pipeline/store.py (esquema con categóricas y
+booleanos, proyección de columnas, lectura de CSV históricos, columnas
+repetidas), que los scripts 05, 06 y 07 dan lo mismo con las columnas
+categóricas, y medir tiempo de carga y pico de RSS CSV vs Parquet.
+"""
+
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.network.feeder_runner import run_feeders
+from src.pipeline.stages import pipeline_stages
+from src.pipeline.runner import _peak_rss_mb
+from src.pipeline.store import (apply_schema, convert_csv, dataset_columns, dataset_exists,
+                                read_frame, write_frame)
+from test_feeder_runner import load_script, synthetic_network
+
+loads = load_script("06_load_estimation_features.py")
+failure = load_script("07_failure_mode_features.py")
+
+
+def network(n_feeders=6, seed=0):
+    """Red sintética con los tipos de la salida del preprocesamiento"""
+    df = synthetic_network(n_feeders=n_feeders, mean_size=40, seed=seed)
+    df['N_Sucursal'] = np.where(df.index % 3 == 0, 'BARILOCHE', 'VIEDMA')
+    return df
+
+
+def test_round_trip_schema(tmp_path):
+    """Categóricas, booleanos, enteros y textos mezclados sobreviven la escritura"""
+    df = network()
+    df['padre_problematico'] = df.index % 2 == 0
+    df['nodo_mixto'] = pd.Series([1, 'SUBSTATION'] * (len(df) // 2) + [2] * (len(df) % 2), dtype=object)
+    df['con_faltantes'] = pd.array([True, None] * (len(df) // 2) + [False] * (len(df) % 2), dtype='boolean')
+    path = write_frame(df, tmp_path / 'datos.csv')
+    assert path.suffix == '.parquet' and dataset_exists(tmp_path / 'datos.parquet')
+
+    loaded = read_frame(path)
+    for column in ('Alimentador', 'N_Sucursal', 'Resultado'):
+        assert isinstance(loaded[column].dtype, pd.CategoricalDtype)
+        assert loaded[column].astype(object).tolist() == df[column].tolist()
+    assert loaded['es_nodo_hoja'].dtype == bool and loaded['padre_problematico'].dtype == bool
+    assert loaded['Potencia'].dtype == 'float64' and loaded['Q_Usuarios'].dtype == 'int64'
+    assert loaded['nodo_mixto'].tolist() == df['nodo_mixto'].astype(str).tolist()
+    assert loaded['con_faltantes'].isna().sum() == df['con_faltantes'].isna().sum()
+
+    plain = read_frame(path, categorical=False)
+    assert plain['Alimentador'].dtype == object and plain['Alimentador'].tolist() == df['Alimentador'].tolist()
+
+
+def test_projection_and_errors(tmp_path):
+    """Solo se leen las columnas pedidas; columnas o archivos ausentes fallan claro"""
+    path = write_frame(network(), tmp_path / 'datos.parquet')
+    projected = read_frame(path, columns=['Codigo', 'Alimentador', 'Coord_X'])
+    assert list(projected.columns) == ['Codigo', 'Alimentador', 'Coord_X']
+    assert 'padre_mst' in dataset_columns(path)
+    with pytest.raises(KeyError, match='no_existe'):
+        read_frame(path, columns=['Codigo', 'no_existe'])
+    with pytest.raises(FileNotFoundError):
+        read_frame(tmp_path / 'otro.parquet')
+
+
+def test_duplicated_columns_rejected(tmp_path):
+    """Una columna repetida no se guarda: el script debe resolverla antes"""
+    df = network()
+    duplicated = pd.concat([df, pd.DataFrame({'Potencia': df['Potencia'] * 2.0})], axis=1)
+    with pytest.raises(ValueError, match='Potencia'):
+        write_frame(duplicated, tmp_path / 'datos.parquet')
+    assert not dataset_exists(tmp_path / 'datos.parquet')
+
+
+def test_load_estimation_resolves_recalculated_columns(tmp_path):
+    """Script 06: la columna original conserva el nombre y la recalculada se renombra"""
+    df = network()
+    recalculated = pd.DataFrame({'factor_potencia_estimado': np.full(len(df), 0.5)})
+    resolved = loads.resolve_recalculated_columns(pd.concat([df, recalculated], axis=1))
+    np.testing.assert_array_equal(resolved['factor_potencia_estimado'], df['factor_potencia_estimado'])
+    np.testing.assert_array_equal(resolved['factor_potencia_tipo_carga'], 0.5)
+    read_frame(write_frame(resolved, tmp_path / 'datos.parquet'))
+
+    with pytest.raises(ValueError, match='Potencia'):
+        loads.resolve_recalculated_columns(pd.concat([df, df[['Potencia']]], axis=1))
+
+
+def test_csv_fallback_and_conversion(tmp_path):
+    """Un CSV de una corrida anterior se lee con el esquema y se puede convertir"""
+    df = network()
+    df.to_csv(tmp_path / 'datos.csv', index=False)
+    from_csv = read_frame(tmp_path / 'datos.parquet')
+    assert isinstance(from_csv['Alimentador'].dtype, pd.CategoricalDtype)
+    assert from_csv['es_nodo_hoja'].dtype == bool
+
+    target = convert_csv(tmp_path / 'datos.csv', remove_csv=True)
+    assert target.exists() and not (tmp_path / 'datos.csv').exists()
+    pd.testing.assert_frame_equal(read_frame(target), from_csv)
+
+    # Sin faltantes se fuerza bool; con faltantes queda como está
+    flags = pd.DataFrame({'es_lineal': [1.0, np.nan, 0.0]})
+    assert apply_schema(flags)['es_lineal'].isna().sum() == 1
+
+
+def test_network_scripts_with_categorical_columns(tmp_path):
+    """Scripts 05, 06 y 07 dan lo mismo leyendo categóricas de Parquet"""
+    df = network(seed=3)
+    stored = read_frame(write_frame(df, tmp_path / 'datos.parquet'))
+    plain = apply_schema(df, categorical=False)
+
+    script = load_script("05_electrical_distance_calculation.py")
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = run_feeders(script.process_feeder, plain, min_rows=2)
+        actual = run_feeders(script.process_feeder, stored, min_rows=2)
+    assert [r.feeder for r in actual] == [r.feeder for r in expected]
+    for a, e in zip(actual, expected):
+        pd.testing.assert_frame_equal(a.result[0], e.result[0], check_dtype=False, check_categorical=False)
+
+    # Pipeline de features de los scripts 06 y 07, cada paso sobre la salida del anterior
+    for frame_func in (loads.classify_load_type_frame, loads.calculate_load_features_frame,
+                       loads.calculate_overload_risk_frame, failure.calculate_thermal_stress_frame,
+                       failure.calculate_dielectric_stress_frame, failure.calculate_parent_influence):
+        new_stored, new_plain = frame_func(stored), frame_func(plain)
+        pd.testing.assert_frame_equal(new_stored, new_plain, check_dtype=False, check_categorical=False)
+        stored = pd.concat([stored.drop(columns=[c for c in new_stored.columns if c in stored.columns]),
+                            new_stored], axis=1)
+        plain = pd.concat([plain.drop(columns=[c for c in new_plain.columns if c in plain.columns]),
+                           new_plain], axis=1)
+    pd.testing.assert_frame_equal(failure.calculate_composite_vulnerability_frame(stored),
+                                  failure.calculate_composite_vulnerability_frame(plain),
+                                  check_dtype=False, check_categorical=False)
+
+
+def test_registry_uses_parquet():
+    """El registro de etapas sigue siendo válido y los intermedios son Parquet"""
+    outputs = [path for stage in pipeline_stages() for path in stage.outputs]
+    assert 'data/processed/transformers_analysis.parquet' in outputs
+    assert not any(path.endswith('transformadores_con_topologia.csv') for path in outputs)
+
+
+def _load_rss(path, columns=None):
+    """Lee el dataset en un proceso nuevo: segundos y MB de RSS que agrega la lectura"""
+    import resource
+    before = _peak_rss_mb(resource.getrusage(resource.RUSAGE_SELF))
+    start = time.perf_counter()
+    if Path(path).suffix == '.csv':
+        data = pd.read_csv(path, usecols=columns)
+    else:
+        data = read_frame(path, columns=columns)
+    elapsed = time.perf_counter() - start
+    assert len(data)
+    return elapsed, _peak_rss_mb(resource.getrusage(resource.RUSAGE_SELF)) - before
+
+
+def benchmark_load(n_transformers=14000):
+    """Carga del dataset de topología: CSV vs Parquet, completa y proyectada (tiempo y pico de RSS)"""
+    import multiprocessing
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+    df = synthetic_network(n_feeders=140, mean_size=n_transformers / 140, seed=7)
+    df['N_Sucursal'] = np.where(df.index % 3 == 0, 'BARILOCHE', 'VIEDMA')
+    # Columnas de texto como las del dataset real (localidad, observaciones)
+    df['N_Localida'] = 'LOCALIDAD_' + (df.index % 60).astype(str)
+    for i in range(30):
+        df[f'feature_{i}'] = np.random.default_rng(i).normal(size=len(df))
+
+    print("=" * 80)
+    print(f"ALMACENAMIENTO INTERMEDIO - {len(df):,} transformadores, {len(df.columns)} columnas")
+    print("=" * 80)
+
+    projection = ['Codigo', 'Alimentador', 'Coord_X', 'Coord_Y', 'Resultado']
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_file = Path(tmp) / 'csv' / 'datos.csv'
+        csv_file.parent.mkdir()
+        df.to_csv(csv_file, index=False)
+        parquet_file = write_frame(df, Path(tmp) / 'datos.parquet')
+        print(f"{'Tamaño en disco':<28} CSV {csv_file.stat().st_size / 1e6:7.2f} MB | "
+              f"Parquet {parquet_file.stat().st_size / 1e6:7.2f} MB")
+
+        # Cada lectura en un proceso nuevo: el pico de RSS no arrastra lecturas anteriores
+        context = multiprocessing.get_context('spawn')
+        for label, columns in (('completo', None), ('proyectado (5 col.)', projection)):
+            measures = {}
+            for name, path in (('CSV', csv_file), ('Parquet', parquet_file)):
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    measures[name] = executor.submit(_load_rss, path, columns).result()
+            (csv_s, csv_mb), (pq_s, pq_mb) = measures['CSV'], measures['Parquet']
+            print(f"{label:<28} CSV {csv_s * 1000:7.1f} ms {csv_mb:7.1f} MB RSS | "
+                  f"Parquet {pq_s * 1000:7.1f} ms {pq_mb:7.1f} MB RSS "
+                  f"({csv_s / pq_s:4.1f}x tiempo, {csv_mb / max(pq_mb, 0.1):4.1f}x memoria)")
+
+
+if __name__ == "__main__":
+    import tempfile
+    for test in (test_round_trip_schema, test_projection_and_errors, test_duplicated_columns_rejected,
+                 test_load_estimation_resolves_recalculated_columns,
+                 test_csv_fallback_and_conversion, test_network_scripts_with_categorical_columns):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    test_registry_uses_parquet()
+    print("Tests de almacenamiento Parquet: OK")
+
+    benchmark_load()
@@ -0,0 +1,323 @@
+"""
+Script de Testing del Pipeline Incremental
+==========================================
+Objetivo: Validar src/pipeline/runner.py (huellas por contenido y
+configuración, etapas al día salteadas, corte temprano, bloqueo de
+dependientes ante fallas, tiempo y memoria por etapa), la caché por
+alimentador de src/network/feeder_runner.py y el registro de etapas de los
+scripts 00 → 16, y medir el recálculo cuando cambia un solo alimentador.
+"""
+
+import ast
+import contextlib
+import io
+import sys
+import textwrap
+import time
+from functools import partial
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+import pandas as pd
+import pytest
+
+from src.network.feeder_runner import FeederCache, run_feeders
+from src.pipeline.runner import PipelineRunner, Stage, format_report, run_report, validate_stages
+from src.pipeline.stages import pipeline_stages
+from test_feeder_runner import load_script, synthetic_network
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(textwrap.dedent(text))
+
+
+def fake_project(root):
+    """
+    Pipeline de juguete: raw -> doble -> suma, más una etapa independiente
+    que reserva ~60 MB, y un parámetro de configuración.
+    """
+    write(root / 'data/raw.csv', "x\n1\n2\n3\n")
+    write(root / 'config/params.yaml', "factor: 2\n")
+    write(root / 'scripts/double.py', """
+        import pandas as pd, yaml
+        factor = yaml.safe_load(open('config/params.yaml'))['factor']
+        df = pd.read_csv('data/raw.csv')
+        # Solo la paridad de x importa: cambiar 1 por 3 da la misma salida
+        pd.DataFrame({'y': (df['x'] % 2) * factor}).to_csv('data/double.csv', index=False)
+    """)
+    write(root / 'scripts/total.py', """
+        import json, pandas as pd
+        json.dump({'total': int(pd.read_csv('data/double.csv')['y'].sum())}, open('data/total.json', 'w'))
+    """)
+    write(root / 'scripts/memory.py', """
+        block = bytearray(60 * 10**6)
+        open('data/memory.txt', 'w').write(str(len(block)))
+    """)
+    return [
+        Stage('double', 'scripts/double.py', inputs=['data/raw.csv'], outputs=['data/double.csv'],
+              config=['config/params.yaml']),
+        Stage('total', 'scripts/total.py', inputs=['data/double.csv'], outputs=['data/total.json']),
+        Stage('memory', 'scripts/memory.py', outputs=['data/memory.txt']),
+    ]
+
+
+def statuses(runs):
+    return {r.name: r.status for r in runs}
+
+
+def test_skips_up_to_date_and_propagates_changes(tmp_path):
+    """Huellas por contenido: solo se re-ejecuta lo afectado, con corte temprano"""
+    stages = fake_project(tmp_path)
+    runner = PipelineRunner(stages, tmp_path)
+    assert statuses(runner.run()) == {'double': 'ejecutada', 'total': 'ejecutada', 'memory': 'ejecutada'}
+    assert (tmp_path / 'data/total.json').read_text() == '{"total": 4}'
+
+    # Sin cambios (y con un runner nuevo que lee el estado de disco): nada se ejecuta
+    runner = PipelineRunner(stages, tmp_path)
+    assert set(statuses(runner.run()).values()) == {'al día'}
+
+    # Tocar la fecha sin cambiar el contenido no invalida
+    raw = tmp_path / 'data/raw.csv'
+    raw.write_text(raw.read_text())
+    assert set(statuses(runner.run()).values()) == {'al día'}
+
+    # Configuración: se re-ejecutan double y su dependiente
+    write(tmp_path / 'config/params.yaml', "factor: 3\n")
+    runs = runner.run()
+    assert statuses(runs) == {'double': 'ejecutada', 'total': 'ejecutada', 'memory': 'al día'}
+    assert 'config/params.yaml' in runs[0].reason
+    assert (tmp_path / 'data/total.json').read_text() == '{"total": 6}'
+
+    # Entrada distinta pero salida idéntica: total queda al día (corte temprano)
+    write(tmp_path / 'data/raw.csv', "x\n3\n2\n1\n")
+    assert statuses(runner.run()) == {'double': 'ejecutada', 'total': 'al día', 'memory': 'al día'}
+
+    # Salida borrada o modificada a mano: se regenera
+    (tmp_path / 'data/total.json').unlink()
+    assert statuses(runner.run())['total'] == 'ejecutada'
+    write(tmp_path / 'data/memory.txt', "editado")
+    runs = runner.run()
+    assert statuses(runs)['memory'] == 'ejecutada' and 'modificado' in runs[2].reason
+
+
+def test_failures_block_dependents_and_dry_run(tmp_path):
+    """Una etapa fallida bloquea a sus dependientes; --dry-run no ejecuta nada"""
+    stages = fake_project(tmp_path)
+    stages.append(Stage('after_total', 'scripts/total.py', inputs=['data/total.json'], outputs=['data/x.json']))
+    write(tmp_path / 'scripts/total.py', "raise SystemExit(3)\n")
+    runner = PipelineRunner(stages, tmp_path)
+
+    planned = runner.run(dry_run=True)
+    assert set(statuses(planned).values()) == {'pendiente'}
+    assert not (tmp_path / 'data/double.csv').exists()
+
+    runs = runner.run()
+    assert statuses(runs) == {'double': 'ejecutada', 'total': 'fallida', 'memory': 'ejecutada',
+                              'after_total': 'bloqueada'}
+    assert runs[1].reason == 'código de salida 3'
+    assert 'total' not in runner.state['stages']
+
+    # Código de salida 0 pero sin la salida declarada también es falla
+    write(tmp_path / 'scripts/total.py', "pass\n")
+    assert statuses(runner.run(only=['total']))['total'] == 'fallida'
+
+
+def test_peak_memory_and_report(tmp_path):
+    """Pico de memoria del proceso hijo y reporte de la corrida"""
+    runner = PipelineRunner(fake_project(tmp_path), tmp_path)
+    runs = runner.run()
+    memory = {r.name: r.peak_memory_mb for r in runs}
+    assert memory['memory'] >= 60
+    assert all(r.wall_time_s > 0 for r in runs)
+
+    report = run_report(runs)
+    assert report['etapas_por_estado'] == {'ejecutada': 3}
+    assert report['pico_memoria_max_mb'] == memory['memory']
+    assert 'memory' in format_report(runs)
+
+
+def test_selection_and_validation(tmp_path):
+    """--only con --downstream y dependencias hacia adelante rechazadas"""
+    stages = fake_project(tmp_path)
+    runner = PipelineRunner(stages, tmp_path)
+    assert [s.name for s in runner.select(['double'], downstream=True)] == ['double', 'total']
+    assert [s.name for s in runner.select(['double'])] == ['double']
+    with pytest.raises(ValueError, match='desconocidas'):
+        runner.select(['nope'])
+
+    with pytest.raises(ValueError, match='etapa posterior'):
+        validate_stages(list(reversed(stages)))
+    with pytest.raises(ValueError, match='salida'):
+        validate_stages(stages + [Stage('again', 'scripts/double.py', outputs=['data/double.csv'])])
+
+
+ELECTRICAL_STAGES = tuple(f'network_analysis/0{i}_' for i in range(4, 9))
+
+
+def script_base_dir(script):
+    """Valor de BASE_DIR de un script (sin importarlo: evalúa solo esa asignación)"""
+    tree = ast.parse(script.read_text())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'BASE_DIR' for t in node.targets):
+            return eval(compile(ast.Expression(node.value), str(script), 'eval'),
+                        {'Path': Path, '__file__': str(script)})
+    return None
+
+
+def test_pipeline_registry():
+    """Las etapas 00 → 16 existen, están en orden y las por alimentador aceptan la caché"""
+    stages = pipeline_stages()
+    validate_stages(stages)
+    assert len(stages) == 6 + 9 + 9 + 2
+    for stage in stages:
+        assert (BASE_DIR / stage.script).exists(), stage.script
+        for path in stage.config + stage.code:
+            assert (BASE_DIR / path).exists(), path
+        # Las rutas de cada script salen del repositorio en que está (no de un checkout fijo)
+        assert '/Users/' not in (BASE_DIR / stage.script).read_text(), stage.script
+        if stage.per_feeder:
+            assert 'add_runner_arguments' in (BASE_DIR / stage.script).read_text()
+        if stage.name.startswith(ELECTRICAL_STAGES):
+            assert script_base_dir(BASE_DIR / stage.script) == BASE_DIR.resolve(), stage.script
+
+
+def src_imports(path, seen=None):
+    """Módulos de src que importa un archivo, directa o indirectamente (rutas relativas)"""
+    seen = set() if seen is None else seen
+    package = path.relative_to(BASE_DIR).parent.parts if path.is_relative_to(BASE_DIR / 'src') else ()
+    for node in ast.walk(ast.parse(path.read_text())):
+        if not isinstance(node, ast.ImportFrom):
+            continue
+        if node.level:
+            parts = list(package[:len(package) - node.level + 1]) + (node.module or '').split('.')
+        elif node.module and node.module.split('.')[0] == 'src':
+            parts = node.module.split('.')
+        else:
+            continue
+        module = BASE_DIR.joinpath(*parts)
+        module = module / '__init__.py' if module.is_dir() else module.with_suffix('.py')
+        relative = module.relative_to(BASE_DIR).as_posix()
+        if module.exists() and relative not in seen:
+            seen.add(relative)
+            src_imports(module, seen)
+    return seen
+
+
+def test_stage_code_covers_src_imports():
+    """Cada módulo de src que importa un script (también indirectamente) está en code"""
+    for stage in pipeline_stages():
+        for module in src_imports(BASE_DIR / stage.script):
+            if module.endswith('__init__.py') and (BASE_DIR / module).stat().st_size == 0:
+                continue
+            assert any(module == path or module.startswith(path.rstrip('/') + '/') for path in stage.code), \
+                f"{stage.name} importa {module} pero no lo declara en code"
+
+
+def test_code_change_marks_stage_outdated(tmp_path):
+    """Editar un módulo declarado en code re-ejecuta la etapa"""
+    write(tmp_path / 'src/helpers.py', "FACTOR = 2\n")
+    stages = fake_project(tmp_path)
+    stages[0].code = ['src/helpers.py']
+    runner = PipelineRunner(stages, tmp_path)
+    runner.run()
+    assert runner.outdated_reason(stages[0]) is None
+
+    write(tmp_path / 'src/helpers.py', "FACTOR = 3\n")
+    assert runner.outdated_reason(stages[0]) == 'cambió src/helpers.py'
+    assert statuses(runner.run())['double'] == 'ejecutada'
+
+
+def _feeder_size(feeder, df_feeder, top=()):
+    return df_feeder.assign(doble=df_feeder['Potencia'] * 2)
+
+
+def test_feeder_cache_recomputes_changed_feeders_only(tmp_path):
+    """Solo los alimentadores cuyos datos cambiaron se recalculan"""
+    df = synthetic_network(n_feeders=6, mean_size=30, seed=5)
+    cache = FeederCache(tmp_path / 'cache')
+    first = run_feeders(_feeder_size, df, cache=cache)
+    assert not any(r.cached for r in first) and cache.misses == 6
+
+    cache = FeederCache(tmp_path / 'cache')
+    again = run_feeders(_feeder_size, df, cache=cache)
+    assert all(r.cached for r in again) and cache.hits == 6
+    for a, b in zip(first, again):
+        pd.testing.assert_frame_equal(a.result, b.result)
+
+    # Cambia un alimentador y se insertan filas antes de otro (índices corridos)
+    changed = df.copy()
+    feeder = changed['Alimentador'].unique()[2]
+    changed.loc[changed['Alimentador'] == feeder, 'Potencia'] += 1
+    changed = pd.concat([changed.iloc[:1].assign(Alimentador='NUEVO'), changed], ignore_index=True)
+    cache = FeederCache(tmp_path / 'cache')
+    results = run_feeders(_feeder_size, changed, cache=cache)
+    recomputed = {r.feeder for r in results if not r.cached}
+    assert recomputed == {feeder, 'NUEVO'}
+    expected = run_feeders(_feeder_size, changed)
+    for a, b in zip(results, expected):
+        pd.testing.assert_frame_equal(a.result, b.result)
+
+    # Las entradas del alimentador viejo se eliminan
+    assert len(list((tmp_path / 'cache').glob('*.pkl'))) == changed['Alimentador'].nunique()
+
+
+def test_feeder_cache_with_script_05(tmp_path):
+    """El script 05 con caché da lo mismo; cambiar argumentos fijos invalida"""
+    script = load_script("05_electrical_distance_calculation.py")
+    df = synthetic_network(n_feeders=4, mean_size=30, seed=6)
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = run_feeders(script.process_feeder, df, min_rows=2)
+        run_feeders(script.process_feeder, df, min_rows=2, cache=FeederCache(tmp_path))
+        cached = run_feeders(script.process_feeder, df, min_rows=2, cache=FeederCache(tmp_path))
+    assert all(r.cached for r in cached)
+    for a, b in zip(expected, cached):
+        pd.testing.assert_frame_equal(a.result[0], b.result[0])
+
+    # Los sets se normalizan (su orden cambia entre procesos); otro valor invalida
+    code = FeederCache.code_digest(partial(_feeder_size, top={'b', 'a', 'c'}))
+    assert code == FeederCache.code_digest(partial(_feeder_size, top={'c', 'a', 'b'}))
+    assert code != FeederCache.code_digest(partial(_feeder_size, top={'a'}))
+    assert code != FeederCache.code_digest(script.process_feeder)
+
+
+def benchmark_incremental_recompute(n_transformers=14000):
+    """Script 05 sobre la red completa: desde cero vs un alimentador modificado"""
+    import tempfile
+    script = load_script("05_electrical_distance_calculation.py")
+    df = synthetic_network(n_feeders=140, mean_size=n_transformers / 140, seed=7)
+
+    print("=" * 80)
+    print(f"PIPELINE INCREMENTAL - script 05, {len(df):,} transformadores, "
+          f"{df['Alimentador'].nunique()} alimentadores")
+    print("=" * 80)
+
+    changed = df.copy()
+    feeder = changed['Alimentador'].value_counts().index[0]
+    changed.loc[changed['Alimentador'] == feeder, 'Potencia'] += 10
+
+    with tempfile.TemporaryDirectory() as cache_dir, contextlib.redirect_stdout(io.StringIO()):
+        timings = {}
+        for label, data in (('desde cero', df), ('sin cambios', df), ('1 alimentador', changed)):
+            start = time.perf_counter()
+            run_feeders(script.process_feeder, data, min_rows=2, cache=FeederCache(cache_dir))
+            timings[label] = time.perf_counter() - start
+    for label, elapsed in timings.items():
+        print(f"{label:>14}: {elapsed:7.2f} s ({timings['desde cero'] / elapsed:5.1f}x)")
+
+
+if __name__ == "__main__":
+    import tempfile
+    for test in (test_skips_up_to_date_and_propagates_changes, test_failures_block_dependents_and_dry_run,
+                 test_peak_memory_and_report, test_selection_and_validation, test_code_change_marks_stage_outdated,
+                 test_feeder_cache_recomputes_changed_feeders_only, test_feeder_cache_with_script_05):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    test_pipeline_registry()
+    test_stage_code_covers_src_imports()
+    print("Tests de pipeline incremental: OK")
+
+    benchmark_incremental_recompute()
@@ -0,0 +1,219 @@
+"""
+Script de Testing del Cubo Resumen del Dashboard
+================================================
+Objetivo: Validar dashboard/utils/summary_cube.py (celdas aditivas, cortes y
+re-agrupaciones exactas, persistencia junto a los datos con la firma del
+archivo de origen) y que las funciones de resumen de data_loader dan lo
+mismo que los groupby sobre el dataset completo; medir ambas versiones.
+"""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.utils import data_loader
+from dashboard.utils.data_service import data_service
+from dashboard.utils.summary_cube import build_cube, cube_path, load_or_build_cube, read_cube, write_cube
+from src.pipeline.store import read_frame, write_frame
+from test_feeder_runner import synthetic_network
+
+
+def transformers(n_feeders=10, seed=0):
+    """Red sintética con todas las dimensiones del cubo y algunos faltantes"""
+    rng = np.random.default_rng(seed)
+    df = synthetic_network(n_feeders=n_feeders, mean_size=40, seed=seed)
+    df['N_Sucursal'] = np.where(df.index % 3 == 0, 'BARILOCHE', 'VIEDMA')
+    df['nivel_vulnerabilidad'] = rng.choice(['Crítica', 'Alta', 'Media', 'Baja', 'Mínima'], len(df))
+    df['size_category'] = pd.cut(df['Potencia'], [0, 63, 160, 10000], labels=['Pequeño', 'Mediano', 'Grande']).astype(str)
+    df['indice_vulnerabilidad_compuesto'] = rng.random(len(df))
+    df.loc[df.index % 17 == 0, 'indice_vulnerabilidad_compuesto'] = np.nan
+    df.loc[df.index % 23 == 0, 'Resultado'] = None
+    df.loc[df.index % 29 == 0, 'tipo_zona'] = None
+    return df
+
+
+@pytest.fixture
+def loaded(tmp_path, monkeypatch):
+    """Dataset sintético registrado como 'transformadores' en el servicio compartido"""
+    df = transformers()
+    path = write_frame(df, tmp_path / 'transformadores_con_topologia.parquet')
+    monkeypatch.setattr(data_service, '_datasets', dict(data_service._datasets))
+    data_service.register('transformadores', [(path, read_frame)], default=pd.DataFrame,
+                          index_by=('N_Sucursal', 'Alimentador'))
+    monkeypatch.setattr(data_loader, 'load_alimentadores', pd.DataFrame)
+    return read_frame(path), path
+
+
+def test_slices_match_groupby():
+    """Cortes y re-agrupaciones del cubo coinciden con groupby sobre las filas"""
+    df = transformers()
+    cube = build_cube(df)
+    assert len(cube.cells) < len(df)
+    assert cube.totals()['transformadores'] == len(df)
+    assert cube.totals()['problemas'] == (df['Resultado'] != 'Correcta').sum()
+
+    rows = df[(df['N_Sucursal'] == 'VIEDMA') & (df['tipo_zona'] == 'Urbano')]
+    by_feeder = cube.slice(N_Sucursal='VIEDMA', tipo_zona='Urbano', Resultado='all').by('Alimentador')
+    expected = rows.groupby('Alimentador').agg(transformadores=('Codigo', 'size'), potencia_kva=('Potencia', 'sum'),
+                                               usuarios=('Q_Usuarios', 'sum'),
+                                               vulnerabilidad=('indice_vulnerabilidad_compuesto', 'mean'))
+    np.testing.assert_array_equal(by_feeder['transformadores'], expected['transformadores'])
+    np.testing.assert_allclose(by_feeder['potencia_kva'], expected['potencia_kva'])
+    np.testing.assert_array_equal(by_feeder['usuarios'], expected['usuarios'])
+    np.testing.assert_allclose(by_feeder['vulnerabilidad_promedio'], expected['vulnerabilidad'])
+
+    # Memorizado por corte; modificar un resultado no cambia el memorizado
+    assert cube.slice(N_Sucursal='VIEDMA', tipo_zona='Urbano') is cube.slice(tipo_zona='Urbano', N_Sucursal='VIEDMA')
+    by_feeder['transformadores'] = 0
+    assert (cube.slice(N_Sucursal='VIEDMA', tipo_zona='Urbano').by('Alimentador')['transformadores'] > 0).all()
+
+    # Dimensiones inexistentes se ignoran al cortar y fallan al agrupar
+    assert len(cube.slice(no_existe='x').cells) == len(cube.cells)
+    with pytest.raises(KeyError):
+        cube.by('no_existe')
+    assert cube.count('nivel_vulnerabilidad', order=['Crítica', 'Otra']).tolist() == [
+        (df['nivel_vulnerabilidad'] == 'Crítica').sum(), 0]
+
+
+def test_persisted_cube_follows_source_version(tmp_path):
+    """El cubo se guarda junto a los datos y se invalida cuando cambia el archivo"""
+    source = write_frame(transformers(), tmp_path / 'datos.parquet')
+    df = read_frame(source)
+    stat = source.stat()
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    built = load_or_build_cube(df, source, signature)
+    assert cube_path(source).exists()
+    stored = read_cube(cube_path(source), source, signature)
+    pd.testing.assert_frame_equal(stored.cells, built.cells)
+    assert stored.dimensions == built.dimensions
+    assert isinstance(stored.cells['Alimentador'].dtype, pd.CategoricalDtype)
+
+    assert read_cube(cube_path(source), source, (signature[0] + 1, signature[1])) is None
+    assert load_or_build_cube(df.head(10), source, (signature[0] + 1, signature[1])).totals()['transformadores'] == 10
+
+    # Varios workers guardan el cubo a la vez (tras un cambio de datos): sin .tmp compartido
+    threads = [threading.Thread(target=write_cube, args=(built, cube_path(source), source, signature))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert read_cube(cube_path(source), source, signature) is not None
+    assert not list(tmp_path.glob('*.tmp'))
+
+    # Sin archivo de origen (valores por defecto) no se guarda nada
+    assert load_or_build_cube(df, None, None).totals()['transformadores'] == len(df)
+    assert build_cube(pd.DataFrame()).empty
+
+
+def test_data_loader_summaries_match_full_scan(loaded):
+    """Métricas y distribuciones desde el cubo = cálculo directo sobre el dataset"""
+    df, path = loaded
+    metrics = data_loader.get_summary_metrics()
+    assert metrics['total_transformadores'] == len(df)
+    assert metrics['total_usuarios'] == df['Q_Usuarios'].sum()
+    assert metrics['capacidad_total_mva'] == pytest.approx(df['Potencia'].sum() / 1000)
+    assert metrics['tasa_problemas'] == pytest.approx((df['Resultado'] != 'Correcta').mean() * 100)
+    assert metrics['transformadores_criticos'] == (df['nivel_vulnerabilidad'] == 'Crítica').sum()
+    assert metrics['alimentadores_total'] == df['Alimentador'].nunique()
+
+    quality = data_loader.get_quality_distribution()
+    expected = df['Resultado'].astype(object).value_counts()
+    assert list(quality.columns) == ['Resultado', 'count']
+    assert dict(zip(quality['Resultado'], quality['count'])) == expected.to_dict()
+
+    vulnerability = data_loader.get_vulnerability_distribution()
+    assert vulnerability['nivel_vulnerabilidad'].tolist() == ['Crítica', 'Alta', 'Media', 'Baja', 'Mínima']
+    assert vulnerability['count'].sum() == len(df)
+
+    summary = data_loader.get_feeder_summary()
+    grouped = df.groupby('Alimentador', observed=True)
+    np.testing.assert_array_equal(summary['num_transformadores'], grouped.size())
+    np.testing.assert_allclose(summary['tasa_problemas'],
+                               grouped['Resultado'].apply(lambda x: (x != 'Correcta').mean()).round(3))
+    np.testing.assert_allclose(summary['vulnerabilidad_promedio'],
+                               grouped['indice_vulnerabilidad_compuesto'].mean().round(3))
+
+    # Calculado una vez por versión y guardado junto a los datos
+    assert data_loader.get_summary_cube() is data_loader.get_summary_cube()
+    assert cube_path(path).exists()
+
+
+def benchmark_summaries(n_transformers=14000, n_views=20):
+    """Funciones de resumen del home: groupby sobre el dataset vs cortes del cubo"""
+    import tempfile
+    df = synthetic_network(n_feeders=140, mean_size=n_transformers / 140, seed=7)
+    df['N_Sucursal'] = np.where(df.index % 3 == 0, 'BARILOCHE', 'VIEDMA')
+    df['nivel_vulnerabilidad'] = np.random.default_rng(1).choice(['Crítica', 'Alta', 'Media', 'Baja', 'Mínima'], len(df))
+    df['indice_vulnerabilidad_compuesto'] = np.random.default_rng(2).random(len(df))
+
+    print("=" * 80)
+    print(f"CUBO RESUMEN - {len(df):,} transformadores, {n_views} vistas del home")
+    print("=" * 80)
+
+    def full_scan(frame):
+        metrics = {'tasa': (frame['Resultado'] != 'Correcta').mean(), 'usuarios': frame['Q_Usuarios'].sum(),
+                   'criticos': len(frame[frame['nivel_vulnerabilidad'] == 'Crítica']),
+                   'alimentadores': frame['Alimentador'].nunique()}
+        frame['Resultado'].value_counts()
+        frame['nivel_vulnerabilidad'].value_counts()
+        frame.groupby('Alimentador', observed=True).agg({
+            'Codigo': 'count', 'Potencia': 'sum', 'Q_Usuarios': 'sum',
+            'Resultado': lambda x: (x != 'Correcta').mean()})
+        return metrics
+
+    def from_cube(cube):
+        totals = cube.totals()
+        metrics = {'tasa': totals['problemas'] / totals['transformadores'], 'usuarios': totals['usuarios'],
+                   'criticos': cube.slice(nivel_vulnerabilidad='Crítica').totals()['transformadores'],
+                   'alimentadores': cube.nunique('Alimentador')}
+        cube.count('Resultado')
+        cube.count('nivel_vulnerabilidad')
+        cube.by('Alimentador')
+        return metrics
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = write_frame(df, Path(tmp) / 'datos.parquet')
+        frame = read_frame(source)
+        stat = source.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        start = time.perf_counter()
+        load_or_build_cube(frame, source, signature)
+        build_s = time.perf_counter() - start
+        start = time.perf_counter()
+        cube = load_or_build_cube(frame, source, signature)
+        read_s = time.perf_counter() - start
+        print(f"{'construcción':<22} {build_s * 1000:8.2f} ms | lectura del guardado {read_s * 1000:6.2f} ms "
+              f"({len(cube.cells):,} celdas, {os.path.getsize(cube_path(source)) / 1e3:.0f} kB)")
+
+        baseline = None
+        for label, view, data in (('groupby por vista', full_scan, frame), ('cubo por vista', from_cube, cube)):
+            start = time.perf_counter()
+            for _ in range(n_views):
+                result = view(data)
+            elapsed = (time.perf_counter() - start) / n_views
+            baseline = baseline or elapsed
+            print(f"{label:<22} {elapsed * 1000:8.2f} ms ({baseline / elapsed:6.1f}x)")
+        assert result['alimentadores'] == frame['Alimentador'].nunique()
+
+
+if __name__ == "__main__":
+    import tempfile
+    test_slices_match_groupby()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_persisted_cube_follows_source_version(Path(tmp))
+    print("Tests del cubo resumen: OK")
+
+    benchmark_summaries()
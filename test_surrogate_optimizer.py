@@ -0,0 +1,84 @@
+"""
+Script de Testing de la Búsqueda Asistida por Sustituto
+=======================================================
+Objetivo: Comparar ClusterOptimizer con method='surrogate' contra
+differential_evolution: evaluaciones del modelo completo y calidad del NPV.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+sys.path.append(str(BASE_DIR / "src"))
+
+import numpy as np
+import pandas as pd
+
+from src.config.config_loader import get_config
+from src.optimization.cluster_optimizer import ClusterOptimizer
+
+CLUSTERS_FILE = BASE_DIR / "reports" / "clustering" / "optimization" / "clusters_optimization_data.parquet"
+
+
+def load_clusters():
+    """Carga los datos de clusters usados por el optimizador"""
+    return [row.to_dict() for _, row in pd.read_parquet(CLUSTERS_FILE).iterrows()]
+
+
+def compare_methods(clusters):
+    """Optimiza cada cluster con DE y con el sustituto"""
+    # Sin arranque en caliente: ambos métodos parten de cero
+    opt_params = {**get_config().get_section('optimization_algorithm'), 'warm_start': False}
+    de = ClusterOptimizer(optimization_params=opt_params)
+    surrogate = ClusterOptimizer(optimization_params={**opt_params, 'method': 'surrogate'})
+
+    rows = []
+    for cluster in clusters:
+        start = time.perf_counter()
+        de_result = de.optimize_cluster(cluster)
+        de_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sg_result = surrogate.optimize_cluster(cluster)
+        sg_time = time.perf_counter() - start
+
+        rows.append({
+            'cluster_id': cluster['cluster_id'],
+            'de_evaluations': de_result.iterations,
+            'surrogate_evaluations': sg_result.iterations,
+            'de_npv_musd': de_result.npv_usd / 1e6,
+            'surrogate_npv_musd': sg_result.npv_usd / 1e6,
+            'npv_gap_percent': (de_result.npv_usd - sg_result.npv_usd) / abs(de_result.npv_usd) * 100,
+            'de_time_s': de_time,
+            'surrogate_time_s': sg_time,
+            'surrogate_status': sg_result.optimization_status
+        })
+    return pd.DataFrame(rows)
+
+
+def test_surrogate_saves_evaluations():
+    """El sustituto usa muchas menos evaluaciones con NPV equivalente"""
+    df = compare_methods(load_clusters()[:3])
+
+    assert (df['surrogate_evaluations'] <= 90).all()
+    assert df['de_evaluations'].sum() >= 10 * df['surrogate_evaluations'].sum()
+    assert (df['npv_gap_percent'] < 2.0).all()
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("SUSTITUTO (GP) vs DIFFERENTIAL EVOLUTION")
+    print("=" * 80)
+
+    df = compare_methods(load_clusters())
+    print(df.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+    ratio = df['de_evaluations'].sum() / df['surrogate_evaluations'].sum()
+    print(f"\nEvaluaciones DE: {df['de_evaluations'].sum():,}")
+    print(f"Evaluaciones sustituto: {df['surrogate_evaluations'].sum():,}")
+    print(f"Reducción: {ratio:.1f}x")
+    print(f"Brecha NPV: media {df['npv_gap_percent'].mean():.3f}%, "
+          f"máxima {df['npv_gap_percent'].max():.3f}%")
@@ -0,0 +1,122 @@
+"""
+Script de Testing de Características Topológicas en O(n)
+========================================================
+Objetivo: Validar src/network/tree_features.py contra el cálculo nodo por
+nodo con NetworkX del script 04 (saltos, hojas, kVA/usuarios aguas abajo,
+descendientes, padre e intermediación) y medir ambos por alimentador.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from src.network.mst_topology import NO_PARENT, minimum_spanning_parents, mst_to_digraph
+from src.network.tree_features import (FEATURE_COLUMNS, calculate_tree_features, tree_levels,
+                                       topology_features_frame)
+
+
+def synthetic_mst(n, seed=0):
+    """MST dirigido de un alimentador sintético (subestación + n trafos)"""
+    rng = np.random.default_rng(seed)
+    lat = np.concatenate([[-40.81], -40.81 + rng.normal(0, 0.05, n)])
+    lon = np.concatenate([[-62.99], -62.99 + rng.normal(0, 0.05, n)])
+    node_ids = ['SUBSTATION'] + [f'T{i:05d}' for i in range(n)]
+    potencia = [0] + rng.choice([25, 63, 100, 160, 315, 500], n).tolist()
+    usuarios = [0] + rng.integers(1, 200, n).tolist()
+    mst = minimum_spanning_parents(lat, lon)
+    return mst_to_digraph(node_ids, mst, lon, lat, potencia, usuarios)
+
+
+def reference_features(mst, node_id):
+    """Versión original por nodo de calculate_topology_features"""
+    features = {}
+    try:
+        path = nx.shortest_path(mst, 'SUBSTATION', node_id)
+        features['numero_saltos'] = len(path) - 1
+    except nx.NetworkXNoPath:
+        features['numero_saltos'] = -1
+    features['es_nodo_hoja'] = mst.out_degree(node_id) == 0
+    features['profundidad_arbol'] = features['numero_saltos']
+    descendants = nx.descendants(mst, node_id)
+    features['kVA_aguas_abajo'] = sum(mst.nodes[d]['potencia'] for d in descendants) + mst.nodes[node_id]['potencia']
+    features['usuarios_aguas_abajo'] = sum(mst.nodes[d]['usuarios'] for d in descendants) + mst.nodes[node_id]['usuarios']
+    features['num_descendientes'] = len(descendants)
+    predecessors = list(mst.predecessors(node_id))
+    features['padre_mst'] = predecessors[0] if predecessors else None
+    features['centralidad_intermediacion'] = nx.betweenness_centrality(mst.to_undirected()).get(node_id, 0)
+    return features
+
+
+def test_matches_networkx_per_node():
+    """Mismos valores que el cálculo por nodo para todos los transformadores"""
+    mst = synthetic_mst(120, seed=2)
+    frame = topology_features_frame(mst)
+    assert list(frame.columns) == FEATURE_COLUMNS
+
+    for node in list(mst.nodes)[1:]:
+        expected = reference_features(mst, node)
+        row = frame.loc[node]
+        for key, value in expected.items():
+            if key == 'centralidad_intermediacion':
+                assert row[key] == pytest.approx(value, abs=1e-12)
+            else:
+                assert row[key] == value, (node, key)
+
+
+def test_chain_and_unreachable_nodes():
+    """Cadena (alimentador lineal) y un nodo aislado sin camino a la raíz"""
+    parent = np.array([NO_PARENT, 0, 1, 2, 3, NO_PARENT])
+    features = calculate_tree_features(parent, [0, 10, 20, 30, 40, 50], [0, 1, 1, 1, 1, 1])
+
+    depth, levels = tree_levels(parent)
+    assert depth.tolist() == [0, 1, 2, 3, 4, -1]
+    assert [level.tolist() for level in levels] == [[0], [1], [2], [3], [4]]
+    assert features['kVA_aguas_abajo'].tolist() == [100, 100, 90, 70, 40, 50]
+    assert features['num_descendientes'].tolist() == [4, 3, 2, 1, 0, 0]
+    assert features['es_nodo_hoja'].tolist() == [False, False, False, False, True, True]
+
+    graph = nx.Graph([(0, 1), (1, 2), (2, 3), (3, 4)])
+    graph.add_node(5)
+    expected = nx.betweenness_centrality(graph)
+    np.testing.assert_allclose(features['centralidad_intermediacion'],
+                               [expected[i] for i in range(6)], atol=1e-12)
+
+
+def benchmark_tree_features(sizes=(50, 150, 1000, 20000)):
+    """Cálculo por nodo con NetworkX (hasta 150 nodos) vs una pasada"""
+    print("=" * 80)
+    print("CARACTERÍSTICAS TOPOLÓGICAS - por nodo (NetworkX) vs una pasada")
+    print("=" * 80)
+
+    for n in sizes:
+        mst = synthetic_mst(n, seed=n)
+
+        start = time.perf_counter()
+        topology_features_frame(mst)
+        fast_time = time.perf_counter() - start
+
+        if n <= 150:
+            start = time.perf_counter()
+            for node in list(mst.nodes)[1:]:
+                reference_features(mst, node)
+            reference_time = time.perf_counter() - start
+            print(f"{n:>6} nodos: por nodo {reference_time:8.2f} s | una pasada {fast_time:7.4f} s "
+                  f"({reference_time / fast_time:,.0f}x)")
+        else:
+            print(f"{n:>6} nodos: por nodo        - | una pasada {fast_time:7.4f} s")
+
+
+if __name__ == "__main__":
+    test_matches_networkx_per_node()
+    test_chain_and_unreachable_nodes()
+    print("Tests de características topológicas: OK")
+
+    benchmark_tree_features()
@@ -0,0 +1,144 @@
+"""
+Script de Testing del Motor de Superficies de Valor
+===================================================
+Objetivo: Validar src/economics/value_surface.py (grillas de resolución
+arbitraria, dataset Parquet particionado por cluster_id y recálculo
+incremental) y medir el costo de evaluar todos los clusters.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+import numpy as np
+import pandas as pd
+
+from src.economics.integrated_cash_flow import IntegratedCashFlowCalculator
+from src.economics.network_benefits import NetworkBenefitsCalculator
+from src.economics.value_surface import SurfaceGrid, ValueSurfaceStore, evaluate_surface
+
+CLUSTERS_FILE = BASE_DIR / "reports" / "clustering" / "optimization" / "clusters_optimization_data.parquet"
+
+
+def _capex(pv_mw, bess_mwh, q_night_mvar):
+    """CAPEX simplificado por componente (acepta arrays)"""
+    pv = pv_mw * 8e5
+    bess = bess_mwh * 2.5e5
+    q = q_night_mvar * 4e4
+    return {'pv': pv, 'bess': bess, 'q_night': q, 'total': (pv + bess + q) * 1.15}
+
+
+def _store(root, params=None):
+    return ValueSurfaceStore(root, IntegratedCashFlowCalculator(params),
+                             NetworkBenefitsCalculator(), _capex)
+
+
+def load_clusters(n=None):
+    clusters = pd.read_parquet(CLUSTERS_FILE)
+    return clusters if n is None else clusters.head(n)
+
+
+def test_grid_linspace_matches_default_axes():
+    """La grilla por defecto reproduce los ejes históricos del script 16"""
+    grid = SurfaceGrid.linspace()
+    assert grid.pv_ratios == (0.5, 0.75, 1.0, 1.25, 1.5, 1.75, 2.0)
+    assert grid.bess_hours == (0, 1, 2, 3, 4)
+    assert grid.q_ratios == (0, 0.1, 0.2, 0.3)
+    assert len(grid.points()) == grid.size == 140
+
+
+def test_batch_network_benefits_match_scalar():
+    """Los beneficios de red vectorizados coinciden con el calculador escalar"""
+    calc = NetworkBenefitsCalculator()
+    cluster = load_clusters(1).iloc[0].to_dict()
+    pv = np.array([0.5, 3.0, 12.0, 40.0])
+    bess = np.array([0.0, 2.0, 0.0, 30.0])
+    q = np.array([0.0, 0.6, 1.2, 9.0])
+
+    batch = calc.calculate_benefit_values_batch(cluster, pv, bess, q)
+    for i in range(len(pv)):
+        scalar = calc.calculate_all_benefits(cluster, pv[i], bess[i], q[i])
+        for name in ('loss_reduction', 'voltage_support', 'investment_deferral'):
+            assert np.isclose(batch[name][i], scalar[name].value_usd, rtol=1e-12, atol=1e-9)
+
+
+def test_store_is_incremental():
+    """Solo se recalculan clusters modificados y puntos de grilla nuevos"""
+    clusters = load_clusters(3)
+    coarse = SurfaceGrid.linspace(pv_points=4, bess_points=3, q_points=2)
+    fine = SurfaceGrid.linspace(pv_points=7, bess_points=5, q_points=2)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _store(tmp)
+        assert set(store.update(clusters, coarse).values()) == {coarse.size}
+        assert set(store.update(clusters, coarse).values()) == {0}
+
+        # Grilla más fina: solo los puntos que faltan
+        added = fine.size - len(fine.points().merge(coarse.points()))
+        assert set(store.update(clusters, fine).values()) == {added}
+
+        # Cambia un cluster: solo ese se recalcula completo
+        changed = clusters.copy()
+        changed.loc[changed.index[1], 'peak_demand_mw'] *= 1.1
+        evaluated = store.update(changed, fine)
+        cluster_ids = [str(cid) for cid in clusters['cluster_id']]
+        assert evaluated == {cluster_ids[0]: 0, cluster_ids[1]: fine.size, cluster_ids[2]: 0}
+
+        # Cambian los parámetros económicos: se recalcula todo
+        params = store.cash_flow_calc.params
+        other = _store(tmp, {**params, 'discount_rate': params['discount_rate'] + 0.01})
+        assert set(other.update(changed, fine).values()) == {fine.size}
+
+        # El dataset (Hive) y la lectura por store coinciden con la evaluación directa
+        surface = other.load([clusters['cluster_id'].iloc[0]], grid=fine)
+        direct = evaluate_surface(other.cash_flow_calc, other.network_calc,
+                                  changed.iloc[0], fine.points(), _capex)
+        assert surface['cluster_id'].iloc[0] == clusters['cluster_id'].iloc[0]
+        np.testing.assert_allclose(surface['npv_musd'], direct['npv_musd'], rtol=1e-12)
+        assert (Path(tmp) / f"cluster_id={cluster_ids[0]}" / "part.parquet").exists()
+
+        # Proyección de columnas y filtro de grilla
+        projected = other.load(columns=['npv_musd'], grid=coarse)
+        assert list(projected.columns) == ['cluster_id', 'npv_musd']
+        assert len(projected) == 3 * coarse.size
+
+
+def benchmark_value_surfaces(points=(31, 21, 16)):
+    """Grilla completa de todos los clusters: primera pasada vs. pasada al día"""
+    clusters = load_clusters()
+    grid = SurfaceGrid.linspace(pv_points=points[0], bess_points=points[1], q_points=points[2])
+
+    print("=" * 80)
+    print(f"SUPERFICIES DE VALOR - {len(clusters)} clusters × {grid.size:,} configuraciones")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _store(tmp)
+
+        start = time.perf_counter()
+        evaluated = store.update(clusters, grid)
+        elapsed = time.perf_counter() - start
+        total = sum(evaluated.values())
+        print(f"Primera pasada:   {elapsed:7.2f} s ({total / elapsed:,.0f} configuraciones/s)")
+
+        start = time.perf_counter()
+        store.update(clusters, grid)
+        print(f"Pasada al día:    {time.perf_counter() - start:7.2f} s")
+
+        start = time.perf_counter()
+        df = store.load(columns=['pv_ratio', 'bess_hours', 'q_ratio', 'npv_musd'])
+        print(f"Lectura dataset:  {time.perf_counter() - start:7.2f} s ({len(df):,} filas)")
+
+
+if __name__ == "__main__":
+    test_grid_linspace_matches_default_axes()
+    test_batch_network_benefits_match_scalar()
+    test_store_is_incremental()
+    print("Tests de superficies de valor: OK")
+
+    benchmark_value_surfaces()
@@ -0,0 +1,139 @@
+"""
+Script de Testing del Arranque en Caliente del Optimizador
+==========================================================
+Objetivo: Verificar la caché de soluciones (clave, vecino más cercano,
+serialización) y medir la re-optimización tras un cambio de parámetros.
+"""
+
+import sys
+import pickle
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+sys.path.append(str(BASE_DIR / "src"))
+
+import numpy as np
+import pandas as pd
+
+from src.config.config_loader import get_config
+from src.optimization import cluster_optimizer
+from src.optimization.cluster_optimizer import ClusterOptimizer, _init_worker
+from src.optimization.warm_start import WarmStartCache
+
+CLUSTERS_FILE = BASE_DIR / "reports" / "clustering" / "optimization" / "clusters_optimization_data.parquet"
+
+
+def load_clusters():
+    """Carga los datos de clusters usados por el optimizador"""
+    return [row.to_dict() for _, row in pd.read_parquet(CLUSTERS_FILE).iterrows()]
+
+
+def make_optimizer(cache, **economic_overrides):
+    """Optimizador DE con la caché dada y parámetros económicos modificados"""
+    config = get_config()
+    economic_params = {**config.get_economic_params(), **economic_overrides}
+    opt_params = {**config.get_section('optimization_algorithm'), 'warm_start': False}
+    return ClusterOptimizer(economic_params, optimization_params=opt_params,
+                            warm_start_cache=cache)
+
+
+def test_cache_key_and_lookup():
+    """La clave depende de cluster y parámetros; el vecino se escala por demanda"""
+    clusters = load_clusters()
+    params = {'electricity_price': 75.0, 'discount_rate': 0.1}
+    cache = WarmStartCache()
+
+    assert cache.lookup(clusters[0], params) is None
+    assert cache.make_key(clusters[0], params) == cache.make_key(dict(clusters[0]), dict(params))
+    assert cache.make_key(clusters[0], params) != cache.make_key(clusters[0], {**params, 'discount_rate': 0.11})
+
+    cache.store(clusters[0], params, [10.0, 5.0, 3.0], 1e6)
+    x, exact = cache.lookup(clusters[0], params)
+    assert exact and np.allclose(x, [10.0, 5.0, 3.0])
+
+    x, exact = cache.lookup(clusters[1], params)
+    scale = clusters[1]['peak_demand_mw'] / clusters[0]['peak_demand_mw']
+    assert not exact and np.allclose(x, np.array([10.0, 5.0, 3.0]) * scale)
+
+    # Viaja a los workers de DE/pool junto con el optimizador
+    restored = pickle.loads(pickle.dumps(cache))
+    assert len(restored) == 1 and restored.lookup(clusters[0], params)[1]
+
+
+def test_persistence_is_opt_in_and_concurrent_safe(tmp_path):
+    """Sin warm_start no hay archivo; guardados concurrentes se combinan sin .tmp compartido"""
+    assert ClusterOptimizer().warm_start_cache is None
+
+    cache_file = tmp_path / 'warm_start_cache.json'
+    caches = [WarmStartCache(cache_file) for _ in range(4)]
+    threads = [threading.Thread(target=lambda c=c, i=i: [
+        c.store({'cluster_id': f'C{i}-{j}', 'peak_demand_mw': 1.0 + j + 100 * i}, {'discount_rate': 0.1},
+                [1.0, 2.0, 0.5], 1e6)
+        for j in range(20)]) for i, c in enumerate(caches)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Cada instancia guarda sus 20 soluciones sin pisar las de las otras
+    assert len(WarmStartCache(cache_file)) == 80 and not list(tmp_path.glob('*.tmp'))
+
+    # Las entradas iniciales se suman a las del archivo (y se guardan con el próximo store)
+    extra = WarmStartCache()
+    extra.store({'cluster_id': 'X', 'peak_demand_mw': 1000.0}, {'discount_rate': 0.1}, [1.0, 2.0, 0.5], 1e6)
+    combined = WarmStartCache(cache_file, entries=extra.snapshot())
+    assert len(combined) == 81
+    combined.store({'cluster_id': 'Y', 'peak_demand_mw': 2000.0}, {'discount_rate': 0.1}, [1.0, 2.0, 0.5], 1e6)
+    assert len(WarmStartCache(cache_file)) == 82
+
+    # Una caché vacía también viaja a los workers del pool (no es None)
+    _init_worker(get_config().get_economic_snapshot(), get_config().get_optimization_constraints(),
+                 get_config().get_section('optimization_algorithm'), WarmStartCache().snapshot())
+    assert cluster_optimizer._worker_optimizer.warm_start_cache is not None
+
+
+def test_warm_start_reoptimization():
+    """Tras un cambio de tarifa, el arranque en caliente no pierde NPV"""
+    clusters = load_clusters()[:3]
+    cache = WarmStartCache()
+    for cluster in clusters:
+        make_optimizer(cache).optimize_cluster(cluster)
+
+    cold = make_optimizer(None, electricity_price=78.0)
+    warm = make_optimizer(WarmStartCache(entries=cache.snapshot()), electricity_price=78.0)
+    for cluster in clusters:
+        cold_result = cold.optimize_cluster(cluster)
+        warm_result = warm.optimize_cluster(cluster)
+        assert warm_result.optimization_status == 'optimal'
+        assert warm_result.npv_usd >= cold_result.npv_usd * 0.999
+        assert warm_result.iterations < cold_result.iterations
+
+
+if __name__ == "__main__":
+    import tempfile
+    test_cache_key_and_lookup()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_persistence_is_opt_in_and_concurrent_safe(Path(tmp))
+    test_warm_start_reoptimization()
+    print("Tests de arranque en caliente: OK")
+
+    print("=" * 80)
+    print("RE-OPTIMIZACIÓN DE TODOS LOS CLUSTERS TRAS CAMBIO DE TARIFA (+5%)")
+    print("=" * 80)
+
+    clusters = load_clusters()
+    cache = WarmStartCache()
+    for cluster in clusters:
+        make_optimizer(cache).optimize_cluster(cluster)
+
+    price = get_config().get_economic_params()['electricity_price'] * 1.05
+    for name, optimizer in [('Desde cero', make_optimizer(None, electricity_price=price)),
+                            ('Arranque en caliente', make_optimizer(cache, electricity_price=price))]:
+        start = time.perf_counter()
+        results = [optimizer.optimize_cluster(cluster) for cluster in clusters]
+        elapsed = time.perf_counter() - start
+        print(f"{name}: {elapsed:.1f} s, {sum(r.iterations for r in results):,} evaluaciones, "
+              f"NPV total {sum(r.npv_usd for r in results) / 1e6:,.2f} MUSD")